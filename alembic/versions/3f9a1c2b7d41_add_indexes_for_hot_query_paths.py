@@ -0,0 +1,59 @@
+"""Add indexes for hot query paths
+
+Revision ID: 3f9a1c2b7d41
+Revises: 24d29e869d63
+Create Date: 2026-10-19 09:12:03.417220
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a1c2b7d41"
+down_revision: Union[str, Sequence[str], None] = "24d29e869d63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_packages_upload_time"), "packages", ["upload_time"], unique=False
+    )
+    op.create_index(
+        "ix_packages_status_upload_time",
+        "packages",
+        ["status", "upload_time"],
+        unique=False,
+    )
+
+    # Metadata is one-to-one with Package; drop any stray duplicate rows so the
+    # unique index can be created.
+    op.execute(
+        "DELETE FROM metadata WHERE id NOT IN "
+        "(SELECT MIN(id) FROM metadata GROUP BY package_id)"
+    )
+    op.create_index(
+        op.f("ix_metadata_package_id"), "metadata", ["package_id"], unique=True
+    )
+    op.create_index(
+        "ix_metadata_product_code_version",
+        "metadata",
+        ["product_code", "version"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_metadata_upgrade_code"), "metadata", ["upgrade_code"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_metadata_upgrade_code"), table_name="metadata")
+    op.drop_index("ix_metadata_product_code_version", table_name="metadata")
+    op.drop_index(op.f("ix_metadata_package_id"), table_name="metadata")
+    op.drop_index("ix_packages_status_upload_time", table_name="packages")
+    op.drop_index(op.f("ix_packages_upload_time"), table_name="packages")
@@ -0,0 +1,31 @@
+"""Add installer_details to metadata
+
+Revision ID: 5d7c9e1f3b62
+Revises: e8a3f5b1c027
+Create Date: 2026-10-19 16:48:12.330571
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d7c9e1f3b62"
+down_revision: Union[str, Sequence[str], None] = "e8a3f5b1c027"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("metadata") as batch_op:
+        batch_op.add_column(sa.Column("installer_details", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("metadata") as batch_op:
+        batch_op.drop_column("installer_details")
@@ -0,0 +1,165 @@
+"""Move pipeline artifacts to a content-addressed blob table
+
+Revision ID: 7b2e4d9c0a15
+Revises: 3f9a1c2b7d41
+Create Date: 2026-10-19 11:40:27.905318
+
+"""
+
+import hashlib
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b2e4d9c0a15"
+down_revision: Union[str, Sequence[str], None] = "3f9a1c2b7d41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Artifact column -> whether the value is JSON (True) or plain text (False)
+ARTIFACT_COLUMNS = {
+    "instruction_result": True,
+    "rag_documentation": False,
+    "initial_script": True,
+    "generated_script": True,
+    "hallucination_report": True,
+    "corrections_applied": True,
+}
+
+
+def _encode(value: Any, as_json: bool) -> tuple[str, bytes, int]:
+    """Canonical payload encoding, mirroring src/app/artifacts.py."""
+    if as_json:
+        if isinstance(value, str):
+            value = json.loads(value)
+        payload = json.dumps(
+            value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+    else:
+        payload = str(value).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest(), zlib.compress(payload, 6), len(payload)
+
+
+def _decode(codec: str, data: bytes) -> str:
+    if codec != "zlib":
+        raise RuntimeError(f"Cannot downgrade artifact stored with codec {codec!r}")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    existing = {c["name"] for c in sa.inspect(bind).get_columns("packages")}
+
+    artifacts = op.create_table(
+        "artifacts",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("codec", sa.String(length=10), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+
+    with op.batch_alter_table("packages") as batch_op:
+        for name in ARTIFACT_COLUMNS:
+            batch_op.add_column(
+                sa.Column(f"{name}_hash", sa.String(length=64), nullable=True)
+            )
+            batch_op.create_foreign_key(
+                f"fk_packages_{name}_hash_artifacts",
+                "artifacts",
+                [f"{name}_hash"],
+                ["hash"],
+            )
+        # 206456dfa91c was generated empty; databases built purely from
+        # migrations never received this column.
+        if "pipeline_metadata" not in existing:
+            batch_op.add_column(
+                sa.Column("pipeline_metadata", sa.JSON(), nullable=True)
+            )
+
+    # Move inline values into the blob table, storing each distinct value once
+    present = [name for name in ARTIFACT_COLUMNS if name in existing]
+    if present:
+        rows = bind.execute(
+            sa.text(f"SELECT id, {', '.join(present)} FROM packages")
+        ).fetchall()
+        stored: set[str] = set()
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            updates = {}
+            for name in present:
+                value = getattr(row, name)
+                if value is None:
+                    continue
+                digest, data, size = _encode(value, ARTIFACT_COLUMNS[name])
+                if digest not in stored:
+                    bind.execute(
+                        artifacts.insert().values(
+                            hash=digest,
+                            codec="zlib",
+                            size=size,
+                            data=data,
+                            created_at=now,
+                        )
+                    )
+                    stored.add(digest)
+                updates[f"{name}_hash"] = digest
+            if updates:
+                assignments = ", ".join(f"{col} = :{col}" for col in updates)
+                bind.execute(
+                    sa.text(f"UPDATE packages SET {assignments} WHERE id = :id"),
+                    {**updates, "id": row.id},
+                )
+
+        with op.batch_alter_table("packages") as batch_op:
+            for name in present:
+                batch_op.drop_column(name)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+
+    with op.batch_alter_table("packages") as batch_op:
+        for name, as_json in ARTIFACT_COLUMNS.items():
+            batch_op.add_column(
+                sa.Column(name, sa.JSON() if as_json else sa.Text(), nullable=True)
+            )
+
+    blobs = {
+        row.hash: _decode(row.codec, row.data)
+        for row in bind.execute(sa.text("SELECT hash, codec, data FROM artifacts"))
+    }
+    hash_columns = [f"{name}_hash" for name in ARTIFACT_COLUMNS]
+    rows = bind.execute(
+        sa.text(f"SELECT id, {', '.join(hash_columns)} FROM packages")
+    ).fetchall()
+    for row in rows:
+        updates = {
+            name: blobs[getattr(row, f"{name}_hash")]
+            for name in ARTIFACT_COLUMNS
+            if getattr(row, f"{name}_hash") in blobs
+        }
+        if updates:
+            assignments = ", ".join(f"{col} = :{col}" for col in updates)
+            bind.execute(
+                sa.text(f"UPDATE packages SET {assignments} WHERE id = :id"),
+                {**updates, "id": row.id},
+            )
+
+    with op.batch_alter_table("packages") as batch_op:
+        for name in ARTIFACT_COLUMNS:
+            batch_op.drop_constraint(
+                f"fk_packages_{name}_hash_artifacts", type_="foreignkey"
+            )
+            batch_op.drop_column(f"{name}_hash")
+
+    op.drop_table("artifacts")
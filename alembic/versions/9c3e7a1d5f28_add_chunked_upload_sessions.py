@@ -0,0 +1,61 @@
+"""Add chunked upload sessions
+
+Revision ID: 9c3e7a1d5f28
+Revises: 5d7c9e1f3b62
+Create Date: 2026-10-19 18:02:37.514209
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3e7a1d5f28"
+down_revision: Union[str, Sequence[str], None] = "5d7c9e1f3b62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "upload_sessions",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_upload_sessions_updated_at"),
+        "upload_sessions",
+        ["updated_at"],
+        unique=False,
+    )
+    op.create_table(
+        "upload_chunks",
+        sa.Column("upload_id", sa.Uuid(), nullable=False),
+        sa.Column("index", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["upload_id"], ["upload_sessions.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("upload_id", "index"),
+    )
+    # Installers of several GB overflow a 32-bit size column
+    with op.batch_alter_table("upload_blobs") as batch_op:
+        batch_op.alter_column("size", existing_type=sa.Integer(), type_=sa.BigInteger())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("upload_blobs") as batch_op:
+        batch_op.alter_column("size", existing_type=sa.BigInteger(), type_=sa.Integer())
+    op.drop_table("upload_chunks")
+    op.drop_index(op.f("ix_upload_sessions_updated_at"), table_name="upload_sessions")
+    op.drop_table("upload_sessions")
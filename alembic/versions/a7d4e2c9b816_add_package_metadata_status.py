@@ -0,0 +1,35 @@
+"""Add metadata stage status to packages
+
+Revision ID: a7d4e2c9b816
+Revises: f3b6d8a2c519
+Create Date: 2026-10-20 16:48:22.519034
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d4e2c9b816"
+down_revision: Union[str, Sequence[str], None] = "f3b6d8a2c519"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Untracked (NULL) packages are never waited for; unfinished ones without
+    # metadata are re-queued, and marked, by resume_metadata_stage on startup
+    with op.batch_alter_table("packages") as batch_op:
+        batch_op.add_column(
+            sa.Column("metadata_status", sa.String(length=20), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("packages") as batch_op:
+        batch_op.drop_column("metadata_status")
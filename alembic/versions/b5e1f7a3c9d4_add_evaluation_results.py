@@ -0,0 +1,84 @@
+"""Add evaluation results
+
+Revision ID: b5e1f7a3c9d4
+Revises: 9c3e7a1d5f28
+Create Date: 2026-10-19 21:14:52.380116
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e1f7a3c9d4"
+down_revision: Union[str, Sequence[str], None] = "9c3e7a1d5f28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "evaluation_results",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("model_id", sa.String(length=100), nullable=False),
+        sa.Column("model_name", sa.String(length=255), nullable=False),
+        sa.Column("scenario_id", sa.String(length=100), nullable=False),
+        sa.Column("scenario_title", sa.String(length=255), nullable=False),
+        sa.Column("scenario_category", sa.String(length=100), nullable=True),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.Column("hallucinations_found", sa.Integer(), nullable=False),
+        sa.Column("hallucinations_corrected", sa.Integer(), nullable=False),
+        sa.Column("trust_score", sa.Float(), nullable=False),
+        sa.Column("evaluation_log", sa.String(length=500), nullable=False),
+        sa.Column("model_info", sa.JSON(), nullable=False),
+        sa.Column("scenario_info", sa.JSON(), nullable=False),
+        sa.Column("output_hash", sa.String(length=64), nullable=True),
+        sa.ForeignKeyConstraint(["output_hash"], ["artifacts.hash"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_evaluation_results_model_id_timestamp",
+        "evaluation_results",
+        ["model_id", "timestamp"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_evaluation_results_scenario_id_timestamp",
+        "evaluation_results",
+        ["scenario_id", "timestamp"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_evaluation_results_scenario_category"),
+        "evaluation_results",
+        ["scenario_category"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_evaluation_results_timestamp"),
+        "evaluation_results",
+        ["timestamp"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_evaluation_results_timestamp"), table_name="evaluation_results"
+    )
+    op.drop_index(
+        op.f("ix_evaluation_results_scenario_category"),
+        table_name="evaluation_results",
+    )
+    op.drop_index(
+        "ix_evaluation_results_scenario_id_timestamp", table_name="evaluation_results"
+    )
+    op.drop_index(
+        "ix_evaluation_results_model_id_timestamp", table_name="evaluation_results"
+    )
+    op.drop_table("evaluation_results")
@@ -0,0 +1,45 @@
+"""Add content-addressed upload store
+
+Revision ID: c41d8e2f6a93
+Revises: 7b2e4d9c0a15
+Create Date: 2026-10-19 14:05:51.220947
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41d8e2f6a93"
+down_revision: Union[str, Sequence[str], None] = "7b2e4d9c0a15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "upload_blobs",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("file_path", sa.String(length=500), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    with op.batch_alter_table("packages") as batch_op:
+        batch_op.add_column(sa.Column("file_hash", sa.String(length=64), nullable=True))
+        batch_op.create_index(
+            batch_op.f("ix_packages_file_hash"), ["file_hash"], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("packages") as batch_op:
+        batch_op.drop_index(batch_op.f("ix_packages_file_hash"))
+        batch_op.drop_column("file_hash")
+    op.drop_table("upload_blobs")
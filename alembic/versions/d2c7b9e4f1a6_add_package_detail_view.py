@@ -0,0 +1,43 @@
+"""Add materialized package detail view
+
+Revision ID: d2c7b9e4f1a6
+Revises: b5e1f7a3c9d4
+Create Date: 2026-10-19 22:05:13.614720
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d2c7b9e4f1a6"
+down_revision: Union[str, Sequence[str], None] = "b5e1f7a3c9d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Views are built on first access for packages completed before this
+    with op.batch_alter_table("packages") as batch_op:
+        batch_op.add_column(
+            sa.Column("detail_view_hash", sa.String(length=64), nullable=True)
+        )
+        batch_op.create_foreign_key(
+            "fk_packages_detail_view_hash_artifacts",
+            "artifacts",
+            ["detail_view_hash"],
+            ["hash"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("packages") as batch_op:
+        batch_op.drop_constraint(
+            "fk_packages_detail_view_hash_artifacts", type_="foreignkey"
+        )
+        batch_op.drop_column("detail_view_hash")
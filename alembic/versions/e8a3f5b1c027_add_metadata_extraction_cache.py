@@ -0,0 +1,37 @@
+"""Add metadata extraction cache
+
+Revision ID: e8a3f5b1c027
+Revises: c41d8e2f6a93
+Create Date: 2026-10-19 15:22:38.604113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8a3f5b1c027"
+down_revision: Union[str, Sequence[str], None] = "c41d8e2f6a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "metadata_cache",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("extractor_version", sa.Integer(), nullable=False),
+        sa.Column("file_metadata", sa.JSON(), nullable=False),
+        sa.Column("executable_names", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256", "extractor_version"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("metadata_cache")
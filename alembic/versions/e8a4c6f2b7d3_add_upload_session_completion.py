@@ -0,0 +1,43 @@
+"""Add completion state to chunked upload sessions
+
+Revision ID: e8a4c6f2b7d3
+Revises: d2c7b9e4f1a6
+Create Date: 2026-10-20 09:41:27.108352
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8a4c6f2b7d3"
+down_revision: Union[str, Sequence[str], None] = "d2c7b9e4f1a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("upload_sessions") as batch_op:
+        batch_op.add_column(sa.Column("completed_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("package_id", sa.Uuid(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_upload_sessions_package_id_packages",
+            "packages",
+            ["package_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("upload_sessions") as batch_op:
+        batch_op.drop_constraint(
+            "fk_upload_sessions_package_id_packages", type_="foreignkey"
+        )
+        batch_op.drop_column("package_id")
+        batch_op.drop_column("completed_at")
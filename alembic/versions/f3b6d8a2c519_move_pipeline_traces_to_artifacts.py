@@ -0,0 +1,129 @@
+"""Move pipeline traces out of pipeline_metadata into artifacts
+
+Revision ID: f3b6d8a2c519
+Revises: e8a4c6f2b7d3
+Create Date: 2026-10-20 14:12:05.384417
+
+"""
+
+import hashlib
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b6d8a2c519"
+down_revision: Union[str, Sequence[str], None] = "e8a4c6f2b7d3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _encode(value: Any) -> tuple[str, bytes, int]:
+    """Canonical JSON payload encoding, mirroring src/app/artifacts.py."""
+    payload = json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest(), zlib.compress(payload, 6), len(payload)
+
+
+def _decode(codec: str, data: bytes) -> Any:
+    if codec != "zlib":
+        raise RuntimeError(f"Cannot downgrade artifact stored with codec {codec!r}")
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def _metadata(value: Any) -> dict:
+    """pipeline_metadata as read through a raw query (text on SQLite)."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value or {}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    with op.batch_alter_table("packages") as batch_op:
+        batch_op.add_column(
+            sa.Column("trace_hash", sa.String(length=64), nullable=True)
+        )
+        batch_op.create_foreign_key(
+            "fk_packages_trace_hash_artifacts",
+            "artifacts",
+            ["trace_hash"],
+            ["hash"],
+        )
+
+    artifacts = sa.table(
+        "artifacts",
+        sa.column("hash", sa.String(64)),
+        sa.column("codec", sa.String(10)),
+        sa.column("size", sa.Integer()),
+        sa.column("data", sa.LargeBinary()),
+        sa.column("created_at", sa.DateTime()),
+    )
+
+    stored = {
+        row.hash for row in bind.execute(sa.text("SELECT hash FROM artifacts"))
+    }
+    now = datetime.now(timezone.utc)
+    rows = bind.execute(
+        sa.text(
+            "SELECT id, pipeline_metadata FROM packages "
+            "WHERE pipeline_metadata IS NOT NULL"
+        )
+    ).fetchall()
+    for row in rows:
+        metadata = _metadata(row.pipeline_metadata)
+        trace = metadata.pop("trace", None)
+        if trace is None:
+            continue
+        digest, data, size = _encode(trace)
+        if digest not in stored:
+            bind.execute(
+                artifacts.insert().values(
+                    hash=digest, codec="zlib", size=size, data=data, created_at=now
+                )
+            )
+            stored.add(digest)
+        bind.execute(
+            sa.text(
+                "UPDATE packages SET pipeline_metadata = :metadata, "
+                "trace_hash = :trace_hash WHERE id = :id"
+            ).bindparams(sa.bindparam("metadata", type_=sa.JSON())),
+            {"metadata": metadata, "trace_hash": digest, "id": row.id},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+
+    rows = bind.execute(
+        sa.text(
+            "SELECT p.id, p.pipeline_metadata, a.codec, a.data FROM packages p "
+            "JOIN artifacts a ON a.hash = p.trace_hash"
+        )
+    ).fetchall()
+    for row in rows:
+        metadata = {
+            **_metadata(row.pipeline_metadata),
+            "trace": _decode(row.codec, row.data),
+        }
+        bind.execute(
+            sa.text(
+                "UPDATE packages SET pipeline_metadata = :metadata WHERE id = :id"
+            ).bindparams(sa.bindparam("metadata", type_=sa.JSON())),
+            {"metadata": metadata, "id": row.id},
+        )
+
+    with op.batch_alter_table("packages") as batch_op:
+        batch_op.drop_constraint(
+            "fk_packages_trace_hash_artifacts", type_="foreignkey"
+        )
+        batch_op.drop_column("trace_hash")
@@ -3,6 +3,6 @@
 from src.app import create_app
 
 if __name__ == "__main__":
-    app, socketio = create_app()
+    app, socketio = create_app({"DEBUG": True})
 
     socketio.run(app, debug=True, port=5001, allow_unsafe_werkzeug=True)
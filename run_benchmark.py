@@ -0,0 +1,8 @@
+"""Benchmark the pipeline offline on recorded LLM and MCP responses."""
+
+import sys
+
+from src.app.benchmark import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,10 @@ from src.app.package_logger import get_package_logger
 
 logger = logging.getLogger(__name__)
 
+# Non-terminal package statuses. Spelled out as a positive IN list (rather than
+# NOT IN completed/failed) so the packages status index can serve the lookup.
+PENDING_STATUSES = ("uploading", "processing")
+
 
 class WorkflowStep(enum.Enum):
     """Represents the steps in the package creation workflow."""
@@ -130,7 +134,7 @@ class PackageRequest:
                 # Find all packages that are not completed or failed
                 pending_packages = (
                     session.query(Package)
-                    .filter(Package.status.notin_(["completed", "failed"]))
+                    .filter(Package.status.in_(PENDING_STATUSES))
                     .all()
                 )
 
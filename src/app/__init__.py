@@ -1,10 +1,18 @@
 """Flask application factory for AIPackager v3."""
 
+import os
 from typing import Optional, Tuple
 from flask import Flask
 from flask_socketio import SocketIO
 from .extensions import socketio
+from .progress_stream import PROGRESS_HEARTBEAT_INTERVAL, register_progress_stream
 from .routes import register_routes
+from .templating import (
+    precompile_templates,
+    set_auto_reload,
+    set_bytecode_cache_dir,
+)
+from .workflow.metadata_stage import resume_metadata_stage
 
 
 def create_app(config: Optional[dict] = None) -> Tuple[Flask, SocketIO]:
@@ -22,14 +30,39 @@ def create_app(config: Optional[dict] = None) -> Tuple[Flask, SocketIO]:
     if config:
         app.config.update(config)
 
-    # Initialize extensions
-    socketio.init_app(app)
+    # Initialize extensions; the ping interval is the progress heartbeat
+    socketio.init_app(
+        app,
+        ping_interval=app.config.get(
+            "PROGRESS_HEARTBEAT_INTERVAL", PROGRESS_HEARTBEAT_INTERVAL
+        ),
+    )
+
+    # Compile the shared script and prompt templates once, up front;
+    # debug apps pick up template edits without a restart
+    bytecode_cache_dir = app.config.get(
+        "TEMPLATE_BYTECODE_CACHE_DIR", os.environ.get("TEMPLATE_BYTECODE_CACHE_DIR")
+    )
+    if bytecode_cache_dir is None:
+        bytecode_cache_dir = os.path.join(app.instance_path, "jinja_cache")
+    set_bytecode_cache_dir(bytecode_cache_dir)
+    set_auto_reload(app.debug)
+    try:
+        precompile_templates()
+    except Exception as e:
+        app.logger.error(f"Failed to precompile templates: {e}")
 
     # Register routes
     register_routes(app)
+    register_progress_stream(socketio)
 
-    # Resume pending jobs on startup
+    # Resume pending jobs on startup, re-queueing lost metadata extractions
+    # first so resumed pipelines wait for them
     with app.app_context():
+        try:
+            resume_metadata_stage()
+        except Exception as e:
+            app.logger.error(f"Failed to resume metadata extraction on startup: {e}")
         try:
             from src.aipackager.workflow import PackageRequest
 
@@ -0,0 +1,73 @@
+"""Content-addressed encoding for heavy pipeline artifacts.
+
+Pipeline stage outputs (prompts, RAG documentation, generated scripts, ...)
+are serialized canonically, hashed with SHA-256 and stored compressed in the
+``artifacts`` table. Identical outputs therefore share a single row.
+"""
+
+import hashlib
+import json
+import zlib
+from typing import Any, Tuple
+
+try:
+    import zstandard  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    zstandard = None
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+
+def serialize_artifact(value: Any, as_json: bool = True) -> bytes:
+    """Serialize an artifact value into its canonical byte form.
+
+    Args:
+        value: Artifact value (JSON-compatible object or text)
+        as_json: Whether the value is stored as JSON or as plain text
+
+    Returns:
+        Canonical UTF-8 payload used for hashing and storage
+    """
+    if as_json:
+        return json.dumps(
+            value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+    return str(value).encode("utf-8")
+
+
+def deserialize_artifact(payload: bytes, as_json: bool = True) -> Any:
+    """Inverse of :func:`serialize_artifact`."""
+    text = payload.decode("utf-8")
+    return json.loads(text) if as_json else text
+
+
+def artifact_hash(payload: bytes) -> str:
+    """Return the content address (SHA-256 hex digest) of a payload."""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def compress_payload(payload: bytes) -> Tuple[str, bytes]:
+    """Compress a payload, preferring zstd when it is installed.
+
+    Returns:
+        Tuple of (codec name, compressed bytes)
+    """
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=9).compress(payload)
+    return CODEC_ZLIB, zlib.compress(payload, 6)
+
+
+def decompress_payload(codec: str, data: bytes) -> bytes:
+    """Decompress a payload stored with the given codec.
+
+    Raises:
+        ValueError: If the codec is unknown or not available
+    """
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("Artifact is zstd-compressed but zstandard is missing")
+        return bytes(zstandard.ZstdDecompressor().decompress(data))
+    raise ValueError(f"Unknown artifact codec: {codec}")
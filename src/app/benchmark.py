@@ -0,0 +1,266 @@
+"""Offline benchmark of the evaluation pipeline.
+
+Each scenario in ``scenarios.json`` runs through
+``EvaluationService.run_evaluation`` (the full 5-stage pipeline and
+script rendering) with its LLM and MCP responses replayed from a cassette
+(see ``replay``), so runs are deterministic and need neither network nor
+API keys. Cassettes are recorded once against the live services with
+``--record`` and live in ``<fixtures>/<model_id>/<scenario_id>.json``;
+none are shipped with the repository. Replaying a scenario without one
+exits with status 2.
+
+The report gives per stage the median wall and CPU time, the peak memory
+allocated and the throughput, plus the same for whole runs. With
+``--baseline`` the CPU medians are compared against an earlier ``--json``
+report and the exit status is non-zero on a regression::
+
+    python run_benchmark.py --json baseline.json
+    python run_benchmark.py --baseline baseline.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import Config
+from .replay import RECORD, REPLAY, use_cassette
+from .schemas import Scenario
+from .services.evaluation_service import EvaluationService
+from .workflow.timings import profile_stages
+
+DEFAULT_FIXTURES_DIR = Path("benchmarks") / "cassettes"
+DEFAULT_REPEAT = 3
+DEFAULT_MAX_REGRESSION = 0.25
+
+# Report row of whole pipeline runs
+TOTAL = "total"
+
+
+def cassette_path(fixtures_dir: Path, model_id: str, scenario_id: str) -> Path:
+    """Cassette file of a model and scenario."""
+    return fixtures_dir / model_id / f"{scenario_id}.json"
+
+
+def run_scenario(
+    service: EvaluationService,
+    model_id: str,
+    scenario: Scenario,
+    fixtures_dir: Path,
+    mode: str = REPLAY,
+    strict: bool = False,
+) -> Dict[str, Any]:
+    """Run one scenario under a cassette and profile its stages.
+
+    Args:
+        service: Evaluation service running the pipeline
+        model_id: Model whose recorded responses are used
+        scenario: Scenario to run
+        fixtures_dir: Directory holding the cassettes
+        mode: ``REPLAY``, or ``RECORD`` to call the live services
+        strict: Fail on requests that changed since recording
+
+    Returns:
+        Outcome, totals and per-stage measurements of the run
+    """
+    path = cassette_path(fixtures_dir, model_id, scenario.id)
+    tracing = tracemalloc.is_tracing()
+    with use_cassette(path, mode, strict) as cassette, profile_stages() as profile:
+        if tracing:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = service.run_evaluation(model_id, scenario.id)
+        total = {
+            "wall": time.perf_counter() - wall,
+            "cpu": time.process_time() - cpu,
+            "peak_bytes": tracemalloc.get_traced_memory()[1] - before if tracing else 0,
+        }
+    return {
+        "scenario_id": scenario.id,
+        "ok": result is not None,
+        "fallbacks": cassette.fallbacks,
+        "stages": {TOTAL: total, **profile.stages},
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Aggregate the measurements of runs per stage.
+
+    Returns:
+        Per stage the number of runs, median wall and CPU seconds, the
+        highest peak allocation and the throughput in runs per second
+    """
+    samples: Dict[str, List[Dict[str, float]]] = {}
+    for run in runs:
+        for stage, entry in run["stages"].items():
+            samples.setdefault(stage, []).append(entry)
+    summary = {}
+    for stage, entries in samples.items():
+        wall = [e["wall"] for e in entries]
+        summary[stage] = {
+            "runs": len(entries),
+            "wall_median": statistics.median(wall),
+            "cpu_median": statistics.median(e["cpu"] for e in entries),
+            "peak_bytes": max(e["peak_bytes"] for e in entries),
+            "throughput": len(wall) / sum(wall) if sum(wall) else 0.0,
+        }
+    return summary
+
+
+def find_regressions(
+    summary: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    max_regression: float,
+) -> List[str]:
+    """Stages whose median CPU time grew by more than ``max_regression``."""
+    regressions = []
+    for stage, entry in summary.items():
+        before = baseline.get(stage, {}).get("cpu_median")
+        if before and entry["cpu_median"] > before * (1 + max_regression):
+            regressions.append(
+                f"{stage}: CPU {before * 1000:.1f} ms -> "
+                f"{entry['cpu_median'] * 1000:.1f} ms"
+            )
+    return regressions
+
+
+def format_report(summary: Dict[str, Dict[str, float]]) -> str:
+    """Render a summary as a text table, whole runs last."""
+    lines = [
+        f"{'stage':<26}{'runs':>6}{'wall ms':>11}{'cpu ms':>11}"
+        f"{'peak KiB':>11}{'runs/s':>9}"
+    ]
+    stages = [s for s in summary if s != TOTAL] + [TOTAL]
+    for stage in stages:
+        if stage not in summary:
+            continue
+        e = summary[stage]
+        lines.append(
+            f"{stage:<26}{e['runs']:>6}{e['wall_median'] * 1000:>11.1f}"
+            f"{e['cpu_median'] * 1000:>11.1f}{e['peak_bytes'] / 1024:>11.1f}"
+            f"{e['throughput']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line entry point; returns the exit status."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline on recorded LLM and MCP responses."
+    )
+    parser.add_argument("--model", default=Config.AI_MODEL, help="Model ID")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        dest="scenarios",
+        help="Scenario ID to run (repeatable; default: all)",
+    )
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Call the live services once per scenario and save the cassettes",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Fail on requests that changed since recording",
+    )
+    parser.add_argument(
+        "--no-allocations",
+        action="store_true",
+        help="Skip tracemalloc, which slows the pipeline down",
+    )
+    parser.add_argument("--json", type=Path, help="Write the summary to this file")
+    parser.add_argument("--baseline", type=Path, help="Summary to compare against")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION)
+    args = parser.parse_args(argv)
+
+    mode = RECORD if args.record else REPLAY
+    if mode == REPLAY:
+        # The OpenAI client needs a key to be constructed; replay never uses it
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+
+    from . import create_app
+
+    with tempfile.TemporaryDirectory() as instance_dir:
+        app, _ = create_app(
+            {"DATABASE_URL": f"sqlite:///{Path(instance_dir) / 'benchmark.db'}"}
+        )
+        app.instance_path = instance_dir
+        with app.app_context():
+            service = EvaluationService(Path(instance_dir))
+            scenarios = [
+                s
+                for s in service.get_scenarios()
+                if not args.scenarios or s.id in args.scenarios
+            ]
+            if not scenarios:
+                print("No matching scenarios", file=sys.stderr)
+                return 2
+            if mode == REPLAY:
+                missing = [
+                    path
+                    for path in (
+                        cassette_path(args.fixtures, args.model, s.id)
+                        for s in scenarios
+                    )
+                    if not path.exists()
+                ]
+                if missing:
+                    for path in missing:
+                        print(f"No recorded responses: {path}", file=sys.stderr)
+                    print(
+                        "Run with --record first to record them against the "
+                        "live services",
+                        file=sys.stderr,
+                    )
+                    return 2
+
+            if not args.no_allocations:
+                tracemalloc.start()
+            runs = []
+            started = time.perf_counter()
+            for _ in range(1 if mode == RECORD else args.repeat):
+                for scenario in scenarios:
+                    run = run_scenario(
+                        service,
+                        args.model,
+                        scenario,
+                        args.fixtures,
+                        mode,
+                        args.strict,
+                    )
+                    runs.append(run)
+                    if not run["ok"]:
+                        print(f"{scenario.id}: pipeline failed", file=sys.stderr)
+            elapsed = time.perf_counter() - started
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+    summary = summarize(runs)
+    print(format_report(summary))
+    print(f"\n{len(runs)} runs in {elapsed:.2f} s ({len(runs) / elapsed:.2f} runs/s)")
+    fallbacks = sum(r["fallbacks"] for r in runs)
+    if fallbacks:
+        print(f"{fallbacks} requests differed from the recording", file=sys.stderr)
+
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2))
+    status = 0 if all(r["ok"] for r in runs) else 1
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = find_regressions(summary, baseline, args.max_regression)
+        for line in regressions:
+            print(f"Regression in {line}", file=sys.stderr)
+        if regressions:
+            status = 1
+    return status
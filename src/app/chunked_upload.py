@@ -0,0 +1,182 @@
+"""Chunked, resumable uploads for large installers.
+
+Clients split an installer into fixed-size chunks and PUT each one with
+its SHA-256. Every chunk is streamed straight from the request body to
+its offset in ``uploads/tmp/<upload id>.part``, so memory use does not
+depend on the chunk or file size, and a failed upload resumes by sending
+only the chunks the server has not recorded yet.
+
+The installer hash is computed incrementally: a running digest advances
+over the contiguous prefix of received chunks as they arrive, so
+completing an upload only hashes what is left rather than the whole
+file. The running digest lives in memory; after a restart it is rebuilt
+from the partial file on completion.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from threading import Lock
+from typing import IO, Dict, Iterable, Optional
+
+from .file_persistence import UPLOAD_CHUNK_SIZE
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MAX_UPLOAD_SIZE = int(os.environ.get("MAX_UPLOAD_SIZE", 64 * 1024**3))
+# Sessions without a new chunk for this long are discarded
+UPLOAD_SESSION_TTL = float(os.environ.get("UPLOAD_SESSION_TTL", 24 * 3600))
+
+
+class ChunkError(ValueError):
+    """A chunk did not match its declared length or checksum."""
+
+
+class _RunningHash:
+    """SHA-256 over chunks ``0 .. next_index - 1`` of an upload."""
+
+    def __init__(self) -> None:
+        self.digest = hashlib.sha256()
+        self.next_index = 0
+        self.lock = Lock()
+
+
+_hashes: Dict[str, _RunningHash] = {}
+_hashes_lock = Lock()
+
+
+def part_path(upload_id: str, instance_dir: Path) -> Path:
+    """Path of the partial file an upload is reassembled in.
+
+    Args:
+        upload_id: UUID string of the upload session
+        instance_dir: Path to the instance directory
+
+    Returns:
+        Path of the form uploads/tmp/<upload id>.part
+    """
+    return instance_dir / "uploads" / "tmp" / f"{upload_id}.part"
+
+
+def write_chunk(
+    path: Path,
+    offset: int,
+    length: int,
+    stream: IO[bytes],
+    expected_sha256: Optional[str] = None,
+) -> str:
+    """Stream one chunk from a request body into the partial file.
+
+    Args:
+        path: Partial file of the upload
+        offset: Byte offset of the chunk within the file
+        length: Expected chunk length in bytes
+        stream: Readable binary stream with the chunk data
+        expected_sha256: Hex SHA-256 the client computed, verified if given
+
+    Returns:
+        Hex SHA-256 digest of the chunk
+
+    Raises:
+        ChunkError: If the data is too short, too long or fails the checksum
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    received = 0
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, "r+b") as out:
+        out.seek(offset)
+        while received <= length:
+            data = stream.read(min(UPLOAD_CHUNK_SIZE, length + 1 - received))
+            if not data:
+                break
+            received += len(data)
+            if received > length:
+                break
+            digest.update(data)
+            out.write(data)
+
+    if received != length:
+        raise ChunkError(f"Expected {length} bytes, received {received}")
+    sha256 = digest.hexdigest()
+    if expected_sha256 and expected_sha256.lower() != sha256:
+        raise ChunkError("Chunk checksum mismatch")
+    return sha256
+
+
+def _running_hash(upload_id: str) -> _RunningHash:
+    with _hashes_lock:
+        return _hashes.setdefault(upload_id, _RunningHash())
+
+
+def _hash_range(digest: "hashlib._Hash", path: Path, offset: int, length: int) -> None:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while length > 0:
+            data = f.read(min(UPLOAD_CHUNK_SIZE, length))
+            if not data:
+                raise ChunkError("Partial file is shorter than the received chunks")
+            digest.update(data)
+            length -= len(data)
+
+
+def advance_hash(
+    upload_id: str,
+    path: Path,
+    size: int,
+    chunk_size: int,
+    received: Iterable[int],
+) -> int:
+    """Extend an upload's running hash over newly contiguous chunks.
+
+    Args:
+        upload_id: UUID string of the upload session
+        path: Partial file of the upload
+        size: Total file size in bytes
+        chunk_size: Size of every chunk but the last
+        received: Indexes of the chunks received so far
+
+    Returns:
+        Number of leading chunks covered by the running hash
+    """
+    state = _running_hash(upload_id)
+    available = set(received)
+    with state.lock:
+        while state.next_index in available:
+            offset = state.next_index * chunk_size
+            _hash_range(state.digest, path, offset, min(chunk_size, size - offset))
+            state.next_index += 1
+        return state.next_index
+
+
+def finish_hash(upload_id: str, path: Path, size: int, chunk_size: int) -> str:
+    """Complete the installer hash once every chunk has been received.
+
+    Args:
+        upload_id: UUID string of the upload session
+        path: Partial file of the upload
+        size: Total file size in bytes
+        chunk_size: Size of every chunk but the last
+
+    Returns:
+        Hex SHA-256 digest of the whole file
+    """
+    chunk_count = max(1, -(-size // chunk_size))
+    advance_hash(upload_id, path, size, chunk_size, range(chunk_count))
+    with _hashes_lock:
+        state = _hashes.pop(upload_id)
+    return state.digest.hexdigest()
+
+
+def discard_upload(upload_id: str, instance_dir: Path) -> None:
+    """Drop the partial file and running hash of an upload.
+
+    Args:
+        upload_id: UUID string of the upload session
+        instance_dir: Path to the instance directory
+    """
+    with _hashes_lock:
+        _hashes.pop(upload_id, None)
+    part_path(upload_id, instance_dir).unlink(missing_ok=True)
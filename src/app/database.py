@@ -1,12 +1,29 @@
 """Database service for AIPackager v3."""
 
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Any, Union
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import create_engine, delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import sessionmaker, selectinload, Session
 from flask import current_app
 from uuid import UUID
-from .models import Base, Package, Metadata
+from .detail_view import (
+    build_detail_view,
+    current_detail_view,
+    materialize_detail_view,
+)
+from .file_persistence import delete_file
+from .models import (
+    Base,
+    EvaluationRecord,
+    Package,
+    Metadata,
+    MetadataCacheEntry,
+    UploadBlob,
+    UploadChunk,
+    UploadSession,
+)
 
 
 def to_uuid(val: Union[str, UUID]) -> UUID:
@@ -57,8 +74,19 @@ def get_database_service() -> DatabaseService:
     return current_app.database_service  # type: ignore[no-any-return, attr-defined]
 
 
+def _artifact_load_options() -> list[Any]:
+    """Loader options that eagerly fetch every pipeline artifact of a Package."""
+    return [
+        selectinload(getattr(Package, f"{name}_artifact"))
+        for name in Package.ARTIFACT_FIELDS
+    ]
+
+
 def create_package(
-    filename: str, file_path: str, custom_instructions: Optional[str] = None
+    filename: str,
+    file_path: str,
+    custom_instructions: Optional[str] = None,
+    file_hash: Optional[str] = None,
 ) -> Package:
     """Create a new package record in the database.
 
@@ -66,6 +94,7 @@ def create_package(
         filename: Original filename
         file_path: Path where file is stored
         custom_instructions: Optional custom instructions
+        file_hash: Optional SHA-256 of the installer content
 
     Returns:
         Created Package instance
@@ -78,6 +107,7 @@ def create_package(
             filename=filename,
             file_path=file_path,
             custom_instructions=custom_instructions,
+            file_hash=file_hash,
         )
         session.add(package)
         session.commit()
@@ -105,7 +135,12 @@ def get_package(package_id: Union[str, UUID]) -> Optional[Package]:
         except ValueError:
             return None
 
-        package = session.query(Package).filter(Package.id == uuid_obj).first()
+        package = (
+            session.query(Package)
+            .options(*_artifact_load_options())
+            .filter(Package.id == uuid_obj)
+            .first()
+        )
         if package:
             # Ensure metadata is loaded
             _ = package.package_metadata
@@ -114,6 +149,131 @@ def get_package(package_id: Union[str, UUID]) -> Optional[Package]:
         session.close()
 
 
+def get_package_status(package_id: Union[str, UUID]) -> Optional[str]:
+    """Get only the status of a package, for cheap polling.
+
+    Args:
+        package_id: UUID string of the package
+
+    Returns:
+        The package status, or None if not found
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        try:
+            uuid_obj = to_uuid(package_id)
+        except ValueError:
+            return None
+        return session.scalar(select(Package.status).where(Package.id == uuid_obj))
+    finally:
+        session.close()
+
+
+def get_metadata_status(package_id: Union[str, UUID]) -> Optional[str]:
+    """Get the metadata stage status of a package.
+
+    Args:
+        package_id: UUID string of the package
+
+    Returns:
+        "queued", "completed" or "failed", or None if not tracked
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        try:
+            uuid_obj = to_uuid(package_id)
+        except ValueError:
+            return None
+        return session.scalar(
+            select(Package.metadata_status).where(Package.id == uuid_obj)
+        )
+    finally:
+        session.close()
+
+
+def set_metadata_status(package_id: Union[str, UUID], status: str) -> bool:
+    """Record the metadata stage status of a package.
+
+    Args:
+        package_id: UUID string of the package
+        status: "queued", "completed" or "failed"
+
+    Returns:
+        True if the package exists
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        result = session.execute(
+            update(Package)
+            .where(Package.id == to_uuid(package_id))
+            .values(metadata_status=status)
+        )
+        session.commit()
+        return bool(result.rowcount)  # type: ignore[attr-defined]
+    finally:
+        session.close()
+
+
+def get_package_detail(
+    package_id: Union[str, UUID],
+) -> Optional[tuple[Package, dict[str, Any]]]:
+    """Get a package with its detail page data.
+
+    Reads the package, its metadata and its stored detail view only. If the
+    view is missing or stale it is built from the pipeline artifacts, and
+    stored once the package has completed.
+
+    Args:
+        package_id: UUID string of the package
+
+    Returns:
+        Tuple of (Package instance, detail view) or None if not found
+    """
+    try:
+        uuid_obj = to_uuid(package_id)
+    except ValueError:
+        return None
+
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        package = (
+            session.query(Package)
+            .options(
+                selectinload(Package.package_metadata),
+                selectinload(Package.detail_view_artifact),
+            )
+            .filter(Package.id == uuid_obj)
+            .first()
+        )
+        if package is None:
+            return None
+        view = current_detail_view(package)
+        if view is None:
+            if package.status == "completed":
+                view = materialize_detail_view(package)
+                try:
+                    session.commit()
+                except SQLAlchemyError:
+                    # Served anyway; the next view tries again
+                    session.rollback()
+                # Expired by the commit or rollback
+                session.refresh(package)
+                _ = package.package_metadata
+            else:
+                view = build_detail_view(package)
+        return package, view
+    finally:
+        session.close()
+
+
 def update_package_status(package_id: Union[str, UUID], status: str) -> bool:
     """Update package status.
 
@@ -143,7 +303,11 @@ def update_package_status(package_id: Union[str, UUID], status: str) -> bool:
 
 
 def create_metadata(package_id: Union[str, UUID], **metadata_fields: Any) -> Metadata:
-    """Create metadata for a package.
+    """Create metadata for a package and mark its metadata stage completed.
+
+    The package's materialized detail view renders its metadata, so it is
+    dropped in the same transaction; metadata can land after the package
+    has completed when the generator stopped waiting for it.
 
     Args:
         package_id: UUID string of the package
@@ -158,6 +322,11 @@ def create_metadata(package_id: Union[str, UUID], **metadata_fields: Any) -> Met
     try:
         metadata = Metadata(package_id=to_uuid(package_id), **metadata_fields)
         session.add(metadata)
+        session.execute(
+            update(Package)
+            .where(Package.id == metadata.package_id)
+            .values(detail_view_hash=None, metadata_status="completed")
+        )
         session.commit()
         session.refresh(metadata)
         return metadata
@@ -168,6 +337,9 @@ def create_metadata(package_id: Union[str, UUID], **metadata_fields: Any) -> Met
 def get_all_packages() -> list[Package]:
     """Get all packages from the database.
 
+    Pipeline artifacts are not loaded; use get_package() for a single package
+    with its stage outputs.
+
     Returns:
         List of Package instances
     """
@@ -182,3 +354,697 @@ def get_all_packages() -> list[Package]:
         return packages  # type: ignore[no-any-return]
     finally:
         session.close()
+
+
+def get_pipeline_timings(limit: int = 500) -> list[dict[str, Any]]:
+    """Get the stage timings of the most recently uploaded packages.
+
+    Args:
+        limit: Maximum number of packages to read
+
+    Returns:
+        ``pipeline_metadata["timings"]`` of each package that has them,
+        newest first
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        rows = (
+            session.query(Package.pipeline_metadata)
+            .filter(Package.pipeline_metadata.isnot(None))
+            .order_by(Package.upload_time.desc())
+            .limit(limit)
+            .all()
+        )
+        return [
+            metadata["timings"]
+            for (metadata,) in rows
+            if isinstance(metadata, dict) and metadata.get("timings")
+        ]
+    finally:
+        session.close()
+
+
+def find_duplicate_metadata(
+    product_code: Optional[str] = None,
+    upgrade_code: Optional[str] = None,
+    version: Optional[str] = None,
+) -> list[Metadata]:
+    """Find metadata records describing the same product.
+
+    Matches on product code (optionally narrowed by version) or on upgrade
+    code; both lookups are served by indexes on the metadata table.
+
+    Args:
+        product_code: MSI ProductCode to match
+        upgrade_code: MSI UpgradeCode to match
+        version: Optional product version to narrow a product code match
+
+    Returns:
+        List of matching Metadata instances (empty if no criteria given)
+    """
+    if not product_code and not upgrade_code:
+        return []
+
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        query = session.query(Metadata)
+        if product_code:
+            query = query.filter(Metadata.product_code == product_code)
+            if version:
+                query = query.filter(Metadata.version == version)
+        else:
+            query = query.filter(Metadata.upgrade_code == upgrade_code)
+        return query.all()  # type: ignore[no-any-return]
+    finally:
+        session.close()
+
+
+def acquire_upload_blob(sha256: str, file_path: str, size: int) -> int:
+    """Add a reference to a stored upload, registering it if new.
+
+    Args:
+        sha256: Hex SHA-256 digest of the file content
+        file_path: Content-addressed path of the stored file
+        size: File size in bytes
+
+    Returns:
+        The reference count after acquiring
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        for _ in range(2):
+            result = session.execute(
+                update(UploadBlob)
+                .where(UploadBlob.sha256 == sha256)
+                .values(ref_count=UploadBlob.ref_count + 1)
+            )
+            if result.rowcount:  # type: ignore[attr-defined]
+                session.commit()
+                break
+            try:
+                session.add(
+                    UploadBlob(
+                        sha256=sha256, file_path=file_path, size=size, ref_count=1
+                    )
+                )
+                session.commit()
+                break
+            except IntegrityError:
+                # Registered concurrently; retry as an increment
+                session.rollback()
+        blob = session.get(UploadBlob, sha256)
+        return blob.ref_count if blob else 0
+    finally:
+        session.close()
+
+
+def release_upload_blob(sha256: str) -> bool:
+    """Drop a reference to a stored upload, deleting it at zero references.
+
+    Args:
+        sha256: Hex SHA-256 digest of the file content
+
+    Returns:
+        True if the last reference was released and the file deleted
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        session.execute(
+            update(UploadBlob)
+            .where(UploadBlob.sha256 == sha256, UploadBlob.ref_count > 0)
+            .values(ref_count=UploadBlob.ref_count - 1)
+        )
+        blob = session.get(UploadBlob, sha256)
+        if blob is None or blob.ref_count > 0:
+            session.commit()
+            return False
+        file_path = blob.file_path
+        session.delete(blob)
+        session.commit()
+        return delete_file(file_path)
+    finally:
+        session.close()
+
+
+def delete_package(package_id: Union[str, UUID]) -> bool:
+    """Delete a package and release its reference to the stored installer.
+
+    Args:
+        package_id: UUID string of the package
+
+    Returns:
+        True if the package existed and was deleted
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        package = session.get(Package, to_uuid(package_id))
+        if package is None:
+            return False
+        file_hash = package.file_hash
+        session.delete(package)
+        session.commit()
+    finally:
+        session.close()
+    if file_hash:
+        release_upload_blob(file_hash)
+    return True
+
+
+def create_upload_session(filename: str, size: int, chunk_size: int) -> UploadSession:
+    """Start a chunked upload.
+
+    Args:
+        filename: Original filename
+        size: Total file size in bytes
+        chunk_size: Size of every chunk but the last
+
+    Returns:
+        Created UploadSession instance
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        upload = UploadSession(filename=filename, size=size, chunk_size=chunk_size)
+        session.add(upload)
+        session.commit()
+        session.refresh(upload)
+        return upload
+    finally:
+        session.close()
+
+
+def get_upload_session(upload_id: Union[str, UUID]) -> Optional[UploadSession]:
+    """Get a chunked upload with its received chunks loaded.
+
+    Args:
+        upload_id: UUID string of the upload session
+
+    Returns:
+        UploadSession instance or None if not found
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        return session.get(
+            UploadSession,
+            to_uuid(upload_id),
+            options=[selectinload(UploadSession.chunks)],
+        )
+    finally:
+        session.close()
+
+
+def record_upload_chunk(
+    upload_id: Union[str, UUID], index: int, sha256: str
+) -> Optional[list[int]]:
+    """Mark a chunk of an upload as received and verified.
+
+    Args:
+        upload_id: UUID string of the upload session
+        index: Zero-based chunk index
+        sha256: Hex SHA-256 digest of the chunk
+
+    Returns:
+        Sorted indexes of all received chunks, or None if the upload
+        session no longer exists
+    """
+    db_service = get_database_service()
+    upload_uuid = to_uuid(upload_id)
+
+    session = db_service.get_session()
+    try:
+        result = session.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload_uuid)
+            .values(updated_at=datetime.now(timezone.utc))
+        )
+        if not result.rowcount:  # type: ignore[attr-defined]
+            session.rollback()
+            return None
+        try:
+            session.merge(
+                UploadChunk(upload_id=upload_uuid, index=index, sha256=sha256)
+            )
+            session.commit()
+        except IntegrityError:
+            # The same chunk was re-sent concurrently; either copy is verified
+            session.rollback()
+        return list(
+            session.scalars(
+                select(UploadChunk.index)
+                .where(UploadChunk.upload_id == upload_uuid)
+                .order_by(UploadChunk.index)
+            )
+        )
+    finally:
+        session.close()
+
+
+def claim_upload_completion(upload_id: Union[str, UUID]) -> bool:
+    """Atomically mark a chunked upload as being completed.
+
+    Only one caller wins the claim, so a repeated or concurrent completion
+    request cannot reassemble the file or create a package a second time.
+
+    Args:
+        upload_id: UUID string of the upload session
+
+    Returns:
+        True if this caller claimed the completion
+    """
+    db_service = get_database_service()
+    now = datetime.now(timezone.utc)
+
+    session = db_service.get_session()
+    try:
+        result = session.execute(
+            update(UploadSession)
+            .where(
+                UploadSession.id == to_uuid(upload_id),
+                UploadSession.completed_at.is_(None),
+            )
+            .values(completed_at=now, updated_at=now)
+        )
+        session.commit()
+        return bool(result.rowcount)  # type: ignore[attr-defined]
+    finally:
+        session.close()
+
+
+def finish_upload_completion(
+    upload_id: Union[str, UUID], package_id: Optional[Union[str, UUID]]
+) -> None:
+    """End a claimed completion.
+
+    Args:
+        upload_id: UUID string of the upload session
+        package_id: Package created from the upload, or None to release the
+            claim so the completion can be retried
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        values: dict[str, Any] = (
+            {"package_id": to_uuid(package_id)}
+            if package_id is not None
+            else {"completed_at": None}
+        )
+        session.execute(
+            update(UploadSession)
+            .where(UploadSession.id == to_uuid(upload_id))
+            .values(**values)
+        )
+        session.commit()
+    finally:
+        session.close()
+
+
+def delete_upload_session(upload_id: Union[str, UUID]) -> bool:
+    """Forget a chunked upload and its chunk records.
+
+    Args:
+        upload_id: UUID string of the upload session
+
+    Returns:
+        True if the session existed
+    """
+    db_service = get_database_service()
+    upload_uuid = to_uuid(upload_id)
+
+    session = db_service.get_session()
+    try:
+        session.execute(delete(UploadChunk).where(UploadChunk.upload_id == upload_uuid))
+        result = session.execute(
+            delete(UploadSession).where(UploadSession.id == upload_uuid)
+        )
+        session.commit()
+        return bool(result.rowcount)  # type: ignore[attr-defined]
+    finally:
+        session.close()
+
+
+def delete_stale_upload_sessions(older_than: datetime) -> list[UUID]:
+    """Drop chunked uploads that have not received data since a cutoff.
+
+    Args:
+        older_than: Sessions last updated before this time are removed
+
+    Returns:
+        IDs of the removed sessions, so their partial files can be deleted
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        stale = list(
+            session.scalars(
+                select(UploadSession.id).where(UploadSession.updated_at < older_than)
+            )
+        )
+        if stale:
+            session.execute(delete(UploadChunk).where(UploadChunk.upload_id.in_(stale)))
+            session.execute(delete(UploadSession).where(UploadSession.id.in_(stale)))
+            session.commit()
+        return stale
+    finally:
+        session.close()
+
+
+def find_package_by_file_hash(
+    sha256: str,
+    exclude_id: Optional[Union[str, UUID]] = None,
+    completed_only: bool = False,
+) -> Optional[Package]:
+    """Find the most recent package uploaded with a given file hash.
+
+    Args:
+        sha256: Hex SHA-256 digest of the installer content
+        exclude_id: Optional package ID to skip (e.g. the package just created)
+        completed_only: Only consider packages with a generated script
+
+    Returns:
+        Package instance (with metadata and artifacts loaded) or None
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        query = (
+            session.query(Package)
+            .options(*_artifact_load_options())
+            .filter(Package.file_hash == sha256)
+        )
+        if exclude_id is not None:
+            query = query.filter(Package.id != to_uuid(exclude_id))
+        if completed_only:
+            query = query.filter(
+                Package.status == "completed",
+                Package.generated_script_hash.is_not(None),
+            )
+        package = query.order_by(Package.upload_time.desc()).first()
+        if package:
+            _ = package.package_metadata
+        return package  # type: ignore[no-any-return]
+    finally:
+        session.close()
+
+
+def reuse_package_scripts(
+    source_id: Union[str, UUID], target_id: Union[str, UUID]
+) -> bool:
+    """Reuse the pipeline results of a completed package for another package.
+
+    Pipeline results are artifact references, so reusing them copies hashes
+    rather than payloads.
+
+    Args:
+        source_id: Completed package whose results are reused
+        target_id: Package receiving the results
+
+    Returns:
+        True if the results were copied, False if the source is not completed
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        source = session.get(Package, to_uuid(source_id))
+        target = session.get(Package, to_uuid(target_id))
+        if (
+            not source
+            or not target
+            or source.status != "completed"
+            or not source.generated_script_hash
+        ):
+            return False
+
+        for name in Package.ARTIFACT_FIELDS:
+            hash_attr = f"{name}_hash"
+            setattr(target, hash_attr, getattr(source, hash_attr))
+        target.pipeline_metadata = {
+            **(source.pipeline_metadata or {}),
+            "reused_from": str(source.id),
+        }
+        target.status = "completed"
+        target.current_step = "completed"
+        target.progress_pct = 100
+
+        session.commit()
+        return True
+    finally:
+        session.close()
+
+
+def get_cached_metadata(
+    sha256: str, extractor_version: int
+) -> Optional[tuple[dict[str, Any], list[str]]]:
+    """Look up a cached extraction result for an installer.
+
+    Args:
+        sha256: Hex SHA-256 digest of the installer content
+        extractor_version: Version of the extractor that produced the entry
+
+    Returns:
+        Tuple of (metadata dict, executable names) or None on a miss
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        entry = session.get(MetadataCacheEntry, (sha256, extractor_version))
+        if entry is None:
+            return None
+        return dict(entry.file_metadata), list(entry.executable_names)
+    finally:
+        session.close()
+
+
+def store_cached_metadata(
+    sha256: str,
+    extractor_version: int,
+    file_metadata: dict[str, Any],
+    executable_names: list[str],
+) -> None:
+    """Store an extraction result in the metadata cache.
+
+    Args:
+        sha256: Hex SHA-256 digest of the installer content
+        extractor_version: Version of the extractor that produced the result
+        file_metadata: Metadata dictionary returned by the extractor
+        executable_names: Executable names found in the installer
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        session.merge(
+            MetadataCacheEntry(
+                sha256=sha256,
+                extractor_version=extractor_version,
+                file_metadata=file_metadata,
+                executable_names=executable_names,
+            )
+        )
+        session.commit()
+    except IntegrityError:
+        # Stored concurrently by another upload of the same installer
+        session.rollback()
+    finally:
+        session.close()
+
+
+# Sort keys accepted by list_evaluation_records
+EVALUATION_SORTS: dict[str, Any] = {
+    "timestamp-desc": (EvaluationRecord.timestamp.desc(),),
+    "timestamp-asc": (EvaluationRecord.timestamp.asc(),),
+    "trust-score-desc": (
+        EvaluationRecord.trust_score.desc(),
+        EvaluationRecord.timestamp.desc(),
+    ),
+    "trust-score-asc": (
+        EvaluationRecord.trust_score.asc(),
+        EvaluationRecord.timestamp.desc(),
+    ),
+    "model-asc": (EvaluationRecord.model_name.asc(), EvaluationRecord.timestamp.desc()),
+    "scenario-asc": (
+        EvaluationRecord.scenario_title.asc(),
+        EvaluationRecord.timestamp.desc(),
+    ),
+}
+
+
+def save_evaluation_records(records: list[EvaluationRecord]) -> None:
+    """Store new evaluation results together with their output artifacts.
+
+    Args:
+        records: Unsaved EvaluationRecord instances
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        session.add_all(records)
+        session.commit()
+    finally:
+        session.close()
+
+
+def get_evaluation_record(evaluation_id: str) -> Optional[EvaluationRecord]:
+    """Get one evaluation result with its output artifact loaded.
+
+    Args:
+        evaluation_id: Evaluation result ID
+
+    Returns:
+        EvaluationRecord instance or None if not found
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        record = (
+            session.query(EvaluationRecord)
+            .options(selectinload(EvaluationRecord.output_artifact))
+            .filter(EvaluationRecord.id == evaluation_id)
+            .first()
+        )
+        if record is not None:
+            # Decode while the session is open
+            _ = record.output
+        return record
+    finally:
+        session.close()
+
+
+def list_evaluation_records(
+    limit: int = 50,
+    offset: int = 0,
+    model_id: Optional[str] = None,
+    scenario_id: Optional[str] = None,
+    category: Optional[str] = None,
+    sort: str = "timestamp-desc",
+    search: Optional[str] = None,
+) -> tuple[list[EvaluationRecord], int]:
+    """Get one page of evaluation results without their outputs.
+
+    Args:
+        limit: Maximum number of results to return
+        offset: Number of matching results to skip
+        model_id: Only results of this model
+        scenario_id: Only results of this scenario
+        category: Only results of scenarios in this category
+        sort: One of EVALUATION_SORTS
+        search: Only results whose model name, scenario title or category
+            contains this text (case-insensitive)
+
+    Returns:
+        Tuple of (results on the page, total number of matching results)
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        query = session.query(EvaluationRecord)
+        if model_id:
+            query = query.filter(EvaluationRecord.model_id == model_id)
+        if scenario_id:
+            query = query.filter(EvaluationRecord.scenario_id == scenario_id)
+        if category:
+            query = query.filter(EvaluationRecord.scenario_category == category)
+        if search:
+            pattern = f"%{search}%"
+            query = query.filter(
+                or_(
+                    EvaluationRecord.model_name.ilike(pattern),
+                    EvaluationRecord.scenario_title.ilike(pattern),
+                    EvaluationRecord.scenario_category.ilike(pattern),
+                )
+            )
+        total = query.count()
+        records = (
+            query.order_by(*EVALUATION_SORTS[sort]).offset(offset).limit(limit).all()
+        )
+        return records, total
+    finally:
+        session.close()
+
+
+def get_evaluation_ids() -> set[str]:
+    """Get the IDs of all stored evaluation results."""
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        return set(session.scalars(select(EvaluationRecord.id)))
+    finally:
+        session.close()
+
+
+def evaluation_stats_by_model() -> list[dict[str, Any]]:
+    """Aggregate the stored evaluation results per model.
+
+    Returns:
+        One dict per model with the number of results, the average,
+        minimum and maximum trust score and the hallucinations found and
+        corrected, ordered by average trust score (best first)
+    """
+    db_service = get_database_service()
+
+    session = db_service.get_session()
+    try:
+        average = func.avg(EvaluationRecord.trust_score)
+        rows = (
+            session.query(
+                EvaluationRecord.model_id,
+                func.max(EvaluationRecord.model_name),
+                func.count(EvaluationRecord.id),
+                average,
+                func.min(EvaluationRecord.trust_score),
+                func.max(EvaluationRecord.trust_score),
+                func.sum(EvaluationRecord.hallucinations_found),
+                func.sum(EvaluationRecord.hallucinations_corrected),
+                func.max(EvaluationRecord.timestamp),
+            )
+            .group_by(EvaluationRecord.model_id)
+            .order_by(average.desc())
+            .all()
+        )
+        return [
+            {
+                "model_id": model_id,
+                "model_name": model_name,
+                "evaluations": count,
+                "avg_trust_score": avg,
+                "min_trust_score": low,
+                "max_trust_score": high,
+                "hallucinations_found": found,
+                "hallucinations_corrected": corrected,
+                "last_evaluated": last.replace(tzinfo=timezone.utc).isoformat(),
+            }
+            for (
+                model_id,
+                model_name,
+                count,
+                avg,
+                low,
+                high,
+                found,
+                corrected,
+                last,
+            ) in rows
+        ]
+    finally:
+        session.close()
@@ -0,0 +1,107 @@
+"""Materialized data of the package detail page.
+
+The detail page shows the rendered PSADT script, the parsed RAG
+documentation, the display metrics and the trace waterfall of a package.
+All of it derives from the pipeline artifacts, which no longer change once
+the package has completed, so it is built once when the package
+completes and stored as the package's ``detail_view`` artifact::
+
+    {
+        "key": "1:<generated_script_hash>:...",
+        "rendered_script": "...",
+        "rag_documentation": {...},
+        "display_metrics": "{...}",
+        "trace_rows": [...],
+    }
+
+Artifacts are stored with sorted keys, so the display metrics, whose order
+is the order of the page, are stored as JSON text.
+
+``key`` names the artifacts the view was built from; a view whose key no
+longer matches the package is stale. ``generate_script`` drops the view
+when a package is regenerated.
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+from .models import Package
+from .script_renderer import ScriptRenderer
+from .services.metrics_service import MetricsService
+from .workflow.tracing import waterfall
+
+# Bump when the view's content or layout changes to rebuild stored views
+DETAIL_VIEW_VERSION = 1
+
+NO_SCRIPT = "No script generated yet."
+
+
+def detail_view_key(package: Package) -> str:
+    """Identity of the artifacts a package's detail view is built from."""
+    return ":".join(
+        [
+            str(DETAIL_VIEW_VERSION),
+            package.generated_script_hash or "",
+            package.rag_documentation_hash or "",
+            package.hallucination_report_hash or "",
+            package.corrections_applied_hash or "",
+            package.trace_hash or "",
+        ]
+    )
+
+
+def build_detail_view(package: Package) -> Dict[str, Any]:
+    """Render the detail page data of a package.
+
+    Args:
+        package: Package with its metadata and artifacts loadable
+
+    Returns:
+        The view, see the module docstring
+    """
+    rendered_script = NO_SCRIPT
+    if package.generated_script:
+        rendered_script = ScriptRenderer().render_psadt_script(
+            package=package, ai_sections=package.generated_script
+        )
+
+    display_metrics = MetricsService(
+        {
+            "pipeline_metadata": package.pipeline_metadata,
+            "hallucination_report": package.hallucination_report,
+            "corrections_applied": package.corrections_applied,
+        }
+    ).get_display_metrics()
+
+    rag_documentation = None
+    if package.rag_documentation:
+        try:
+            rag_documentation = json.loads(package.rag_documentation)
+        except (json.JSONDecodeError, TypeError):
+            rag_documentation = package.rag_documentation
+
+    return {
+        "key": detail_view_key(package),
+        "rendered_script": rendered_script,
+        "rag_documentation": rag_documentation,
+        "display_metrics": display_metrics,
+        "trace_rows": waterfall(package.trace),
+    }
+
+
+def materialize_detail_view(package: Package) -> Dict[str, Any]:
+    """Build and store the detail view of a package; commit to persist it."""
+    view = build_detail_view(package)
+    package.detail_view = {
+        **view,
+        "display_metrics": json.dumps(view["display_metrics"]),
+    }
+    return view
+
+
+def current_detail_view(package: Package) -> Optional[Dict[str, Any]]:
+    """Stored detail view of a package, or None if missing or stale."""
+    view = package.detail_view
+    if isinstance(view, dict) and view.get("key") == detail_view_key(package):
+        return {**view, "display_metrics": json.loads(view["display_metrics"])}
+    return None
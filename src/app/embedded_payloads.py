@@ -0,0 +1,353 @@
+"""Locate and extract MSI databases wrapped inside EXE bootstrappers.
+
+WiX Burn bundles carry their packages in cabinet (CAB) containers
+appended to the stub; InstallShield and other wrappers often append the
+MSI itself. This module scans the PE overlay for cabinet headers and OLE
+compound file headers, skipping over each payload it recognises, and
+streams the chosen MSI to a temporary file one block at a time so memory
+use stays bounded regardless of the payload size.
+"""
+
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .msi_reader import MsiDatabase, MsiFormatError
+from .pe_reader import PeImage
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = 1024 * 1024
+SCAN_CHUNK_SIZE = 1024 * 1024
+# Overlay bytes searched for payload headers (payloads that are found are
+# skipped over and do not count against the limit)
+PAYLOAD_SCAN_LIMIT = 64 * 1024 * 1024
+MAX_PAYLOADS = 16
+
+CFB_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+CAB_SIGNATURE = b"MSCF\x00\x00\x00\x00"
+
+_CFB_FREESECT = 0xFFFFFFFF
+_CFB_HEADER_DIFAT = 109
+
+# Cabinet header flags and compression types
+_CAB_PREV_CABINET = 0x0001
+_CAB_NEXT_CABINET = 0x0002
+_CAB_RESERVE_PRESENT = 0x0004
+_COMPRESS_NONE = 0
+_COMPRESS_MSZIP = 1
+_MSZIP_WINDOW = 32 * 1024
+
+
+class EmbeddedPayload(NamedTuple):
+    """A payload found in the overlay: ``kind`` is "msi" or "cab"."""
+
+    kind: str
+    offset: int
+    size: int
+
+
+class _CabFile(NamedTuple):
+    name: str
+    size: int
+    folder_offset: int
+    folder: int
+
+
+def _cfb_extent(pe: PeImage, offset: int, limit: int) -> Optional[int]:
+    """Size of a compound file embedded at ``offset``, from its FAT.
+
+    The CFB header does not record the file size, so the highest sector
+    in use is found by walking the FAT sectors listed in the DIFAT.
+    """
+    header = pe.read(offset, 512)
+    if len(header) < 512 or not header.startswith(CFB_SIGNATURE):
+        return None
+    byte_order, sector_shift = struct.unpack_from("<HH", header, 0x1C)
+    if byte_order != 0xFFFE or sector_shift not in (9, 12):
+        return None
+    sector_size = 1 << sector_shift
+    entries_per_sector = sector_size // 4
+    fat_count, _dir_start = struct.unpack_from("<II", header, 0x2C)
+    difat_start, difat_count = struct.unpack_from("<II", header, 0x44)
+
+    def sector(sid: int) -> bytes:
+        return pe.read(offset + (sid + 1) * sector_size, sector_size)
+
+    fat_sectors = [
+        sid
+        for sid in struct.unpack_from(f"<{_CFB_HEADER_DIFAT}I", header, 0x4C)
+        if sid != _CFB_FREESECT
+    ]
+    next_difat = difat_start
+    visited = set()
+    # The header's count is untrusted; no chain outruns the payload limit
+    for _ in range(min(difat_count, limit // sector_size)):
+        if len(fat_sectors) >= fat_count or next_difat in visited:
+            break
+        if (next_difat + 1) * sector_size >= limit:
+            return None
+        visited.add(next_difat)
+        entries = struct.unpack(f"<{entries_per_sector}I", sector(next_difat))
+        fat_sectors.extend(sid for sid in entries[:-1] if sid != _CFB_FREESECT)
+        next_difat = entries[-1]
+
+    highest = -1
+    for index, sid in enumerate(fat_sectors[:fat_count]):
+        data = sector(sid)
+        if len(data) < sector_size:
+            return None
+        entries = struct.unpack(f"<{entries_per_sector}I", data)
+        for position in range(entries_per_sector - 1, -1, -1):
+            if entries[position] != _CFB_FREESECT:
+                highest = max(highest, index * entries_per_sector + position)
+                break
+    if highest < 0:
+        return None
+    return int(min((highest + 2) * sector_size, limit))
+
+
+def _cab_size(pe: PeImage, offset: int, limit: int) -> Optional[int]:
+    """Total size of a cabinet at ``offset`` if its header looks valid."""
+    header = pe.read(offset, 36)
+    if len(header) < 36 or not header.startswith(CAB_SIGNATURE):
+        return None
+    (size,) = struct.unpack_from("<I", header, 8)
+    minor, major, folders = struct.unpack_from("<BBH", header, 24)
+    if (major, minor) != (1, 3) or not folders or not 36 < size <= limit:
+        return None
+    return int(size)
+
+
+def find_embedded_payloads(
+    pe: PeImage, scan_limit: int = PAYLOAD_SCAN_LIMIT
+) -> List[EmbeddedPayload]:
+    """Scan the overlay for cabinets and compound files.
+
+    Args:
+        pe: Open PE image
+        scan_limit: Maximum number of overlay bytes to search
+
+    Returns:
+        Payloads in file order
+    """
+    start = pe.overlay_offset()
+    end = pe.overlay_end()
+    payloads: List[EmbeddedPayload] = []
+    scanned = 0
+    pos = start
+    overlap = len(CFB_SIGNATURE) - 1
+
+    while pos < end and scanned < scan_limit and len(payloads) < MAX_PAYLOADS:
+        chunk = pe.read(pos, min(SCAN_CHUNK_SIZE + overlap, end - pos))
+        hits = [
+            i for i in (chunk.find(CFB_SIGNATURE), chunk.find(CAB_SIGNATURE)) if i >= 0
+        ]
+        if not hits:
+            pos += SCAN_CHUNK_SIZE
+            scanned += SCAN_CHUNK_SIZE
+            continue
+
+        hit = min(hits)
+        offset = pos + hit
+        scanned += hit
+        if chunk.startswith(CFB_SIGNATURE, hit):
+            kind, size = "msi", _cfb_extent(pe, offset, end - offset)
+        else:
+            kind, size = "cab", _cab_size(pe, offset, end - offset)
+
+        if size:
+            payloads.append(EmbeddedPayload(kind, offset, size))
+            pos = offset + size
+        else:
+            pos = offset + 1
+    return payloads
+
+
+def _copy_range(pe: PeImage, offset: int, size: int, dest: Path) -> None:
+    with open(dest, "wb") as out:
+        for start in range(offset, offset + size, COPY_CHUNK_SIZE):
+            out.write(pe.read(start, min(COPY_CHUNK_SIZE, offset + size - start)))
+
+
+def _cab_directory(pe: PeImage, payload: EmbeddedPayload) -> tuple:
+    """Parse a cabinet's folder and file tables."""
+    offset = payload.offset
+    header = pe.read(offset, 36)
+    files_offset = struct.unpack_from("<I", header, 16)[0]
+    folder_count, file_count, flags = struct.unpack_from("<HHH", header, 26)
+
+    pos = offset + 36
+    folder_reserve = data_reserve = 0
+    if flags & _CAB_RESERVE_PRESENT:
+        header_reserve, folder_reserve, data_reserve = struct.unpack(
+            "<HBB", pe.read(pos, 4)
+        )
+        pos += 4 + header_reserve
+    for flag in (_CAB_PREV_CABINET, _CAB_NEXT_CABINET):
+        if flags & flag:
+            # Skip the cabinet and disk name strings
+            for _ in range(2):
+                pos = pe.find(b"\x00", pos, offset + payload.size) + 1
+
+    folders = []
+    for _ in range(folder_count):
+        folders.append(struct.unpack("<IHH", pe.read(pos, 8)))
+        pos += 8 + folder_reserve
+
+    files = []
+    pos = offset + files_offset
+    for _ in range(file_count):
+        size, folder_offset, folder = struct.unpack_from("<IIH", pe.read(pos, 16))
+        name_end = pe.find(b"\x00", pos + 16, offset + payload.size)
+        if name_end < 0:
+            break
+        name = pe.read(pos + 16, name_end - pos - 16).decode("utf-8", "replace")
+        files.append(_CabFile(name, size, folder_offset, folder))
+        pos = name_end + 1
+    return folders, files, data_reserve
+
+
+def _extract_cab_msis(
+    pe: PeImage, payload: EmbeddedPayload, dest_dir: Path
+) -> List[Dict[str, Any]]:
+    """Stream every MSI-looking file out of a cabinet into ``dest_dir``.
+
+    Files are candidates when they are named ``*.msi`` or, since Burn
+    names its payloads by id, when their content starts with the compound
+    file signature. Folders are decompressed one CFDATA block at a time.
+    """
+    folders, files, data_reserve = _cab_directory(pe, payload)
+    extracted = []
+
+    for index, (data_offset, block_count, compression) in enumerate(folders):
+        members = sorted(
+            (f for f in files if f.folder == index), key=lambda f: f.folder_offset
+        )
+        if not members:
+            continue
+        if compression & 0x0F not in (_COMPRESS_NONE, _COMPRESS_MSZIP):
+            logger.info(
+                f"Skipping cabinet folder with unsupported compression {compression}"
+            )
+            continue
+
+        outputs: Dict[int, Any] = {}
+        rejected = set()
+        history = b""
+        position = 0
+        block_pos = payload.offset + data_offset
+        try:
+            for _ in range(block_count):
+                _checksum, packed, _unpacked = struct.unpack(
+                    "<IHH", pe.read(block_pos, 8)
+                )
+                block_pos += 8 + data_reserve
+                raw = pe.read(block_pos, packed)
+                block_pos += packed
+
+                if compression & 0x0F == _COMPRESS_MSZIP:
+                    if not raw.startswith(b"CK"):
+                        raise ValueError("Invalid MSZIP block")
+                    if history:
+                        inflater = zlib.decompressobj(-zlib.MAX_WBITS, zdict=history)
+                    else:
+                        inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+                    data = inflater.decompress(raw[2:]) + inflater.flush()
+                    history = (history + data)[-_MSZIP_WINDOW:]
+                else:
+                    data = raw
+
+                block_end = position + len(data)
+                for i, member in enumerate(members):
+                    member_end = member.folder_offset + member.size
+                    if i in rejected or member_end <= position:
+                        continue
+                    if member.folder_offset >= block_end:
+                        break
+                    piece = data[
+                        max(member.folder_offset - position, 0) : member_end - position
+                    ]
+                    if i not in outputs:
+                        named_msi = member.name.lower().endswith(".msi")
+                        if not named_msi and not CFB_SIGNATURE.startswith(piece[:8]):
+                            rejected.add(i)
+                            continue
+                        outputs[i] = open(dest_dir / f"cab{index}-{i}.msi", "wb")
+                    outputs[i].write(piece)
+                position = block_end
+                if all(
+                    i in rejected or m.folder_offset + m.size <= position
+                    for i, m in enumerate(members)
+                ):
+                    break
+        except (ValueError, zlib.error, struct.error) as e:
+            logger.info(f"Stopped reading cabinet at 0x{payload.offset:x}: {e}")
+        finally:
+            for handle in outputs.values():
+                handle.close()
+
+        for i, handle in outputs.items():
+            extracted.append(
+                {
+                    "path": handle.name,
+                    "name": members[i].name,
+                    "container": "cab",
+                    "offset": payload.offset,
+                    "size": members[i].size,
+                }
+            )
+    return extracted
+
+
+def _is_valid_msi(path: str) -> bool:
+    try:
+        with MsiDatabase(path) as msi:
+            msi.summary_information()
+        return True
+    except (MsiFormatError, OSError, struct.error):
+        return False
+
+
+def extract_embedded_msi(pe: PeImage, dest_dir: str) -> Optional[Dict[str, Any]]:
+    """Extract the main MSI wrapped inside an EXE bootstrapper.
+
+    When several MSIs are embedded the largest one is taken to be the
+    product; the others (typically prerequisites) are discarded.
+
+    Args:
+        pe: Open PE image
+        dest_dir: Directory for the extracted file, owned by the caller
+
+    Returns:
+        Dictionary with ``path``, ``name``, ``container`` ("raw" or "cab"),
+        ``offset`` and ``size``, or None when no valid MSI is embedded
+    """
+    dest = Path(dest_dir)
+    candidates: List[Dict[str, Any]] = []
+
+    for index, payload in enumerate(find_embedded_payloads(pe)):
+        if payload.kind == "msi":
+            path = dest / f"raw{index}.msi"
+            _copy_range(pe, payload.offset, payload.size, path)
+            candidates.append(
+                {
+                    "path": str(path),
+                    "name": None,
+                    "container": "raw",
+                    "offset": payload.offset,
+                    "size": payload.size,
+                }
+            )
+        else:
+            candidates.extend(_extract_cab_msis(pe, payload, dest))
+
+    valid = [c for c in candidates if _is_valid_msi(c["path"])]
+    chosen = max(valid, key=lambda c: c["size"], default=None)
+    for candidate in candidates:
+        if candidate is not chosen:
+            os.unlink(candidate["path"])
+    return chosen
@@ -1,44 +1,111 @@
 """File persistence utilities for AIPackager v3."""
 
+import hashlib
 import os
 from pathlib import Path
-from typing import Tuple
+from typing import IO, NamedTuple
 from uuid import UUID, uuid4
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
 
-def save_uploaded_file(file: FileStorage, instance_dir: Path) -> Tuple[UUID, str]:
-    """Save an uploaded file with UUID naming.
+# Uploads are streamed to disk in chunks of this size while being hashed
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class StoredFile(NamedTuple):
+    """Result of writing an upload into the content-addressed store."""
+
+    sha256: str
+    file_path: str
+    size: int
+    already_stored: bool
+
+
+def get_content_path(sha256: str, extension: str, instance_dir: Path) -> Path:
+    """Get the content-addressed path for a file hash.
 
     Args:
-        file: The uploaded file from Flask request
+        sha256: Hex SHA-256 digest of the file content
+        extension: File extension including the dot (e.g. ".msi")
+        instance_dir: Path to the instance directory
+
+    Returns:
+        Path of the form uploads/objects/<ab>/<sha256><extension>
+    """
+    return instance_dir / "uploads" / "objects" / sha256[:2] / f"{sha256}{extension}"
+
+
+def store_stream(stream: IO[bytes], filename: str, instance_dir: Path) -> StoredFile:
+    """Stream data into the content-addressed upload store.
+
+    The data is copied to a temporary file in fixed-size chunks while its
+    SHA-256 is computed in the same pass. If content with the same hash is
+    already stored the temporary copy is discarded.
+
+    Args:
+        stream: Readable binary stream positioned at the start of the data
+        filename: Original filename (only its extension is kept)
         instance_dir: Path to the instance directory
 
     Returns:
-        Tuple of (file_id, file_path) where file_id is the generated UUID
-        and file_path is the absolute path to the saved file
+        StoredFile describing the stored content
     """
-    # Generate unique file ID
-    file_id = uuid4()
+    tmp_dir = instance_dir / "uploads" / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / f"{uuid4()}.part"
 
-    # Secure the filename to prevent directory traversal
-    secure_name = secure_filename(file.filename or "unknown")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        return adopt_file(tmp_path, digest.hexdigest(), size, filename, instance_dir)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def adopt_file(
+    source: Path, sha256: str, size: int, filename: str, instance_dir: Path
+) -> StoredFile:
+    """Move an already-hashed file into the content-addressed store.
+
+    Args:
+        source: Path of the fully written file (removed if content is known)
+        sha256: Hex SHA-256 digest of the file content
+        size: File size in bytes
+        filename: Original filename (only its extension is kept)
+        instance_dir: Path to the instance directory
 
-    # Create filename with UUID prefix
-    filename = f"{file_id}_{secure_name}"
+    Returns:
+        StoredFile describing the stored content
+    """
+    extension = Path(secure_filename(filename)).suffix.lower()
+    content_path = get_content_path(sha256, extension, instance_dir)
 
-    # Ensure uploads directory exists
-    uploads_dir = instance_dir / "uploads"
-    uploads_dir.mkdir(exist_ok=True)
+    if content_path.exists():
+        source.unlink(missing_ok=True)
+        return StoredFile(sha256, str(content_path), size, True)
 
-    # Full file path
-    file_path = uploads_dir / filename
+    content_path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(source, content_path)
+    return StoredFile(sha256, str(content_path), size, False)
 
-    # Save the file
-    file.save(str(file_path))
 
-    return file_id, str(file_path)
+def store_uploaded_file(file: FileStorage, instance_dir: Path) -> StoredFile:
+    """Save an uploaded file into the content-addressed upload store.
+
+    Args:
+        file: The uploaded file from Flask request
+        instance_dir: Path to the instance directory
+
+    Returns:
+        StoredFile describing the stored content
+    """
+    return store_stream(file.stream, file.filename or "unknown", instance_dir)
 
 
 def get_file_path(file_id: UUID, filename: str, instance_dir: Path) -> str:
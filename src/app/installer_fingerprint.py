@@ -0,0 +1,174 @@
+"""Installer-framework fingerprinting for EXE installers.
+
+Setup bootstrappers built with the common authoring tools leave stable
+markers: a dedicated section (WiX Burn's ``.wixburn``), a header at the
+start of the overlay (NSIS, Inno Setup, InstallShield) or well-known
+strings in the stub and its resources. Only the PE header region, the
+resource section and the beginning of the overlay are scanned, in fixed
+size chunks, so the cost does not grow with the payload.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .pe_reader import PeImage
+
+SCAN_CHUNK_SIZE = 64 * 1024
+HEAD_SCAN_LIMIT = 1024 * 1024
+RESOURCE_SCAN_LIMIT = 1024 * 1024
+OVERLAY_SCAN_LIMIT = 1024 * 1024
+
+# Known frameworks with their unattended install/uninstall command lines
+FRAMEWORKS: Dict[str, Dict[str, str]] = {
+    "wix_burn": {
+        "name": "WiX Burn bundle",
+        "silent_switches": "/quiet /norestart",
+        "uninstall_switches": "/uninstall /quiet /norestart",
+        "notes": "Chains MSI/EXE packages; pass MSI properties as NAME=value.",
+    },
+    "nsis": {
+        "name": "Nullsoft Scriptable Install System (NSIS)",
+        "silent_switches": "/S",
+        "uninstall_switches": "/S (run the uninstaller, e.g. uninstall.exe)",
+        "notes": "Switches are case-sensitive; /D=<dir> must come last and unquoted.",
+    },
+    "inno": {
+        "name": "Inno Setup",
+        "silent_switches": "/VERYSILENT /SUPPRESSMSGBOXES /NORESTART /SP-",
+        "uninstall_switches": "/VERYSILENT /SUPPRESSMSGBOXES /NORESTART (unins000.exe)",
+        "notes": 'Use /DIR="<dir>" to change the install folder and /LOG="<file>" to log.',
+    },
+    "installshield": {
+        "name": "InstallShield",
+        "silent_switches": '/s /v"/qn REBOOT=ReallySuppress"',
+        "uninstall_switches": '/s /x /v"/qn"',
+        "notes": 'InstallScript projects need a recorded response file: /s /f1"setup.iss".',
+    },
+    "squirrel": {
+        "name": "Squirrel.Windows",
+        "silent_switches": "--silent",
+        "uninstall_switches": "--uninstall -s (Update.exe)",
+        "notes": "Installs per-user under %LocalAppData%; no machine-wide install.",
+    },
+}
+
+# (framework, region, marker). Regions: "head" (first MiB of the file),
+# "resources" (the .rsrc section) and "overlay" (data after the last section)
+MARKERS: Tuple[Tuple[str, str, bytes], ...] = (
+    ("nsis", "overlay", b"\xef\xbe\xad\xdeNullsoftInst"),
+    ("nsis", "resources", b"Nullsoft.NSIS.exehead"),
+    ("inno", "overlay", b"Inno Setup Setup Data"),
+    ("inno", "resources", b"rDlPtS\xcd\xe6\xd7\x7b"),
+    ("inno", "resources", b"JR.Inno.Setup"),
+    ("installshield", "overlay", b"InstallShield"),
+    ("installshield", "overlay", b"ISSetupStream"),
+    ("installshield", "head", b"InstallShield"),
+    ("installshield", "head", b"ISSetup.dll"),
+    ("squirrel", "head", b"SquirrelTemp"),
+    ("squirrel", "head", b"Squirrel.Windows"),
+    ("squirrel", "resources", b"S\x00q\x00u\x00i\x00r\x00r\x00e\x00l\x00"),
+)
+
+# Plain strings that any program may contain, e.g. an about box or a
+# bundled redistributable's name; they only count next to another marker
+WEAK_MARKERS: Set[Tuple[str, bytes]] = {
+    ("installshield", b"InstallShield"),
+    ("installshield", b"ISSetup.dll"),
+}
+
+# Checked in this order; earlier frameworks are more specific
+_PRIORITY = ("wix_burn", "nsis", "inno", "installshield", "squirrel")
+
+
+def scan_region(
+    pe: PeImage,
+    start: int,
+    length: int,
+    markers: Iterable[bytes],
+    chunk_size: int = SCAN_CHUNK_SIZE,
+) -> Set[bytes]:
+    """Find which markers occur in a byte range, reading it chunk by chunk.
+
+    Consecutive chunks overlap by the longest marker minus one byte so
+    matches that straddle a chunk boundary are not missed.
+
+    Args:
+        pe: Open PE image
+        start: File offset of the region
+        length: Number of bytes to scan
+        markers: Byte strings to look for
+        chunk_size: Bytes read per step
+
+    Returns:
+        The markers that were found
+    """
+    pending = set(markers)
+    found: Set[bytes] = set()
+    if not pending or length <= 0:
+        return found
+    overlap = max(len(m) for m in pending) - 1
+    end = min(start + length, pe.size)
+
+    pos = start
+    while pos < end and pending:
+        chunk = pe.read(pos, min(chunk_size + overlap, end - pos))
+        for marker in list(pending):
+            if marker in chunk:
+                found.add(marker)
+                pending.discard(marker)
+        pos += chunk_size
+    return found
+
+
+def _regions(pe: PeImage) -> Dict[str, Tuple[int, int]]:
+    overlay = pe.overlay_offset()
+    regions = {
+        "head": (0, min(HEAD_SCAN_LIMIT, overlay or pe.size)),
+        "overlay": (overlay, min(OVERLAY_SCAN_LIMIT, pe.overlay_end() - overlay)),
+    }
+    for section in pe.sections:
+        if section.name == ".rsrc":
+            regions["resources"] = (
+                section.raw_offset,
+                min(section.raw_size, RESOURCE_SCAN_LIMIT),
+            )
+    return regions
+
+
+def detect_installer_framework(pe: PeImage) -> Optional[Dict[str, Any]]:
+    """Identify the authoring tool of an EXE installer.
+
+    Args:
+        pe: Open PE image
+
+    Returns:
+        Dictionary with ``framework`` (key into FRAMEWORKS), its display
+        ``name``, ``silent_switches``, ``uninstall_switches``, ``notes`` and
+        the ``evidence`` that matched, or None if no framework is recognised
+    """
+    evidence: Dict[str, List[str]] = {}
+    # Frameworks with at least one marker that is not in WEAK_MARKERS
+    strong: Set[str] = set()
+
+    if any(section.name == ".wixburn" for section in pe.sections):
+        evidence.setdefault("wix_burn", []).append("section .wixburn")
+        strong.add("wix_burn")
+
+    for region, (start, length) in _regions(pe).items():
+        markers = [m for _fw, r, m in MARKERS if r == region]
+        for marker in scan_region(pe, start, length, markers):
+            for framework, r, m in MARKERS:
+                if r == region and m == marker:
+                    label = re.sub(rb"[^\x20-\x7e]", b"", marker).decode("ascii")
+                    evidence.setdefault(framework, []).append(f"{region}: {label}")
+                    if (framework, marker) not in WEAK_MARKERS:
+                        strong.add(framework)
+
+    for framework in _PRIORITY:
+        if framework in strong or len(evidence.get(framework, ())) > 1:
+            return {
+                "framework": framework,
+                **FRAMEWORKS[framework],
+                "evidence": sorted(evidence[framework]),
+            }
+    return None
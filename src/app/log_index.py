@@ -0,0 +1,228 @@
+"""Sidecar offset index for JSON Lines package logs.
+
+``<log>.idx`` holds one fixed-size record per complete log line: byte
+offset, byte length, CRC-32 of the step name and the numeric level. The
+index is brought up to date lazily by readers, which only scan the bytes
+appended since the last read. Tail, offset and filtered reads then touch
+the index and the selected lines only, never the whole log.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from bisect import bisect_left
+from pathlib import Path
+from threading import Lock
+from typing import Any, Collection, Dict, List, NamedTuple, Optional, Tuple
+
+# offset, length, crc32(step), level
+_ENTRY = struct.Struct("<QIIB3x")
+_SCAN_CHUNK_SIZE = 1024 * 1024
+
+# Logs share a fixed pool of locks, chosen by path, so the pool never grows
+_LOCK_STRIPES = 64
+_locks = [Lock() for _ in range(_LOCK_STRIPES)]
+
+
+class LogSlice(NamedTuple):
+    """Entries selected from a log plus the cursor for the next poll."""
+
+    entries: List[Dict[str, Any]]
+    # Byte offset just past the last indexed line; pass back as ``since``
+    next_offset: int
+    # Number of complete lines in the log
+    total: int
+
+
+def _step_key(step: str) -> int:
+    return zlib.crc32(step.encode("utf-8"))
+
+
+def _level_number(level: Any) -> int:
+    if isinstance(level, int):
+        return level
+    number = logging.getLevelName(str(level).upper())
+    return number if isinstance(number, int) else 0
+
+
+class LogIndex:
+    """Offset index over one JSON Lines log file."""
+
+    def __init__(self, log_path: Path):
+        self.log_path = Path(log_path)
+        self.index_path = self.log_path.with_name(self.log_path.name + ".idx")
+        self._lock = _locks[
+            zlib.crc32(str(self.log_path).encode("utf-8")) % _LOCK_STRIPES
+        ]
+
+    def sync(self) -> int:
+        """Index any lines appended since the last sync.
+
+        Returns:
+            Number of indexed lines
+        """
+        with self._lock:
+            try:
+                log_size = self.log_path.stat().st_size
+            except FileNotFoundError:
+                self.index_path.unlink(missing_ok=True)
+                return 0
+
+            count, end = self._extent()
+            if end > log_size:
+                # Log was replaced or truncated; start over
+                self.index_path.unlink(missing_ok=True)
+                count, end = 0, 0
+            if end == log_size:
+                return count
+
+            with open(self.log_path, "rb") as log, open(self.index_path, "ab") as idx:
+                log.seek(end)
+                offset = end
+                pending = b""
+                while True:
+                    chunk = log.read(_SCAN_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    pending += chunk
+                    lines = pending.split(b"\n")
+                    pending = lines.pop()  # incomplete last line, if any
+                    records = []
+                    for line in lines:
+                        records.append(self._pack(offset, line))
+                        offset += len(line) + 1
+                    idx.write(b"".join(records))
+                    count += len(records)
+            return count
+
+    @staticmethod
+    def _pack(offset: int, line: bytes) -> bytes:
+        try:
+            entry = json.loads(line)
+            step, level = str(entry.get("step", "")), entry.get("level", "")
+        except (ValueError, AttributeError):
+            step, level = "", 0
+        return _ENTRY.pack(offset, len(line), _step_key(step), _level_number(level))
+
+    def _extent(self) -> Tuple[int, int]:
+        """(line count, end offset of the last indexed line)."""
+        try:
+            size = self.index_path.stat().st_size
+        except FileNotFoundError:
+            return 0, 0
+        count = size // _ENTRY.size
+        if size % _ENTRY.size:
+            # Torn write: drop the partial record
+            os.truncate(self.index_path, count * _ENTRY.size)
+        if not count:
+            return 0, 0
+        with open(self.index_path, "rb") as idx:
+            idx.seek((count - 1) * _ENTRY.size)
+            offset, length, _step, _level = _ENTRY.unpack(idx.read(_ENTRY.size))
+        return count, int(offset + length + 1)
+
+    def select(
+        self,
+        since: Optional[int] = None,
+        start: Optional[int] = None,
+        limit: Optional[int] = None,
+        tail: Optional[int] = None,
+        steps: Optional[Collection[str]] = None,
+        min_level: Optional[Any] = None,
+    ) -> LogSlice:
+        """Read selected lines of the log.
+
+        Args:
+            since: Only lines starting at or after this byte offset
+            start: Skip this many matching lines
+            limit: Return at most this many lines
+            tail: Return only the last N matching lines
+            steps: Only lines whose step is one of these
+            min_level: Only lines at or above this level (name or number)
+
+        Returns:
+            LogSlice with the decoded entries, the next ``since`` cursor
+            and the total line count
+        """
+        total = self.sync()
+        if not total:
+            return LogSlice([], 0, 0)
+
+        step_keys = {_step_key(s) for s in steps} if steps else None
+        level_floor = _level_number(min_level) if min_level is not None else 0
+
+        with (
+            open(self.index_path, "rb") as idx,
+            mmap.mmap(
+                idx.fileno(), total * _ENTRY.size, access=mmap.ACCESS_READ
+            ) as table,
+        ):
+
+            def entry(i: int) -> tuple:
+                return _ENTRY.unpack_from(table, i * _ENTRY.size)
+
+            last_offset, last_length, _s, _l = entry(total - 1)
+            next_offset = last_offset + last_length + 1
+
+            first = 0
+            if since:
+                offsets = _OffsetView(entry, total)
+                first = bisect_left(offsets, since)
+
+            def matches(i: int) -> bool:
+                _offset, _length, step_key, level = entry(i)
+                if step_keys is not None and step_key not in step_keys:
+                    return False
+                return bool(level >= level_floor)
+
+            if tail is not None:
+                chosen: List[int] = []
+                i = total - 1
+                while i >= first and len(chosen) < tail:
+                    if matches(i):
+                        chosen.append(i)
+                    i -= 1
+                chosen.reverse()
+            else:
+                chosen = []
+                skip = start or 0
+                for i in range(first, total):
+                    if not matches(i):
+                        continue
+                    if skip:
+                        skip -= 1
+                        continue
+                    chosen.append(i)
+                    if limit is not None and len(chosen) >= limit:
+                        break
+            spans = [entry(i)[:2] for i in chosen]
+
+        entries = []
+        with open(self.log_path, "rb") as log:
+            for offset, length in spans:
+                log.seek(offset)
+                try:
+                    decoded = json.loads(log.read(length))
+                except ValueError:
+                    continue
+                if steps and decoded.get("step") not in steps:
+                    continue  # CRC collision
+                entries.append(decoded)
+        return LogSlice(entries, next_offset, total)
+
+
+class _OffsetView:
+    """Sequence of line offsets, for bisecting the index."""
+
+    def __init__(self, entry: Any, count: int):
+        self._entry = entry
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> int:
+        return int(self._entry(i)[0])
@@ -0,0 +1,316 @@
+"""Non-blocking log pipeline shared by the CMTrace and package logs.
+
+Loggers get a ``PipelineHandler`` that only puts the record on a bounded
+queue. A single writer thread drains the queue in batches, formats the
+records and writes each batch to its file with one write and one flush,
+so request and worker threads never wait on disk I/O.
+
+When the queue is full, ``LOG_QUEUE_POLICY`` decides what happens:
+``drop`` (the default) discards the record and counts it, ``block``
+waits up to ``LOG_QUEUE_BLOCK_TIMEOUT`` seconds for space before
+dropping.
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import sys
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+from .metrics import QUEUE_DEPTH, Gauge
+
+LOG_RECORDS_DROPPED = Gauge(
+    "aipackager_log_records_dropped", "Log records dropped because the queue was full"
+)
+
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+LOG_QUEUE_POLICY = os.environ.get("LOG_QUEUE_POLICY", "drop").lower()
+_block_timeout = os.environ.get("LOG_QUEUE_BLOCK_TIMEOUT")
+LOG_QUEUE_BLOCK_TIMEOUT: Optional[float] = (
+    float(_block_timeout) if _block_timeout else None
+)
+# Records taken off the queue per write
+LOG_BATCH_SIZE = 512
+
+_CLOSE = "close"
+_FLUSH = "flush"
+_STOP = "stop"
+
+# (target handler, record) or (command, argument)
+_Item = Tuple[Any, Any]
+
+
+class BatchFileHandler(logging.FileHandler):
+    """File handler that writes a list of records with a single write."""
+
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        """Format and append records, flushing once at the end."""
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        with self.lock:  # type: ignore[union-attr]
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write("".join(lines))
+            self.stream.flush()
+
+
+class LogPipeline:
+    """Bounded queue plus the single writer thread that empties it."""
+
+    def __init__(
+        self,
+        maxsize: int = LOG_QUEUE_SIZE,
+        policy: str = LOG_QUEUE_POLICY,
+        block_timeout: Optional[float] = LOG_QUEUE_BLOCK_TIMEOUT,
+    ):
+        self.queue: "queue.Queue[_Item]" = queue.Queue(maxsize)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._reported_drops = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def _ensure_started(self) -> bool:
+        """Start the writer thread if needed; False once the pipeline is stopped."""
+        if self._stopped:
+            return False
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._stopped:
+                    return False
+                if self._thread is None or not self._thread.is_alive():
+                    thread = threading.Thread(
+                        target=self._run, name="log-writer", daemon=True
+                    )
+                    try:
+                        thread.start()
+                    except RuntimeError:
+                        # Interpreter shutdown: no new threads, write inline
+                        self._stopped = True
+                        return False
+                    self._thread = thread
+        return True
+
+    def submit(self, target: logging.Handler, record: logging.LogRecord) -> bool:
+        """Queue a record for ``target`` according to the backpressure policy.
+
+        Returns:
+            False if the record was dropped
+        """
+        if not self._ensure_started():
+            # Stopped: nothing drains the queue any more, write it here
+            self._write([(target, record)])
+            return True
+        try:
+            if self.policy == "block":
+                self.queue.put((target, record), timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait((target, record))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close_target(self, target: logging.Handler) -> None:
+        """Close a handler once the records queued before this call are written."""
+        if not self._ensure_started():
+            self._write([(_CLOSE, target)])
+            return
+        # Control items must not be lost, so they always wait for space
+        self.queue.put((_CLOSE, target))
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until everything queued so far has been written.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            True if the queue was drained within the timeout
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self.queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Drain the queue and stop the writer thread.
+
+        The thread is never restarted afterwards: later records, flushes
+        and closes are handled synchronously on the calling thread.
+        """
+        with self._lock:
+            self._stopped = True
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put((_STOP, None))
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+        # Items that raced in behind the stop marker
+        leftover: List[_Item] = []
+        try:
+            while True:
+                leftover.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        if leftover:
+            self._write(leftover)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < LOG_BATCH_SIZE:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            if not self._write(batch):
+                return
+
+    def _write(self, batch: List[_Item]) -> bool:
+        """Write one batch, keeping per-target order; False on stop."""
+        pending: dict = {}
+
+        def write_pending() -> None:
+            for target, records in pending.items():
+                try:
+                    if isinstance(target, BatchFileHandler):
+                        target.emit_batch(records)
+                    else:
+                        for record in records:
+                            target.handle(record)
+                except Exception as e:
+                    sys.stderr.write(f"Log writer failed: {e}\n")
+            pending.clear()
+
+        keep_running = True
+        for first, second in batch:
+            if first == _CLOSE:
+                write_pending()
+                second.close()
+            elif first == _FLUSH:
+                write_pending()
+                second.set()
+            elif first == _STOP:
+                keep_running = False
+            else:
+                pending.setdefault(first, []).append(second)
+        write_pending()
+
+        if self.dropped > self._reported_drops:
+            sys.stderr.write(
+                f"Log queue full: dropped {self.dropped - self._reported_drops} "
+                "records\n"
+            )
+            self._reported_drops = self.dropped
+        return keep_running
+
+
+class PipelineHandler(logging.Handler):
+    """Handler that hands records to the writer thread for ``target``.
+
+    The message is rendered on the calling thread, so later changes to
+    the arguments do not affect what is written; everything else,
+    including the target's formatter, runs on the writer thread.
+    """
+
+    def __init__(self, target: logging.Handler, pipeline: Optional[LogPipeline] = None):
+        super().__init__(target.level)
+        self.target = target
+        self.pipeline = pipeline or get_log_pipeline()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Snapshot a record so it can be formatted on another thread."""
+        prepared = copy.copy(record)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Queue the record without touching the file."""
+        try:
+            self.pipeline.submit(self.target, self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """Wait for this pipeline's queued records to be written."""
+        self.pipeline.flush()
+
+    def close(self) -> None:
+        """Close the target after its queued records are written."""
+        self.pipeline.close_target(self.target)
+        super().close()
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """Get the process-wide log pipeline."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = LogPipeline()
+    return _pipeline
+
+
+def flush_logs(timeout: Optional[float] = 5.0) -> bool:
+    """Wait until all queued log records have been written.
+
+    Args:
+        timeout: Seconds to wait
+
+    Returns:
+        True if everything was written within the timeout
+    """
+    return get_log_pipeline().flush(timeout)
+
+
+QUEUE_DEPTH.labels("log").set_function(lambda: get_log_pipeline().queue.qsize())
+LOG_RECORDS_DROPPED.set_function(lambda: get_log_pipeline().dropped)
+
+
+_shutdown_hooks: List[Callable[[], None]] = []
+
+
+def on_shutdown(hook: Callable[[], None]) -> None:
+    """Run ``hook`` at exit, once the writer thread has been stopped.
+
+    Hooks that close handlers then write and close them synchronously;
+    closing them from their own atexit hook would run before the
+    pipeline stops and could try to start a thread during shutdown.
+    """
+    _shutdown_hooks.append(hook)
+
+
+def _shutdown() -> None:
+    if _pipeline is not None:
+        _pipeline.stop()
+    for hook in _shutdown_hooks:
+        try:
+            hook()
+        except Exception as e:
+            sys.stderr.write(f"Log shutdown hook failed: {e}\n")
+
+
+# logging.shutdown may still close handlers after this; once stopped, the
+# pipeline does that synchronously instead of restarting.
+atexit.register(_shutdown)
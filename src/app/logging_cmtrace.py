@@ -1,13 +1,44 @@
 """CMTrace logging helper for AIPackager v3."""
 
 import logging
-from datetime import datetime
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+
+from .log_pipeline import BatchFileHandler, PipelineHandler
+
+# Python log levels mapped to CMTrace types: 1 = Info, 2 = Warning, 3 = Error
+_CMTRACE_TYPES = {
+    logging.DEBUG: "1",
+    logging.INFO: "1",
+    logging.WARNING: "2",
+    logging.ERROR: "3",
+    logging.CRITICAL: "3",
+}
 
 
 class CMTraceFormatter(logging.Formatter):
-    """Custom formatter for CMTrace log format."""
+    """Custom formatter for CMTrace log format.
+
+    The time and date strings only change once per second, so they are
+    cached and only the milliseconds are formatted per record.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._cached_second = -1
+        self._cached_stamp: Tuple[str, str] = ("", "")
+
+    def _timestamp(self, created: float) -> Tuple[str, str]:
+        second = int(created)
+        if second != self._cached_second:
+            local = time.localtime(second)
+            self._cached_stamp = (
+                time.strftime("%H:%M:%S", local),
+                time.strftime("%m-%d-%Y", local),
+            )
+            self._cached_second = second
+        return self._cached_stamp
 
     def format(self, record: logging.LogRecord) -> str:
         """Format log record in CMTrace format.
@@ -22,9 +53,8 @@ class CMTraceFormatter(logging.Formatter):
             Formatted log message
         """
         # Get timestamp
-        dt = datetime.fromtimestamp(record.created)
-        time_str = dt.strftime("%H:%M:%S.%f")[:-3] + "+000"  # Milliseconds + timezone
-        date_str = dt.strftime("%m-%d-%Y")
+        clock, date_str = self._timestamp(record.created)
+        time_str = f"{clock}.{int(record.msecs):03d}+000"  # Milliseconds + timezone
 
         # Get component name (logger name or module name)
         component = getattr(record, "component", record.name)
@@ -32,16 +62,7 @@ class CMTraceFormatter(logging.Formatter):
         # Get context (can be set via extra parameter)
         context = getattr(record, "context", "")
 
-        # Map Python log levels to CMTrace types
-        # 1 = Info, 2 = Warning, 3 = Error
-        level_map = {
-            logging.DEBUG: "1",
-            logging.INFO: "1",
-            logging.WARNING: "2",
-            logging.ERROR: "3",
-            logging.CRITICAL: "3",
-        }
-        log_type = level_map.get(record.levelno, "1")
+        log_type = _CMTRACE_TYPES.get(record.levelno, "1")
 
         # Get thread ID
         thread_id = record.thread or 0
@@ -72,6 +93,9 @@ def setup_cmtrace_logging(
 ) -> logging.Logger:
     """Set up CMTrace logging.
 
+    File output goes through the shared log pipeline, so callers never
+    wait on disk I/O; call ``log_pipeline.flush_logs`` to wait for it.
+
     Args:
         log_file: Path to log file (default: logs/aipackager.log)
         component: Component name for logs
@@ -97,9 +121,10 @@ def setup_cmtrace_logging(
     # Remove existing handlers to avoid duplicates
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+        handler.close()
 
-    # Create file handler
-    file_handler = logging.FileHandler(log_file, encoding="utf-8")
+    # Create file handler, written by the log pipeline's writer thread
+    file_handler = BatchFileHandler(log_file, encoding="utf-8", delay=True)
     file_handler.setLevel(level)
 
     # Create CMTrace formatter
@@ -107,7 +132,7 @@ def setup_cmtrace_logging(
     file_handler.setFormatter(formatter)
 
     # Add handler to logger
-    logger.addHandler(file_handler)
+    logger.addHandler(PipelineHandler(file_handler))
 
     # Also add console handler for development
     console_handler = logging.StreamHandler()
@@ -1,12 +1,89 @@
-import os
 import subprocess
+import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 import re
 
+from .embedded_payloads import extract_embedded_msi
+from .installer_fingerprint import detect_installer_framework
+from .msi_reader import MsiDatabase, MsiFormatError
+from .pe_reader import VERSION_STRINGS, PeImage
+
 logger = logging.getLogger(__name__)
 
+# Bump whenever extraction output changes so cached results are recomputed
+EXTRACTOR_VERSION = 7
+
+# MSI tables scanned for executable names
+EXECUTABLE_TABLES = ("Icon", "Shortcut")
+
+# MSI tables decoded into installer_details; lists are capped per table
+DETAIL_TABLES = (
+    "File",
+    "Component",
+    "Directory",
+    "Registry",
+    "Shortcut",
+    "ServiceInstall",
+    "CustomAction",
+)
+MAX_DETAIL_ROWS = 500
+
+# Registry.Root values; -1 means HKLM for per-machine, HKCU for per-user installs
+REGISTRY_ROOTS = {-1: "HKLM/HKCU", 0: "HKCR", 1: "HKCU", 2: "HKLM", 3: "HKU"}
+
+# ServiceInstall.StartType values
+SERVICE_START_TYPES = {0: "boot", 1: "system", 2: "auto", 3: "demand", 4: "disabled"}
+
+# Directory IDs Windows Installer resolves to system folders
+STANDARD_FOLDERS = {
+    "AdminToolsFolder",
+    "AppDataFolder",
+    "CommonAppDataFolder",
+    "CommonFiles64Folder",
+    "CommonFilesFolder",
+    "DesktopFolder",
+    "FavoritesFolder",
+    "FontsFolder",
+    "LocalAppDataFolder",
+    "PersonalFolder",
+    "ProgramFiles64Folder",
+    "ProgramFilesFolder",
+    "ProgramMenuFolder",
+    "SendToFolder",
+    "StartMenuFolder",
+    "StartupFolder",
+    "System16Folder",
+    "System64Folder",
+    "SystemFolder",
+    "TempFolder",
+    "TemplateFolder",
+    "WindowsFolder",
+}
+
+# SummaryInformation fields -> metadata keys
+SUMMARY_FIELDS = {
+    "title": "summary_title",
+    "subject": "summary_subject",
+    "author": "summary_author",
+    "template": "template",
+    "comments": "summary_comments",
+}
+
+
+@lru_cache(maxsize=1)
+def _msitools_available() -> bool:
+    """Probe for msiinfo once per process."""
+    try:
+        result = subprocess.run(
+            ["msiinfo", "--help"], capture_output=True, check=False, timeout=5
+        )
+        return result.returncode == 0
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return False
+
 
 class MetadataExtractor:
     """Extract metadata from installer files using cross-platform tools."""
@@ -18,13 +95,19 @@ class MetadataExtractor:
         if not file_path.lower().endswith(".msi"):
             return []
 
+        try:
+            with MsiDatabase(file_path) as msi:
+                return self._executables_from_tables(msi)
+        except (MsiFormatError, OSError) as e:
+            logger.info(f"Native MSI reader failed, falling back to msitools: {e}")
+
         if not self._is_msitools_available():
             logger.warning("msitools not available, cannot extract executable names.")
             return []
 
         executables = set()
 
-        for table in ["Icon", "Shortcut"]:
+        for table in EXECUTABLE_TABLES:
             try:
                 cmd = ["msiinfo", "export", file_path, table]
                 result = subprocess.run(
@@ -47,6 +130,32 @@ class MetadataExtractor:
 
         return sorted(list(executables))
 
+    def extract_with_executables(
+        self, file_path: str
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Extract metadata and executable names, opening an MSI only once.
+
+        Args:
+            file_path: Path to the installer file
+
+        Returns:
+            Tuple of (metadata dictionary, executable names)
+        """
+        if Path(file_path).suffix.lower() == ".msi" and Path(file_path).exists():
+            metadata = self._extract_basic_metadata(file_path)
+            try:
+                with MsiDatabase(file_path) as msi:
+                    metadata.update(self._read_msi(msi))
+                    return metadata, self._executables_from_tables(msi)
+            except (MsiFormatError, OSError) as e:
+                logger.info(f"Native MSI reader failed, falling back: {e}")
+
+        metadata = self.extract_metadata(file_path)
+        embedded = (metadata.get("installer_details") or {}).get("embedded_msi")
+        if embedded:
+            return metadata, embedded["executable_names"]
+        return metadata, self.extract_executable_names(file_path)
+
     def extract_metadata(self, file_path: str) -> Dict[str, Any]:
         """Extract metadata from an installer file.
 
@@ -101,7 +210,7 @@ class MetadataExtractor:
         }
 
     def _extract_msi_metadata(self, file_path: str) -> Dict[str, Any]:
-        """Extract metadata from MSI file using msitools.
+        """Extract metadata from MSI file, natively or via msitools.
 
         Args:
             file_path: Path to the MSI file
@@ -115,7 +224,14 @@ class MetadataExtractor:
         metadata = self._extract_basic_metadata(file_path)
 
         try:
-            # Try msitools first (preferred method)
+            with MsiDatabase(file_path) as msi:
+                metadata.update(self._read_msi(msi))
+            return metadata
+        except (MsiFormatError, OSError) as e:
+            logger.info(f"Native MSI reader failed, falling back to msitools: {e}")
+
+        try:
+            # Fall back to msitools, then other external tools
             if self._is_msitools_available():
                 metadata.update(self._extract_with_msitools(file_path))
             else:
@@ -129,19 +245,208 @@ class MetadataExtractor:
 
         return metadata
 
+    def _read_msi(self, msi: MsiDatabase) -> Dict[str, Any]:
+        """Read MSI metadata in-process from an open database.
+
+        Produces the same keys as the msitools path: summary fields, mapped
+        Property table values and architecture parsed from the Template.
+
+        Args:
+            msi: Open MSI database
+
+        Returns:
+            MSI metadata dictionary
+        """
+        metadata: Dict[str, Any] = {}
+
+        summary = msi.summary_information()
+        for field, key in SUMMARY_FIELDS.items():
+            if field in summary:
+                metadata[key] = str(summary[field]).strip()
+
+        properties = {
+            name: value.strip()
+            for name, value in msi.properties().items()
+            if value.strip()
+        }
+        metadata.update(self._map_msi_properties(properties))
+
+        if "template" in metadata:
+            metadata.update(self._parse_template_architecture(metadata["template"]))
+
+        metadata["installer_details"] = self._read_installer_details(msi)
+
+        return metadata
+
+    def _executables_from_tables(self, msi: MsiDatabase) -> List[str]:
+        """Collect executable names referenced by the Icon and Shortcut tables.
+
+        Falls back to the executables installed by the File table when no
+        shortcut or icon references one.
+        """
+        executables = set()
+        for table in EXECUTABLE_TABLES:
+            for row in msi.table(table):
+                text = "\t".join(str(v) for v in row.values() if v is not None)
+                for exe in re.findall(r"(\w+\.exe)", text, re.IGNORECASE):
+                    executables.add(exe.lower())
+        if not executables:
+            executables.update(
+                name.lower()
+                for name in (
+                    _long_name(row.get("FileName")) for row in msi.table("File")
+                )
+                if name and name.lower().endswith(".exe")
+            )
+        return sorted(executables)
+
+    def _read_installer_details(self, msi: MsiDatabase) -> Dict[str, Any]:
+        """Decode the MSI tables that describe what the installer changes.
+
+        Args:
+            msi: Open MSI database
+
+        Returns:
+            Dictionary with files, components, registry values, shortcuts,
+            services and custom actions, plus total row counts per table
+        """
+        directories = self._resolve_directories(msi.table("Directory"))
+        components = {
+            row["Component"]: row
+            for row in msi.table("Component")
+            if row.get("Component") is not None
+        }
+
+        def directory_path(directory: Optional[str]) -> Optional[str]:
+            return directories.get(directory) if directory is not None else None
+
+        def component_dir(component: Optional[str]) -> Optional[str]:
+            row = components.get(component) if component is not None else None
+            return directory_path(row.get("Directory_")) if row else None
+
+        files = [
+            {
+                "name": _long_name(row.get("FileName")),
+                "directory": component_dir(row.get("Component_")),
+                "component": row.get("Component_"),
+                "size": row.get("FileSize"),
+                "version": row.get("Version"),
+            }
+            for row in msi.table("File")
+        ]
+        details: Dict[str, Any] = {
+            "counts": {table: len(msi.table(table)) for table in DETAIL_TABLES},
+            "executables": sorted(
+                {
+                    file["name"]
+                    for file in files
+                    if file["name"] and file["name"].lower().endswith(".exe")
+                }
+            ),
+            "files": files,
+            "components": [
+                {
+                    "component": row.get("Component"),
+                    "directory": directory_path(row.get("Directory_")),
+                    "key_path": row.get("KeyPath"),
+                }
+                for row in components.values()
+            ],
+            "directories": directories,
+            "registry": [
+                {
+                    "root": _coded(REGISTRY_ROOTS, row.get("Root")),
+                    "key": row.get("Key"),
+                    "name": row.get("Name"),
+                    "value": row.get("Value"),
+                    "component": row.get("Component_"),
+                }
+                for row in msi.table("Registry")
+            ],
+            "shortcuts": [
+                {
+                    "name": _long_name(row.get("Name")),
+                    "directory": directory_path(row.get("Directory_")),
+                    "target": row.get("Target"),
+                    "arguments": row.get("Arguments"),
+                }
+                for row in msi.table("Shortcut")
+            ],
+            "services": [
+                {
+                    "name": row.get("Name"),
+                    "display_name": row.get("DisplayName"),
+                    "start_type": _coded(SERVICE_START_TYPES, row.get("StartType")),
+                    "account": row.get("StartName"),
+                }
+                for row in msi.table("ServiceInstall")
+            ],
+            "custom_actions": [
+                {
+                    "action": row.get("Action"),
+                    "type": row.get("Type"),
+                    "source": row.get("Source"),
+                    "target": row.get("Target"),
+                }
+                for row in msi.table("CustomAction")
+            ],
+        }
+        for key, value in details.items():
+            if isinstance(value, list):
+                details[key] = value[:MAX_DETAIL_ROWS]
+        return details
+
+    def _resolve_directories(self, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Resolve Directory table rows to install paths.
+
+        System folders are kept as their Windows Installer property
+        (e.g. ``[ProgramFilesFolder]Contoso\\Tools``).
+        """
+        entries = {
+            row["Directory"]: (
+                row.get("Directory_Parent"),
+                _long_name(row.get("DefaultDir")),
+            )
+            for row in rows
+            if row.get("Directory") is not None
+        }
+        resolved: Dict[str, str] = {}
+
+        def resolve(directory: str, depth: int = 0) -> str:
+            if directory in resolved:
+                return resolved[directory]
+            parent, name = entries.get(directory, (None, None))
+            if (
+                directory in STANDARD_FOLDERS
+                or not parent
+                or parent == directory
+                or depth > 64
+            ):
+                path = "" if directory == "TARGETDIR" else f"[{directory}]"
+            else:
+                base = resolve(parent, depth + 1)
+                if not name or name in (".", "SourceDir"):
+                    path = base
+                elif base.endswith("]") or not base:
+                    path = f"{base}{name}"
+                else:
+                    path = f"{base}\\{name}"
+            resolved[directory] = path
+            return path
+
+        for directory in entries:
+            resolve(directory)
+        return resolved
+
     def _is_msitools_available(self) -> bool:
         """Check if msitools (msiinfo) is available.
 
+        The probe runs once per process; later calls use the cached result.
+
         Returns:
             True if msitools is available, False otherwise
         """
-        try:
-            result = subprocess.run(
-                ["msiinfo", "--help"], capture_output=True, check=False, timeout=5
-            )
-            return result.returncode == 0
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            return False
+        return _msitools_available()
 
     def _extract_with_msitools(self, file_path: str) -> Dict[str, Any]:
         """Extract MSI metadata using msitools (recommended approach).
@@ -252,16 +557,7 @@ class MetadataExtractor:
             properties = self._parse_property_table(content)
 
             # Map MSI properties to our metadata fields
-            metadata.update(
-                {
-                    "product_name": properties.get("ProductName"),
-                    "version": properties.get("ProductVersion"),
-                    "publisher": properties.get("Manufacturer"),
-                    "product_code": properties.get("ProductCode"),
-                    "upgrade_code": properties.get("UpgradeCode"),
-                    "language": properties.get("ProductLanguage"),
-                }
-            )
+            metadata.update(self._map_msi_properties(properties))
 
             logger.debug(f"MSI properties extracted: {len(properties)} properties")
 
@@ -274,6 +570,24 @@ class MetadataExtractor:
 
         return metadata
 
+    def _map_msi_properties(self, properties: Dict[str, str]) -> Dict[str, Any]:
+        """Map MSI Property table values to metadata fields.
+
+        Args:
+            properties: Property name -> value
+
+        Returns:
+            Metadata dictionary
+        """
+        return {
+            "product_name": properties.get("ProductName"),
+            "version": properties.get("ProductVersion"),
+            "publisher": properties.get("Manufacturer"),
+            "product_code": properties.get("ProductCode"),
+            "upgrade_code": properties.get("UpgradeCode"),
+            "language": properties.get("ProductLanguage"),
+        }
+
     def _parse_property_table(self, content: str) -> Dict[str, str]:
         """Parse MSI property table content.
 
@@ -463,97 +777,110 @@ class MetadataExtractor:
         metadata: Dict[str, Any] = {}
 
         try:
-            with open(file_path, "rb") as f:
-                # Read DOS header
-                dos_header = f.read(64)
-                if len(dos_header) < 64 or dos_header[:2] != b"MZ":
-                    raise ValueError("Invalid PE file - missing DOS header")
-
-                # Get PE header offset
-                pe_offset = int.from_bytes(dos_header[60:64], "little")
-
-                # Read PE header
-                f.seek(pe_offset)
-                pe_signature = f.read(4)
-                if pe_signature != b"PE\x00\x00":
-                    raise ValueError("Invalid PE file - missing PE signature")
-
-                # Read COFF header
-                coff_header = f.read(20)
-                if len(coff_header) < 20:
-                    raise ValueError("Invalid PE file - incomplete COFF header")
-
-                # Extract machine type (architecture)
-                machine = int.from_bytes(coff_header[0:2], "little")
-                if machine == 0x014C:
-                    metadata["architecture"] = "x86"
-                elif machine == 0x8664:
-                    metadata["architecture"] = "x64"
-                elif machine == 0x01C4:
-                    metadata["architecture"] = "ARM"
-                else:
-                    metadata["architecture"] = f"Unknown (0x{machine:04x})"
+            with PeImage(file_path) as pe:
+                metadata["architecture"] = pe.architecture
 
                 # Try to extract version information from resources
-                metadata.update(self._extract_version_info(file_path))
+                metadata.update(self._read_version_info(pe))
+
+                framework = detect_installer_framework(pe)
+                if framework:
+                    logger.info(f"Detected installer framework: {framework['name']}")
+                    metadata.setdefault("installer_details", {})["framework"] = (
+                        framework
+                    )
+
+                # Wrapped MSIs carry far richer metadata than the stub
+                metadata.update(self._read_embedded_msi(pe, metadata))
 
         except Exception as e:
             logger.warning(f"PE header extraction failed: {e}")
 
         return metadata
 
-    def _extract_version_info(self, file_path: str) -> Dict[str, Any]:
-        """Extract version information from PE resources.
+    def _read_embedded_msi(
+        self, pe: PeImage, exe_metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Read the MSI wrapped inside an EXE bootstrapper, if there is one.
+
+        The inner database is streamed to a temporary directory and read
+        like an uploaded MSI. Its values take precedence over the stub's
+        (Burn stubs are always x86, for example); the stub's version info,
+        manifest and framework are kept alongside the MSI's tables in
+        ``installer_details``.
 
         Args:
-            file_path: Path to the EXE file
+            pe: Open PE image
+            exe_metadata: Metadata already read from the stub
 
         Returns:
-            Version information dictionary
+            Metadata to merge over the EXE metadata, or an empty dictionary
         """
-        metadata: Dict[str, Any] = {}
-
         try:
-            # On Windows, we could use win32api to extract version info
-            # For cross-platform compatibility, we'll use a basic approach
-            if os.name == "nt":
-                metadata.update(self._extract_version_info_windows(file_path))
-            else:
-                # For non-Windows systems, we could use tools like 'file' command
-                # or implement a basic PE resource parser
-                logger.debug("Version info extraction not implemented for non-Windows")
-
-        except Exception as e:
-            logger.debug(f"Version info extraction failed: {e}")
-
+            with tempfile.TemporaryDirectory(prefix="aipackager-payload-") as tmp:
+                payload = extract_embedded_msi(pe, tmp)
+                if payload is None:
+                    return {}
+                with MsiDatabase(payload["path"]) as msi:
+                    metadata = self._read_msi(msi)
+                    executables = self._executables_from_tables(msi)
+        except (MsiFormatError, OSError, ValueError) as e:
+            logger.info(f"Embedded MSI extraction failed: {e}")
+            return {}
+
+        logger.info(
+            f"Read embedded MSI from {payload['container']} payload at "
+            f"0x{payload['offset']:x} ({payload['size']} bytes)"
+        )
+        details = metadata.get("installer_details") or {}
+        details.update(exe_metadata.get("installer_details") or {})
+        details["embedded_msi"] = {
+            "name": payload["name"],
+            "container": payload["container"],
+            "offset": payload["offset"],
+            "size": payload["size"],
+            "executable_names": executables,
+        }
+        metadata["installer_details"] = details
         return metadata
 
-    def _extract_version_info_windows(self, file_path: str) -> Dict[str, Any]:
-        """Extract version info on Windows using win32api.
+    def _read_version_info(self, pe: PeImage) -> Dict[str, Any]:
+        """Map VS_VERSIONINFO strings and the manifest of an open PE image.
+
+        ProductName/ProductVersion/CompanyName fill the same keys as the MSI
+        Property table; FileDescription and the fixed-size product version
+        are fallbacks. The raw strings and manifest settings are kept in
+        ``installer_details`` for the prompts.
 
         Args:
-            file_path: Path to the EXE file
+            pe: Open PE image
 
         Returns:
             Version information dictionary
         """
         metadata: Dict[str, Any] = {}
 
-        try:
-            # This would require pywin32 package
-            # import win32api
-            # import win32file
-
-            # For now, we'll simulate the extraction
-            logger.debug(f"Would extract Windows version info from: {file_path}")
-
-            # In a real implementation, you would:
-            # 1. Use GetFileVersionInfo to get version info
-            # 2. Parse the version info structure
-            # 3. Extract ProductName, ProductVersion, CompanyName, etc.
-
-        except Exception as e:
-            logger.debug(f"Windows version info extraction failed: {e}")
+        info = pe.version_info()
+        strings = info["strings"]
+        product_name = strings.get("ProductName") or strings.get("FileDescription")
+        if product_name:
+            metadata["product_name"] = product_name
+        version = strings.get("ProductVersion") or info.get("product_version")
+        if version:
+            # Older resource compilers write versions as "1, 2, 3, 4"
+            metadata["version"] = re.sub(r"\s*,\s*", ".", version)
+        if strings.get("CompanyName"):
+            metadata["publisher"] = strings["CompanyName"]
+
+        details: Dict[str, Any] = {}
+        version_strings = {k: strings[k] for k in VERSION_STRINGS if k in strings}
+        if version_strings:
+            details["version_info"] = version_strings
+        manifest = pe.manifest()
+        if manifest:
+            details["manifest"] = manifest
+        if details:
+            metadata["installer_details"] = details
 
         return metadata
 
@@ -615,6 +942,19 @@ class MetadataExtractor:
         return psadt_vars
 
 
+def _coded(labels: Dict[int, str], value: Any) -> Any:
+    """Return the label of a coded MSI column value, or the value if unknown."""
+    return labels.get(value, value) if isinstance(value, int) else value
+
+
+def _long_name(value: Optional[str]) -> Optional[str]:
+    """Return the long form of an MSI ``short|long`` (or ``target:source``) name."""
+    if not value:
+        return value
+    target = value.split(":", 1)[0]
+    return target.split("|", 1)[-1]
+
+
 def extract_file_metadata(file_path: str) -> Dict[str, Any]:
     """Convenience function to extract metadata from a file.
 
@@ -0,0 +1,349 @@
+"""Application metrics in the Prometheus text format.
+
+Metrics are defined here once and updated by the code they describe;
+``/metrics`` renders them with ``render_metrics``. With prometheus_client
+installed its default registry is used (which adds process and Python
+runtime metrics); otherwise a small pure-Python registry with the same
+Counter/Gauge/Histogram interface produces the same exposition format.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from prometheus_client import (  # type: ignore
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+except ImportError:  # pragma: no cover - exercised when the package is missing
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+    def _escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    def _format_value(value: float) -> str:
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(float(value))
+
+    def _labels_text(pairs: Sequence[Tuple[str, str]]) -> str:
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+    class _Registry:
+        def __init__(self) -> None:
+            self._metrics: List["_Metric"] = []
+            self._lock = threading.Lock()
+
+        def register(self, metric: "_Metric") -> None:
+            with self._lock:
+                if any(m.name == metric.name for m in self._metrics):
+                    raise ValueError(f"Duplicated metric: {metric.name}")
+                self._metrics.append(metric)
+
+        def collect(self) -> List["_Metric"]:
+            with self._lock:
+                return list(self._metrics)
+
+    REGISTRY = _Registry()
+
+    # (name suffix, extra label pairs, value)
+    _Sample = Tuple[str, List[Tuple[str, str]], float]
+
+    class _Metric:
+        """Metric family; with label names, ``labels()`` returns its children."""
+
+        kind = "untyped"
+
+        def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            registry: Optional[_Registry] = REGISTRY,
+        ):
+            self.name = name
+            self.documentation = documentation
+            self.labelnames = tuple(labelnames)
+            self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+            self._lock = threading.Lock()
+            if registry is not None:
+                registry.register(self)
+
+        def labels(self, *values: Any) -> Any:
+            key = tuple(str(v) for v in values)
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+                return child
+
+        def _new_child(self) -> "_Metric":
+            return type(self)(self.name, self.documentation, registry=None)
+
+        def _samples(self) -> List[_Sample]:
+            raise NotImplementedError
+
+        def render(self) -> List[str]:
+            lines = [
+                f"# HELP {self.name} {self.documentation}",
+                f"# TYPE {self.name} {self.kind}",
+            ]
+            if self.labelnames:
+                with self._lock:
+                    series = [
+                        (list(zip(self.labelnames, key)), child)
+                        for key, child in self._children.items()
+                    ]
+            else:
+                series = [([], self)]
+            for pairs, metric in series:
+                for suffix, extra, value in metric._samples():
+                    labels = _labels_text(pairs + extra)
+                    lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+            return lines
+
+    class Counter(_Metric):  # type: ignore[no-redef]
+        kind = "counter"
+
+        def __init__(self, name: str, *args: Any, **kwargs: Any):
+            # The family is named without the _total suffix of its sample
+            super().__init__(name.removesuffix("_total"), *args, **kwargs)
+            self._value = 0.0
+
+        def inc(self, amount: float = 1) -> None:
+            with self._lock:
+                self._value += amount
+
+        def _samples(self) -> List[_Sample]:
+            return [("_total", [], self._value)]
+
+    class Gauge(_Metric):  # type: ignore[no-redef]
+        kind = "gauge"
+
+        def __init__(self, *args: Any, **kwargs: Any):
+            super().__init__(*args, **kwargs)
+            self._value = 0.0
+            self._function: Optional[Callable[[], float]] = None
+
+        def set(self, value: float) -> None:
+            self._value = float(value)
+
+        def inc(self, amount: float = 1) -> None:
+            with self._lock:
+                self._value += amount
+
+        def dec(self, amount: float = 1) -> None:
+            self.inc(-amount)
+
+        def set_function(self, function: Callable[[], float]) -> None:
+            self._function = function
+
+        def _samples(self) -> List[_Sample]:
+            value = self._function() if self._function else self._value
+            return [("", [], float(value))]
+
+    class Histogram(_Metric):  # type: ignore[no-redef]
+        kind = "histogram"
+        DEFAULT_BUCKETS = (
+            0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5,
+            0.75, 1.0, 2.5, 5.0, 7.5, 10.0, float("inf"),
+        )  # fmt: skip
+
+        def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            registry: Optional[_Registry] = REGISTRY,
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+        ):
+            super().__init__(name, documentation, labelnames, registry)
+            self._upper_bounds = sorted(float(b) for b in buckets)
+            if self._upper_bounds[-1] != float("inf"):
+                self._upper_bounds.append(float("inf"))
+            self._counts = [0] * len(self._upper_bounds)
+            self._sum = 0.0
+
+        def _new_child(self) -> _Metric:
+            child: _Metric = Histogram(
+                self.name, self.documentation, registry=None, buckets=self._upper_bounds
+            )
+            return child
+
+        def observe(self, amount: float) -> None:
+            with self._lock:
+                self._sum += amount
+                for i, bound in enumerate(self._upper_bounds):
+                    if amount <= bound:
+                        self._counts[i] += 1
+                        break
+
+        @contextmanager
+        def time(self) -> Iterator[None]:
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.observe(time.perf_counter() - started)
+
+        def _samples(self) -> List[_Sample]:
+            with self._lock:
+                counts, total = list(self._counts), self._sum
+            samples: List[_Sample] = []
+            cumulative = 0
+            for bound, count in zip(self._upper_bounds, counts):
+                cumulative += count
+                samples.append(("_bucket", [("le", _format_value(bound))], cumulative))
+            samples.append(("_count", [], cumulative))
+            samples.append(("_sum", [], total))
+            return samples
+
+    def generate_latest(registry: _Registry = REGISTRY) -> bytes:
+        lines: List[str] = []
+        for metric in registry.collect():
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# Latency buckets for slow, remote work (LLM and MCP calls, whole stages)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, float("inf"))
+# Latency buckets for local work (database commits)
+FAST_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, float("inf"),
+)  # fmt: skip
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "aipackager_pipeline_stage_seconds",
+    "Time spent in a pipeline stage",
+    ["stage"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "aipackager_llm_request_seconds",
+    "Latency of LLM API calls",
+    ["model"],
+    buckets=SLOW_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "aipackager_llm_tokens_total",
+    "LLM tokens sent (input) and received (output)",
+    ["model", "direction"],
+)
+LLM_ERRORS = Counter("aipackager_llm_errors_total", "Failed LLM API calls", ["model"])
+MCP_CALL_SECONDS = Histogram(
+    "aipackager_mcp_call_seconds",
+    "Latency of MCP tool calls",
+    ["tool"],
+    buckets=SLOW_BUCKETS,
+)
+MCP_CALL_ERRORS = Counter(
+    "aipackager_mcp_call_errors_total", "Failed MCP tool calls", ["tool"]
+)
+DB_COMMIT_SECONDS = Histogram(
+    "aipackager_db_commit_seconds",
+    "Latency of database commits",
+    buckets=FAST_BUCKETS,
+)
+QUEUE_DEPTH = Gauge(
+    "aipackager_queue_depth", "Items waiting in an in-process queue", ["queue"]
+)
+WORKERS_BUSY = Gauge(
+    "aipackager_workers_busy", "Workers of a pool currently running a task", ["pool"]
+)
+WORKERS_TOTAL = Gauge("aipackager_workers", "Size of a worker pool", ["pool"])
+CACHE_REQUESTS = Counter(
+    "aipackager_cache_requests_total",
+    "Cache lookups by result; hit ratio = hit / (hit + miss)",
+    ["cache", "result"],
+)
+UPLOAD_BYTES = Counter(
+    "aipackager_upload_bytes_total", "Installer bytes received", ["mode"]
+)
+UPLOAD_SECONDS = Counter(
+    "aipackager_upload_seconds_total",
+    "Time spent receiving installer bytes; bytes/sec = bytes / seconds",
+    ["mode"],
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one cache lookup."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_upload(mode: str, size: int, seconds: float) -> None:
+    """Count received upload bytes and the time spent receiving them.
+
+    Args:
+        mode: ``form`` for single-request uploads, ``chunked`` for chunks
+        size: Bytes received
+        seconds: Time spent receiving and storing them
+    """
+    UPLOAD_BYTES.labels(mode).inc(size)
+    UPLOAD_SECONDS.labels(mode).inc(seconds)
+
+
+class LLMCall:
+    """Handle for ``observe_llm_call``; ``record`` counts the tokens."""
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def record(self, response: Any) -> None:
+        """Count the prompt and completion tokens of an API response."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        LLM_TOKENS.labels(self.model, "input").inc(
+            getattr(usage, "prompt_tokens", 0) or 0
+        )
+        LLM_TOKENS.labels(self.model, "output").inc(
+            getattr(usage, "completion_tokens", 0) or 0
+        )
+
+
+@contextmanager
+def observe_llm_call(model: str) -> Iterator[LLMCall]:
+    """Time an LLM call and count its failure; tokens via ``call.record``."""
+    call = LLMCall(model)
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        LLM_ERRORS.labels(model).inc()
+        raise
+    finally:
+        LLM_REQUEST_SECONDS.labels(model).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def observe_mcp_call(tool: str) -> Iterator[None]:
+    """Time an MCP tool call and count it as failed if it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        MCP_CALL_ERRORS.labels(tool).inc()
+        raise
+    finally:
+        MCP_CALL_SECONDS.labels(tool).observe(time.perf_counter() - started)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text format.
+
+    Returns:
+        (body, content type)
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
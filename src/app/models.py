@@ -1,11 +1,39 @@
 """SQLAlchemy models for AIPackager v3."""
 
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text, JSON
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    JSON,
+    event,
+)
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    Session,
+    mapped_column,
+    object_session,
+    relationship,
+)
+
+from .artifacts import (
+    artifact_hash,
+    compress_payload,
+    decompress_payload,
+    deserialize_artifact,
+    serialize_artifact,
+)
 
 
 class Base(DeclarativeBase):
@@ -14,10 +42,110 @@ class Base(DeclarativeBase):
     pass
 
 
+class Artifact(Base):
+    """Compressed, content-addressed pipeline stage output."""
+
+    __tablename__ = "artifacts"
+
+    # SHA-256 of the uncompressed canonical payload
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    codec: Mapped[str] = mapped_column(String(10), nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+
+    @classmethod
+    def from_value(cls, value: Any, as_json: bool = True) -> "Artifact":
+        """Build an (unsaved) artifact for a value."""
+        payload = serialize_artifact(value, as_json)
+        codec, data = compress_payload(payload)
+        return cls(
+            hash=artifact_hash(payload), codec=codec, size=len(payload), data=data
+        )
+
+    def load(self, as_json: bool = True) -> Any:
+        """Decompress and decode the stored value."""
+        return deserialize_artifact(decompress_payload(self.codec, self.data), as_json)
+
+    def __repr__(self) -> str:
+        """String representation of Artifact."""
+        return f"Artifact(hash={self.hash!r}, codec={self.codec!r}, size={self.size!r})"
+
+
+class ArtifactField:
+    """Expose an artifact reference on a model as a plain attribute.
+
+    The owning model maps ``<name>_hash`` (FK to ``artifacts.hash``) and a
+    view-only ``<name>_artifact`` relationship. Reading the attribute loads and
+    decodes the artifact lazily; assigning a value stages a new artifact that
+    is written (once per hash) when the session flushes.
+    """
+
+    def __init__(self, as_json: bool = True) -> None:
+        self.as_json = as_json
+        self.name = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.hash_attr = f"{name}_hash"
+        self.artifact_attr = f"{name}_artifact"
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+
+        digest = getattr(instance, self.hash_attr)
+        if digest is None:
+            return None
+
+        values = instance.__dict__.setdefault("_artifact_values", {})
+        cached = values.get(self.name)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+
+        artifact = getattr(instance, self.artifact_attr)
+        if artifact is None or artifact.hash != digest:
+            # Reference changed since the relationship was loaded
+            session = object_session(instance)
+            artifact = session.get(Artifact, digest) if session else None
+        if artifact is None:
+            return None
+
+        value = artifact.load(self.as_json)
+        values[self.name] = (digest, value)
+        return value
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        values = instance.__dict__.setdefault("_artifact_values", {})
+        pending = instance.__dict__.setdefault("_pending_artifacts", {})
+
+        if value is None:
+            setattr(instance, self.hash_attr, None)
+            values.pop(self.name, None)
+            pending.pop(self.name, None)
+            return
+
+        artifact = Artifact.from_value(value, self.as_json)
+        setattr(instance, self.hash_attr, artifact.hash)
+        values[self.name] = (artifact.hash, value)
+        pending[self.name] = artifact
+
+
+def _artifact_ref(name: str) -> Any:
+    """Mapped column holding the artifact hash for an ArtifactField."""
+    return mapped_column(f"{name}_hash", String(64), ForeignKey("artifacts.hash"))
+
+
 class Package(Base):
     """Package model representing uploaded installer files."""
 
     __tablename__ = "packages"
+    __table_args__ = (
+        # Serves status filters (resume_pending_jobs) and status-scoped history
+        Index("ix_packages_status_upload_time", "status", "upload_time"),
+    )
 
     # Primary key
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
@@ -25,10 +153,12 @@ class Package(Base):
     # File information
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    # SHA-256 of the installer content (content-addressed uploads)
+    file_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True)
 
     # Timestamps
     upload_time: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc)
+        DateTime, default=lambda: datetime.now(timezone.utc), index=True
     )
 
     # Status tracking
@@ -41,18 +171,76 @@ class Package(Base):
         String(50), default="upload", nullable=False
     )
     progress_pct: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Background metadata stage: "queued", "completed" or "failed"; shared by
+    # all worker processes (None for packages uploaded before the stage)
+    metadata_status: Mapped[Optional[str]] = mapped_column(String(20))
 
     # User input
     custom_instructions: Mapped[Optional[str]] = mapped_column(Text)
 
     # 5-Stage Pipeline Results
-    instruction_result: Mapped[Optional[dict]] = mapped_column(JSON)
-    rag_documentation: Mapped[Optional[str]] = mapped_column(Text)
-    initial_script: Mapped[Optional[dict]] = mapped_column(JSON)
-    generated_script: Mapped[Optional[dict]] = mapped_column(JSON)
-    hallucination_report: Mapped[Optional[dict]] = mapped_column(JSON)
+    # Heavy stage outputs live in the artifacts table and are referenced by
+    # hash, so list queries never haul prompts and scripts around.
+    instruction_result_hash: Mapped[Optional[str]] = _artifact_ref("instruction_result")
+    rag_documentation_hash: Mapped[Optional[str]] = _artifact_ref("rag_documentation")
+    initial_script_hash: Mapped[Optional[str]] = _artifact_ref("initial_script")
+    generated_script_hash: Mapped[Optional[str]] = _artifact_ref("generated_script")
+    hallucination_report_hash: Mapped[Optional[str]] = _artifact_ref(
+        "hallucination_report"
+    )
+    corrections_applied_hash: Mapped[Optional[str]] = _artifact_ref(
+        "corrections_applied"
+    )
+    # Rendered script, parsed RAG docs and display metrics of the detail page,
+    # derived from the artifacts above (see detail_view)
+    detail_view_hash: Mapped[Optional[str]] = _artifact_ref("detail_view")
+    # Span tree of the last pipeline run (see workflow.tracing)
+    trace_hash: Mapped[Optional[str]] = _artifact_ref("trace")
     pipeline_metadata: Mapped[Optional[dict]] = mapped_column(JSON)
-    corrections_applied: Mapped[Optional[list]] = mapped_column(JSON)
+
+    instruction_result_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[instruction_result_hash], viewonly=True
+    )
+    rag_documentation_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[rag_documentation_hash], viewonly=True
+    )
+    initial_script_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[initial_script_hash], viewonly=True
+    )
+    generated_script_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[generated_script_hash], viewonly=True
+    )
+    hallucination_report_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[hallucination_report_hash], viewonly=True
+    )
+    corrections_applied_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[corrections_applied_hash], viewonly=True
+    )
+    detail_view_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[detail_view_hash], viewonly=True
+    )
+    trace_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[trace_hash], viewonly=True
+    )
+
+    instruction_result = ArtifactField()
+    rag_documentation = ArtifactField(as_json=False)
+    initial_script = ArtifactField()
+    generated_script = ArtifactField()
+    hallucination_report = ArtifactField()
+    corrections_applied = ArtifactField()
+    detail_view = ArtifactField()
+    trace = ArtifactField()
+
+    ARTIFACT_FIELDS = (
+        "instruction_result",
+        "rag_documentation",
+        "initial_script",
+        "generated_script",
+        "hallucination_report",
+        "corrections_applied",
+        "trace",
+    )
 
     # Relationship to metadata
     package_metadata: Mapped[Optional["Metadata"]] = relationship(
@@ -67,16 +255,124 @@ class Package(Base):
         return f"Package(id={self.id!r}, filename={self.filename!r}, status={self.status!r})"
 
 
+class UploadBlob(Base):
+    """Reference-counted installer file in the content-addressed upload store."""
+
+    __tablename__ = "upload_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    file_path: Mapped[str] = mapped_column(String(500), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self) -> str:
+        """String representation of UploadBlob."""
+        return f"UploadBlob(sha256={self.sha256!r}, ref_count={self.ref_count!r})"
+
+
+class UploadSession(Base):
+    """Chunked upload in progress, reassembled in uploads/tmp/<id>.part."""
+
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    chunk_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), index=True
+    )
+    # Set when completion is claimed; the package once it is created
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    package_id: Mapped[Optional[UUID]] = mapped_column(
+        ForeignKey("packages.id", ondelete="SET NULL")
+    )
+
+    chunks: Mapped[list["UploadChunk"]] = relationship(
+        back_populates="upload",
+        cascade="all, delete-orphan",
+        order_by="UploadChunk.index",
+    )
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of chunks the file is split into."""
+        return max(1, -(-self.size // self.chunk_size))
+
+    def chunk_length(self, index: int) -> int:
+        """Expected byte length of chunk ``index`` (the last may be short)."""
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def __repr__(self) -> str:
+        """String representation of UploadSession."""
+        return f"UploadSession(id={self.id!r}, filename={self.filename!r}, size={self.size!r})"
+
+
+class UploadChunk(Base):
+    """A verified chunk of an upload session.
+
+    Rows are only ever inserted, so chunks arriving concurrently never
+    overwrite each other's bookkeeping.
+    """
+
+    __tablename__ = "upload_chunks"
+
+    upload_id: Mapped[UUID] = mapped_column(
+        ForeignKey("upload_sessions.id", ondelete="CASCADE"), primary_key=True
+    )
+    index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    upload: Mapped[UploadSession] = relationship(back_populates="chunks")
+
+    def __repr__(self) -> str:
+        """String representation of UploadChunk."""
+        return f"UploadChunk(upload_id={self.upload_id!r}, index={self.index!r})"
+
+
+class MetadataCacheEntry(Base):
+    """Extraction result cached by installer hash and extractor version."""
+
+    __tablename__ = "metadata_cache"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    extractor_version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    file_metadata: Mapped[dict] = mapped_column(JSON, nullable=False)
+    executable_names: Mapped[list] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self) -> str:
+        """String representation of MetadataCacheEntry."""
+        return (
+            f"MetadataCacheEntry(sha256={self.sha256!r}, "
+            f"extractor_version={self.extractor_version!r})"
+        )
+
+
 class Metadata(Base):
     """Metadata model for extracted installer information."""
 
     __tablename__ = "metadata"
+    __table_args__ = (
+        # Dedup lookups: same product code, optionally narrowed by version
+        Index("ix_metadata_product_code_version", "product_code", "version"),
+    )
 
     # Primary key
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
 
     # Foreign key to package
-    package_id: Mapped[UUID] = mapped_column(ForeignKey("packages.id"), nullable=False)
+    package_id: Mapped[UUID] = mapped_column(
+        ForeignKey("packages.id"), nullable=False, unique=True, index=True
+    )
 
     # MSI/EXE metadata fields
     product_name: Mapped[Optional[str]] = mapped_column(String(255))
@@ -88,10 +384,12 @@ class Metadata(Base):
 
     # Additional metadata fields
     product_code: Mapped[Optional[str]] = mapped_column(String(100))
-    upgrade_code: Mapped[Optional[str]] = mapped_column(String(100))
+    upgrade_code: Mapped[Optional[str]] = mapped_column(String(100), index=True)
     language: Mapped[Optional[str]] = mapped_column(String(50))
     architecture: Mapped[Optional[str]] = mapped_column(String(20))
     executable_names: Mapped[Optional[list]] = mapped_column(JSON)
+    # Decoded MSI tables (files, registry, shortcuts, services, custom actions)
+    installer_details: Mapped[Optional[dict]] = mapped_column(JSON)
 
     # Relationship to package
     package: Mapped["Package"] = relationship(
@@ -101,3 +399,69 @@ class Metadata(Base):
     def __repr__(self) -> str:
         """String representation of Metadata."""
         return f"Metadata(id={self.id!r}, product_name={self.product_name!r}, version={self.version!r})"
+
+
+class EvaluationRecord(Base):
+    """Result of one model × scenario evaluation.
+
+    Listing, filtering and per-model aggregates use the summary columns;
+    the rendered scripts and detailed reports live in an artifact that is
+    only loaded for a single result.
+    """
+
+    __tablename__ = "evaluation_results"
+    __table_args__ = (
+        Index("ix_evaluation_results_model_id_timestamp", "model_id", "timestamp"),
+        Index(
+            "ix_evaluation_results_scenario_id_timestamp", "scenario_id", "timestamp"
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    model_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    model_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    scenario_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    scenario_title: Mapped[str] = mapped_column(String(255), nullable=False)
+    scenario_category: Mapped[Optional[str]] = mapped_column(String(100), index=True)
+    # UTC
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    hallucinations_found: Mapped[int] = mapped_column(Integer, nullable=False)
+    hallucinations_corrected: Mapped[int] = mapped_column(Integer, nullable=False)
+    trust_score: Mapped[float] = mapped_column(Float, nullable=False)
+    evaluation_log: Mapped[str] = mapped_column(String(500), nullable=False)
+    # ModelInfo and Scenario as evaluated (small)
+    model_info: Mapped[dict] = mapped_column(JSON, nullable=False)
+    scenario_info: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    # Rendered outputs and detailed reports
+    output_hash: Mapped[Optional[str]] = _artifact_ref("output")
+    output_artifact: Mapped[Optional[Artifact]] = relationship(
+        foreign_keys=[output_hash], viewonly=True
+    )
+    output = ArtifactField()
+
+    def __repr__(self) -> str:
+        """String representation of EvaluationRecord."""
+        return (
+            f"EvaluationRecord(id={self.id!r}, model_id={self.model_id!r}, "
+            f"scenario_id={self.scenario_id!r})"
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _store_pending_artifacts(
+    session: Session, flush_context: Any, instances: Any
+) -> None:
+    """Write staged artifacts, skipping hashes that are already stored."""
+    staged = {obj.hash for obj in session.new if isinstance(obj, Artifact)}
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty):
+            pending = obj.__dict__.pop("_pending_artifacts", None)
+            if not pending:
+                continue
+            for artifact in pending.values():
+                if artifact.hash in staged:
+                    continue
+                if session.get(Artifact, artifact.hash) is None:
+                    session.add(artifact)
+                staged.add(artifact.hash)
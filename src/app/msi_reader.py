@@ -0,0 +1,558 @@
+"""Native reader for Windows Installer (MSI) databases.
+
+An MSI file is an OLE Compound File Binary (CFB) container. This module
+memory-maps the file once and reads only the streams it needs: the
+SummaryInformation property set, the string pool and individual table
+streams. It replaces spawning ``msiinfo`` for every table that is queried.
+"""
+
+import functools
+import mmap
+import struct
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+# CFB sector markers
+_FREESECT = 0xFFFFFFFF
+_ENDOFCHAIN = 0xFFFFFFFE
+_NOSTREAM = 0xFFFFFFFF
+
+_CFB_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_ENTRY_SIZE = 128
+_TYPE_STREAM = 2
+_TYPE_ROOT = 5
+
+# Table stream names are compressed into this alphabet (see _decode_stream_name)
+_MIME = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz._"
+_TABLE_PREFIX = 0x4840
+
+# Column type bits from the _Columns table
+_MSITYPE_VALID = 0x0100
+_MSITYPE_STRING = 0x0800
+_MSITYPE_NULLABLE = 0x1000
+_MSITYPE_KEY = 0x2000
+
+SUMMARY_STREAM = "\x05SummaryInformation"
+
+# SummaryInformation property IDs, named like `msiinfo suminfo` prints them
+SUMMARY_PROPERTIES = {
+    1: "codepage",
+    2: "title",
+    3: "subject",
+    4: "author",
+    5: "keywords",
+    6: "comments",
+    7: "template",
+    8: "last_saved_by",
+    9: "revision_number",
+    12: "create_time",
+    13: "last_save_time",
+    14: "page_count",
+    15: "word_count",
+    16: "character_count",
+    18: "application",
+    19: "security",
+}
+
+_VT_I2 = 2
+_VT_I4 = 3
+_VT_LPSTR = 30
+_VT_FILETIME = 64
+
+# Raised while decoding malformed databases: truncated streams (struct.error,
+# IndexError), unknown code pages and missing streams (LookupError, KeyError)
+_DECODE_ERRORS = (struct.error, LookupError, IndexError)
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+class MsiFormatError(ValueError):
+    """Raised when a file is not a readable MSI database."""
+
+
+def _format_errors(method: _F) -> _F:
+    """Report decoding failures of a reader method as MsiFormatError."""
+
+    @functools.wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return method(*args, **kwargs)
+        except _DECODE_ERRORS as e:
+            raise MsiFormatError(f"{type(e).__name__}: {e}") from e
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _decode_stream_name(name: str) -> str:
+    """Decode a compressed MSI stream name; table streams get a '!' prefix."""
+    chars = []
+    for ch in name:
+        code = ord(ch)
+        if code == _TABLE_PREFIX:
+            chars.append("!")
+        elif 0x3800 <= code < 0x4800:
+            code -= 0x3800
+            chars.append(_MIME[code & 0x3F])
+            chars.append(_MIME[(code >> 6) & 0x3F])
+        elif 0x4800 <= code < _TABLE_PREFIX:
+            chars.append(_MIME[code - 0x4800])
+        else:
+            chars.append(ch)
+    return "".join(chars)
+
+
+def _signed32(value: int) -> int:
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+def _codec_for(codepage: int) -> str:
+    """Map a Windows code page to a Python codec name."""
+    if codepage in (0, 1252):
+        return "cp1252"
+    if codepage == 65001:
+        return "utf-8"
+    return f"cp{codepage}"
+
+
+class CompoundFile:
+    """Read-only view of the root-level streams of a CFB container."""
+
+    def __init__(self, data: Any):
+        """Parse the CFB header, FAT and directory.
+
+        Args:
+            data: Buffer (bytes or mmap) holding the whole file
+
+        Raises:
+            MsiFormatError: If the buffer is not a valid compound file
+        """
+        self._data = data
+        if len(self._data) < 512 or self._data[:8] != _CFB_SIGNATURE:
+            raise MsiFormatError("Not an OLE compound file")
+
+        (
+            major_version,
+            sector_shift,
+            mini_sector_shift,
+        ) = struct.unpack_from("<H2xHH", self._data, 0x1A)
+        if sector_shift not in (9, 12):
+            raise MsiFormatError(f"Unsupported sector shift {sector_shift}")
+        self._major_version = major_version
+        self._sector_size = 1 << sector_shift
+        self._mini_sector_size = 1 << mini_sector_shift
+        (
+            num_fat_sectors,
+            first_dir_sector,
+            self._mini_cutoff,
+            first_minifat_sector,
+            _num_minifat_sectors,
+            first_difat_sector,
+            num_difat_sectors,
+        ) = struct.unpack_from("<II4xIIIII", self._data, 0x2C)
+
+        self._fat = self._load_fat(
+            num_fat_sectors, first_difat_sector, num_difat_sectors
+        )
+        self._entries = self._load_directory(first_dir_sector)
+        root = self._entries[0]
+        if root["type"] != _TYPE_ROOT:
+            raise MsiFormatError("Missing root directory entry")
+        self._mini_stream = self._read_chain(root["start"], root["size"])
+        self._minifat = self._unpack_sectors(
+            self._chain(first_minifat_sector, self._fat)
+        )
+        self._streams = {
+            _decode_stream_name(entry["name"]): entry
+            for entry in self._children(root)
+            if entry["type"] == _TYPE_STREAM
+        }
+
+    def _sector(self, sector: int) -> bytes:
+        offset = (sector + 1) * self._sector_size
+        if offset + self._sector_size > len(self._data):
+            raise MsiFormatError(f"Sector {sector} is beyond the end of the file")
+        return bytes(self._data[offset : offset + self._sector_size])
+
+    def _unpack_sectors(self, sectors: List[int]) -> List[int]:
+        values: List[int] = []
+        for sector in sectors:
+            values.extend(
+                struct.unpack(f"<{self._sector_size // 4}I", self._sector(sector))
+            )
+        return values
+
+    def _load_fat(
+        self, num_fat_sectors: int, first_difat_sector: int, num_difat_sectors: int
+    ) -> List[int]:
+        # Header counts are untrusted: no chain can be longer than the file
+        file_sectors = len(self._data) // self._sector_size - 1
+        num_fat_sectors = min(num_fat_sectors, file_sectors)
+        difat = list(struct.unpack_from("<109I", self._data, 0x4C))
+        sector = first_difat_sector
+        per_sector = self._sector_size // 4 - 1
+        visited = set()
+        for _ in range(min(num_difat_sectors, file_sectors)):
+            if len(difat) >= num_fat_sectors or sector in (_ENDOFCHAIN, _FREESECT):
+                break
+            if sector in visited:
+                raise MsiFormatError("DIFAT chain contains a cycle")
+            visited.add(sector)
+            values = struct.unpack(f"<{per_sector + 1}I", self._sector(sector))
+            difat.extend(values[:per_sector])
+            sector = values[per_sector]
+        return self._unpack_sectors(
+            [s for s in difat[:num_fat_sectors] if s != _FREESECT]
+        )
+
+    def _chain(self, start: int, fat: List[int]) -> List[int]:
+        sectors: List[int] = []
+        sector = start
+        while sector != _ENDOFCHAIN and sector != _FREESECT:
+            if sector >= len(fat) or len(sectors) > len(fat):
+                raise MsiFormatError("Corrupt sector chain")
+            sectors.append(sector)
+            sector = fat[sector]
+        return sectors
+
+    def _read_chain(self, start: int, size: int) -> bytes:
+        """Read a regular stream, slicing contiguous sector runs in one go."""
+        if size == 0:
+            return b""
+        runs: List[List[int]] = []
+        for sector in self._chain(start, self._fat):
+            if runs and sector == runs[-1][1]:
+                runs[-1][1] = sector + 1
+            else:
+                runs.append([sector, sector + 1])
+        parts = [
+            self._data[(first + 1) * self._sector_size : (end + 1) * self._sector_size]
+            for first, end in runs
+        ]
+        data = b"".join(parts)
+        if len(data) < size:
+            raise MsiFormatError("Stream is truncated")
+        return data[:size]
+
+    def _read_mini_chain(self, start: int, size: int) -> bytes:
+        parts = []
+        step = self._mini_sector_size
+        for sector in self._chain(start, self._minifat):
+            parts.append(self._mini_stream[sector * step : (sector + 1) * step])
+        data = b"".join(parts)
+        if len(data) < size:
+            raise MsiFormatError("Mini stream is truncated")
+        return data[:size]
+
+    def _load_directory(self, first_dir_sector: int) -> List[Dict[str, Any]]:
+        raw = b"".join(
+            self._sector(s) for s in self._chain(first_dir_sector, self._fat)
+        )
+        entries = []
+        for offset in range(0, len(raw), _ENTRY_SIZE):
+            name_len, entry_type = struct.unpack_from("<HB", raw, offset + 64)
+            left, right, child = struct.unpack_from("<III", raw, offset + 68)
+            start, size = struct.unpack_from("<IQ", raw, offset + 116)
+            if self._major_version == 3:
+                size &= 0xFFFFFFFF
+            name = raw[offset : offset + max(name_len - 2, 0)].decode(
+                "utf-16-le", errors="replace"
+            )
+            entries.append(
+                {
+                    "name": name,
+                    "type": entry_type,
+                    "left": left,
+                    "right": right,
+                    "child": child,
+                    "start": start,
+                    "size": size,
+                }
+            )
+        if not entries:
+            raise MsiFormatError("Empty directory")
+        return entries
+
+    def _children(self, storage: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Collect the entries of a storage's red-black sibling tree."""
+        children = []
+        pending = [storage["child"]]
+        seen = set()
+        while pending:
+            index = pending.pop()
+            if index == _NOSTREAM or index in seen or index >= len(self._entries):
+                continue
+            seen.add(index)
+            entry = self._entries[index]
+            children.append(entry)
+            pending.extend((entry["left"], entry["right"]))
+        return children
+
+    def stream_names(self) -> List[str]:
+        """Return the decoded names of all root-level streams."""
+        return sorted(self._streams)
+
+    def has_stream(self, name: str) -> bool:
+        """Check whether a root-level stream exists."""
+        return name in self._streams
+
+    def read_stream(self, name: str) -> bytes:
+        """Read a root-level stream by its decoded name.
+
+        Raises:
+            KeyError: If the stream does not exist
+        """
+        entry = self._streams[name]
+        if entry["size"] < self._mini_cutoff:
+            return self._read_mini_chain(entry["start"], entry["size"])
+        return self._read_chain(entry["start"], entry["size"])
+
+
+class MsiDatabase:
+    """In-process reader for MSI summary information and tables.
+
+    Reading methods raise MsiFormatError for malformed databases.
+
+    Usage::
+
+        with MsiDatabase(path) as msi:
+            summary = msi.summary_information()
+            rows = msi.table("Property")
+    """
+
+    def __init__(self, file_path: str):
+        """Open and memory-map an MSI file.
+
+        Args:
+            file_path: Path to the MSI file
+
+        Raises:
+            MsiFormatError: If the file is not a valid MSI database
+        """
+        self._file = open(file_path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            self._file.close()
+            raise MsiFormatError(str(e)) from e
+        try:
+            self._cfb = CompoundFile(self._mmap)
+        except (MsiFormatError, *_DECODE_ERRORS) as e:
+            self.close()
+            raise MsiFormatError(str(e)) from e
+        self._strings: Optional[List[Optional[str]]] = None
+        self._string_ref_size = 2
+        self._columns: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+
+    def __enter__(self) -> "MsiDatabase":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map and file handle."""
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    @_format_errors
+    def summary_information(self) -> Dict[str, Any]:
+        """Parse the SummaryInformation property set.
+
+        Returns:
+            Dictionary keyed by the names in SUMMARY_PROPERTIES
+        """
+        if not self._cfb.has_stream(SUMMARY_STREAM):
+            return {}
+        data = self._cfb.read_stream(SUMMARY_STREAM)
+        if len(data) < 48:
+            raise MsiFormatError("Truncated SummaryInformation stream")
+        (section_offset,) = struct.unpack_from("<I", data, 44)
+        _size, count = struct.unpack_from("<II", data, section_offset)
+
+        raw: Dict[int, Any] = {}
+        for index in range(count):
+            pid, offset = struct.unpack_from(
+                "<II", data, section_offset + 8 + index * 8
+            )
+            position = section_offset + offset
+            (vt,) = struct.unpack_from("<I", data, position)
+            if vt == _VT_I2:
+                raw[pid] = struct.unpack_from("<h", data, position + 4)[0]
+            elif vt == _VT_I4:
+                raw[pid] = struct.unpack_from("<i", data, position + 4)[0]
+            elif vt == _VT_FILETIME:
+                raw[pid] = struct.unpack_from("<Q", data, position + 4)[0]
+            elif vt == _VT_LPSTR:
+                (length,) = struct.unpack_from("<I", data, position + 4)
+                raw[pid] = data[position + 8 : position + 8 + length].rstrip(b"\x00")
+
+        codec = _codec_for(raw.get(1, 0) & 0xFFFF)
+        summary: Dict[str, Any] = {}
+        for pid, value in raw.items():
+            name = SUMMARY_PROPERTIES.get(pid)
+            if name is None:
+                continue
+            if isinstance(value, bytes):
+                value = value.decode(codec, errors="replace")
+            summary[name] = value
+        return summary
+
+    def _load_string_pool(self) -> List[Optional[str]]:
+        if self._strings is not None:
+            return self._strings
+
+        pool = self._cfb.read_stream("!_StringPool")
+        data = self._cfb.read_stream("!_StringData")
+        words = struct.unpack(f"<{len(pool) // 2}H", pool[: len(pool) // 2 * 2])
+        if len(words) < 2:
+            raise MsiFormatError("Empty string pool")
+        codepage = words[0] | ((words[1] & 0x7FFF) << 16)
+        self._string_ref_size = 3 if words[1] & 0x8000 else 2
+        codec = _codec_for(codepage)
+
+        # String ID 0 is the null string; IDs follow entry order
+        strings: List[Optional[str]] = [None]
+        count = len(words) // 2
+        index = 1
+        offset = 0
+        while index < count:
+            length = words[index * 2]
+            refs = words[index * 2 + 1]
+            if length == 0 and refs == 0:
+                strings.append(None)
+                index += 1
+                continue
+            if length == 0:
+                # Strings over 64k: a null entry carries the high length word
+                if index * 2 + 2 >= len(words):
+                    break
+                length = (refs << 16) + words[index * 2 + 2]
+                index += 2
+            else:
+                index += 1
+            strings.append(
+                data[offset : offset + length].decode(codec, errors="replace")
+            )
+            offset += length
+
+        self._strings = strings
+        return strings
+
+    def _string(self, string_id: int) -> Optional[str]:
+        strings = self._load_string_pool()
+        if 0 < string_id < len(strings):
+            return strings[string_id]
+        return None
+
+    def _column_size(self, column_type: int) -> int:
+        if column_type & ~_MSITYPE_NULLABLE == _MSITYPE_STRING | _MSITYPE_VALID:
+            return 2  # binary stream reference
+        if column_type & _MSITYPE_STRING:
+            return self._string_ref_size
+        return 2 if column_type & 0xFF <= 2 else 4
+
+    def _read_rows(
+        self, stream: str, columns: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Decode a column-major table stream into row dictionaries."""
+        if not self._cfb.has_stream(stream):
+            return []
+        data = self._cfb.read_stream(stream)
+        self._load_string_pool()
+        sizes = [self._column_size(column["type"]) for column in columns]
+        row_size = sum(sizes)
+        if not row_size or len(data) % row_size:
+            raise MsiFormatError(f"Table stream {stream} has an invalid size")
+        row_count = len(data) // row_size
+
+        values: List[List[Any]] = []
+        offset = 0
+        for column, size in zip(columns, sizes):
+            if size == 3:
+                raw = [
+                    int.from_bytes(data[p : p + 3], "little")
+                    for p in range(offset, offset + 3 * row_count, 3)
+                ]
+            else:
+                fmt = "H" if size == 2 else "I"
+                raw = list(struct.unpack_from(f"<{row_count}{fmt}", data, offset))
+            offset += size * row_count
+
+            column_type = column["type"]
+            if column_type & ~_MSITYPE_NULLABLE == _MSITYPE_STRING | _MSITYPE_VALID:
+                decoded: List[Any] = [None] * row_count  # binary data lives in streams
+            elif column_type & _MSITYPE_STRING:
+                decoded = [self._string(v) for v in raw]
+            elif size == 2:
+                decoded = [v - 0x8000 if v else None for v in raw]
+            else:
+                decoded = [_signed32(v ^ 0x80000000) if v else None for v in raw]
+            values.append(decoded)
+
+        names = [column["name"] for column in columns]
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def _load_columns(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._columns is not None:
+            return self._columns
+
+        meta = [
+            {"name": "Table", "type": _MSITYPE_VALID | _MSITYPE_STRING | 64},
+            {"name": "Number", "type": _MSITYPE_VALID | 2},
+            {"name": "Name", "type": _MSITYPE_VALID | _MSITYPE_STRING | 64},
+            {"name": "Type", "type": _MSITYPE_VALID | 2},
+        ]
+        columns: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self._read_rows("!_Columns", meta):
+            if row["Table"] is None or row["Type"] is None:
+                continue
+            columns.setdefault(row["Table"], []).append(
+                {
+                    "name": row["Name"],
+                    "number": (row["Number"] or 0) & 0x7FFF,
+                    "type": row["Type"] & 0xFFFF,
+                }
+            )
+        for table_columns in columns.values():
+            table_columns.sort(key=lambda column: column["number"])
+        self._columns = columns
+        return columns
+
+    @_format_errors
+    def table_names(self) -> List[str]:
+        """Return the names of all tables declared in the database."""
+        return sorted(self._load_columns())
+
+    @_format_errors
+    def table(self, name: str) -> List[Dict[str, Any]]:
+        """Read all rows of a table.
+
+        Args:
+            name: Table name, e.g. "Property"
+
+        Returns:
+            List of rows mapping column name to value (empty if the table
+            does not exist)
+        """
+        if name not in self._tables:
+            columns = self._load_columns().get(name)
+            self._tables[name] = self._read_rows(f"!{name}", columns) if columns else []
+        return self._tables[name]
+
+    def properties(self) -> Dict[str, str]:
+        """Return the Property table as a name -> value dictionary."""
+        return {
+            row["Property"]: row["Value"]
+            for row in self.table("Property")
+            if row.get("Property") and row.get("Value")
+        }
+
+
+def is_msi_database(file_path: str) -> bool:
+    """Check whether a file starts with the OLE compound file signature."""
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(8) == _CFB_SIGNATURE
+    except OSError:
+        return False
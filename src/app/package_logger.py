@@ -1,55 +1,139 @@
-"""Per-package logging system for AIPackager v3."""
+"""Per-package logging system for AIPackager v3.
 
+Loggers are kept in a small LRU registry, so repeated
+``get_package_logger`` calls for the same package return the same
+instance without touching the filesystem. Records are written by the
+shared log pipeline's writer thread (see ``log_pipeline``), so logging a
+step never waits on disk I/O; the least recently used logger's file is
+closed once too many are open.
+
+Each package log is a JSON Lines file, one compact object per step:
+``{"ts", "level", "step", "message", "data"}``. Payloads are serialized
+only when their level is enabled, and payloads larger than
+PACKAGE_LOG_INLINE_LIMIT bytes are stored once under ``logs/payloads``
+by SHA-256 and referenced as ``data_ref``. ``get_logs`` renders the
+entries as readable text for the log viewer.
+"""
+
+import hashlib
 import logging
 import json
+import os
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from threading import Lock
+from typing import Optional, Dict, Any, Collection, Iterator, Set, Tuple
 from flask import current_app
 
+from .log_index import LogIndex, LogSlice
+from .log_pipeline import BatchFileHandler, PipelineHandler, flush_logs, on_shutdown
+
+# Loggers kept open at once; the least recently used one is closed beyond this
+MAX_OPEN_LOGGERS = int(os.environ.get("MAX_OPEN_PACKAGE_LOGGERS", 64))
+# Serialized payloads above this many bytes go to a side file
+INLINE_PAYLOAD_LIMIT = int(os.environ.get("PACKAGE_LOG_INLINE_LIMIT", 8192))
+# Step payloads of INFO entries are only kept when DEBUG is enabled
+PACKAGE_LOG_LEVEL = os.environ.get("PACKAGE_LOG_LEVEL", "DEBUG").upper()
+
+_LEVELS = {"ERROR": logging.ERROR, "WARNING": logging.WARNING}
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """Render a step record as one compact JSON object.
+
+    The payload arrives already serialized, so it is spliced in rather
+    than decoded and encoded again.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "step": getattr(record, "step", ""),
+            "message": record.getMessage(),
+        }
+        data_ref = getattr(record, "data_ref", None)
+        if data_ref:
+            entry["data_ref"] = data_ref
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        payload = getattr(record, "payload", None)
+        if payload:
+            line = f'{line[:-1]},"data":{payload}}}'
+        return line
+
+
+def render_entry(entry: Dict[str, Any]) -> str:
+    """Format a JSONL entry the way the log viewer shows it."""
+    prefix = (
+        f"{str(entry.get('ts', ''))[:19].replace('T', ' ')} - {entry.get('level', '')}"
+    )
+    step = entry.get("step", "")
+    lines = [f"{prefix} - [{step}] {entry.get('message', '')}"]
+    if "data" in entry:
+        lines.append(f"{prefix} - [{step}] Data: {json.dumps(entry['data'], indent=2)}")
+    elif "data_ref" in entry:
+        ref = entry["data_ref"]
+        lines.append(
+            f"{prefix} - [{step}] Data: payloads/{ref['sha256']}.json "
+            f"({ref['size']} bytes)"
+        )
+    return "\n".join(lines)
+
 
 class PackageLogger:
     """Handles per-package logging for detailed troubleshooting."""
 
-    def __init__(self, package_id: str):
+    def __init__(self, package_id: str, logs_dir: Optional[Path] = None):
         self.package_id = package_id
         self.log_file: Optional[Path] = None
         self.logger: Optional[logging.Logger] = None
-        self._setup_logger()
+        self._file_handler: Optional[BatchFileHandler] = None
+        self._handler: Optional[PipelineHandler] = None
+        logs_dir = logs_dir or _logs_dir()
+        self._payloads_dir = logs_dir / "payloads"
+        # Plain-text log written by earlier versions, still shown if present
+        self._legacy_log_file = logs_dir / f"{package_id}.log"
+        self._setup_logger(logs_dir)
 
-    def _setup_logger(self) -> None:
+    def _setup_logger(self, logs_dir: Path) -> None:
         """Set up logger for this package."""
-        # Create logs directory
-        if current_app:
-            logs_dir = Path(current_app.instance_path) / "logs"
-        else:
-            logs_dir = Path("instance/logs")
-
-        logs_dir.mkdir(exist_ok=True)
+        _ensure_dir(logs_dir)
 
         # Create log file for this package
-        self.log_file = logs_dir / f"{self.package_id}.log"
+        self.log_file = logs_dir / f"{self.package_id}.jsonl"
 
-        # Create logger
-        self.logger = logging.getLogger(f"package_{self.package_id}")
-        self.logger.setLevel(logging.DEBUG)
+        # A standalone logger: logging.getLogger would keep one entry per
+        # package in the global logger dict for the life of the process
+        self.logger = logging.Logger(
+            f"package_{self.package_id}",
+            logging.getLevelName(PACKAGE_LOG_LEVEL),
+        )
+        self.logger.propagate = False  # Don't propagate to root logger
 
-        # Remove existing handlers to avoid duplicates
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
+        # Opened by the writer thread on the first write, not here
+        self._file_handler = BatchFileHandler(
+            self.log_file, encoding="utf-8", delay=True
+        )
+        self._file_handler.setFormatter(_JsonLineFormatter())
 
-        # Create file handler
-        file_handler = logging.FileHandler(self.log_file)
-        file_handler.setLevel(logging.DEBUG)
+        self._handler = PipelineHandler(self._file_handler)
+        self.logger.addHandler(self._handler)
 
-        # Create formatter
-        formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        file_handler.setFormatter(formatter)
+    def flush(self) -> None:
+        """Wait until this logger's queued records are in the log file."""
+        flush_logs()
 
-        self.logger.addHandler(file_handler)
-        self.logger.propagate = False  # Don't propagate to root logger
+    def close(self) -> None:
+        """Release the log file handle once queued records are written.
+
+        Does not wait. The logger stays usable; a later write reopens the
+        file.
+        """
+        if self._handler:
+            self._handler.close()
 
     def log_step(
         self,
@@ -58,33 +142,111 @@ class PackageLogger:
         level: str = "INFO",
         data: Optional[Dict[str, Any]] = None,
     ) -> None:
-        """Log a step in the package processing pipeline."""
+        """Log a step in the package processing pipeline.
+
+        Nothing is serialized when the level is disabled. ``data`` is kept
+        for warnings and errors, and for other steps when DEBUG is enabled.
+        """
         if not self.logger:
             return
+        levelno = _LEVELS.get(level.upper(), logging.INFO)
+        if not self.logger.isEnabledFor(levelno):
+            return
 
-        log_entry: Dict[str, Any] = {
-            "timestamp": datetime.now().isoformat(),
-            "step": step,
-            "message": message,
-            "level": level,
-        }
+        extra: Dict[str, Any] = {"step": step}
+        if data and (
+            levelno >= logging.WARNING or self.logger.isEnabledFor(logging.DEBUG)
+        ):
+            payload = json.dumps(
+                data, ensure_ascii=False, separators=(",", ":"), default=str
+            )
+            if len(payload) > INLINE_PAYLOAD_LIMIT:
+                extra["data_ref"] = self._store_payload(payload)
+            else:
+                extra["payload"] = payload
+
+        self.logger.log(levelno, message, extra=extra)
 
-        if data:
-            log_entry["data"] = data
-
-        # Log to file
-        if level.upper() == "ERROR":
-            self.logger.error(f"[{step}] {message}")
-            if data:
-                self.logger.error(f"[{step}] Data: {json.dumps(data, indent=2)}")
-        elif level.upper() == "WARNING":
-            self.logger.warning(f"[{step}] {message}")
-            if data:
-                self.logger.warning(f"[{step}] Data: {json.dumps(data, indent=2)}")
-        else:
-            self.logger.info(f"[{step}] {message}")
-            if data:
-                self.logger.debug(f"[{step}] Data: {json.dumps(data, indent=2)}")
+    def _store_payload(self, payload: str) -> Dict[str, Any]:
+        """Write a large payload to its side file once and reference it."""
+        encoded = payload.encode("utf-8")
+        sha256 = hashlib.sha256(encoded).hexdigest()
+        path = self._payloads_dir / f"{sha256}.json"
+        if not path.exists():
+            _ensure_dir(self._payloads_dir)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(encoded)
+            os.replace(tmp_path, path)
+        return {"sha256": sha256, "size": len(encoded)}
+
+    def load_payload(self, sha256: str) -> Any:
+        """Load a payload stored in a side file.
+
+        Args:
+            sha256: Hash from an entry's ``data_ref``
+
+        Returns:
+            The decoded payload
+        """
+        path = self._payloads_dir / f"{sha256}.json"
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def read_entries(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the JSONL entries of this package's log.
+
+        Yields:
+            One dictionary per logged step, oldest first
+        """
+        self.flush()
+        if not self.log_file or not self.log_file.exists():
+            return
+        with open(self.log_file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Partially written last line
+
+    def read_range(
+        self,
+        since: Optional[int] = None,
+        start: Optional[int] = None,
+        limit: Optional[int] = None,
+        tail: Optional[int] = None,
+        steps: Optional[Collection[str]] = None,
+        min_level: Optional[str] = None,
+        flush: bool = True,
+    ) -> LogSlice:
+        """Read part of this package's log through its offset index.
+
+        Only the selected lines are read from disk, so tails and polls stay
+        cheap however large the log grows.
+
+        Args:
+            since: Byte offset cursor from a previous read's ``next_offset``
+            start: Skip this many matching entries
+            limit: Return at most this many entries
+            tail: Return only the last N matching entries
+            steps: Only entries with one of these steps
+            min_level: Only entries at or above this level
+            flush: Wait for queued records first; frequent pollers skip
+                this and pick up records on a later read
+
+        Returns:
+            LogSlice with ``entries``, ``next_offset`` and ``total``
+        """
+        if flush:
+            self.flush()
+        if not self.log_file:
+            return LogSlice([], 0, 0)
+        return LogIndex(self.log_file).select(
+            since=since,
+            start=start,
+            limit=limit,
+            tail=tail,
+            steps=steps,
+            min_level=min_level,
+        )
 
     def log_error(
         self, step: str, error: Exception, context: Optional[Dict[str, Any]] = None
@@ -113,16 +275,74 @@ class PackageLogger:
         self.log_step(f"PIPELINE_STAGE_{stage}", message, "INFO", details)
 
     def get_logs(self) -> str:
-        """Get all logs for this package."""
-        if self.log_file and self.log_file.exists():
-            return self.log_file.read_text()
-        return "No logs available"
+        """Get all logs for this package as readable text."""
+        parts = []
+        if self._legacy_log_file.exists():
+            parts.append(self._legacy_log_file.read_text().rstrip("\n"))
+        parts.extend(render_entry(entry) for entry in self.read_entries())
+        if not parts:
+            return "No logs available"
+        return "\n".join(parts) + "\n"
 
     def get_log_file_path(self) -> Optional[Path]:
         """Get the path to the log file."""
-        return self.log_file if self.log_file and self.log_file.exists() else None
+        self.flush()
+        for path in (self.log_file, self._legacy_log_file):
+            if path and path.exists():
+                return path
+        return None
+
+
+_loggers: "OrderedDict[Tuple[Path, str], PackageLogger]" = OrderedDict()
+_known_dirs: Set[Path] = set()
+_lock = Lock()
+
+
+def _logs_dir() -> Path:
+    if current_app:
+        return Path(current_app.instance_path) / "logs"
+    return Path("instance/logs")
+
+
+def _ensure_dir(logs_dir: Path) -> None:
+    # mkdir once per directory rather than once per logger
+    if logs_dir not in _known_dirs:
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        _known_dirs.add(logs_dir)
 
 
 def get_package_logger(package_id: str) -> PackageLogger:
-    """Get or create a logger for a specific package."""
-    return PackageLogger(package_id)
+    """Get or create a logger for a specific package.
+
+    Loggers are cached per logs directory and package; the least recently
+    used logger's file is closed once MAX_OPEN_LOGGERS are open.
+    """
+    logs_dir = _logs_dir()
+    key = (logs_dir, str(package_id))
+    with _lock:
+        package_logger = _loggers.get(key)
+        if package_logger is not None:
+            _loggers.move_to_end(key)
+            return package_logger
+
+        package_logger = PackageLogger(str(package_id), logs_dir)
+        _loggers[key] = package_logger
+        evicted = []
+        while len(_loggers) > MAX_OPEN_LOGGERS:
+            evicted.append(_loggers.popitem(last=False)[1])
+
+    for idle in evicted:
+        idle.close()
+    return package_logger
+
+
+def close_package_loggers() -> None:
+    """Close every package logger's file and empty the registry."""
+    with _lock:
+        open_loggers = list(_loggers.values())
+        _loggers.clear()
+    for package_logger in open_loggers:
+        package_logger.close()
+
+
+on_shutdown(close_package_loggers)
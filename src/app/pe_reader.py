@@ -0,0 +1,436 @@
+"""Native reader for Windows PE (EXE/DLL) headers and resources.
+
+The file is memory-mapped and only the structures that are needed are
+touched: the DOS/COFF/optional headers, the section table and the
+resource tree under ``.rsrc``. Version information (VS_VERSIONINFO) and
+the embedded application manifest are decoded without reading the rest
+of the image, so multi-GB installers cost a handful of page faults.
+"""
+
+import mmap
+import re
+import struct
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Union
+
+# COFF machine types
+MACHINE_TYPES = {
+    0x014C: "x86",
+    0x8664: "x64",
+    0x01C4: "ARM",
+    0xAA64: "ARM64",
+}
+
+# Resource types
+RT_VERSION = 16
+RT_MANIFEST = 24
+
+# Optional header data directories
+_DIRECTORY_RESOURCE = 2
+_DIRECTORY_SECURITY = 4
+
+_PE32_MAGIC = 0x10B
+_PE32_PLUS_MAGIC = 0x20B
+_FIXED_FILE_INFO_SIGNATURE = 0xFEEF04BD
+
+# Hard limits so malformed or hostile images cannot make us loop or allocate
+_MAX_SECTIONS = 96
+# Resource directory entries visited per lookup, across all three levels
+_MAX_RESOURCE_ENTRIES = 4096
+_MAX_RESOURCE_SIZE = 1 << 20
+
+# StringFileInfo keys returned by version_info(), in display order
+VERSION_STRINGS = (
+    "ProductName",
+    "ProductVersion",
+    "CompanyName",
+    "FileDescription",
+    "FileVersion",
+    "LegalCopyright",
+    "OriginalFilename",
+    "InternalName",
+)
+
+_MANIFEST_PATTERNS = {
+    "execution_level": r"<(?:\w+:)?requestedExecutionLevel\b[^>]*?\blevel\s*=\s*[\"']([^\"']+)",
+    "ui_access": r"<(?:\w+:)?requestedExecutionLevel\b[^>]*?\buiAccess\s*=\s*[\"']([^\"']+)",
+    "assembly_name": r"<(?:\w+:)?assemblyIdentity\b[^>]*?\bname\s*=\s*[\"']([^\"']+)",
+    "assembly_version": r"<(?:\w+:)?assemblyIdentity\b[^>]*?\bversion\s*=\s*[\"']([^\"']+)",
+    "dpi_aware": r"<(?:\w+:)?dpiAware\b[^>]*>\s*([^<\s]+)",
+}
+
+
+class PeFormatError(ValueError):
+    """Raised when a file is not a readable PE image."""
+
+
+class Section(NamedTuple):
+    """A PE section header."""
+
+    name: str
+    virtual_address: int
+    virtual_size: int
+    raw_offset: int
+    raw_size: int
+
+
+class _Block(NamedTuple):
+    """A VS_VERSIONINFO-style node: key, value and child range."""
+
+    key: str
+    value: bytes
+    value_start: int
+    is_text: bool
+    children: int
+    end: int
+
+
+def _align4(offset: int) -> int:
+    return (offset + 3) & ~3
+
+
+def _read_block(data: bytes, offset: int, limit: int) -> Optional[_Block]:
+    """Decode the version-info node starting at ``offset``."""
+    if offset + 6 > limit:
+        return None
+    length, value_length, value_type = struct.unpack_from("<HHH", data, offset)
+    if length < 6:
+        return None
+    end = min(offset + length, limit)
+
+    key_end = offset + 6
+    while key_end + 1 < end and data[key_end : key_end + 2] != b"\x00\x00":
+        key_end += 2
+    key = data[offset + 6 : key_end].decode("utf-16-le", "replace")
+
+    value_start = _align4(key_end + 2)
+    # Text values are measured in WCHARs, binary values in bytes
+    size = value_length * 2 if value_type == 1 else value_length
+    value_end = min(value_start + size, end)
+    value = data[value_start:value_end] if value_start < value_end else b""
+    return _Block(key, value, value_start, value_type == 1, _align4(value_end), end)
+
+
+def _iter_blocks(data: bytes, start: int, end: int) -> Iterator[_Block]:
+    """Yield the sibling nodes between ``start`` and ``end``."""
+    pos = start
+    while pos < end:
+        block = _read_block(data, pos, end)
+        if block is None:
+            return
+        yield block
+        pos = _align4(block.end)
+
+
+def _format_version(ms: int, ls: int) -> str:
+    return f"{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}.{ls & 0xFFFF}"
+
+
+def parse_version_info(data: bytes) -> Dict[str, Any]:
+    """Decode a VS_VERSIONINFO resource.
+
+    Args:
+        data: Raw RT_VERSION resource bytes
+
+    Returns:
+        Dictionary with ``strings`` (StringFileInfo values from the first
+        string table that defines them) and, when present, the
+        ``file_version``/``product_version`` from VS_FIXEDFILEINFO
+    """
+    info: Dict[str, Any] = {"strings": {}}
+    root = _read_block(data, 0, len(data))
+    if root is None or root.key != "VS_VERSION_INFO":
+        return info
+
+    if len(root.value) >= 24:
+        signature, _struct_version, file_ms, file_ls, prod_ms, prod_ls = (
+            struct.unpack_from("<6I", root.value)
+        )
+        if signature == _FIXED_FILE_INFO_SIGNATURE:
+            info["file_version"] = _format_version(file_ms, file_ls)
+            info["product_version"] = _format_version(prod_ms, prod_ls)
+
+    strings: Dict[str, str] = info["strings"]
+    for child in _iter_blocks(data, root.children, root.end):
+        if child.key != "StringFileInfo":
+            continue
+        for table in _iter_blocks(data, child.children, child.end):
+            for entry in _iter_blocks(data, table.children, table.end):
+                # Some linkers give wValueLength in bytes; read to the block end
+                raw = data[entry.value_start : entry.end]
+                value = raw.decode("utf-16-le", "replace").split("\x00", 1)[0]
+                if entry.key and value.strip():
+                    strings.setdefault(entry.key, value.strip())
+    return info
+
+
+def parse_manifest(data: bytes) -> Dict[str, Any]:
+    """Pick the deployment-relevant settings out of an application manifest.
+
+    Args:
+        data: Raw RT_MANIFEST resource bytes
+
+    Returns:
+        Dictionary with any of ``execution_level``, ``ui_access``,
+        ``assembly_name``, ``assembly_version`` and ``dpi_aware``
+    """
+    if data.startswith(b"\xff\xfe"):
+        text = data[2:].decode("utf-16-le", "replace")
+    else:
+        text = data.decode("utf-8-sig", "replace")
+
+    manifest: Dict[str, Any] = {}
+    for key, pattern in _MANIFEST_PATTERNS.items():
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            manifest[key] = match.group(1).strip()
+    return manifest
+
+
+class PeImage:
+    """Memory-mapped reader for PE headers, sections and resources.
+
+    Usage::
+
+        with PeImage(path) as pe:
+            arch = pe.architecture
+            info = pe.version_info()
+    """
+
+    def __init__(self, file_path: str):
+        """Open and memory-map a PE file and parse its headers.
+
+        Images with a COFF header but no optional header or section table
+        are accepted; they simply have no sections or resources.
+
+        Args:
+            file_path: Path to the EXE/DLL file
+
+        Raises:
+            PeFormatError: If the file has no DOS header, PE signature or
+                COFF header
+        """
+        self._file = open(file_path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # empty file
+            self._file.close()
+            raise PeFormatError(str(e)) from e
+        self.size = len(self._mmap)
+        self.sections: List[Section] = []
+        self._directories: List[tuple] = []
+        try:
+            self._parse_headers()
+        except (PeFormatError, struct.error) as e:
+            self.close()
+            raise PeFormatError(str(e)) from e
+
+    def __enter__(self) -> "PeImage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the memory map and file handle."""
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def _parse_headers(self) -> None:
+        data = self._mmap
+        if self.size < 64 or data[:2] != b"MZ":
+            raise PeFormatError("Invalid PE file - missing DOS header")
+        (pe_offset,) = struct.unpack_from("<I", data, 60)
+        if data[pe_offset : pe_offset + 4] != b"PE\x00\x00":
+            raise PeFormatError("Invalid PE file - missing PE signature")
+        if pe_offset + 24 > self.size:
+            raise PeFormatError("Invalid PE file - incomplete COFF header")
+
+        self.machine, section_count = struct.unpack_from("<HH", data, pe_offset + 4)
+        (optional_size,) = struct.unpack_from("<H", data, pe_offset + 20)
+
+        optional = pe_offset + 24
+        section_table = optional + optional_size
+        if optional_size < 2 or section_table > self.size:
+            return
+
+        (magic,) = struct.unpack_from("<H", data, optional)
+        if magic == _PE32_MAGIC:
+            count_offset = 92
+        elif magic == _PE32_PLUS_MAGIC:
+            count_offset = 108
+        else:
+            raise PeFormatError(f"Unknown optional header magic 0x{magic:04x}")
+        if count_offset + 4 <= optional_size:
+            (count,) = struct.unpack_from("<I", data, optional + count_offset)
+            count = min(count, (optional_size - count_offset - 4) // 8)
+            self._directories = [
+                struct.unpack_from("<II", data, optional + count_offset + 4 + 8 * i)
+                for i in range(count)
+            ]
+
+        for i in range(min(section_count, _MAX_SECTIONS)):
+            offset = section_table + 40 * i
+            if offset + 40 > self.size:
+                break
+            name, vsize, vaddr, raw_size, raw_offset = struct.unpack_from(
+                "<8sIIII", data, offset
+            )
+            self.sections.append(
+                Section(
+                    name.rstrip(b"\x00").decode("latin-1"),
+                    vaddr,
+                    vsize,
+                    raw_offset,
+                    raw_size,
+                )
+            )
+
+    @property
+    def architecture(self) -> str:
+        """Human-readable COFF machine type."""
+        return MACHINE_TYPES.get(self.machine, f"Unknown (0x{self.machine:04x})")
+
+    def data_directory(self, index: int) -> tuple:
+        """Return the ``(address, size)`` of an optional header data directory."""
+        if index < len(self._directories):
+            return self._directories[index]
+        return (0, 0)
+
+    def overlay_offset(self) -> int:
+        """File offset where data appended after the last section begins.
+
+        Returns:
+            Offset of the overlay, or the file size when there is none
+        """
+        if not self.sections:
+            return self.size
+        end = max(s.raw_offset + s.raw_size for s in self.sections)
+        return min(end, self.size)
+
+    def overlay_end(self) -> int:
+        """File offset where the overlay ends (before an Authenticode signature)."""
+        # The security directory holds a file offset, not an RVA
+        cert_offset, cert_size = self.data_directory(_DIRECTORY_SECURITY)
+        if cert_size and self.overlay_offset() <= cert_offset < self.size:
+            return int(cert_offset)
+        return self.size
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Read up to ``size`` bytes at a file offset."""
+        return self._mmap[offset : min(offset + size, self.size)]
+
+    def find(self, sub: bytes, start: int, end: int) -> int:
+        """Offset of the first ``sub`` between two file offsets, or -1."""
+        return self._mmap.find(sub, start, end)
+
+    def rva_to_offset(self, rva: int) -> Optional[int]:
+        """Translate a relative virtual address to a file offset."""
+        for section in self.sections:
+            span = max(section.virtual_size, section.raw_size)
+            if section.virtual_address <= rva < section.virtual_address + span:
+                delta = rva - section.virtual_address
+                if delta < section.raw_size:
+                    return section.raw_offset + delta
+                return None
+        return None
+
+    def _resource_root(self) -> Optional[int]:
+        rva, size = self.data_directory(_DIRECTORY_RESOURCE)
+        if rva and size:
+            return self.rva_to_offset(rva)
+        for section in self.sections:
+            if section.name == ".rsrc" and section.raw_size:
+                return section.raw_offset
+        return None
+
+    def _resource_entries(self, root: int, offset: int) -> Iterator[tuple]:
+        """Yield ``(name_or_id, target, is_directory)`` for a resource directory."""
+        data = self._mmap
+        base = root + offset
+        if base + 16 > self.size:
+            return
+        named, ids = struct.unpack_from("<HH", data, base + 12)
+        for i in range(min(named + ids, _MAX_RESOURCE_ENTRIES)):
+            entry = base + 16 + 8 * i
+            if entry + 8 > self.size:
+                return
+            name, target = struct.unpack_from("<II", data, entry)
+            key: Union[int, str] = name
+            if name & 0x80000000:
+                name_offset = root + (name & 0x7FFFFFFF)
+                if name_offset + 2 > self.size:
+                    continue
+                (length,) = struct.unpack_from("<H", data, name_offset)
+                key = data[name_offset + 2 : name_offset + 2 + 2 * length].decode(
+                    "utf-16-le", "replace"
+                )
+            yield key, target & 0x7FFFFFFF, bool(target & 0x80000000)
+
+    def resources(self, resource_type: int) -> Iterator[bytes]:
+        """Yield the data of every resource of a type (all names and languages).
+
+        At most ``_MAX_RESOURCE_ENTRIES`` directory entries are visited in
+        total, and directories or data entries reached a second time are
+        skipped, so self-referencing trees stay cheap.
+
+        Args:
+            resource_type: Numeric resource type, e.g. RT_VERSION
+
+        Yields:
+            Resource payloads in directory order, each capped at 1 MiB
+        """
+        root = self._resource_root()
+        if root is None:
+            return
+
+        remaining = _MAX_RESOURCE_ENTRIES
+        seen: Set[int] = set()
+
+        def entries(offset: int) -> Iterator[tuple]:
+            nonlocal remaining
+            if offset in seen:
+                return
+            seen.add(offset)
+            for entry in self._resource_entries(root, offset):
+                if remaining <= 0:
+                    return
+                remaining -= 1
+                yield entry
+
+        for type_id, names, is_dir in entries(0):
+            if type_id != resource_type or not is_dir:
+                continue
+            for _name, languages, name_is_dir in entries(names):
+                if not name_is_dir:
+                    continue
+                for _lang, leaf, leaf_is_dir in entries(languages):
+                    if leaf_is_dir or leaf in seen or root + leaf + 8 > self.size:
+                        continue
+                    seen.add(leaf)
+                    rva, size = struct.unpack_from("<II", self._mmap, root + leaf)
+                    offset = self.rva_to_offset(rva)
+                    if offset is not None:
+                        yield self.read(offset, min(size, _MAX_RESOURCE_SIZE))
+
+    def version_info(self) -> Dict[str, Any]:
+        """Decode the first RT_VERSION resource (see parse_version_info)."""
+        for data in self.resources(RT_VERSION):
+            info = parse_version_info(data)
+            if info["strings"] or "product_version" in info:
+                return info
+        return {"strings": {}}
+
+    def manifest(self) -> Dict[str, Any]:
+        """Decode the first RT_MANIFEST resource (see parse_manifest)."""
+        data = next(self.resources(RT_MANIFEST), None)
+        return parse_manifest(data) if data is not None else {}
+
+
+def is_pe_image(file_path: str) -> bool:
+    """Check whether a file starts with a DOS header pointing at a PE header."""
+    try:
+        with PeImage(file_path):
+            return True
+    except (PeFormatError, OSError):
+        return False
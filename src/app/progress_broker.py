@@ -0,0 +1,407 @@
+"""Publish/subscribe broker for package progress events.
+
+Every package has a channel with any number of subscribers and a bounded
+replay buffer, so a page opened late (or in a second tab) is sent the
+recent events, and with them the current state, as soon as it subscribes.
+Publishing never blocks: a subscriber that falls behind loses its oldest
+pending events rather than holding up the pipeline.
+
+Closing a channel sends subscribers an end-of-stream marker. The channel
+is kept for ``PROGRESS_RETENTION`` seconds so late subscribers still see
+the final state, then dropped.
+
+With ``PROGRESS_FANOUT_DB`` set to a SQLite file path, events are also
+appended to that file and every process tails it, so subscribers connected
+to one worker receive events published by another.
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+PROGRESS_REPLAY_SIZE = int(os.environ.get("PROGRESS_REPLAY_SIZE", 50))
+PROGRESS_SUBSCRIBER_QUEUE_SIZE = int(
+    os.environ.get("PROGRESS_SUBSCRIBER_QUEUE_SIZE", 100)
+)
+# Seconds a closed channel is kept for late subscribers
+PROGRESS_RETENTION = float(os.environ.get("PROGRESS_RETENTION", 300))
+# Seconds without events after which an unclosed channel is dropped
+PROGRESS_IDLE_TTL = float(os.environ.get("PROGRESS_IDLE_TTL", 6 * 3600))
+PROGRESS_FANOUT_DB = os.environ.get("PROGRESS_FANOUT_DB")
+PROGRESS_FANOUT_INTERVAL = float(os.environ.get("PROGRESS_FANOUT_INTERVAL", 0.25))
+
+# (sequence number, event); an event of None marks the end of the stream
+ProgressItem = Tuple[int, Optional[Dict[str, Any]]]
+# Called with (package id, sequence number, event) for every event
+ProgressListener = Callable[[str, int, Optional[Dict[str, Any]]], None]
+
+
+class Subscription:
+    """One subscriber's bounded queue of progress events."""
+
+    def __init__(self, broker: "ProgressBroker", package_id: str, maxsize: int):
+        self.broker = broker
+        self.package_id = package_id
+        self.queue: "queue.Queue[ProgressItem]" = queue.Queue(maxsize)
+
+    def deliver(self, item: ProgressItem) -> None:
+        """Queue an event, discarding the oldest pending one if full."""
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> ProgressItem:
+        """Wait for the next event.
+
+        Raises:
+            queue.Empty: If nothing arrived within the timeout
+        """
+        return self.queue.get(timeout=timeout)
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self.broker.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class _Channel:
+    def __init__(self, replay_size: int):
+        self.replay: Deque[ProgressItem] = deque(maxlen=replay_size)
+        self.subscribers: Set[Subscription] = set()
+        self.last_seq = 0
+        self.closed_at: Optional[float] = None
+        self.touched = time.monotonic()
+
+
+class ProgressBroker:
+    """Per-package progress channels shared by all threads of a process."""
+
+    def __init__(
+        self,
+        replay_size: int = PROGRESS_REPLAY_SIZE,
+        subscriber_queue_size: int = PROGRESS_SUBSCRIBER_QUEUE_SIZE,
+        retention: float = PROGRESS_RETENTION,
+        idle_ttl: float = PROGRESS_IDLE_TTL,
+        fanout_path: Optional[str] = PROGRESS_FANOUT_DB,
+    ):
+        self.replay_size = replay_size
+        self.subscriber_queue_size = subscriber_queue_size
+        self.retention = retention
+        self.idle_ttl = idle_ttl
+        self._channels: Dict[str, _Channel] = {}
+        self._listeners: List[ProgressListener] = []
+        self._lock = threading.Lock()
+        self._fanout = _SQLiteFanout(fanout_path, self) if fanout_path else None
+
+    def publish(self, package_id: str, event: Optional[Dict[str, Any]]) -> int:
+        """Send an event to the package's subscribers and replay buffer.
+
+        Args:
+            package_id: Package the event belongs to
+            event: JSON-serializable event, or None to close the channel
+
+        Returns:
+            Sequence number of the event
+        """
+        seq = self._fanout.append(package_id, event) if self._fanout else None
+        return self._deliver(package_id, seq, event)
+
+    def close(self, package_id: str) -> None:
+        """End the package's stream; subscribers get the end marker."""
+        self.publish(package_id, None)
+
+    def subscribe(self, package_id: str, since: Optional[int] = None) -> Subscription:
+        """Subscribe to a package's events.
+
+        Args:
+            package_id: Package to follow
+            since: Only replay events after this sequence number; by
+                default the whole replay buffer is sent
+
+        Returns:
+            Subscription whose queue already holds the replayed events
+        """
+        if self._fanout:
+            self._fanout.backfill(package_id)
+        subscription = Subscription(self, package_id, self.subscriber_queue_size)
+        with self._lock:
+            self._prune()
+            channel = self._channel(package_id)
+            for item in self._replayed(channel, since):
+                subscription.deliver(item)
+            channel.subscribers.add(subscription)
+        return subscription
+
+    def replay(
+        self, package_id: str, since: Optional[int] = None
+    ) -> List[ProgressItem]:
+        """Buffered events of a package, without subscribing.
+
+        Args:
+            package_id: Package to read
+            since: Only events after this sequence number
+
+        Returns:
+            (sequence number, event) pairs, oldest first
+        """
+        if self._fanout:
+            self._fanout.backfill(package_id)
+        with self._lock:
+            channel = self._channels.get(package_id)
+            return self._replayed(channel, since) if channel else []
+
+    def add_listener(self, listener: ProgressListener) -> None:
+        """Call ``listener(package_id, seq, event)`` for every event.
+
+        Listeners run on the publishing (or fan-out) thread after the event
+        is buffered, so they must not block. Adding one twice has no effect.
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber."""
+        with self._lock:
+            channel = self._channels.get(subscription.package_id)
+            if channel:
+                channel.subscribers.discard(subscription)
+
+    def last_event(self, package_id: str) -> Optional[Dict[str, Any]]:
+        """Most recent event published for a package, if still buffered."""
+        with self._lock:
+            channel = self._channels.get(package_id)
+            for _seq, event in reversed(channel.replay if channel else ()):
+                if event is not None:
+                    return event
+        return None
+
+    def publisher(self, package_id: str) -> "ProgressPublisher":
+        """Queue-like handle that publishes to one package's channel."""
+        return ProgressPublisher(self, package_id)
+
+    def stop(self) -> None:
+        """Stop tailing the fan-out file."""
+        if self._fanout:
+            self._fanout.stop()
+
+    @staticmethod
+    def _replayed(channel: _Channel, since: Optional[int]) -> List[ProgressItem]:
+        return [item for item in channel.replay if since is None or item[0] > since]
+
+    def _channel(self, package_id: str) -> _Channel:
+        channel = self._channels.get(package_id)
+        if channel is None:
+            channel = self._channels[package_id] = _Channel(self.replay_size)
+        return channel
+
+    def _deliver(
+        self, package_id: str, seq: Optional[int], event: Optional[Dict[str, Any]]
+    ) -> int:
+        """Record and fan out an event; without a ``seq`` the next one is used."""
+        with self._lock:
+            channel = self._channel(package_id)
+            if seq is None:
+                seq = channel.last_seq + 1
+            elif seq <= channel.last_seq:
+                return seq  # already seen through the fan-out file
+            channel.last_seq = seq
+            channel.touched = time.monotonic()
+            if event is None:
+                channel.closed_at = channel.touched
+            elif channel.closed_at is not None:
+                # Reopened, e.g. by a regeneration: forget the finished run
+                channel.closed_at = None
+                channel.replay.clear()
+            channel.replay.append((seq, event))
+            for subscription in channel.subscribers:
+                subscription.deliver((seq, event))
+            self._prune()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(package_id, seq, event)
+            except Exception as e:
+                sys.stderr.write(f"Progress listener failed: {e}\n")
+        return seq
+
+    def _prune(self) -> None:
+        """Drop closed channels past retention and abandoned ones."""
+        now = time.monotonic()
+        expired = [
+            package_id
+            for package_id, channel in self._channels.items()
+            if (
+                channel.closed_at is not None
+                and now - channel.closed_at > self.retention
+            )
+            or (not channel.subscribers and now - channel.touched > self.idle_ttl)
+        ]
+        for package_id in expired:
+            del self._channels[package_id]
+        if expired and self._fanout:
+            self._fanout.forget(expired)
+
+
+class ProgressPublisher:
+    """Adapter with a ``queue.Queue``-style ``put`` for the pipeline code."""
+
+    def __init__(self, broker: ProgressBroker, package_id: str):
+        self.broker = broker
+        self.package_id = package_id
+
+    def put(self, event: Optional[Dict[str, Any]]) -> None:
+        """Publish an event; None closes the stream."""
+        self.broker.publish(self.package_id, event)
+
+
+class _SQLiteFanout:
+    """Cross-process delivery through an append-only SQLite table.
+
+    Publishing inserts a row; the row id is the event's sequence number.
+    A background thread in every process reads rows written by the other
+    processes and delivers them locally.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path: str, broker: ProgressBroker):
+        self.path = path
+        self.broker = broker
+        self.origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS progress_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "package_id TEXT NOT NULL, origin TEXT NOT NULL, "
+            "payload TEXT, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_progress_events_package "
+            "ON progress_events (package_id, id)"
+        )
+        self._appended = 0
+        self._backfilled: Set[str] = set()
+        (self._cursor,) = self._conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM progress_events"
+        ).fetchone()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="progress-fanout", daemon=True
+        )
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def append(self, package_id: str, event: Optional[Dict[str, Any]]) -> int:
+        payload = json.dumps(event) if event is not None else None
+        with self._lock:
+            seq = self._conn.execute(
+                "INSERT INTO progress_events "
+                "(package_id, origin, payload, created_at) VALUES (?, ?, ?, ?)",
+                (package_id, self.origin, payload, time.time()),
+            ).lastrowid
+            self._appended += 1
+            if self._appended % self.PRUNE_EVERY == 0:
+                cutoff = time.time() - max(self.broker.retention, 60)
+                self._conn.execute(
+                    "DELETE FROM progress_events WHERE created_at < ?", (cutoff,)
+                )
+        return int(seq or 0)
+
+    def backfill(self, package_id: str) -> None:
+        """Load a channel's recent events written before this process started."""
+        if package_id in self._backfilled:
+            return
+        self._backfilled.add(package_id)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, payload FROM progress_events "
+                "WHERE package_id = ? AND id <= ? ORDER BY id DESC LIMIT ?",
+                (package_id, self._cursor, self.broker.replay_size),
+            ).fetchall()
+        for seq, payload in reversed(rows):
+            self.broker._deliver(package_id, seq, _decode(payload))
+
+    def forget(self, package_ids: Iterable[str]) -> None:
+        """Drop the backfill marks of expired channels."""
+        self._backfilled.difference_update(package_ids)
+
+    def poll(self) -> int:
+        """Deliver rows written since the last poll; returns how many."""
+        with self._lock:
+            rows: List[Tuple[int, str, str, Optional[str]]] = self._conn.execute(
+                "SELECT id, package_id, origin, payload FROM progress_events "
+                "WHERE id > ? ORDER BY id",
+                (self._cursor,),
+            ).fetchall()
+            if rows:
+                self._cursor = rows[-1][0]
+        for seq, package_id, origin, payload in rows:
+            if origin != self.origin:
+                self.broker._deliver(package_id, seq, _decode(payload))
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.wait(PROGRESS_FANOUT_INTERVAL):
+            try:
+                self.poll()
+            except sqlite3.Error:
+                pass  # database busy; try again on the next tick
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+        with self._lock:
+            self._conn.close()
+
+
+def _decode(payload: Optional[str]) -> Optional[Dict[str, Any]]:
+    return json.loads(payload) if payload is not None else None
+
+
+_broker: Optional[ProgressBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_progress_broker() -> ProgressBroker:
+    """Get the process-wide progress broker."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = ProgressBroker()
+    return _broker
+
+
+def _shutdown() -> None:
+    if _broker is not None:
+        _broker.stop()
+
+
+atexit.register(_shutdown)
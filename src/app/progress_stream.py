@@ -0,0 +1,156 @@
+"""Delivery of package progress to browsers.
+
+The progress page subscribes over Socket.IO: it joins the package's room
+on the ``/progress`` namespace and the broker pushes each event to the
+room as it is published. No request thread or loop exists per subscriber,
+so idle progress pages only cost their socket (a greenlet under eventlet
+or gevent). Each event carries its broker sequence number as ``id``; a
+client that reconnects sends the last one it saw as ``last_event_id`` and
+is replayed only what it missed.
+
+``/stream-progress/<id>`` remains as a server-sent events fallback for
+clients without Socket.IO. Each open stream occupies a worker thread, so
+at most ``PROGRESS_SSE_MAX_STREAMS`` are served at once; further requests
+get 503 and should use Socket.IO.
+"""
+
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Response
+from flask_socketio import SocketIO, emit, join_room, leave_room
+
+from .database import get_package
+from .progress_broker import Subscription, get_progress_broker
+
+NAMESPACE = "/progress"
+# Seconds between heartbeats: Socket.IO pings and SSE keep-alive comments
+PROGRESS_HEARTBEAT_INTERVAL = float(os.environ.get("PROGRESS_HEARTBEAT_INTERVAL", 25))
+PROGRESS_SSE_MAX_STREAMS = int(os.environ.get("PROGRESS_SSE_MAX_STREAMS", 32))
+
+_sse_slots = threading.BoundedSemaphore(PROGRESS_SSE_MAX_STREAMS)
+_socketio: Optional[SocketIO] = None
+
+
+def _room(package_id: str) -> str:
+    return f"progress:{package_id}"
+
+
+def final_state(package_id: str) -> Optional[Dict[str, Any]]:
+    """Terminal event for a package that finished without buffered events.
+
+    Returns:
+        Completed/failed event built from the database, or None while the
+        package is still running (or does not exist)
+    """
+    package = get_package(package_id)
+    if not package or package.status not in ("completed", "failed"):
+        return None
+    return {
+        "status": package.status,
+        "progress": 100 if package.status == "completed" else None,
+        "current_step": package.status.capitalize(),
+    }
+
+
+def _emit_progress(package_id: str, seq: int, event: Optional[Dict[str, Any]]) -> None:
+    """Broker listener: push an event to the package's Socket.IO room."""
+    if _socketio is not None:
+        _socketio.emit(
+            "progress",
+            {"id": seq, "data": event},
+            to=_room(package_id),
+            namespace=NAMESPACE,
+        )
+
+
+def _on_subscribe(message: Dict[str, Any]) -> None:
+    package_id = str(message.get("package_id", ""))
+    if not package_id:
+        return
+    last_event_id = message.get("last_event_id")
+    join_room(_room(package_id))
+    if last_event_id is not None and not str(last_event_id).isdigit():
+        # Not an id we issued; follow live events only
+        return
+    since = int(last_event_id) if last_event_id is not None else None
+
+    items = get_progress_broker().replay(package_id, since)
+    if not items and since is None:
+        final = final_state(package_id)
+        if final is not None:
+            items = [(0, final), (0, None)]
+    # Events published between joining and replaying can arrive twice;
+    # clients drop ids they have already seen
+    for seq, event in items:
+        emit("progress", {"id": seq, "data": event})
+
+
+def _on_unsubscribe(message: Dict[str, Any]) -> None:
+    leave_room(_room(str(message.get("package_id", ""))))
+
+
+def register_progress_stream(socketio: SocketIO) -> None:
+    """Serve progress subscriptions on the ``/progress`` namespace.
+
+    Args:
+        socketio: The application's SocketIO instance
+    """
+    global _socketio
+    _socketio = socketio
+    socketio.on_event("subscribe", _on_subscribe, namespace=NAMESPACE)
+    socketio.on_event("unsubscribe", _on_unsubscribe, namespace=NAMESPACE)
+    get_progress_broker().add_listener(_emit_progress)
+
+
+def sse_response(package_id: str, since: Optional[int], heartbeat: float) -> Response:
+    """Server-sent events response following one package.
+
+    Args:
+        package_id: Package to follow
+        since: Sequence number from ``Last-Event-ID``, if resuming
+        heartbeat: Seconds between keep-alive comments
+
+    Returns:
+        Event stream that ends after the package's end-of-stream marker,
+        or 503 when all SSE slots are taken
+    """
+    if not _sse_slots.acquire(blocking=False):
+        response = Response(
+            "Too many progress streams; use the Socket.IO /progress namespace",
+            status=503,
+        )
+        response.headers["Retry-After"] = str(int(heartbeat))
+        return response
+
+    broker = get_progress_broker()
+    subscription = broker.subscribe(package_id, since)
+    final = None
+    if since is None and broker.last_event(package_id) is None:
+        final = final_state(package_id)
+    frames: Iterable[str] = (
+        [f"data: {json.dumps(final)}\n\n"]
+        if final
+        else _sse_frames(subscription, heartbeat)
+    )
+
+    response = Response(frames, mimetype="text/event-stream")
+    # Runs even if the client goes away before the stream starts
+    response.call_on_close(subscription.close)
+    response.call_on_close(_sse_slots.release)
+    return response
+
+
+def _sse_frames(subscription: Subscription, heartbeat: float) -> Iterator[str]:
+    while True:
+        try:
+            seq, data = subscription.get(timeout=heartbeat)
+        except queue.Empty:
+            yield ":\n\n"
+            continue
+        if data is None:
+            return
+        yield f"id: {seq}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,176 @@
+"""Record and replay LLM and MCP responses.
+
+Every OpenAI chat completion of the pipeline goes through
+``chat_completion`` and every MCP tool call through
+``MCPService._call_mcp_tool_async``. While a cassette is in use
+(``use_cassette``) these either record the live responses to a JSON file
+or replay the recorded ones without touching the network::
+
+    {
+        "version": 1,
+        "interactions": [
+            {"kind": "llm", "name": "gpt-4o", "key": "9f2c...",
+             "request": {...}, "response": {...}},
+            {"kind": "mcp", "name": "perform_rag_query", ...},
+        ],
+    }
+
+``key`` is a hash of the request. A replayed request takes the recording
+with the same key; if the request changed since recording (e.g. a prompt
+template was edited) it takes the next unused recording of the same kind
+and name, which is counted in ``Cassette.fallbacks``, unless the cassette
+is strict. MCP calls run on their own threads, so the cassette in use is
+process-wide: replay runs one pipeline at a time.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from openai.types.chat import ChatCompletion
+
+RECORD = "record"
+REPLAY = "replay"
+
+CASSETTE_VERSION = 1
+
+_active: Optional["Cassette"] = None
+
+
+class ReplayMissError(RuntimeError):
+    """A replayed request has no recorded response."""
+
+
+def _request_key(kind: str, name: str, request: Dict[str, Any]) -> str:
+    payload = json.dumps([kind, name, request], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Cassette:
+    """Recorded interactions of one pipeline run."""
+
+    def __init__(self, path: Path, mode: str, strict: bool = False):
+        """
+        Args:
+            path: JSON file holding the interactions
+            mode: ``RECORD`` or ``REPLAY``
+            strict: When replaying, fail on requests that changed since
+                recording instead of falling back to recording order
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.strict = strict
+        self.interactions: List[Dict[str, Any]] = []
+        self.fallbacks = 0
+        self._used: set[int] = set()
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            data = json.loads(path.read_text())
+            self.interactions = data["interactions"]
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def record(
+        self, kind: str, name: str, request: Dict[str, Any], response: Any
+    ) -> None:
+        """Add a live response to the cassette."""
+        with self._lock:
+            self.interactions.append(
+                {
+                    "kind": kind,
+                    "name": name,
+                    "key": _request_key(kind, name, request),
+                    "request": request,
+                    "response": response,
+                }
+            )
+
+    def replay(self, kind: str, name: str, request: Dict[str, Any]) -> Any:
+        """Recorded response to a request.
+
+        Raises:
+            ReplayMissError: If no unused recording matches
+        """
+        key = _request_key(kind, name, request)
+        with self._lock:
+            candidates = [
+                i
+                for i, entry in enumerate(self.interactions)
+                if i not in self._used
+                and entry["kind"] == kind
+                and entry["name"] == name
+            ]
+            match = next(
+                (i for i in candidates if self.interactions[i]["key"] == key), None
+            )
+            if match is None and candidates and not self.strict:
+                match = candidates[0]
+                self.fallbacks += 1
+            if match is None:
+                raise ReplayMissError(
+                    f"No recorded {kind} response for {name} in {self.path}"
+                )
+            self._used.add(match)
+            return self.interactions[match]["response"]
+
+    def save(self) -> None:
+        """Write the recorded interactions atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with self._lock:
+            tmp.write_text(
+                json.dumps(
+                    {"version": CASSETTE_VERSION, "interactions": self.interactions},
+                    indent=2,
+                    default=str,
+                )
+            )
+        os.replace(tmp, self.path)
+
+
+def active_cassette() -> Optional[Cassette]:
+    """Cassette in use, if any."""
+    return _active
+
+
+@contextmanager
+def use_cassette(path: Path, mode: str, strict: bool = False) -> Iterator[Cassette]:
+    """Record or replay LLM and MCP responses for the duration of the block.
+
+    A recording is saved when the block exits, also if the run failed, so
+    the responses received so far are kept.
+    """
+    global _active
+    cassette = Cassette(path, mode, strict)
+    previous, _active = _active, cassette
+    try:
+        yield cassette
+    finally:
+        _active = previous
+        if mode == RECORD:
+            cassette.save()
+
+
+def chat_completion(client: Any, **request: Any) -> ChatCompletion:
+    """Create a chat completion, recorded or replayed if a cassette is in use.
+
+    Args:
+        client: OpenAI client for live requests
+        **request: Arguments of ``client.chat.completions.create``
+    """
+    cassette = _active
+    name = str(request.get("model"))
+    if cassette is not None and cassette.replaying:
+        return ChatCompletion.model_validate(cassette.replay("llm", name, request))
+    response = client.chat.completions.create(**request)
+    if cassette is not None:
+        cassette.record("llm", name, request, response.model_dump(mode="json"))
+    return response  # type: ignore[no-any-return]
@@ -1,6 +1,6 @@
 """Route handlers for AIPackager v3."""
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Union, Any, cast, Generator
 from uuid import UUID
@@ -13,24 +13,182 @@ from flask import (
     url_for,
     Response,
     current_app,
+    send_file,
+    stream_with_context,
 )
 
-from .file_persistence import save_uploaded_file
-from .database import create_package, get_package, get_all_packages, create_metadata
-from .metadata_extractor import extract_file_metadata
+from .file_persistence import StoredFile, adopt_file, store_uploaded_file
+from .chunked_upload import (
+    DEFAULT_CHUNK_SIZE,
+    MAX_CHUNK_SIZE,
+    MAX_UPLOAD_SIZE,
+    MIN_CHUNK_SIZE,
+    UPLOAD_SESSION_TTL,
+    ChunkError,
+    advance_hash,
+    discard_upload,
+    finish_hash,
+    part_path,
+    write_chunk,
+)
+from .database import (
+    EVALUATION_SORTS,
+    acquire_upload_blob,
+    claim_upload_completion,
+    create_package,
+    create_upload_session,
+    delete_package,
+    delete_stale_upload_sessions,
+    delete_upload_session,
+    find_package_by_file_hash,
+    finish_upload_completion,
+    get_all_packages,
+    get_package,
+    get_package_detail,
+    get_package_status,
+    get_pipeline_timings,
+    get_upload_session,
+    record_upload_chunk,
+    release_upload_blob,
+    reuse_package_scripts,
+)
+from .workflow.metadata_stage import start_metadata_stage
+from .workflow.tracing import to_otlp
 from .services.script_generator import PSADTGenerator
-from .script_renderer import ScriptRenderer
 from .services.metrics_service import MetricsService
-from .models import Package
-from .package_logger import get_package_logger
+from .detail_view import materialize_detail_view
+from .models import Package, UploadSession
+from .package_logger import get_package_logger, render_entry
 from .crawl_logger import get_crawl_logger
 from .extensions import socketio
-import queue
+from .metrics import record_cache, record_upload, render_metrics
+from .progress_broker import get_progress_broker
+from .progress_stream import PROGRESS_HEARTBEAT_INTERVAL, sse_response
 import json
 import concurrent.futures
 import anyio
+import os
+import threading
+import time
+
+# Entries shown by the log viewer and returned by the logs API by default
+LOG_VIEW_TAIL = 500
+LOG_API_DEFAULT_TAIL = 1000
+# Seconds between polls of a followed log
+LOG_FOLLOW_INTERVAL = 1.0
+# Followed logs served at once; each stream occupies a worker thread
+LOG_STREAM_MAX_STREAMS = int(os.environ.get("LOG_STREAM_MAX_STREAMS", 32))
+# Package statuses after which no more log entries are written
+TERMINAL_STATUSES = ("completed", "failed")
+
+_log_stream_slots = threading.BoundedSemaphore(LOG_STREAM_MAX_STREAMS)
+# Largest page of evaluation results served by the evaluations API
+EVALUATION_PAGE_LIMIT = 500
+
+
+def _publish_progress(package_id: str, event: dict[str, Any]) -> None:
+    """Publish a progress event to the package's subscribers."""
+    get_progress_broker().publish(package_id, event)
 
-progress_queues: dict[str, queue.Queue[Any]] = {}
+
+def _register_upload(
+    stored: StoredFile, filename: str, custom_instructions: str, reuse_script: bool
+) -> dict[str, Any]:
+    """Create the package for a stored installer and start its metadata stage.
+
+    Shared by the single-request and the chunked upload endpoints.
+
+    Args:
+        stored: Installer in the content-addressed store
+        filename: Original upload filename
+        custom_instructions: User-supplied instructions
+        reuse_script: Whether to reuse scripts of an earlier identical upload
+
+    Returns:
+        JSON-serializable description of the new package
+    """
+    package_logger = None
+    package = None
+    acquired = False
+    record_cache("upload_blob", stored.already_stored)
+    try:
+        acquire_upload_blob(stored.sha256, stored.file_path, stored.size)
+        acquired = True
+        file_path = stored.file_path
+
+        # Create package record in database
+        package = create_package(
+            filename=filename,
+            file_path=file_path,
+            custom_instructions=custom_instructions,
+            file_hash=stored.sha256,
+        )
+
+        # Initialize logger for this package
+        package_logger = get_package_logger(str(package.id))
+        package_logger.log_step(
+            "UPLOAD",
+            f"Package upload started: {filename}",
+            data={
+                "filename": filename,
+                "file_size": stored.size,
+                "file_hash": stored.sha256,
+                "already_stored": stored.already_stored,
+                "custom_instructions": custom_instructions,
+                "file_path": str(file_path),
+            },
+        )
+
+        # Attach metadata: cached results right away, otherwise queued
+        metadata_cached = start_metadata_stage(
+            str(package.id),
+            file_path,
+            stored.sha256,
+            filename,
+            publish=lambda event: _publish_progress(str(package.id), event),
+        )
+
+        # Re-upload of a packaged installer: optionally reuse its scripts
+        reused_from = None
+        if reuse_script:
+            previous = find_package_by_file_hash(
+                stored.sha256, exclude_id=package.id, completed_only=True
+            )
+            if previous and reuse_package_scripts(previous.id, package.id):
+                reused_from = str(previous.id)
+                package_logger.log_step(
+                    "DEDUP",
+                    f"Reusing generated scripts of package {previous.id}",
+                    data={"reused_from": reused_from},
+                )
+
+        package_logger.log_step(
+            "UPLOAD_COMPLETE",
+            f"Package upload completed successfully: {package.id}",
+        )
+
+        # Return package information
+        return {
+            "package_id": str(package.id),
+            "filename": package.filename,
+            "status": "completed" if reused_from else package.status,
+            "upload_time": package.upload_time.isoformat(),
+            "custom_instructions": package.custom_instructions,
+            "file_hash": stored.sha256,
+            "deduplicated": stored.already_stored,
+            "metadata_cached": metadata_cached,
+            "metadata_status": "completed" if metadata_cached else "queued",
+            "reused_from": reused_from,
+        }
+    except Exception as e:
+        if package_logger:
+            package_logger.log_error("UPLOAD_FAILED", e)
+        # Drop the half-registered package and its reference to the file
+        if package is not None:
+            delete_package(package.id)
+        elif acquired:
+            release_upload_blob(stored.sha256)
+        raise
 
 
 def run_mcp_in_thread(async_func: Any, *args: Any, **kwargs: Any) -> Any:
@@ -83,7 +241,7 @@ def register_routes(app: Flask) -> None:
 
         # If package needs script generation, start the 5-stage pipeline
         if package.status == "uploading" or (
-            package.status == "completed" and not package.generated_script
+            package.status == "completed" and not package.generated_script_hash
         ):
             try:
                 from .database import update_package_status, get_database_service
@@ -108,6 +266,7 @@ def register_routes(app: Flask) -> None:
 
                                 package_logger = get_package_logger(str(package_obj.id))
                                 generator = PSADTGenerator()
+                                progress = get_progress_broker().publisher(id)
 
                                 try:
                                     psadt_script = generator.generate_script(
@@ -115,20 +274,19 @@ def register_routes(app: Flask) -> None:
                                         or "Install the application",
                                         package=package_obj,
                                         session=session,
-                                        progress_queue=progress_queues.get(id),
+                                        progress_queue=progress,
                                     )
                                 except Exception as e:
                                     package_logger.log_error("PIPELINE_FAILED", e)
                                     package_obj.status = "failed"
                                     session.commit()
-                                    if id in progress_queues:
-                                        progress_queues[id].put(
-                                            {
-                                                "status": "failed",
-                                                "error": str(e),
-                                            }
-                                        )
-                                        progress_queues[id].put(None)
+                                    progress.put(
+                                        {
+                                            "status": "failed",
+                                            "error": str(e),
+                                        }
+                                    )
+                                    progress.put(None)
                                     return
 
                                 package_obj.generated_script = psadt_script.model_dump()
@@ -139,22 +297,23 @@ def register_routes(app: Flask) -> None:
                                     psadt_script.corrections_applied
                                 )
                                 package_obj.pipeline_metadata = {
+                                    **(package_obj.pipeline_metadata or {}),
                                     "generation_timestamp": datetime.now().isoformat(),
                                     "model_used": "gpt-4.1-mini",
                                     "pipeline_version": "5-stage-v1",
                                 }
                                 package_obj.status = "completed"
+                                materialize_detail_view(package_obj)
                                 session.commit()
 
-                                if id in progress_queues:
-                                    progress_queues[id].put(
-                                        {
-                                            "status": "completed",
-                                            "progress": 100,
-                                            "current_step": "Completed",
-                                        }
-                                    )
-                                    progress_queues[id].put(None)
+                                progress.put(
+                                    {
+                                        "status": "completed",
+                                        "progress": 100,
+                                        "current_step": "Completed",
+                                    }
+                                )
+                                progress.put(None)
 
                                 instance_dir = Path(current_app.instance_path)
                                 script_path = instance_dir / f"{package_obj.id}.json"
@@ -188,56 +347,34 @@ def register_routes(app: Flask) -> None:
 
     @app.route("/stream-progress/<id>")
     def stream_progress(id: str) -> Response:
-        def generate() -> Generator[str, None, None]:
-            progress_queues[id] = queue.Queue()
-            while True:
-                try:
-                    data = progress_queues[id].get(timeout=30)
-                    if data is None:
-                        break
-                    yield f"data: {json.dumps(data)}\n\n"
-                except queue.Empty:
-                    # Send a keep-alive comment
-                    yield ":\n\n"
-
-        return Response(generate(), mimetype="text/event-stream")
+        """Server-sent events fallback for the Socket.IO progress stream."""
+        last_event_id = request.headers.get("Last-Event-ID") or request.args.get(
+            "last_event_id"
+        )
+        since = (
+            int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        )
+        heartbeat = current_app.config.get(
+            "PROGRESS_HEARTBEAT_INTERVAL", PROGRESS_HEARTBEAT_INTERVAL
+        )
+        return sse_response(id, since, heartbeat)
 
     @app.route("/detail/<id>")
     def detail(id: str) -> Union[str, tuple[str, int]]:
-        """Result details page."""
-        package = get_package(id)
-        if not package:
+        """Result details page, served from the package's materialized view."""
+        found = get_package_detail(id)
+        if not found:
             return "Package not found", 404
-
-        # Convert 5-stage pipeline results to rendered script
-        rendered_script = "No script generated yet."
-        if package.generated_script:
-            renderer = ScriptRenderer()
-            rendered_script = renderer.render_psadt_script(
-                package=package, ai_sections=package.generated_script
-            )
-
-        # Calculate display metrics
-        metrics_service = MetricsService(package.__dict__)
-        display_metrics = metrics_service.get_display_metrics()
-
-        # Parse RAG documentation if available
-        rag_documentation = None
-        if package.rag_documentation:
-            try:
-                import json
-
-                rag_documentation = json.loads(package.rag_documentation)
-            except (json.JSONDecodeError, TypeError):
-                rag_documentation = package.rag_documentation
+        package, view = found
 
         return render_template(
             "detail.html",
             package=package,
             metadata=package.package_metadata,
-            rendered_script=rendered_script,
-            display_metrics=display_metrics,
-            rag_documentation=rag_documentation,
+            rendered_script=view["rendered_script"],
+            display_metrics=view["display_metrics"],
+            rag_documentation=view["rag_documentation"],
+            trace_rows=view["trace_rows"],
         )
 
     @app.route("/history")
@@ -269,10 +406,7 @@ def register_routes(app: Flask) -> None:
 
             instance_dir = Path(current_app.instance_path)
             evaluation_service = EvaluationService(instance_dir)
-            evaluations = evaluation_service.get_all_evaluations()
-
-            # Find the specific evaluation
-            evaluation = next((e for e in evaluations if e.id == evaluation_id), None)
+            evaluation = evaluation_service.get_evaluation(evaluation_id)
             if not evaluation:
                 return "Evaluation not found", 404
 
@@ -296,8 +430,8 @@ def register_routes(app: Flask) -> None:
     @app.route("/api/packages", methods=["POST"])
     def api_create_package() -> Response | tuple[Response, int]:
         """API endpoint to create a new package with file upload."""
-        package_logger = None
-
+        # Form parsing below reads the request body, so time from here
+        started = time.perf_counter()
         try:
             # Validate file upload
             if "installer" not in request.files:
@@ -313,131 +447,214 @@ def register_routes(app: Flask) -> None:
 
             # Get custom instructions
             custom_instructions = request.form.get("custom_instructions", "")
+            reuse_script = request.form.get("reuse_script", "").lower() in (
+                "1",
+                "true",
+                "on",
+                "yes",
+            )
 
             # Get instance directory
             instance_dir = Path(current_app.instance_path)
 
-            # Save file with UUID naming
-            file_id, file_path = save_uploaded_file(file, instance_dir)
-
-            # Create package record in database
-            package = create_package(
-                filename=filename,
-                file_path=file_path,
-                custom_instructions=custom_instructions,
+            # Stream the file into the content-addressed store, hashing it
+            stored = store_uploaded_file(file, instance_dir)
+            record_upload("form", stored.size, time.perf_counter() - started)
+            return jsonify(
+                _register_upload(stored, filename, custom_instructions, reuse_script)
             )
 
-            # Initialize logger for this package
-            package_logger = get_package_logger(str(package.id))
-            package_logger.log_step(
-                "UPLOAD",
-                f"Package upload started: {file.filename}",
-                data={
-                    "filename": file.filename,
-                    "file_size": file.content_length,
-                    "custom_instructions": custom_instructions,
-                    "file_path": str(file_path),
-                },
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    def _upload_session_json(
+        upload: UploadSession, received: list[int]
+    ) -> dict[str, Any]:
+        return {
+            "upload_id": str(upload.id),
+            "filename": upload.filename,
+            "size": upload.size,
+            "chunk_size": upload.chunk_size,
+            "chunk_count": upload.chunk_count,
+            "received": received,
+            "package_id": str(upload.package_id) if upload.package_id else None,
+        }
+
+    @app.route("/api/uploads", methods=["POST"])
+    def api_create_upload() -> Response | tuple[Response, int]:
+        """Start a chunked upload for installers too large for one request."""
+        data = request.get_json(silent=True) or {}
+        filename = str(data.get("filename") or "")
+        if not filename.lower().endswith((".msi", ".exe")):
+            return jsonify({"error": "Invalid file type"}), 400
+        try:
+            size = int(data.get("size", 0))
+            chunk_size = int(data.get("chunk_size") or DEFAULT_CHUNK_SIZE)
+        except (TypeError, ValueError):
+            return jsonify({"error": "size and chunk_size must be integers"}), 400
+        if not 0 < size <= MAX_UPLOAD_SIZE:
+            return jsonify({"error": f"size must be 1..{MAX_UPLOAD_SIZE} bytes"}), 400
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            return jsonify(
+                {
+                    "error": f"chunk_size must be {MIN_CHUNK_SIZE}..{MAX_CHUNK_SIZE} bytes"
+                }
+            ), 400
+
+        instance_dir = Path(current_app.instance_path)
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=UPLOAD_SESSION_TTL)
+        for stale_id in delete_stale_upload_sessions(cutoff):
+            discard_upload(str(stale_id), instance_dir)
+
+        upload = create_upload_session(filename, size, chunk_size)
+        return jsonify(_upload_session_json(upload, [])), 201
+
+    @app.route("/api/uploads/<uuid:upload_id>", methods=["GET"])
+    def api_get_upload(upload_id: UUID) -> Response | tuple[Response, int]:
+        """Report which chunks of an upload have arrived, for resuming."""
+        upload = get_upload_session(upload_id)
+        if upload is None:
+            return jsonify({"error": "Upload not found"}), 404
+        return jsonify(_upload_session_json(upload, [c.index for c in upload.chunks]))
+
+    @app.route("/api/uploads/<uuid:upload_id>/chunks/<int:index>", methods=["PUT"])
+    def api_put_upload_chunk(
+        upload_id: UUID, index: int
+    ) -> Response | tuple[Response, int]:
+        """Receive one chunk as the raw request body.
+
+        The optional ``X-Chunk-SHA256`` header is checked against the data;
+        chunks that fail are not recorded and can simply be sent again.
+        """
+        upload = get_upload_session(upload_id)
+        if upload is None:
+            return jsonify({"error": "Upload not found"}), 404
+        if not 0 <= index < upload.chunk_count:
+            return jsonify({"error": "Chunk index out of range"}), 400
+
+        recorded = {c.index: c.sha256 for c in upload.chunks}
+        if index in recorded:
+            # Already verified; a resumed client re-sending it is harmless
+            return jsonify(
+                {
+                    "index": index,
+                    "sha256": recorded[index],
+                    "received": len(recorded),
+                    "chunk_count": upload.chunk_count,
+                }
             )
 
-            # Extract and store metadata
-            package_logger.log_step(
-                "METADATA_EXTRACTION", "Starting metadata extraction"
+        instance_dir = Path(current_app.instance_path)
+        path = part_path(str(upload_id), instance_dir)
+        started = time.perf_counter()
+        try:
+            sha256 = write_chunk(
+                path,
+                index * upload.chunk_size,
+                upload.chunk_length(index),
+                request.stream,
+                request.headers.get("X-Chunk-SHA256"),
             )
-            try:
-                metadata_dict = extract_file_metadata(file_path)
-                package_logger.log_step(
-                    "METADATA_EXTRACTION",
-                    "Metadata extraction completed successfully",
-                    data={"metadata_keys": list(metadata_dict.keys())},
-                )
-            except Exception as e:
-                package_logger.log_error(
-                    "METADATA_EXTRACTION",
-                    e,
+        except ChunkError as e:
+            return jsonify({"error": str(e), "index": index}), 400
+        record_upload(
+            "chunked", upload.chunk_length(index), time.perf_counter() - started
+        )
+
+        received = record_upload_chunk(upload_id, index, sha256)
+        if received is None:
+            discard_upload(str(upload_id), instance_dir)
+            return jsonify({"error": "Upload not found"}), 404
+        advance_hash(str(upload_id), path, upload.size, upload.chunk_size, received)
+        return jsonify(
+            {
+                "index": index,
+                "sha256": sha256,
+                "received": len(received),
+                "chunk_count": upload.chunk_count,
+            }
+        )
+
+    @app.route("/api/uploads/<uuid:upload_id>/complete", methods=["POST"])
+    def api_complete_upload(upload_id: UUID) -> Response | tuple[Response, int]:
+        """Move a fully received upload into the store and create its package.
+
+        Completion is claimed atomically; a repeated request gets the package
+        created by the first one, or 409 while that one is still running.
+        """
+        try:
+            upload = get_upload_session(upload_id)
+            if upload is None:
+                return jsonify({"error": "Upload not found"}), 404
+            if upload.package_id is not None:
+                return jsonify(
                     {
-                        "file_path": str(file_path),
-                        "file_type": (
-                            filename.split(".")[-1].lower() if filename else ""
-                        ),
-                    },
-                )
-                # Continue with empty metadata dict
-                metadata_dict = {}
-                package_logger.log_step(
-                    "METADATA_EXTRACTION",
-                    "Continuing with empty metadata due to extraction failure",
+                        "upload_id": str(upload_id),
+                        "package_id": str(upload.package_id),
+                        "already_completed": True,
+                    }
                 )
 
-            # Get PSADT variables with fallback mapping
-            package_logger.log_step("PSADT_MAPPING", "Starting PSADT variable mapping")
-            try:
-                from .metadata_extractor import MetadataExtractor
+            received = {c.index for c in upload.chunks}
+            missing = [i for i in range(upload.chunk_count) if i not in received]
+            if missing:
+                return jsonify({"error": "Upload incomplete", "missing": missing}), 409
+
+            data = request.get_json(silent=True) or request.form
+            custom_instructions = str(data.get("custom_instructions") or "")
+            reuse_script = str(data.get("reuse_script", "")).lower() in (
+                "1",
+                "true",
+                "on",
+                "yes",
+            )
 
-                extractor = MetadataExtractor()
-                psadt_vars = extractor.get_psadt_variables(metadata_dict)
-                executable_names = extractor.extract_executable_names(file_path)
-                package_logger.log_step(
-                    "PSADT_MAPPING",
-                    "PSADT mapping completed",
-                    data={
-                        "psadt_vars": psadt_vars,
-                        "executable_names": executable_names,
-                    },
-                )
-            except Exception as e:
-                package_logger.log_error("PSADT_MAPPING", e)
-                psadt_vars = {}
-                executable_names = []
+            if not claim_upload_completion(upload_id):
+                return jsonify({"error": "Upload is already being completed"}), 409
 
-            # Store metadata in database
-            package_logger.log_step("DATABASE_STORAGE", "Storing metadata in database")
+            instance_dir = Path(current_app.instance_path)
+            path = part_path(str(upload_id), instance_dir)
             try:
-                create_metadata(
-                    package_id=package.id,
-                    product_name=psadt_vars.get("appName")
-                    or metadata_dict.get("product_name"),
-                    version=psadt_vars.get("appVersion")
-                    or metadata_dict.get("version"),
-                    publisher=psadt_vars.get("appVendor")
-                    or metadata_dict.get("publisher"),
-                    install_date=metadata_dict.get("install_date"),
-                    uninstall_string=metadata_dict.get("uninstall_string"),
-                    estimated_size=metadata_dict.get("estimated_size"),
-                    product_code=psadt_vars.get("productCode")
-                    or metadata_dict.get("product_code"),
-                    upgrade_code=metadata_dict.get("upgrade_code"),
-                    language=metadata_dict.get("language"),
-                    architecture=metadata_dict.get("architecture"),
-                    executable_names=executable_names,
+                sha256 = finish_hash(
+                    str(upload_id), path, upload.size, upload.chunk_size
                 )
-                package_logger.log_step(
-                    "DATABASE_STORAGE", "Metadata stored successfully"
+                expected = str(data.get("sha256") or "").lower()
+                if expected and expected != sha256:
+                    delete_upload_session(upload_id)
+                    discard_upload(str(upload_id), instance_dir)
+                    return jsonify({"error": "File checksum mismatch"}), 400
+
+                stored = adopt_file(
+                    path, sha256, upload.size, upload.filename, instance_dir
                 )
-            except Exception as e:
-                package_logger.log_error("DATABASE_STORAGE", e)
-
-            package_logger.log_step(
-                "UPLOAD_COMPLETE",
-                f"Package upload completed successfully: {package.id}",
-            )
+            except Exception:
+                # The partial file is untouched; let the client retry
+                finish_upload_completion(upload_id, None)
+                raise
 
-            # Return package information
-            return jsonify(
-                {
-                    "package_id": str(package.id),
-                    "filename": package.filename,
-                    "status": package.status,
-                    "upload_time": package.upload_time.isoformat(),
-                    "custom_instructions": package.custom_instructions,
-                }
-            )
+            try:
+                package = _register_upload(
+                    stored, upload.filename, custom_instructions, reuse_script
+                )
+            except Exception:
+                # The file has left the partial path; the upload cannot be retried
+                delete_upload_session(upload_id)
+                raise
+            finish_upload_completion(upload_id, package["package_id"])
+            return jsonify(package)
 
         except Exception as e:
-            if package_logger:
-                package_logger.log_error("UPLOAD_FAILED", e)
             return jsonify({"error": str(e)}), 500
 
+    @app.route("/api/uploads/<uuid:upload_id>", methods=["DELETE"])
+    def api_abort_upload(upload_id: UUID) -> Response | tuple[Response, int]:
+        """Abandon a chunked upload and delete its partial file."""
+        found = delete_upload_session(upload_id)
+        discard_upload(str(upload_id), Path(current_app.instance_path))
+        if not found:
+            return jsonify({"error": "Upload not found"}), 404
+        return jsonify({"upload_id": str(upload_id), "status": "aborted"})
+
     @app.route("/api/packages/<uuid:package_id>/generate", methods=["POST"])
     def api_generate_script(package_id: UUID) -> Response | tuple[Response, int]:
         """API endpoint to generate a PSADT script using the 5-stage pipeline."""
@@ -506,11 +723,13 @@ def register_routes(app: Flask) -> None:
                     db_package.hallucination_report = psadt_script.hallucination_report
                     db_package.corrections_applied = psadt_script.corrections_applied
                     db_package.pipeline_metadata = {
+                        **(db_package.pipeline_metadata or {}),
                         "generation_timestamp": datetime.now().isoformat(),
                         "model_used": "gpt-4.1-mini",
                         "pipeline_version": "5-stage-v1",
                     }
                     db_package.status = "completed"
+                    materialize_detail_view(db_package)
 
                     session.commit()
                     package_logger.log_step(
@@ -655,14 +874,59 @@ def register_routes(app: Flask) -> None:
 
     @app.route("/api/evaluations", methods=["GET"])
     def api_get_evaluations() -> Response | tuple[Response, int]:
-        """API endpoint to get all past evaluation results."""
+        """API endpoint to list past evaluation results, one page at a time.
+
+        Query parameters: ``limit`` (default 50, at most
+        ``EVALUATION_PAGE_LIMIT``), ``offset``, ``model_id``, ``scenario_id``,
+        ``category``, ``search`` (text in model, scenario or category names)
+        and ``sort`` (a key of ``EVALUATION_SORTS``).
+        """
+        try:
+            from .services.evaluation_service import EvaluationService
+
+            try:
+                limit = int(request.args.get("limit", 50))
+                offset = int(request.args.get("offset", 0))
+            except ValueError:
+                return jsonify({"error": "limit and offset must be integers"}), 400
+            if limit < 1 or offset < 0:
+                return jsonify({"error": "limit and offset out of range"}), 400
+            limit = min(limit, EVALUATION_PAGE_LIMIT)
+            sort = request.args.get("sort", "timestamp-desc")
+            if sort not in EVALUATION_SORTS:
+                return jsonify({"error": f"Unknown sort: {sort}"}), 400
+
+            instance_dir = Path(current_app.instance_path)
+            evaluation_service = EvaluationService(instance_dir)
+            evaluations, total = evaluation_service.list_evaluations(
+                limit=limit,
+                offset=offset,
+                model_id=request.args.get("model_id"),
+                scenario_id=request.args.get("scenario_id"),
+                category=request.args.get("category"),
+                sort=sort,
+                search=request.args.get("search", "").strip() or None,
+            )
+            return jsonify(
+                {
+                    "evaluations": [e.model_dump() for e in evaluations],
+                    "total": total,
+                    "limit": limit,
+                    "offset": offset,
+                }
+            )
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/evaluations/stats", methods=["GET"])
+    def api_get_evaluation_stats() -> Response | tuple[Response, int]:
+        """API endpoint to get trust score aggregates per model."""
         try:
             from .services.evaluation_service import EvaluationService
 
             instance_dir = Path(current_app.instance_path)
             evaluation_service = EvaluationService(instance_dir)
-            evaluations = evaluation_service.get_all_evaluations()
-            return jsonify([evaluation.model_dump() for evaluation in evaluations])
+            return jsonify({"models": evaluation_service.trust_scores_by_model()})
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -702,62 +966,69 @@ def register_routes(app: Flask) -> None:
         if not scenario_ids:
             return jsonify({"error": "At least one scenario must be selected"}), 400
 
-        def evaluation_task(model_ids: list[str], scenario_ids: list[str]) -> None:
-            with app.app_context():
-                from .services.evaluation_service import EvaluationService
-
-                instance_dir = Path(current_app.instance_path)
-                evaluation_service = EvaluationService(instance_dir)
+        from .workflow.evaluation_runner import EvaluationRun
 
-                total_runs = len(model_ids) * len(scenario_ids)
-                completed_runs = 0
-
-                for model_id in model_ids:
-                    for scenario_id in scenario_ids:
-                        try:
-                            result = evaluation_service.run_evaluation(
-                                model_id, scenario_id
-                            )
-                            completed_runs += 1
-                            progress = (completed_runs / total_runs) * 100
-
-                            if result:
-                                socketio.emit(
-                                    "evaluation_progress",
-                                    {
-                                        "progress": progress,
-                                        "status": f"Completed {completed_runs}/{total_runs}: {result.model['name']} on {result.scenario['title']}",
-                                        "result": result.model_dump(),
-                                    },
-                                )
-                            else:
-                                socketio.emit(
-                                    "evaluation_progress",
-                                    {
-                                        "progress": progress,
-                                        "status": f"Failed {completed_runs}/{total_runs}: {model_id} on {scenario_id}",
-                                        "error": f"Evaluation failed for {model_id} on {scenario_id}",
-                                    },
-                                )
-                        except Exception as e:
-                            completed_runs += 1
-                            progress = (completed_runs / total_runs) * 100
-                            socketio.emit(
-                                "evaluation_progress",
-                                {
-                                    "progress": progress,
-                                    "status": f"Error on {model_id} / {scenario_id}",
-                                    "error": str(e),
-                                },
-                            )
-
-                socketio.emit(
-                    "evaluation_complete", {"message": "All evaluations completed."}
-                )
+        run = EvaluationRun.create(
+            Path(current_app.instance_path), model_ids, scenario_ids
+        )
+        run.start()
+        socketio.start_background_task(run.execute, app, socketio.emit)
 
-        socketio.start_background_task(evaluation_task, model_ids, scenario_ids)
+        return (
+            jsonify(
+                {
+                    "message": "Evaluation started",
+                    "run_id": run.id,
+                    "cells": len(run.state["cells"]),
+                }
+            ),
+            202,
+        )
 
-        return jsonify({"message": "Evaluation started"}), 202
+    @app.route("/api/evaluations/runs/<run_id>", methods=["GET"])
+    def api_get_evaluation_run(run_id: str) -> Response | tuple[Response, int]:
+        """State of an evaluation run and each of its cells."""
+        from .workflow.evaluation_runner import EvaluationRun
+
+        run = EvaluationRun.load(Path(current_app.instance_path), run_id)
+        if not run:
+            return jsonify({"error": "Evaluation run not found"}), 404
+        return jsonify(run.snapshot())
+
+    @app.route("/api/evaluations/runs/<run_id>/cancel", methods=["POST"])
+    def api_cancel_evaluation_run(run_id: str) -> Response | tuple[Response, int]:
+        """Stop starting cells of a run; cells already running finish."""
+        from .workflow.evaluation_runner import EvaluationRun
+
+        run = EvaluationRun.load(Path(current_app.instance_path), run_id)
+        if not run:
+            return jsonify({"error": "Evaluation run not found"}), 404
+        if not run.active:
+            return jsonify({"error": "Evaluation run is not running"}), 409
+        run.cancel()
+        return jsonify({"message": "Evaluation run cancelling", "run_id": run.id}), 202
+
+    @app.route("/api/evaluations/runs/<run_id>/resume", methods=["POST"])
+    def api_resume_evaluation_run(run_id: str) -> Response | tuple[Response, int]:
+        """Run the cells of a cancelled or interrupted run that have no result."""
+        from .workflow.evaluation_runner import EvaluationRun
+
+        run = EvaluationRun.load(Path(current_app.instance_path), run_id)
+        if not run:
+            return jsonify({"error": "Evaluation run not found"}), 404
+        if not run.start():
+            return jsonify({"error": "Evaluation run is already running"}), 409
+        socketio.start_background_task(run.execute, app, socketio.emit)
+        return (
+            jsonify(
+                {
+                    "message": "Evaluation resumed",
+                    "run_id": run.id,
+                    "cells": run.snapshot()["counts"].get("pending", 0),
+                }
+            ),
+            202,
+        )
 
     @app.route("/api/kb/sources", methods=["GET"])
     def api_get_kb_sources() -> Response | tuple[Response, int]:
@@ -1008,6 +1279,26 @@ def register_routes(app: Flask) -> None:
         socketio.start_background_task(parse_github_task, url)
         return jsonify({"message": f"Parsing repository {url}", "status": "started"})
 
+    @app.route("/metrics", methods=["GET"])
+    def metrics() -> Response:
+        """Prometheus scrape endpoint."""
+        body, content_type = render_metrics()
+        return Response(body, content_type=content_type)
+
+    @app.route("/api/metrics/stage-timings", methods=["GET"])
+    def api_stage_timings() -> Union[Response, tuple[Response, int]]:
+        """Stage and sub-step latency percentiles across recent packages."""
+        limit = request.args.get("limit", 500, type=int)
+        if limit < 1:
+            return jsonify({"error": "limit must be positive"}), 400
+        timings = get_pipeline_timings(limit)
+        return jsonify(
+            {
+                "packages": len(timings),
+                "percentiles": MetricsService.aggregate_timings(timings),
+            }
+        )
+
     @app.route("/api/health/mcp", methods=["GET"])
     def api_health_mcp() -> Response | tuple[Response, int]:
         """API endpoint to check MCP server health."""
@@ -1206,15 +1497,40 @@ def register_routes(app: Flask) -> None:
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route("/api/packages/<package_id>/trace", methods=["GET"])
+    def api_get_trace(package_id: str) -> Response | tuple[Response, int]:
+        """Span tree of the package's last pipeline run as OTLP/JSON.
+
+        The body can be posted unchanged to the ``/v1/traces`` endpoint of
+        an OpenTelemetry collector.
+        """
+        package = get_package(package_id)
+        if not package:
+            return jsonify({"error": "Package not found"}), 404
+        trace = package.trace
+        if not trace:
+            return jsonify({"error": "No trace recorded for this package"}), 404
+        return jsonify(
+            to_otlp(
+                trace,
+                {"package.id": str(package.id), "package.filename": package.filename},
+            )
+        )
+
     @app.route("/logs/<package_id>")
     def view_logs(package_id: str) -> Union[str, tuple[str, int]]:
-        """View logs for a specific package."""
+        """View the most recent log entries of a package."""
         package = get_package(package_id)
         if not package:
             return "Package not found", 404
 
         package_logger = get_package_logger(package_id)
-        logs = package_logger.get_logs()
+        log_slice = package_logger.read_range(tail=LOG_VIEW_TAIL)
+        if log_slice.total:
+            logs = "\n".join(render_entry(entry) for entry in log_slice.entries)
+        else:
+            # Plain-text log from before the JSONL format, if any
+            logs = package_logger.get_logs()
         log_file_path = package_logger.get_log_file_path()
 
         return render_template(
@@ -1222,25 +1538,55 @@ def register_routes(app: Flask) -> None:
             package=package,
             logs=logs,
             log_file_path=log_file_path,
+            shown=len(log_slice.entries),
+            total=log_slice.total,
+            next_offset=log_slice.next_offset,
         )
 
+    def _log_query() -> dict[str, Any]:
+        """Parse tail/since/start/limit/step/level query arguments."""
+        query: dict[str, Any] = {}
+        for name in ("since", "start", "limit", "tail"):
+            value = request.args.get(name, type=int)
+            if value is not None:
+                query[name] = max(value, 0)
+        steps = request.args.get("step")
+        if steps:
+            query["steps"] = [s.strip() for s in steps.split(",") if s.strip()]
+        if request.args.get("level"):
+            query["min_level"] = request.args["level"]
+        return query
+
     @app.route("/api/packages/<package_id>/logs", methods=["GET"])
     def api_get_logs(package_id: str) -> Response | tuple[Response, int]:
-        """API endpoint to get logs for a specific package."""
+        """API endpoint to read a package's logs.
+
+        Query arguments: ``tail=N`` (default 1000 when no other selector is
+        given), ``since=<byte offset>`` from a previous ``next_offset``,
+        ``start``/``limit`` line offsets, ``step`` (comma-separated) and
+        ``level`` (minimum level).
+        """
         try:
             package = get_package(package_id)
             if not package:
                 return jsonify({"error": "Package not found"}), 404
 
+            query = _log_query()
+            if not {"since", "start", "limit", "tail"} & query.keys():
+                query["tail"] = LOG_API_DEFAULT_TAIL
+
             package_logger = get_package_logger(package_id)
-            logs = package_logger.get_logs()
+            log_slice = package_logger.read_range(**query)
             log_file_path = package_logger.get_log_file_path()
 
             return jsonify(
                 {
                     "package_id": package_id,
                     "filename": package.filename,
-                    "logs": logs,
+                    "entries": log_slice.entries,
+                    "logs": "\n".join(render_entry(e) for e in log_slice.entries),
+                    "next_offset": log_slice.next_offset,
+                    "total": log_slice.total,
                     "log_file_path": str(log_file_path) if log_file_path else None,
                     "timestamp": datetime.now().isoformat(),
                 }
@@ -1248,3 +1594,74 @@ def register_routes(app: Flask) -> None:
 
         except Exception as e:
             return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/packages/<package_id>/logs/raw", methods=["GET"])
+    def api_get_raw_logs(package_id: str) -> Response | tuple[Response, int]:
+        """Serve the JSONL log file itself, honouring HTTP Range requests."""
+        package_logger = get_package_logger(package_id)
+        package_logger.flush()
+        log_file = package_logger.log_file
+        if not log_file or not log_file.exists():
+            return jsonify({"error": "No logs available"}), 404
+        return send_file(
+            log_file, mimetype="application/x-ndjson", conditional=True, etag=False
+        )
+
+    @app.route("/api/packages/<package_id>/logs/stream")
+    def stream_logs(package_id: str) -> Response | tuple[Response, int]:
+        """Follow a package's log over SSE, starting at ``since``.
+
+        Event ids are byte offsets, so a reconnecting EventSource resumes
+        from its ``Last-Event-ID`` without repeating entries. Once the
+        package has completed or failed and its log is drained, an ``end``
+        event closes the stream. At most ``LOG_STREAM_MAX_STREAMS`` streams
+        are served at once; further requests get 503.
+        """
+        if get_package_status(package_id) is None:
+            return jsonify({"error": "Package not found"}), 404
+        query = _log_query()
+        last_event_id = request.headers.get("Last-Event-ID", "")
+        if last_event_id.isdigit():
+            query["since"] = int(last_event_id)
+        query.pop("tail", None)
+        query.pop("start", None)
+        query.pop("limit", None)
+        package_logger = get_package_logger(package_id)
+
+        if not _log_stream_slots.acquire(blocking=False):
+            response = Response("Too many log streams", status=503)
+            response.headers["Retry-After"] = str(int(LOG_FOLLOW_INTERVAL * 15))
+            return response
+
+        def generate() -> Generator[str, None, None]:
+            since = query.pop("since", 0)
+            idle = 0.0
+            while True:
+                # Flush queued records only for the final read
+                finished = get_package_status(package_id) in TERMINAL_STATUSES
+                log_slice = package_logger.read_range(
+                    since=since, flush=finished, **query
+                )
+                for entry in log_slice.entries:
+                    entry["text"] = render_entry(entry)
+                    yield f"data: {json.dumps(entry)}\n\n"
+                if log_slice.next_offset > since:
+                    since = log_slice.next_offset
+                    yield f"id: {since}\n\n"
+                    idle = 0.0
+                elif idle >= 15:
+                    # Send a keep-alive comment
+                    yield ":\n\n"
+                    idle = 0.0
+                if finished:
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                time.sleep(LOG_FOLLOW_INTERVAL)
+                idle += LOG_FOLLOW_INTERVAL
+
+        response = Response(
+            stream_with_context(generate()), mimetype="text/event-stream"
+        )
+        # Runs even if the client goes away before the stream starts
+        response.call_on_close(_log_stream_slots.release)
+        return response
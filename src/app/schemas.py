@@ -47,6 +47,8 @@ class ModelInfo(BaseModel):
     id: str
     name: str
     description: str
+    # Evaluation cells run at once for this model; None uses the default
+    max_concurrency: Optional[int] = None
 
 
 class EvaluationMetrics(BaseModel):
@@ -57,6 +59,17 @@ class EvaluationMetrics(BaseModel):
     trust_score: float
 
 
+class EvaluationSummary(BaseModel):
+    """Pydantic model for an evaluation result without its outputs."""
+
+    id: str
+    model: ModelInfo
+    scenario: Scenario
+    timestamp: str
+    evaluation_log: str
+    metrics: EvaluationMetrics
+
+
 class EvaluationResult(BaseModel):
     """Pydantic model for a full evaluation result."""
 
@@ -5,52 +5,30 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from jinja2 import Environment, FileSystemLoader, TemplateSyntaxError
+from jinja2 import Environment, TemplateSyntaxError
 
 from .models import Package, Metadata
+from .templating import PSADT, RENDER_PROMPTS, get_environment
 
 logger = logging.getLogger(__name__)
 
 
 class ScriptRenderer:
-    """Renders PSADT scripts and AI prompt templates using Jinja2."""
+    """Renders PSADT scripts and AI prompt templates using Jinja2.
 
-    def __init__(self) -> None:
-        """Initialize the ScriptRenderer with template environments."""
-        self._prompt_env: Optional[Environment] = None
-        self._psadt_env: Optional[Environment] = None
+    Templates come from the process-wide environments in ``templating``,
+    so renderers are cheap to create and never recompile a template.
+    """
 
     @property
     def prompt_env(self) -> Environment:
-        """Get or create the prompt template environment."""
-        if self._prompt_env is None:
-            prompts_dir = Path("src/app/prompts")
-            if not prompts_dir.exists():
-                raise FileNotFoundError(f"Prompts directory not found: {prompts_dir}")
-
-            self._prompt_env = Environment(
-                loader=FileSystemLoader(str(prompts_dir)),
-                trim_blocks=True,
-                lstrip_blocks=True,
-            )
-        return self._prompt_env
+        """Shared prompt template environment."""
+        return get_environment(RENDER_PROMPTS)
 
     @property
     def psadt_env(self) -> Environment:
-        """Get or create the PSADT template environment."""
-        if self._psadt_env is None:
-            templates_dir = Path("src/app/templates")
-            if not templates_dir.exists():
-                raise FileNotFoundError(
-                    f"Templates directory not found: {templates_dir}"
-                )
-
-            self._psadt_env = Environment(
-                loader=FileSystemLoader(str(templates_dir)),
-                trim_blocks=True,
-                lstrip_blocks=True,
-            )
-        return self._psadt_env
+        """Shared PSADT template environment."""
+        return get_environment(PSADT)
 
     def render_psadt_script(self, package: Package, ai_sections: Dict[str, Any]) -> str:
         """Render the complete PSADT script using the template and AI-generated sections.
@@ -15,9 +15,12 @@ from openai import (
     AuthenticationError,
 )
 
-from jinja2 import Environment, FileSystemLoader
 from ..schemas import PSADTScript
 from ..package_logger import PackageLogger
+from ..metrics import observe_llm_call
+from ..replay import chat_completion
+from ..templating import PROMPTS, get_environment
+from ..workflow.timings import LLM_CALL, substep
 from .rag_service import RAGService
 from .psadt_documentation_parser import PSADTDocumentationParser, CmdletDefinition
 from ..config import Config  # Import Config
@@ -26,7 +29,7 @@ from ..config import Config  # Import Config
 class AdvisorService:
     def __init__(self) -> None:
         self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        self.jinja_env = Environment(loader=FileSystemLoader("src/app/prompts"))
+        self.jinja_env = get_environment(PROMPTS)
 
         # Initialize PSADT v4 documentation parser
         self.psadt_parser = PSADTDocumentationParser()
@@ -96,11 +99,17 @@ class AdvisorService:
         )
 
         try:
-            response = self.client.chat.completions.create(
-                model=model_name,
-                messages=messages,
-                response_format=response_format,
-            )
+            with (
+                substep(LLM_CALL, model=model_name),
+                observe_llm_call(model_name) as call,
+            ):
+                response = chat_completion(
+                    self.client,
+                    model=model_name,
+                    messages=messages,
+                    response_format=response_format,
+                )
+                call.record(response)
             corrected_script_str = response.choices[0].message.content or ""
             package_logger.log_step(
                 "OPENAI_API_RESPONSE",
@@ -1,22 +1,109 @@
 # src/app/services/evaluation_service.py
 import json
+import threading
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 
+from ..database import (
+    evaluation_stats_by_model,
+    get_evaluation_ids,
+    get_evaluation_record,
+    list_evaluation_records,
+    save_evaluation_records,
+)
 from ..schemas import (
     EvaluationResult,
+    EvaluationSummary,
     ModelInfo,
     Scenario,
     EvaluationMetrics,
     PSADTScript,
 )
 from ..package_logger import get_package_logger
+from .advisor_service import AdvisorService
+from .cmdlet_discovery import cmdlet_discovery_service
+from .hallucination_detector import HallucinationDetector
+from .rag_service import RAGCache
 from .script_generator import PSADTGenerator
-from ..models import Package, Metadata
+from ..models import EvaluationRecord, Package, Metadata
 from ..script_renderer import ScriptRenderer
 
+# Result fields stored in the output artifact rather than in columns
+_OUTPUT_FIELDS = (
+    "raw_model_output",
+    "advisor_corrected_output",
+    "detailed_hallucination_report",
+    "detailed_corrections_log",
+)
+
+# Directories whose legacy JSON results were imported by this process
+_imported_dirs: Set[Path] = set()
+_import_lock = threading.Lock()
+
+
+def _to_record(result: EvaluationResult) -> EvaluationRecord:
+    """Build the database row for an evaluation result."""
+    timestamp = datetime.fromisoformat(result.timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    record = EvaluationRecord(
+        id=result.id,
+        model_id=result.model.id,
+        model_name=result.model.name,
+        scenario_id=result.scenario.id,
+        scenario_title=result.scenario.title,
+        scenario_category=result.scenario.category,
+        timestamp=timestamp,
+        hallucinations_found=result.metrics.hallucinations_found,
+        hallucinations_corrected=result.metrics.hallucinations_corrected,
+        trust_score=result.metrics.trust_score,
+        evaluation_log=result.evaluation_log,
+        model_info=result.model.model_dump(),
+        scenario_info=result.scenario.model_dump(),
+    )
+    record.output = result.model_dump(include=set(_OUTPUT_FIELDS))
+    return record
+
+
+def _summary_fields(record: EvaluationRecord) -> Dict[str, Any]:
+    return {
+        "id": record.id,
+        "model": record.model_info,
+        "scenario": record.scenario_info,
+        "timestamp": record.timestamp.replace(tzinfo=timezone.utc).isoformat(),
+        "evaluation_log": record.evaluation_log,
+        "metrics": {
+            "hallucinations_found": record.hallucinations_found,
+            "hallucinations_corrected": record.hallucinations_corrected,
+            "trust_score": record.trust_score,
+        },
+    }
+
+
+class PipelineResources:
+    """Pipeline services shared by the evaluation runs of one matrix.
+
+    The PSADT cmdlet definitions are parsed once and RAG responses are
+    cached across runs instead of being rebuilt for every model/scenario
+    cell.
+    """
+
+    def __init__(self) -> None:
+        cmdlet_discovery_service.get_cmdlet_reference()
+        self.hallucination_detector = HallucinationDetector()
+        self.advisor_service = AdvisorService()
+        self.rag_cache = RAGCache()
+
+    def generator(self) -> PSADTGenerator:
+        """New pipeline generator using the shared services."""
+        return PSADTGenerator(
+            hallucination_detector=self.hallucination_detector,
+            advisor_service=self.advisor_service,
+            rag_cache=self.rag_cache,
+        )
+
 
 class EvaluationService:
     """Service for handling model evaluations."""
@@ -63,23 +150,70 @@ class EvaluationService:
             return ModelInfo(**models_data["advisor_model"])
         return None
 
-    def get_all_evaluations(self) -> List[EvaluationResult]:
-        """Retrieves all past evaluation results."""
-        evaluations = []
-        for file_path in self.evaluations_dir.glob("*.json"):
-            eval_data = self._load_json_data(file_path)
-            if eval_data:
-                evaluations.append(EvaluationResult(**eval_data))
-        evaluations.sort(key=lambda x: x.timestamp, reverse=True)
-        return evaluations
+    def _import_legacy_results(self) -> None:
+        """Import results saved as JSON files by earlier versions, once."""
+        with _import_lock:
+            if self.evaluations_dir in _imported_dirs:
+                return
+            existing = get_evaluation_ids()
+            records = []
+            for file_path in self.evaluations_dir.glob("*.json"):
+                eval_data = self._load_json_data(file_path)
+                if eval_data and eval_data.get("id") not in existing:
+                    records.append(_to_record(EvaluationResult(**eval_data)))
+            if records:
+                save_evaluation_records(records)
+            _imported_dirs.add(self.evaluations_dir)
+
+    def list_evaluations(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        model_id: Optional[str] = None,
+        scenario_id: Optional[str] = None,
+        category: Optional[str] = None,
+        sort: str = "timestamp-desc",
+        search: Optional[str] = None,
+    ) -> Tuple[List[EvaluationSummary], int]:
+        """Retrieves one page of past evaluation results.
+
+        Args:
+            limit: Maximum number of results to return
+            offset: Number of matching results to skip
+            model_id: Only results of this model
+            scenario_id: Only results of this scenario
+            category: Only results of scenarios in this category
+            sort: Sort key, e.g. ``timestamp-desc`` or ``trust-score-desc``
+            search: Text to look for in model names, scenario titles and
+                categories
+
+        Returns:
+            Tuple of (result summaries, total number of matching results)
+        """
+        self._import_legacy_results()
+        records, total = list_evaluation_records(
+            limit=limit,
+            offset=offset,
+            model_id=model_id,
+            scenario_id=scenario_id,
+            category=category,
+            sort=sort,
+            search=search,
+        )
+        return [EvaluationSummary(**_summary_fields(r)) for r in records], total
 
     def get_evaluation(self, evaluation_id: str) -> Optional[EvaluationResult]:
         """Retrieves a single evaluation result by its ID."""
-        file_path = self.evaluations_dir / f"{evaluation_id}.json"
-        eval_data = self._load_json_data(file_path)
-        if eval_data:
-            return EvaluationResult(**eval_data)
-        return None
+        self._import_legacy_results()
+        record = get_evaluation_record(evaluation_id)
+        if record is None:
+            return None
+        return EvaluationResult(**_summary_fields(record), **(record.output or {}))
+
+    def trust_scores_by_model(self) -> List[Dict[str, Any]]:
+        """Aggregates trust scores and hallucination counts per model."""
+        self._import_legacy_results()
+        return evaluation_stats_by_model()
 
     def get_evaluation_log_content(self, log_path: str) -> Optional[str]:
         """Reads the content of a log file."""
@@ -90,9 +224,18 @@ class EvaluationService:
             return None
 
     def run_evaluation(
-        self, model_id: str, scenario_id: str
+        self,
+        model_id: str,
+        scenario_id: str,
+        resources: Optional[PipelineResources] = None,
     ) -> Optional[EvaluationResult]:
-        """Runs a new evaluation using the live 5-stage pipeline."""
+        """Runs a new evaluation using the live 5-stage pipeline.
+
+        Args:
+            model_id: Model to evaluate
+            scenario_id: Scenario to run
+            resources: Services shared with the other runs of a matrix
+        """
         models = {m.id: m for m in self.get_models()}
         scenarios = {s.id: s for s in self.get_scenarios()}
 
@@ -127,7 +270,7 @@ class EvaluationService:
             )
 
             # Instantiate the pipeline generator
-            generator = PSADTGenerator()
+            generator = resources.generator() if resources else PSADTGenerator()
 
             # Run the 5-stage pipeline - Note: session=None for evaluation mode
             pipeline_result: PSADTScript = generator.generate_script(
@@ -156,18 +299,12 @@ class EvaluationService:
                 "METRICS_CALC", "Live metrics calculated.", data=metrics.model_dump()
             )
 
-            # Get raw and corrected script outputs
-            renderer = ScriptRenderer()
-            raw_output = renderer.render_psadt_script(
+            # The pipeline result already includes the advisor's corrections,
+            # so the raw and corrected outputs are the same rendered script
+            raw_output = ScriptRenderer().render_psadt_script(
                 temp_package, pipeline_result.model_dump()
             )
-            corrected_output = raw_output  # Default to raw if no corrections
-            if pipeline_result.corrections_applied:
-                # Re-render with the final script state if corrections were applied
-                final_script_sections = pipeline_result.model_dump()
-                corrected_output = renderer.render_psadt_script(
-                    temp_package, final_script_sections
-                )
+            corrected_output = raw_output
 
             log_file_path = logger.get_log_file_path()
             result = EvaluationResult(
@@ -183,13 +320,8 @@ class EvaluationService:
                 detailed_corrections_log=corrections_log,
             )
 
-            # Save result to disk
-            with open(self.evaluations_dir / f"{result.id}.json", "w") as f:
-                json.dump(result.model_dump(), f, indent=2)
-            logger.log_step(
-                "SAVE_RESULT",
-                f"Live evaluation result saved to {self.evaluations_dir / f'{result.id}.json'}",
-            )
+            save_evaluation_records([_to_record(result)])
+            logger.log_step("SAVE_RESULT", "Live evaluation result saved.")
 
             return result
 
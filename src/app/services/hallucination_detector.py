@@ -6,6 +6,7 @@ Stage 4: Script validation using MCP knowledge graph
 
 from ..utils import retry_with_backoff
 from ..package_logger import PackageLogger
+from ..workflow.timings import REGEX_VALIDATION, substep
 import re
 from typing import Dict, Any, Optional
 from .psadt_documentation_parser import PSADTDocumentationParser, CmdletDefinition
@@ -43,7 +44,8 @@ class HallucinationDetector:
         """
         Detects potential hallucinations in a PowerShell script using MCP knowledge graph.
         """
-        self._load_psadt_cmdlets(package_logger)
+        if not self.psadt_cmdlets:
+            self._load_psadt_cmdlets(package_logger)
         package_logger.log_step(
             "HALLUCINATION_DETECTION_START",
             "Starting hallucination detection with MCP knowledge graph",
@@ -52,7 +54,8 @@ class HallucinationDetector:
 
         # First, extract cmdlets from the script for analysis
         cmdlet_pattern = r"([A-Z][a-zA-Z]*-[A-Z][a-zA-Z]*)"
-        found_cmdlets = re.findall(cmdlet_pattern, script)
+        with substep(REGEX_VALIDATION):
+            found_cmdlets = re.findall(cmdlet_pattern, script)
 
         package_logger.log_step(
             "CMDLET_EXTRACTION",
@@ -79,7 +82,10 @@ class HallucinationDetector:
             )
 
             # Fallback to basic validation if MCP fails
-            report = self._fallback_validation(script, found_cmdlets, package_logger)
+            with substep(REGEX_VALIDATION):
+                report = self._fallback_validation(
+                    script, found_cmdlets, package_logger
+                )
 
         package_logger.log_step(
             "HALLUCINATION_DETECTION_COMPLETE",
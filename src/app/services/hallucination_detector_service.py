@@ -9,6 +9,7 @@ import concurrent.futures
 import anyio
 from .mcp_service import mcp_service
 from ..package_logger import get_package_logger
+from ..workflow.timings import MCP_CALL, substep
 
 
 class HallucinationDetectorService:
@@ -24,7 +25,10 @@ class HallucinationDetectorService:
         def run_async() -> Any:
             return anyio.run(async_wrapper)
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
+        with (
+            substep(MCP_CALL, function=getattr(async_func, "__name__", None)),
+            concurrent.futures.ThreadPoolExecutor() as executor,
+        ):
             future = executor.submit(run_async)
             return future.result(timeout=30)
 
@@ -6,6 +6,7 @@ Stage 1: User instruction processing
 
 import os
 import json
+from typing import Any, Dict, Optional
 from openai import (
     OpenAI,
     OpenAIError,
@@ -15,18 +16,25 @@ from openai import (
 )
 from ..schemas import InstructionResult
 from ..package_logger import get_package_logger
+from ..metrics import observe_llm_call
+from ..replay import chat_completion
+from ..templating import PROMPTS, get_environment
+from ..workflow.timings import LLM_CALL, substep
 from .cmdlet_discovery import cmdlet_discovery_service
 from ..config import Config  # Import Config
 
-from jinja2 import Environment, FileSystemLoader
-
 
 class InstructionProcessor:
     def __init__(self) -> None:
         self.client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        self.jinja_env = Environment(loader=FileSystemLoader("src/app/prompts"))
+        self.jinja_env = get_environment(PROMPTS)
 
-    def process_instructions(self, text: str, package_id: str) -> InstructionResult:
+    def process_instructions(
+        self,
+        text: str,
+        package_id: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> InstructionResult:
         package_logger = get_package_logger(package_id)
 
         if not self.client.api_key:
@@ -42,7 +50,8 @@ class InstructionProcessor:
 
         prompt = self.jinja_env.get_template("instruction_processing.j2").render(
             user_instructions=text,
-            metadata={
+            metadata=metadata
+            or {
                 "product_name": "Application",
                 "version": "1.0.0",
                 "file_type": "msi",
@@ -72,11 +81,17 @@ class InstructionProcessor:
         )
 
         try:
-            response = self.client.chat.completions.create(
-                model=model_name,
-                messages=messages,
-                response_format=response_format,
-            )
+            with (
+                substep(LLM_CALL, model=model_name),
+                observe_llm_call(model_name) as call,
+            ):
+                response = chat_completion(
+                    self.client,
+                    model=model_name,
+                    messages=messages,
+                    response_format=response_format,
+                )
+                call.record(response)
             response_content = response.choices[0].message.content or ""
             package_logger.log_step(
                 "OPENAI_API_RESPONSE",
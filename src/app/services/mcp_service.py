@@ -7,6 +7,8 @@ Service for interacting with the Model Context Protocol (MCP) server.
 from typing import Any, Optional, cast, Dict
 
 from ..package_logger import get_package_logger
+from ..metrics import observe_mcp_call
+from ..replay import active_cassette
 from ..utils import retry_with_backoff
 from ..config import MCPConfigLoader
 from mcp import ClientSession
@@ -32,7 +34,25 @@ class MCPService:
     async def _call_mcp_tool_async(
         self, server_name: str, tool_name: str, arguments: dict[str, Any]
     ) -> Any:
-        """Helper to call an MCP tool asynchronously."""
+        """Helper to call an MCP tool asynchronously.
+
+        While a replay cassette is in use the response is recorded, or
+        replayed without contacting the server.
+        """
+        cassette = active_cassette()
+        request = {"server": server_name, "arguments": arguments}
+        if cassette is not None and cassette.replaying:
+            with observe_mcp_call(tool_name):
+                return cassette.replay("mcp", tool_name, request)
+        response = await self._call_mcp_server(server_name, tool_name, arguments)
+        if cassette is not None:
+            cassette.record("mcp", tool_name, request, response)
+        return response
+
+    async def _call_mcp_server(
+        self, server_name: str, tool_name: str, arguments: dict[str, Any]
+    ) -> Any:
+        """Call an MCP tool on the server."""
         # Get URL from configuration or use fallback
         if self.config_loader and self.server_config:
             try:
@@ -48,90 +68,89 @@ class MCPService:
             data={"url": url, "tool_name": tool_name, "arguments": arguments},
         )
 
-        try:
-            async with sse_client(url) as (read, write):
-                self.package_logger.log_step(
-                    "MCP_TRANSPORT_CONNECTED",
-                    "MCP transport connected successfully",
-                )
-
-                async with ClientSession(read, write) as session:
+        with observe_mcp_call(tool_name):
+            try:
+                async with sse_client(url) as (read, write):
                     self.package_logger.log_step(
-                        "MCP_SESSION_CREATED",
-                        "MCP session created, attempting initialization",
+                        "MCP_TRANSPORT_CONNECTED",
+                        "MCP transport connected successfully",
                     )
 
-                    await session.initialize()
+                    async with ClientSession(read, write) as session:
+                        self.package_logger.log_step(
+                            "MCP_SESSION_CREATED",
+                            "MCP session created, attempting initialization",
+                        )
 
-                    self.package_logger.log_step(
-                        "MCP_SESSION_INITIALIZED",
-                        "MCP session initialized successfully",
-                    )
+                        await session.initialize()
 
-                    result = await session.call_tool(tool_name, arguments)
+                        self.package_logger.log_step(
+                            "MCP_SESSION_INITIALIZED",
+                            "MCP session initialized successfully",
+                        )
 
-                    if result.isError:
-                        error_message = (
-                            f"MCP tool call failed for {tool_name}: {result.content}"
+                        result = await session.call_tool(tool_name, arguments)
+
+                        if result.isError:
+                            error_message = f"MCP tool call failed for {tool_name}: {result.content}"
+                            self.package_logger.log_step(
+                                "MCP_TOOL_ERROR",
+                                error_message,
+                                data={
+                                    "tool_name": tool_name,
+                                    "arguments": arguments,
+                                    "error_content": result.content,
+                                },
+                            )
+                            raise Exception(error_message)
+
+                        # Parse the response properly - MCP returns TextContent objects
+                        response_data: dict[str, Any] | list[Any] | str = (
+                            result.structuredContent or result.content
                         )
+
+                        # If it's a list of TextContent objects, extract the text
+                        if isinstance(response_data, list) and response_data:
+                            # Get the first TextContent object and extract its text
+                            text_content = (
+                                response_data[0].text
+                                if hasattr(response_data[0], "text")
+                                else str(response_data[0])
+                            )
+                            try:
+                                # Try to parse as JSON if it looks like JSON
+                                import json
+
+                                if text_content.strip().startswith("{"):
+                                    response_data = json.loads(text_content)
+                                else:
+                                    response_data = text_content
+                            except (json.JSONDecodeError, AttributeError):
+                                response_data = text_content
+
                         self.package_logger.log_step(
-                            "MCP_TOOL_ERROR",
-                            error_message,
+                            "MCP_TOOL_SUCCESS",
+                            f"MCP tool call successful for {tool_name}",
                             data={
                                 "tool_name": tool_name,
                                 "arguments": arguments,
-                                "error_content": result.content,
+                                "response": response_data,
                             },
                         )
-                        raise Exception(error_message)
+                        return response_data
 
-                    # Parse the response properly - MCP returns TextContent objects
-                    response_data: dict[str, Any] | list[Any] | str = (
-                        result.structuredContent or result.content
-                    )
-
-                    # If it's a list of TextContent objects, extract the text
-                    if isinstance(response_data, list) and response_data:
-                        # Get the first TextContent object and extract its text
-                        text_content = (
-                            response_data[0].text
-                            if hasattr(response_data[0], "text")
-                            else str(response_data[0])
-                        )
-                        try:
-                            # Try to parse as JSON if it looks like JSON
-                            import json
-
-                            if text_content.strip().startswith("{"):
-                                response_data = json.loads(text_content)
-                            else:
-                                response_data = text_content
-                        except (json.JSONDecodeError, AttributeError):
-                            response_data = text_content
-
-                    self.package_logger.log_step(
-                        "MCP_TOOL_SUCCESS",
-                        f"MCP tool call successful for {tool_name}",
-                        data={
-                            "tool_name": tool_name,
-                            "arguments": arguments,
-                            "response": response_data,
-                        },
-                    )
-                    return response_data
-
-        except Exception as e:
-            self.package_logger.log_step(
-                "MCP_CONNECTION_ERROR",
-                f"MCP connection failed: {str(e)}",
-                data={
-                    "error": str(e),
-                    "error_type": type(e).__name__,
-                    "url": url,
-                    "tool_name": tool_name,
-                },
-            )
-            raise
+            except Exception as e:
+                self.package_logger.log_step(
+                    "MCP_CONNECTION_ERROR",
+                    f"MCP connection failed: {str(e)}",
+                    data={
+                        "error": str(e),
+                        "error_type": type(e).__name__,
+                        "url": url,
+                        "tool_name": tool_name,
+                    },
+                )
+                raise
 
     @retry_with_backoff()
     async def crawl_and_index(self, url: str) -> dict:
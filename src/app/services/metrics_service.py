@@ -1,6 +1,33 @@
 """Service to calculate and present pipeline metrics."""
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
+
+# Display names of the timed pipeline stages, in pipeline order
+STAGE_KEYS = {
+    "instruction_processing": "stage_1_instruction_processing",
+    "rag_enrichment": "stage_2_targeted_rag",
+    "script_generation": "stage_3_script_generation",
+    "hallucination_detection": "stage_4_hallucination_detection",
+    "advisor_correction": "stage_5_advisor_correction",
+}
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linearly interpolated percentile of already sorted values.
+
+    Args:
+        sorted_values: Non-empty values in ascending order
+        q: Percentile between 0 and 100
+
+    Returns:
+        The q-th percentile
+    """
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    spread = sorted_values[upper] - sorted_values[lower]
+    return sorted_values[lower] + spread * (position - lower)
 
 
 class MetricsService:
@@ -27,23 +54,60 @@ class MetricsService:
         """
         metrics = {
             "stage_times": self._calculate_stage_times(),
+            "substep_times": self._calculate_substep_times(),
             "hallucination_metrics": self._calculate_hallucination_metrics(),
             "advisor_metrics": self._calculate_advisor_metrics(),
             "overall_performance": self._calculate_overall_performance(),
         }
         return metrics
 
+    def _timings(self) -> Dict[str, Any]:
+        """Timings recorded by the pipeline run, if any."""
+        return (self.pipeline_metadata or {}).get("timings") or {}
+
     def _calculate_stage_times(self) -> Dict[str, Optional[float]]:
-        """Calculate the duration of each pipeline stage."""
-        # This is a placeholder. The actual implementation will parse timestamps.
+        """Duration of each pipeline stage in seconds; None if it did not run."""
+        stages = self._timings().get("stages", {})
+        return {key: stages.get(stage) for stage, key in STAGE_KEYS.items()}
+
+    def _calculate_substep_times(self) -> Dict[str, Dict[str, float]]:
+        """Seconds spent in LLM calls, MCP calls, DB commits etc. per stage."""
         return {
-            "stage_1_instruction_processing": 1.5,
-            "stage_2_targeted_rag": 2.1,
-            "stage_3_script_generation": 5.3,
-            "stage_4_hallucination_detection": 3.2,
-            "stage_5_advisor_correction": 4.0,
+            stage: {name: entry["seconds"] for name, entry in steps.items()}
+            for stage, steps in self._timings().get("substeps", {}).items()
         }
 
+    @staticmethod
+    def aggregate_timings(
+        timings: Iterable[Dict[str, Any]],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Latency percentiles across pipeline runs.
+
+        Args:
+            timings: ``pipeline_metadata["timings"]`` of several packages
+
+        Returns:
+            For the total, every stage and every ``stage.substep``: the
+            number of runs and the p50/p95/p99 durations in seconds
+        """
+        samples: Dict[str, List[float]] = {}
+        for timing in timings:
+            if timing.get("total") is not None:
+                samples.setdefault("total", []).append(timing["total"])
+            for stage, seconds in timing.get("stages", {}).items():
+                samples.setdefault(stage, []).append(seconds)
+            for stage, steps in timing.get("substeps", {}).items():
+                for name, entry in steps.items():
+                    samples.setdefault(f"{stage}.{name}", []).append(entry["seconds"])
+
+        report: Dict[str, Dict[str, Any]] = {}
+        for key, values in samples.items():
+            values.sort()
+            report[key] = {"count": len(values)}
+            for q in PERCENTILES:
+                report[key][f"p{q}"] = round(percentile(values, q), 3)
+        return report
+
     def _calculate_hallucination_metrics(self) -> Dict[str, Any]:
         """Calculate metrics related to hallucination detection."""
         # Placeholder implementation
@@ -73,9 +137,10 @@ class MetricsService:
 
     def _calculate_overall_performance(self) -> Dict[str, Any]:
         """Calculate overall pipeline performance metrics."""
-        # Placeholder implementation
-        stage_times = self._calculate_stage_times().values()
-        total_time = sum(time for time in stage_times if time is not None)
+        total_time = self._timings().get("total")
+        if total_time is None:
+            stage_times = self._calculate_stage_times().values()
+            total_time = sum(time for time in stage_times if time is not None)
         metadata = self.pipeline_metadata or {}
         return {
             "total_pipeline_time": round(total_time, 2),
@@ -4,18 +4,52 @@
 Stage 2+5: Targeted documentation queries
 """
 
-from typing import List, Any, cast
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Any, Optional, Tuple, cast
 import concurrent.futures
 import anyio
+from ..metrics import record_cache
 from ..utils import retry_with_backoff
 from .mcp_service import MCPService
 from ..package_logger import get_package_logger
+from ..workflow.timings import MCP_CALL, substep
+
+
+class RAGCache:
+    """Thread-safe LRU of RAG responses, shared by several RAGService instances.
+
+    Used where many pipeline runs query the same documentation, such as the
+    cells of an evaluation matrix.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, query_text: str, source: str) -> Optional[str]:
+        with self._lock:
+            response = self._entries.get((query_text, source))
+            if response is not None:
+                self._entries.move_to_end((query_text, source))
+            return response
+
+    def put(self, query_text: str, source: str, response: str) -> None:
+        with self._lock:
+            self._entries[(query_text, source)] = response
+            self._entries.move_to_end((query_text, source))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
 
 
 class RAGService:
-    def __init__(self, package_id: str = "system") -> None:
+    def __init__(
+        self, package_id: str = "system", cache: Optional[RAGCache] = None
+    ) -> None:
         self.package_logger = get_package_logger(package_id)
         self.mcp_service = MCPService(package_id)
+        self.cache = cache
 
     def _run_mcp_in_thread(self, async_func: Any, *args: Any, **kwargs: Any) -> Any:
         """Run async MCP function in a separate thread to avoid asyncio conflicts."""
@@ -26,7 +60,10 @@ class RAGService:
         def run_async() -> Any:
             return anyio.run(async_wrapper)
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
+        with (
+            substep(MCP_CALL, function=getattr(async_func, "__name__", None)),
+            concurrent.futures.ThreadPoolExecutor() as executor,
+        ):
             future = executor.submit(run_async)
             return future.result(timeout=30)
 
@@ -37,16 +74,30 @@ class RAGService:
         Uses the crawl4ai-rag MCP server to get PSADT documentation.
         """
         query_text = " ".join(cmdlets)
+        source = "psappdeploytoolkit.com"
+        if self.cache is not None:
+            cached = self.cache.get(query_text, source)
+            record_cache("rag", cached is not None)
+            if cached is not None:
+                self.package_logger.log_step(
+                    "RAG_QUERY_CACHED",
+                    f"Using cached RAG response for cmdlets: {query_text}",
+                    data={"source": source},
+                )
+                return cached
+
         self.package_logger.log_step(
             "RAG_QUERY_START",
             f"Querying RAG for cmdlets: {query_text}",
-            data={"source": "psappdeploytoolkit.com"},
+            data={"source": source},
         )
         response = self._run_mcp_in_thread(
             self.mcp_service.perform_rag_query,
             query_text,
-            source="psappdeploytoolkit.com",
+            source=source,
         )
+        if self.cache is not None and isinstance(response, str):
+            self.cache.put(query_text, source, response)
         self.package_logger.log_step(
             "RAG_QUERY_COMPLETE",
             "RAG query complete",
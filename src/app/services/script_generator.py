@@ -5,53 +5,55 @@
 """
 
 from .instruction_processor import InstructionProcessor
-from .rag_service import RAGService
+from .rag_service import RAGCache, RAGService
 from .hallucination_detector import HallucinationDetector
 from .advisor_service import AdvisorService
 from ..schemas import PSADTScript, InstructionResult
 from ..utils import retry_with_backoff
 from ..workflow.progress import pct
 from ..logging_cmtrace import get_cmtrace_logger
+from ..metrics import PIPELINE_STAGE_SECONDS, observe_llm_call
+from ..replay import chat_completion
 from ..package_logger import PackageLogger, get_package_logger
-from typing import ContextManager, Optional
-import queue
+from ..progress_broker import ProgressPublisher
+from ..workflow.metadata_stage import metadata_pending, wait_for_metadata
+from ..workflow.timings import LLM_CALL, PipelineTimer, pipeline_timer, substep
+from ..workflow.tracing import Trace, pipeline_trace, span
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
 from ..config import Config  # Import Config
 
-try:
-    from prometheus_client import Summary  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-
-    class Summary:  # type: ignore
-        def __init__(self, *_: object, **__: object) -> None:
-            pass
-
-        def labels(self, *_: object, **__: object) -> "Summary":  # type: ignore
-            return self
-
-        def time(self) -> ContextManager[None]:  # type: ignore
-            from contextlib import nullcontext
-
-            return nullcontext()
-
-
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from ..models import Package
 
 
 logger_cm = get_cmtrace_logger("pipeline")
-PIPELINE_STAGE_SECONDS = Summary(
-    "pipeline_stage_seconds", "Time spent in pipeline stage", ["stage"]
-)
 
 
 class PSADTGenerator:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        hallucination_detector: Optional[HallucinationDetector] = None,
+        advisor_service: Optional[AdvisorService] = None,
+        rag_cache: Optional[RAGCache] = None,
+    ) -> None:
+        """
+        Args:
+            hallucination_detector: Detector to reuse, e.g. one shared by
+                concurrent evaluation runs so the PSADT cmdlet definitions
+                are parsed once
+            advisor_service: Advisor to reuse, likewise
+            rag_cache: Cache of RAG responses shared with other generators
+        """
         self.instruction_processor = InstructionProcessor()
         self.rag_service: Optional[RAGService] = (
             None  # Will be initialized with package_id in generate_script
         )
-        self.hallucination_detector = HallucinationDetector()
-        self.advisor_service = AdvisorService()
+        self.rag_cache = rag_cache
+        self.hallucination_detector = hallucination_detector or HallucinationDetector()
+        self.advisor_service = advisor_service or AdvisorService()
 
     @retry_with_backoff()
     def generate_script(
@@ -59,32 +61,74 @@ class PSADTGenerator:
         text: str,
         package: Package | None = None,
         session: Session | None = None,
-        progress_queue: queue.Queue | None = None,
+        progress_queue: ProgressPublisher | None = None,
         model_name: Optional[str] = None,
         package_logger: Optional[PackageLogger] = None,
     ) -> PSADTScript:
         """
         5-stage pipeline for generating validated PSADT scripts.
+
+        Stage and sub-step timings of the run are stored in
+        ``package.pipeline_metadata["timings"]`` and its span tree as the
+        package's ``trace`` artifact, also when a stage fails.
+        The package's materialized detail view is dropped; it is rebuilt
+        when the package completes again.
         """
+        if package and session:
+            package.detail_view = None
+        trace: Optional[Trace] = None
+        with pipeline_timer() as timer:
+            try:
+                with pipeline_trace(
+                    "generate_script",
+                    package_id=str(package.id) if package else None,
+                    model=model_name or Config.AI_MODEL,
+                ) as trace:
+                    return self._run_stages(
+                        text,
+                        package,
+                        session,
+                        progress_queue,
+                        model_name,
+                        package_logger,
+                        timer,
+                    )
+            finally:
+                if package and session:
+                    self._store_timings(package, session, timer, trace)
+
+    def _run_stages(
+        self,
+        text: str,
+        package: Package | None,
+        session: Session | None,
+        progress_queue: ProgressPublisher | None,
+        model_name: Optional[str],
+        package_logger: Optional[PackageLogger],
+        timer: PipelineTimer,
+    ) -> PSADTScript:
         package_id = str(package.id) if package else "unknown_package"
         if package_logger is None:
             package_logger = get_package_logger(package_id)
 
         # Initialize RAG service with package_id if not already done
         if self.rag_service is None:
-            self.rag_service = RAGService(package_id)
+            self.rag_service = RAGService(package_id, cache=self.rag_cache)
 
         # Type assertion to help mypy understand the type
         assert self.rag_service is not None
 
         # Stage 1: Instruction Processing
         if not package or not package.instruction_result:
+            self._await_metadata(package, session, package_logger, progress_queue)
             package_logger.log_5_stage_pipeline(
                 1, "Instruction Processing", "START", {"user_instructions": text}
             )
-            with PIPELINE_STAGE_SECONDS.labels("instruction_processing").time():
+            with self._stage(timer, "instruction_processing"):
                 instruction_result = self.instruction_processor.process_instructions(  # type: ignore
-                    text=str(text), package_id=package_id
+                    text=str(text),
+                    package_id=package_id,
+                    metadata=self._prompt_metadata(package),
                 )
             if package and session:
                 package.instruction_result = instruction_result.model_dump()
@@ -155,7 +199,7 @@ class PSADTGenerator:
                 "START",
                 {"predicted_cmdlets": instruction_result.predicted_cmdlets},
             )
-            with PIPELINE_STAGE_SECONDS.labels("rag_enrichment").time():
+            with self._stage(timer, "rag_enrichment"):
                 rag_documentation = self.rag_service.query(  # type: ignore
                     instruction_result.predicted_cmdlets
                 )
@@ -196,6 +240,7 @@ class PSADTGenerator:
 
         # Stage 3: Script Generation
         if not package or not package.initial_script:
+            self._await_metadata(package, session, package_logger, progress_queue)
             package_logger.log_5_stage_pipeline(
                 3,
                 "Script Generation",
@@ -205,7 +250,7 @@ class PSADTGenerator:
                     "rag_documentation_length": len(rag_documentation),
                 },
             )
-            with PIPELINE_STAGE_SECONDS.labels("script_generation").time():
+            with self._stage(timer, "script_generation"):
                 initial_script = self._generate_initial_script(
                     instruction_result, rag_documentation, package, model_name
                 )
@@ -256,7 +301,7 @@ class PSADTGenerator:
                 "START",
                 {"script_to_validate_length": len(script_to_validate)},
             )
-            with PIPELINE_STAGE_SECONDS.labels("hallucination_detection").time():
+            with self._stage(timer, "hallucination_detection"):
                 hallucination_report = self.hallucination_detector.detect(
                     script_to_validate, package_logger=package_logger
                 )
@@ -297,7 +342,7 @@ class PSADTGenerator:
                     "START",
                     {"hallucination_report": hallucination_report},
                 )
-                with PIPELINE_STAGE_SECONDS.labels("advisor_correction").time():
+                with self._stage(timer, "advisor_correction"):
                     corrected_script = self.advisor_service.correct_script(
                         initial_script,
                         hallucination_report,
@@ -347,6 +392,83 @@ class PSADTGenerator:
             )
             return initial_script
 
+    @contextmanager
+    def _stage(self, timer: PipelineTimer, name: str) -> Iterator[None]:
+        """Time and trace a stage for the run and the stage histogram."""
+        with (
+            span(name),
+            timer.stage(name),
+            PIPELINE_STAGE_SECONDS.labels(name).time(),
+        ):
+            yield
+
+    def _store_timings(
+        self,
+        package: Package,
+        session: Session,
+        timer: PipelineTimer,
+        trace: Optional[Trace],
+    ) -> None:
+        """Persist the run's timings and trace without masking a pipeline error."""
+        try:
+            package.pipeline_metadata = {
+                **(package.pipeline_metadata or {}),
+                "timings": timer.as_dict(),
+            }
+            if trace:
+                package.trace = trace.as_dict()
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger_cm.warning("Could not store pipeline timings: %s", e)
+
+    def _await_metadata(
+        self,
+        package: Package | None,
+        session: Session | None,
+        package_logger: PackageLogger,
+        progress_queue: ProgressPublisher | None,
+    ) -> None:
+        """Wait for a queued metadata extraction before a stage that needs it."""
+        if not package or not metadata_pending(str(package.id)):
+            return
+
+        package_logger.log_step(
+            "METADATA_WAIT", "Waiting for metadata extraction to finish"
+        )
+        if progress_queue:
+            progress_queue.put(
+                {
+                    "status": "processing",
+                    "progress": package.progress_pct,
+                    "current_step": "Metadata Extraction",
+                    "stage_number": 0,
+                }
+            )
+        if not wait_for_metadata(str(package.id)):
+            package_logger.log_step(
+                "METADATA_WAIT",
+                "Metadata extraction did not finish in time; continuing without it",
+                level="WARNING",
+            )
+        if session:
+            # Metadata was written by the extraction worker's own session
+            session.expire(package, ["package_metadata"])
+
+    def _prompt_metadata(self, package: Package | None) -> Optional[dict[str, Any]]:
+        """Collect the extracted installer metadata used by the prompts."""
+        if not package or not package.package_metadata:
+            return None
+        metadata = package.package_metadata
+        return {
+            "product_name": metadata.product_name,
+            "version": metadata.version,
+            "file_type": Path(package.filename).suffix.lstrip(".").lower() or None,
+            "architecture": metadata.architecture,
+            "executable_names": metadata.executable_names,
+            "installer_details": metadata.installer_details,
+        }
+
     def _generate_initial_script(
         self,
         instruction_result: InstructionResult,
@@ -374,11 +496,15 @@ class PSADTGenerator:
             {"role": "user", "content": prompt},
         ]
 
-        response = ip.client.chat.completions.create(
-            model=model_name or Config.AI_MODEL,  # Use model_name or fallback to config
-            messages=messages,
-            response_format={"type": "json_object"},
-        )
+        model = model_name or Config.AI_MODEL  # Use model_name or fallback to config
+        with substep(LLM_CALL, model=model), observe_llm_call(model) as call:
+            response = chat_completion(
+                ip.client,
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+            )
+            call.record(response)
 
         response_content = response.choices[0].message.content or "{}"
         script_data = json.loads(response_content)
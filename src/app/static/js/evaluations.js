@@ -25,6 +25,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const filterInput = document.getElementById('filter-input');
     const sortSelect = document.getElementById('sort-select');
     const resultsCount = document.getElementById('results-count');
+    const prevPageBtn = document.getElementById('evaluations-prev');
+    const nextPageBtn = document.getElementById('evaluations-next');
     const exportCsvBtn = document.getElementById('export-csv-btn');
     const refreshBtn = document.getElementById('refresh-evaluations-btn');
     const modelsLoading = document.getElementById('models-loading');
@@ -36,11 +38,15 @@ document.addEventListener('DOMContentLoaded', () => {
     const completedRuns = document.getElementById('completed-runs');
     const totalRuns = document.getElementById('total-runs');
 
-    // State management
-    let allEvaluations = [];
-    let filteredEvaluations = [];
+    // State management: filtering, sorting and paging happen on the server
+    const PAGE_SIZE = 50;
+    const EXPORT_PAGE_SIZE = 500;  // EVALUATION_PAGE_LIMIT of the API
+    let pageEvaluations = [];
+    let totalEvaluations = 0;
+    let currentOffset = 0;
     let currentFilter = '';
     let currentSort = 'timestamp-desc';
+    let filterTimer = null;
 
     const api = {
         getModels: () => fetch('/api/evaluations/models').then(res => {
@@ -51,7 +57,7 @@ document.addEventListener('DOMContentLoaded', () => {
             if (!res.ok) throw new Error(`HTTP ${res.status}: ${res.statusText}`);
             return res.json();
         }),
-        getEvaluations: () => fetch('/api/evaluations').then(res => {
+        getEvaluations: (params) => fetch(`/api/evaluations?${new URLSearchParams(params)}`).then(res => {
             if (!res.ok) throw new Error(`HTTP ${res.status}: ${res.statusText}`);
             return res.json();
         }),
@@ -184,10 +190,10 @@ document.addEventListener('DOMContentLoaded', () => {
             showLoadingState('scenarios');
             showLoadingState('evaluations');
 
-            const [models, scenarios, evaluations] = await Promise.all([
+            const [models, scenarios] = await Promise.all([
                 api.getModels(),
                 api.getScenarios(),
-                api.getEvaluations(),
+                loadEvaluations(),
             ]);
 
             // Load models
@@ -200,9 +206,6 @@ document.addEventListener('DOMContentLoaded', () => {
             scenarios.forEach(scenario => scenarioSelector.appendChild(createCard(scenario, 'scenario')));
             hideLoadingState('scenarios');
 
-            // Load evaluations
-            allEvaluations = evaluations;
-            applyFiltersAndSort();
             hideLoadingState('evaluations');
 
             // Load saved selections
@@ -226,51 +229,42 @@ document.addEventListener('DOMContentLoaded', () => {
         evaluationError.classList.add('hidden');
     }
 
-    function filterEvaluations(evaluations, filterText) {
-        if (!filterText) return evaluations;
-
-        const filter = filterText.toLowerCase();
-        return evaluations.filter(e =>
-            e.model.name.toLowerCase().includes(filter) ||
-            e.scenario.title.toLowerCase().includes(filter) ||
-            e.scenario.category?.toLowerCase().includes(filter)
-        );
+    function evaluationQuery(offset, limit) {
+        const params = { limit, offset, sort: currentSort };
+        if (currentFilter) params.search = currentFilter;
+        return params;
     }
 
-    function sortEvaluations(evaluations, sortBy) {
-        const sorted = [...evaluations];
-
-        switch (sortBy) {
-            case 'timestamp-desc':
-                return sorted.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-            case 'timestamp-asc':
-                return sorted.sort((a, b) => new Date(a.timestamp) - new Date(b.timestamp));
-            case 'trust-score-desc':
-                return sorted.sort((a, b) => b.metrics.trust_score - a.metrics.trust_score);
-            case 'trust-score-asc':
-                return sorted.sort((a, b) => a.metrics.trust_score - b.metrics.trust_score);
-            case 'model-asc':
-                return sorted.sort((a, b) => a.model.name.localeCompare(b.model.name));
-            case 'scenario-asc':
-                return sorted.sort((a, b) => a.scenario.title.localeCompare(b.scenario.title));
-            default:
-                return sorted;
+    async function loadEvaluations() {
+        let page = await api.getEvaluations(evaluationQuery(currentOffset, PAGE_SIZE));
+        if (page.evaluations.length === 0 && currentOffset > 0 && page.total > 0) {
+            // The page emptied (e.g. a narrower filter); show the last one
+            currentOffset = Math.floor((page.total - 1) / PAGE_SIZE) * PAGE_SIZE;
+            page = await api.getEvaluations(evaluationQuery(currentOffset, PAGE_SIZE));
         }
-    }
-
-    function applyFiltersAndSort() {
-        // Filter evaluations
-        filteredEvaluations = filterEvaluations(allEvaluations, currentFilter);
+        pageEvaluations = page.evaluations;
+        totalEvaluations = page.total;
 
-        // Sort evaluations
-        filteredEvaluations = sortEvaluations(filteredEvaluations, currentSort);
-
-        // Render results
-        renderPastEvaluations(filteredEvaluations);
+        renderPastEvaluations(pageEvaluations);
+        updatePagination();
+    }
 
-        // Update results count
+    function updatePagination() {
         if (resultsCount) {
-            resultsCount.textContent = filteredEvaluations.length;
+            const first = totalEvaluations ? currentOffset + 1 : 0;
+            const last = currentOffset + pageEvaluations.length;
+            resultsCount.textContent = `${first}–${last} of ${totalEvaluations}`;
+        }
+        if (prevPageBtn) prevPageBtn.disabled = currentOffset === 0;
+        if (nextPageBtn) nextPageBtn.disabled = currentOffset + PAGE_SIZE >= totalEvaluations;
+    }
+
+    async function showPage(offset) {
+        currentOffset = Math.max(0, offset);
+        try {
+            await loadEvaluations();
+        } catch (error) {
+            showError('Failed to load evaluations: ' + error.message);
         }
     }
 
@@ -278,7 +272,7 @@ document.addEventListener('DOMContentLoaded', () => {
         pastEvaluationsTable.innerHTML = '';
 
         if (evaluations.length === 0) {
-            if (allEvaluations.length === 0) {
+            if (!currentFilter) {
                 // No evaluations at all - show empty state
                 pastEvaluationsTable.parentElement.classList.add('hidden');
                 evaluationsEmpty.classList.remove('hidden');
@@ -449,8 +443,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
             // Refresh evaluations data
             try {
-                allEvaluations = await api.getEvaluations();
-                applyFiltersAndSort();
+                await loadEvaluations();
             } catch (error) {
                 console.error('Failed to refresh evaluations:', error);
             }
@@ -486,16 +479,29 @@ document.addEventListener('DOMContentLoaded', () => {
         newEvaluationModal.classList.remove('flex');
     }
 
-    function exportToCSV() {
-        if (filteredEvaluations.length === 0) {
+    async function exportToCSV() {
+        if (totalEvaluations === 0) {
             alert('No evaluations to export');
             return;
         }
 
+        // Export every matching result, not just the page on screen
+        const evaluations = [];
+        try {
+            while (evaluations.length < totalEvaluations) {
+                const page = await api.getEvaluations(evaluationQuery(evaluations.length, EXPORT_PAGE_SIZE));
+                if (page.evaluations.length === 0) break;
+                evaluations.push(...page.evaluations);
+            }
+        } catch (error) {
+            showError('Failed to export evaluations: ' + error.message);
+            return;
+        }
+
         const headers = ['Model', 'Scenario', 'Trust Score (%)', 'Issues Found', 'Issues Fixed', 'Timestamp'];
         const csvContent = [
             headers.join(','),
-            ...filteredEvaluations.map(e => [
+            ...evaluations.map(e => [
                 `"${e.model.name}"`,
                 `"${e.scenario.title}"`,
                 (e.metrics.trust_score * 100).toFixed(1),
@@ -519,8 +525,7 @@ document.addEventListener('DOMContentLoaded', () => {
     async function refreshEvaluations() {
         try {
             showLoadingState('evaluations');
-            allEvaluations = await api.getEvaluations();
-            applyFiltersAndSort();
+            await loadEvaluations();
             hideLoadingState('evaluations');
         } catch (error) {
             hideLoadingState('evaluations');
@@ -533,18 +538,29 @@ document.addEventListener('DOMContentLoaded', () => {
     // Filter and sort event handlers
     if (filterInput) {
         filterInput.addEventListener('input', (e) => {
-            currentFilter = e.target.value;
-            applyFiltersAndSort();
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(() => {
+                currentFilter = e.target.value.trim();
+                showPage(0);
+            }, 300);
         });
     }
 
     if (sortSelect) {
         sortSelect.addEventListener('change', (e) => {
             currentSort = e.target.value;
-            applyFiltersAndSort();
+            showPage(0);
         });
     }
 
+    if (prevPageBtn) {
+        prevPageBtn.addEventListener('click', () => showPage(currentOffset - PAGE_SIZE));
+    }
+
+    if (nextPageBtn) {
+        nextPageBtn.addEventListener('click', () => showPage(currentOffset + PAGE_SIZE));
+    }
+
     // Export and refresh handlers
     if (exportCsvBtn) {
         exportCsvBtn.addEventListener('click', exportToCSV);
@@ -0,0 +1,128 @@
+"""Shared Jinja environments for prompts and PSADT scripts.
+
+Each template set has one ``Environment`` per process, shared by
+``ScriptRenderer`` and the pipeline services. An environment keeps every
+compiled ``Template`` (``cache_size=-1``) and writes their bytecode to
+``TEMPLATE_BYTECODE_CACHE_DIR`` (``create_app`` defaults it to
+``jinja_cache`` in the app's instance folder; empty to disable), so a new
+process loads bytecode instead of compiling.
+``precompile_templates`` loads all templates at startup, after which
+renders never compile.
+
+Templates are only checked for changes on disk while auto-reload is on,
+which ``create_app`` enables for debug apps.
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+logger = logging.getLogger(__name__)
+
+# None until configured: no bytecode cache outside an app
+TEMPLATE_BYTECODE_CACHE_DIR: Optional[str] = os.environ.get(
+    "TEMPLATE_BYTECODE_CACHE_DIR"
+)
+
+_APP_DIR = Path(__file__).parent
+
+# Prompts sent to the LLM by the pipeline services
+PROMPTS = "prompts"
+# Prompts rendered by ScriptRenderer, with block whitespace trimmed
+RENDER_PROMPTS = "render_prompts"
+# PSADT script templates
+PSADT = "psadt"
+
+_TEMPLATE_SETS: Dict[str, Tuple[Path, Dict[str, Any]]] = {
+    PROMPTS: (_APP_DIR / "prompts", {}),
+    RENDER_PROMPTS: (
+        _APP_DIR / "prompts",
+        {"trim_blocks": True, "lstrip_blocks": True},
+    ),
+    PSADT: (_APP_DIR / "templates", {"trim_blocks": True, "lstrip_blocks": True}),
+}
+
+_environments: Dict[str, Environment] = {}
+_auto_reload = False
+_lock = threading.Lock()
+
+
+def _bytecode_cache(name: str) -> Optional[FileSystemBytecodeCache]:
+    """Bytecode cache of a template set, or None if disabled or unwritable.
+
+    Each set has its own directory: cached bytecode is keyed by template
+    name and source, not by the environment options it was compiled with.
+    """
+    if not TEMPLATE_BYTECODE_CACHE_DIR:
+        return None
+    directory = Path(TEMPLATE_BYTECODE_CACHE_DIR) / name
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled: {e}")
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
+def get_environment(name: str) -> Environment:
+    """Shared environment of a template set.
+
+    Args:
+        name: ``PROMPTS``, ``RENDER_PROMPTS`` or ``PSADT``
+    """
+    env = _environments.get(name)
+    if env is not None:
+        return env
+    with _lock:
+        if name not in _environments:
+            directory, options = _TEMPLATE_SETS[name]
+            _environments[name] = Environment(
+                loader=FileSystemLoader(str(directory)),
+                bytecode_cache=_bytecode_cache(name),
+                auto_reload=_auto_reload,
+                cache_size=-1,
+                **options,
+            )
+        return _environments[name]
+
+
+def get_template(name: str, template_name: str) -> Template:
+    """Compiled template from a template set."""
+    return get_environment(name).get_template(template_name)
+
+
+def set_bytecode_cache_dir(directory: Optional[str]) -> None:
+    """Write template bytecode below ``directory``; None or empty disables it."""
+    global TEMPLATE_BYTECODE_CACHE_DIR
+    with _lock:
+        TEMPLATE_BYTECODE_CACHE_DIR = directory
+        for name, env in _environments.items():
+            env.bytecode_cache = _bytecode_cache(name)
+
+
+def set_auto_reload(enabled: bool) -> None:
+    """Check templates for changes on disk before each use, for debugging."""
+    global _auto_reload
+    with _lock:
+        _auto_reload = enabled
+        for env in _environments.values():
+            env.auto_reload = enabled
+
+
+def precompile_templates() -> int:
+    """Load every ``.j2`` template of every set.
+
+    Returns:
+        Number of templates loaded
+    """
+    count = 0
+    for name in _TEMPLATE_SETS:
+        env = get_environment(name)
+        for template_name in env.list_templates(extensions=["j2"]):
+            env.get_template(template_name)
+            count += 1
+    return count
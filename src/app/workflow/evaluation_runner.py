@@ -0,0 +1,330 @@
+"""Concurrent evaluation of model × scenario matrices.
+
+An evaluation run is a matrix of cells, one per model and scenario. Cells
+run on a worker pool of ``EVALUATION_WORKERS`` threads shared by all runs,
+with at most ``EVALUATION_MODEL_CONCURRENCY`` cells of one model running
+at once (``max_concurrency`` in models.json overrides it per model), so
+each provider's rate limits hold however many runs are in flight. The
+dispatcher serves models round-robin, so a large row of one model does not
+hold up the others. The cells of a run share one set of pipeline services
+(``PipelineResources``), so the cmdlet definitions are parsed once and RAG
+responses are reused.
+
+Each run's state is written to ``instance/evaluations/runs/<run_id>.json``
+as cells change state. A run can be cancelled, which lets running cells
+finish and skips the rest, and a cancelled or interrupted run can be
+resumed: only the cells without a result are run again. Every finished
+cell is emitted as ``evaluation_progress`` and the end of the run as
+``evaluation_complete``.
+"""
+
+import json
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from flask import Flask
+
+from ..services.evaluation_service import EvaluationService, PipelineResources
+
+EVALUATION_WORKERS = int(os.environ.get("EVALUATION_WORKERS", 4))
+EVALUATION_MODEL_CONCURRENCY = int(os.environ.get("EVALUATION_MODEL_CONCURRENCY", 2))
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+# Run status of a run left "running" by a process that is gone
+INTERRUPTED = "interrupted"
+
+Emit = Callable[[str, Dict[str, Any]], None]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_active: Dict[str, "EvaluationRun"] = {}
+_lock = threading.Lock()
+
+# Cells running per model and in total, across all runs
+_capacity = threading.Condition()
+_busy: Dict[str, int] = {}
+_busy_total = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=EVALUATION_WORKERS, thread_name_prefix="evaluation"
+            )
+        return _executor
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def runs_dir(instance_dir: Path) -> Path:
+    """Directory holding the state files of evaluation runs."""
+    return instance_dir / "evaluations" / "runs"
+
+
+class EvaluationRun:
+    """State of one evaluation matrix, persisted as JSON."""
+
+    def __init__(self, instance_dir: Path, state: Dict[str, Any]):
+        self.instance_dir = instance_dir
+        self.state = state
+        self.id: str = state["id"]
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._next_model = 0
+
+    @classmethod
+    def create(
+        cls, instance_dir: Path, model_ids: List[str], scenario_ids: List[str]
+    ) -> "EvaluationRun":
+        """New run with a pending cell per model and scenario."""
+        run = cls(
+            instance_dir,
+            {
+                "id": str(uuid.uuid4()),
+                "created_at": _now(),
+                "status": PENDING,
+                "cells": [
+                    {
+                        "model_id": model_id,
+                        "scenario_id": scenario_id,
+                        "status": PENDING,
+                        "result_id": None,
+                        "error": None,
+                    }
+                    for model_id in model_ids
+                    for scenario_id in scenario_ids
+                ],
+            },
+        )
+        run.save()
+        return run
+
+    @classmethod
+    def load(cls, instance_dir: Path, run_id: str) -> Optional["EvaluationRun"]:
+        """The live run with this id, or its last saved state."""
+        with _lock:
+            if run_id in _active:
+                return _active[run_id]
+        try:
+            path = runs_dir(instance_dir) / f"{uuid.UUID(run_id)}.json"
+            state = json.loads(path.read_text())
+        except (ValueError, FileNotFoundError, json.JSONDecodeError):
+            return None
+        if state.get("status") in (PENDING, RUNNING):
+            state["status"] = INTERRUPTED
+        return cls(instance_dir, state)
+
+    @property
+    def active(self) -> bool:
+        with _lock:
+            return _active.get(self.id) is self
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the run's state with per-status cell counts."""
+        with self._lock:
+            state: Dict[str, Any] = json.loads(json.dumps(self.state))
+        counts: Dict[str, int] = {}
+        for cell in state["cells"]:
+            counts[cell["status"]] = counts.get(cell["status"], 0) + 1
+        state["counts"] = counts
+        return state
+
+    def save(self) -> None:
+        """Write the state file atomically."""
+        directory = runs_dir(self.instance_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f"{self.id}.json.tmp"
+        with self._lock:
+            tmp.write_text(json.dumps(self.state, indent=2))
+            os.replace(tmp, directory / f"{self.id}.json")
+
+    def start(self) -> bool:
+        """Mark the run active and reset its unfinished cells to pending.
+
+        Returns:
+            False if the run is already active
+        """
+        with _lock:
+            if self.id in _active:
+                return False
+            _active[self.id] = self
+        self._cancelled.clear()
+        with self._lock:
+            for cell in self.state["cells"]:
+                if cell["status"] != COMPLETED:
+                    cell.update(status=PENDING, error=None)
+            self.state["status"] = RUNNING
+        self.save()
+        return True
+
+    def cancel(self) -> None:
+        """Stop dispatching cells; running cells finish."""
+        self._cancelled.set()
+        with _capacity:
+            _capacity.notify_all()
+
+    def execute(self, app: Flask, emit: Emit) -> None:
+        """Run the pending cells and wait for them; call after ``start``.
+
+        Args:
+            app: Application whose context the pipeline runs in
+            emit: Socket.IO emit function receiving event name and payload
+        """
+        error: Optional[str] = None
+        try:
+            with app.app_context():
+                service = EvaluationService(Path(app.instance_path))
+                caps = {
+                    m.id: m.max_concurrency or EVALUATION_MODEL_CONCURRENCY
+                    for m in service.get_models()
+                }
+                resources = PipelineResources()
+            self._dispatch(app, emit, service, resources, caps)
+            status = CANCELLED if self._cancelled.is_set() else COMPLETED
+        except Exception as e:
+            status, error = FAILED, str(e)
+        finally:
+            with _lock:
+                _active.pop(self.id, None)
+
+        with self._lock:
+            for cell in self.state["cells"]:
+                if cell["status"] == PENDING:
+                    cell.update(status=CANCELLED if error is None else FAILED)
+                    cell["error"] = error
+            self.state["status"] = status
+            self.state["error"] = error
+        self.save()
+        counts = self.snapshot()["counts"]
+        emit(
+            "evaluation_complete",
+            {
+                "message": (
+                    "All evaluations completed."
+                    if status == COMPLETED
+                    else f"Evaluation run {status}."
+                ),
+                "run_id": self.id,
+                "status": status,
+                "counts": counts,
+            },
+        )
+
+    def _dispatch(
+        self,
+        app: Flask,
+        emit: Emit,
+        service: EvaluationService,
+        resources: PipelineResources,
+        caps: Dict[str, int],
+    ) -> None:
+        queues: Dict[str, Deque[Dict[str, Any]]] = {}
+        for cell in self.state["cells"]:
+            if cell["status"] == PENDING:
+                queues.setdefault(cell["model_id"], deque()).append(cell)
+
+        futures: List["Future[None]"] = []
+        executor = _get_executor()
+        while queues:
+            cell = self._claim(queues, caps)
+            if cell is None:
+                break
+            futures.append(
+                executor.submit(self._run_cell, app, emit, service, resources, cell)
+            )
+        wait(futures)
+
+    def _claim(
+        self, queues: Dict[str, Deque[Dict[str, Any]]], caps: Dict[str, int]
+    ) -> Optional[Dict[str, Any]]:
+        """Wait for a free slot and take the next cell, round-robin by model."""
+        global _busy_total
+        with _capacity:
+            while not self._cancelled.is_set():
+                models = list(queues)
+                for i in range(len(models)):
+                    index = (self._next_model + i) % len(models)
+                    model_id = models[index]
+                    cap = caps.get(model_id, EVALUATION_MODEL_CONCURRENCY)
+                    if (
+                        _busy_total < EVALUATION_WORKERS
+                        and _busy.get(model_id, 0) < cap
+                    ):
+                        cell = queues[model_id].popleft()
+                        if not queues[model_id]:
+                            del queues[model_id]
+                        self._next_model = index + 1
+                        _busy[model_id] = _busy.get(model_id, 0) + 1
+                        _busy_total += 1
+                        with self._lock:
+                            cell["status"] = RUNNING
+                        return cell
+                _capacity.wait(timeout=1.0)
+        return None
+
+    def _run_cell(
+        self,
+        app: Flask,
+        emit: Emit,
+        service: EvaluationService,
+        resources: PipelineResources,
+        cell: Dict[str, Any],
+    ) -> None:
+        global _busy_total
+        model_id, scenario_id = cell["model_id"], cell["scenario_id"]
+        result = None
+        error = None
+        try:
+            self.save()
+            with app.app_context():
+                result = service.run_evaluation(model_id, scenario_id, resources)
+            if result is None:
+                error = f"Evaluation failed for {model_id} on {scenario_id}"
+        except Exception as e:
+            error = str(e)
+        finally:
+            with _capacity:
+                _busy[model_id] -= 1
+                _busy_total -= 1
+                _capacity.notify_all()
+
+        with self._lock:
+            cell["status"] = FAILED if error else COMPLETED
+            cell["result_id"] = result.id if result else None
+            cell["error"] = error
+            cells = self.state["cells"]
+            done = sum(1 for c in cells if c["status"] in (COMPLETED, FAILED))
+        self.save()
+
+        payload: Dict[str, Any] = {
+            "run_id": self.id,
+            "model_id": model_id,
+            "scenario_id": scenario_id,
+            "cell_status": cell["status"],
+            "progress": done / len(cells) * 100,
+        }
+        if result:
+            payload["status"] = (
+                f"Completed {done}/{len(cells)}: "
+                f"{result.model.name} on {result.scenario.title}"
+            )
+            payload["result"] = result.model_dump()
+        else:
+            payload["status"] = (
+                f"Failed {done}/{len(cells)}: {model_id} on {scenario_id}"
+            )
+            payload["error"] = error
+        emit("evaluation_progress", payload)
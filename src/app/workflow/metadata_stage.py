@@ -0,0 +1,343 @@
+"""Background metadata extraction stage.
+
+Uploads only store the installer and record the package. Metadata is
+then either copied from the extraction cache right away (a single
+indexed lookup) or extracted on a small worker pool, so large MSIs and
+external tool timeouts never hold up the upload request. The script
+generator calls ``wait_for_metadata`` only when a stage actually needs
+the metadata.
+
+The stage's progress is recorded as ``Package.metadata_status``, so a
+generator in another worker process, or one resumed after a restart,
+also waits for an extraction it did not queue itself.
+"""
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+
+from ..database import (
+    create_metadata,
+    get_cached_metadata,
+    get_database_service,
+    get_metadata_status,
+    set_metadata_status,
+    store_cached_metadata,
+    to_uuid,
+)
+from ..metadata_extractor import EXTRACTOR_VERSION, MetadataExtractor
+from ..metrics import QUEUE_DEPTH, WORKERS_BUSY, WORKERS_TOTAL, record_cache
+from ..models import Metadata, Package
+from ..package_logger import get_package_logger
+from .progress import pct
+
+METADATA_WORKERS = int(os.environ.get("METADATA_WORKERS", 2))
+# Upper bound on how long the generator waits for a queued extraction
+METADATA_WAIT_TIMEOUT = float(os.environ.get("METADATA_WAIT_TIMEOUT", 600))
+# Seconds between status checks for extractions queued by another process
+METADATA_POLL_INTERVAL = 0.5
+# Packages whose metadata stage may still be outstanding
+UNFINISHED_STATUSES = ("uploading", "processing")
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_pending: Dict[str, "Future[None]"] = {}
+_lock = Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=METADATA_WORKERS, thread_name_prefix="metadata"
+            )
+        return _executor
+
+
+def start_metadata_stage(
+    package_id: str,
+    file_path: str,
+    file_hash: str,
+    filename: str,
+    publish: Optional[ProgressCallback] = None,
+) -> bool:
+    """Attach metadata to a freshly uploaded package.
+
+    Cached results are stored immediately; otherwise extraction is queued
+    on the worker pool and this returns without waiting for it.
+
+    Args:
+        package_id: UUID string of the package
+        file_path: Path of the stored installer
+        file_hash: SHA-256 of the installer
+        filename: Original upload filename
+        publish: Optional callback receiving progress events
+
+    Returns:
+        True if the metadata came from the cache, False if it was queued
+    """
+    package_logger = get_package_logger(package_id)
+
+    cached = get_cached_metadata(file_hash, EXTRACTOR_VERSION)
+    record_cache("metadata", cached is not None)
+    if cached is not None:
+        package_logger.log_step(
+            "METADATA_EXTRACTION",
+            "Metadata loaded from cache",
+            data={"file_hash": file_hash, "extractor_version": EXTRACTOR_VERSION},
+        )
+        _store_metadata(package_id, *cached)
+        return True
+
+    set_metadata_status(package_id, "queued")
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    executor = _get_executor()
+    with _lock:
+        future = executor.submit(
+            _run_extraction, app, package_id, file_path, file_hash, filename, publish
+        )
+        _pending[package_id] = future
+    future.add_done_callback(lambda _: _forget(package_id, future))
+    package_logger.log_step(
+        "METADATA_EXTRACTION",
+        "Metadata extraction queued",
+        data={"file_hash": file_hash},
+    )
+    return False
+
+
+def resume_metadata_stage() -> int:
+    """Re-queue metadata extractions lost with a previous process.
+
+    The extraction work only lives in the process that queued it, even
+    though its status is stored. Unfinished packages whose
+    installer is still stored but that have no metadata are handed to
+    ``start_metadata_stage`` again, which stores cached results right away
+    and queues the rest. Call on startup, before pending jobs resume.
+
+    Returns:
+        Number of packages whose metadata stage was restarted
+    """
+    session = get_database_service().get_session()
+    try:
+        rows = (
+            session.query(
+                Package.id, Package.file_path, Package.file_hash, Package.filename
+            )
+            .outerjoin(Metadata, Metadata.package_id == Package.id)
+            .filter(
+                Metadata.id.is_(None),
+                Package.status.in_(UNFINISHED_STATUSES),
+            )
+            .all()
+        )
+    finally:
+        session.close()
+
+    resumed = 0
+    for package_id, file_path, file_hash, filename in rows:
+        if (
+            not file_hash
+            or not os.path.isfile(file_path)
+            or _local_future(str(package_id)) is not None
+        ):
+            continue
+        get_package_logger(str(package_id)).log_step(
+            "METADATA_EXTRACTION", "Resuming metadata stage after restart"
+        )
+        start_metadata_stage(str(package_id), file_path, file_hash, filename)
+        resumed += 1
+    return resumed
+
+
+def _pool_stats() -> Tuple[int, int]:
+    """(queued, running) extractions."""
+    with _lock:
+        futures = list(_pending.values())
+    running = sum(1 for f in futures if f.running())
+    queued = sum(1 for f in futures if not f.running() and not f.done())
+    return queued, running
+
+
+QUEUE_DEPTH.labels("metadata").set_function(lambda: _pool_stats()[0])
+WORKERS_BUSY.labels("metadata").set_function(lambda: _pool_stats()[1])
+WORKERS_TOTAL.labels("metadata").set(METADATA_WORKERS)
+
+
+def _forget(package_id: str, future: "Future[None]") -> None:
+    with _lock:
+        if _pending.get(package_id) is future:
+            del _pending[package_id]
+
+
+def _local_future(package_id: str) -> "Optional[Future[None]]":
+    """The package's extraction if it was queued by this process."""
+    with _lock:
+        return _pending.get(package_id)
+
+
+def metadata_pending(package_id: str) -> bool:
+    """Whether a queued extraction for the package has not finished yet."""
+    future = _local_future(package_id)
+    if future is not None:
+        return not future.done()
+    return get_metadata_status(package_id) == "queued"
+
+
+def wait_for_metadata(
+    package_id: str, timeout: Optional[float] = METADATA_WAIT_TIMEOUT
+) -> bool:
+    """Block until the package's queued extraction (if any) has finished.
+
+    Args:
+        package_id: UUID string of the package
+        timeout: Seconds to wait before giving up
+
+    Returns:
+        True if the metadata stage is finished (or was never queued),
+        False if the wait timed out
+    """
+    future = _local_future(package_id)
+    if future is None:
+        # Queued by another process: follow the stored status
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while get_metadata_status(package_id) == "queued":
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(METADATA_POLL_INTERVAL)
+        return True
+    try:
+        future.result(timeout=timeout)
+    except TimeoutError:
+        return False
+    except Exception:
+        # Failures are logged by the stage itself; the package carries on
+        # with whatever metadata could be stored.
+        pass
+    return True
+
+
+def _set_stage(package_id: str, step: str) -> None:
+    session = get_database_service().get_session()
+    try:
+        package = session.get(Package, to_uuid(package_id))
+        if package and package.status == "uploading":
+            package.current_step = step
+            package.progress_pct = pct(step)
+            session.commit()
+    finally:
+        session.close()
+
+
+def _run_extraction(
+    app: Flask,
+    package_id: str,
+    file_path: str,
+    file_hash: str,
+    filename: str,
+    publish: Optional[ProgressCallback],
+) -> None:
+    """Worker body: extract, cache and store metadata for one package."""
+    with app.app_context():
+        package_logger = get_package_logger(package_id)
+        package_logger.log_step("METADATA_EXTRACTION", "Starting metadata extraction")
+        if publish:
+            publish(
+                {
+                    "status": "processing",
+                    "progress": pct("upload"),
+                    "current_step": "Metadata Extraction",
+                    "stage_number": 0,
+                }
+            )
+
+        try:
+            metadata_dict, executable_names = (
+                MetadataExtractor().extract_with_executables(file_path)
+            )
+            store_cached_metadata(
+                file_hash, EXTRACTOR_VERSION, metadata_dict, executable_names
+            )
+            package_logger.log_step(
+                "METADATA_EXTRACTION",
+                "Metadata extraction completed successfully",
+                data={"metadata_keys": list(metadata_dict.keys())},
+            )
+        except Exception as e:
+            package_logger.log_error(
+                "METADATA_EXTRACTION",
+                e,
+                {
+                    "file_path": str(file_path),
+                    "file_type": filename.split(".")[-1].lower() if filename else "",
+                },
+            )
+            # Continue with empty metadata dict
+            metadata_dict, executable_names = {}, []
+            package_logger.log_step(
+                "METADATA_EXTRACTION",
+                "Continuing with empty metadata due to extraction failure",
+            )
+
+        _store_metadata(package_id, metadata_dict, executable_names)
+        _set_stage(package_id, "extract_metadata")
+        if publish:
+            publish(
+                {
+                    "status": "processing",
+                    "progress": pct("extract_metadata"),
+                    "current_step": "Metadata Extracted",
+                    "stage_number": 0,
+                }
+            )
+
+
+def _store_metadata(
+    package_id: str, metadata_dict: Dict[str, Any], executable_names: List[str]
+) -> None:
+    """Map metadata to PSADT variables and store it for the package."""
+    package_logger = get_package_logger(package_id)
+
+    # Get PSADT variables with fallback mapping
+    package_logger.log_step("PSADT_MAPPING", "Starting PSADT variable mapping")
+    try:
+        psadt_vars = MetadataExtractor().get_psadt_variables(metadata_dict)
+        package_logger.log_step(
+            "PSADT_MAPPING",
+            "PSADT mapping completed",
+            data={"psadt_vars": psadt_vars, "executable_names": executable_names},
+        )
+    except Exception as e:
+        package_logger.log_error("PSADT_MAPPING", e)
+        psadt_vars = {}
+
+    # Store metadata in database
+    package_logger.log_step("DATABASE_STORAGE", "Storing metadata in database")
+    try:
+        create_metadata(
+            package_id=package_id,
+            product_name=psadt_vars.get("appName") or metadata_dict.get("product_name"),
+            version=psadt_vars.get("appVersion") or metadata_dict.get("version"),
+            publisher=psadt_vars.get("appVendor") or metadata_dict.get("publisher"),
+            install_date=metadata_dict.get("install_date"),
+            uninstall_string=metadata_dict.get("uninstall_string"),
+            estimated_size=metadata_dict.get("estimated_size"),
+            product_code=psadt_vars.get("productCode")
+            or metadata_dict.get("product_code"),
+            upgrade_code=metadata_dict.get("upgrade_code"),
+            language=metadata_dict.get("language"),
+            architecture=metadata_dict.get("architecture"),
+            executable_names=executable_names,
+            installer_details=metadata_dict.get("installer_details"),
+        )
+        package_logger.log_step("DATABASE_STORAGE", "Metadata stored successfully")
+    except Exception as e:
+        package_logger.log_error("DATABASE_STORAGE", e)
+        # Nothing will be stored; stop generators waiting for it
+        set_metadata_status(package_id, "failed")
@@ -0,0 +1,195 @@
+"""Monotonic timings of pipeline stages and their sub-steps.
+
+``generate_script`` runs under a ``PipelineTimer`` held in a context
+variable and times each stage with ``timer.stage(name)``. Services wrap
+their expensive sub-steps (LLM calls, MCP calls, regex validation) in
+``substep(name)``; the duration is added to the stage running at the
+time. Outside a pipeline run ``substep`` does nothing. Database
+commits are timed through SQLAlchemy session events, which also feed the
+commit latency histogram for every commit, inside a run or not. Sub-steps
+and commits are traced as spans as well (see ``tracing``).
+
+Benchmarks run the pipeline under ``profile_stages()``, which also
+measures the CPU time and memory allocated per stage.
+
+The resulting ``timer.as_dict()`` is stored under
+``pipeline_metadata["timings"]``::
+
+    {
+        "total": 12.4,
+        "stages": {"instruction_processing": 2.1, ...},
+        "substeps": {"instruction_processing": {"llm_call": {"count": 1, "seconds": 1.9}}},
+    }
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..metrics import DB_COMMIT_SECONDS
+from .tracing import record_span, span
+
+LLM_CALL = "llm_call"
+MCP_CALL = "mcp_call"
+DB_COMMIT = "db_commit"
+REGEX_VALIDATION = "regex_validation"
+
+# Sub-steps outside any stage, e.g. commits between stages
+_NO_STAGE = "other"
+
+_current: ContextVar[Optional["PipelineTimer"]] = ContextVar(
+    "pipeline_timer", default=None
+)
+_profile: ContextVar[Optional["StageProfile"]] = ContextVar(
+    "stage_profile", default=None
+)
+
+
+class StageProfile:
+    """Wall time, CPU time and allocations per stage, for benchmarks.
+
+    CPU time is that of the whole process, as MCP calls run on their own
+    threads, so profile one pipeline run at a time. Allocations are only
+    measured while ``tracemalloc`` is tracing: ``peak_bytes`` is the
+    highest traced memory during the stage above its level at the start.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Profile a block as (another occurrence of) a stage."""
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(
+                name, {"wall": 0.0, "cpu": 0.0, "peak_bytes": 0}
+            )
+            entry["wall"] += time.perf_counter() - wall
+            entry["cpu"] += time.process_time() - cpu
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                entry["peak_bytes"] = max(entry["peak_bytes"], peak - before)
+
+
+class PipelineTimer:
+    """Stage and sub-step durations of one pipeline run."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self.substeps: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._stage: Optional[str] = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage; sub-steps inside it are attributed to it."""
+        outer, self._stage = self._stage, name
+        profile = _profile.get()
+        started = time.perf_counter()
+        try:
+            with profile.measure(name) if profile else nullcontext():
+                yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (
+                time.perf_counter() - started
+            )
+            self._stage = outer
+
+    def record(self, substep: str, seconds: float) -> None:
+        """Add one occurrence of a sub-step to the current stage."""
+        steps = self.substeps.setdefault(self._stage or _NO_STAGE, {})
+        entry = steps.setdefault(substep, {"count": 0, "seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-serializable timings, rounded to milliseconds."""
+        return {
+            "total": round(time.perf_counter() - self._started, 3),
+            "stages": {name: round(s, 3) for name, s in self.stages.items()},
+            "substeps": {
+                stage: {
+                    name: {"count": e["count"], "seconds": round(e["seconds"], 3)}
+                    for name, e in steps.items()
+                }
+                for stage, steps in self.substeps.items()
+            },
+        }
+
+
+def current_timer() -> Optional[PipelineTimer]:
+    """Timer of the pipeline run in progress on this thread, if any."""
+    return _current.get()
+
+
+@contextmanager
+def pipeline_timer() -> Iterator[PipelineTimer]:
+    """Make a new timer current for the duration of a pipeline run."""
+    timer = PipelineTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def profile_stages() -> Iterator[StageProfile]:
+    """Profile the stages of the pipeline runs in the block."""
+    profile = StageProfile()
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+@contextmanager
+def substep(name: str, **attributes: Any) -> Iterator[None]:
+    """Time a sub-step of the current pipeline stage.
+
+    Args:
+        name: Sub-step name, e.g. ``LLM_CALL``
+        **attributes: Attributes of the sub-step's span, e.g. the model
+    """
+    with span(name, **attributes):
+        timer = _current.get()
+        if timer is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            timer.record(name, time.perf_counter() - started)
+
+
+@event.listens_for(Session, "before_commit")
+def _commit_started(session: Session) -> None:
+    session.info["commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session: Session) -> None:
+    started = session.info.pop("commit_started", None)
+    if started is None:
+        return
+    ended = time.perf_counter()
+    seconds = ended - started
+    DB_COMMIT_SECONDS.observe(seconds)
+    record_span(DB_COMMIT, started, ended)
+    timer = _current.get()
+    if timer is not None:
+        timer.record(DB_COMMIT, seconds)
@@ -0,0 +1,256 @@
+"""Span trees of pipeline runs.
+
+``generate_script`` runs inside ``pipeline_trace``, which makes a new
+``Trace`` current in a context variable together with the innermost open
+span. ``span(name)`` opens a child of that span: stages, LLM and MCP calls
+(through ``timings.substep``) and database commits (recorded after the
+fact from session events) become nested spans. Outside a traced run
+``span`` does nothing.
+
+A finished trace is stored as the package's ``trace`` artifact::
+
+    {
+        "trace_id": "5b8efff798038103d269b633813fc60c",
+        "start_unix_nano": 1700000000000000000,
+        "spans": [
+            {"id": "eee19b7ec3c1b174", "parent": None, "name": "generate_script",
+             "start": 0.0, "duration": 12.4, "status": "ok", "attributes": {}},
+            ...
+        ],
+        "dropped": 0,
+    }
+
+``start`` and ``duration`` are seconds on the monotonic clock relative to
+the start of the trace. ``to_otlp`` converts a stored trace to OTLP/JSON
+for any OpenTelemetry backend and ``waterfall`` lays it out for the
+detail page.
+"""
+
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Spans kept per run; further spans are only counted
+TRACE_MAX_SPANS = int(os.environ.get("TRACE_MAX_SPANS", 1000))
+
+SERVICE_NAME = "aipackager"
+_SCOPE_NAME = "aipackager.pipeline"
+_SPAN_KIND_INTERNAL = 1
+_STATUS_CODE_ERROR = 2
+
+# (trace, id of the innermost open span)
+_active: ContextVar[Optional[Tuple["Trace", Optional[str]]]] = ContextVar(
+    "pipeline_trace", default=None
+)
+
+
+class Trace:
+    """Finished spans of one pipeline run."""
+
+    def __init__(self) -> None:
+        self.trace_id = secrets.token_hex(16)
+        self.start_unix_nano = time.time_ns()
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, record: Dict[str, Any], started: float, ended: float) -> None:
+        """Store a finished span given its ``perf_counter`` start and end."""
+        record["start"] = round(started - self._origin, 6)
+        record["duration"] = round(ended - started, 6)
+        with self._lock:
+            if len(self.spans) >= TRACE_MAX_SPANS:
+                self.dropped += 1
+            else:
+                self.spans.append(record)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-serializable trace, spans ordered by start."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start"])
+        return {
+            "trace_id": self.trace_id,
+            "start_unix_nano": self.start_unix_nano,
+            "spans": spans,
+            "dropped": self.dropped,
+        }
+
+
+def _new_span(
+    name: str, parent: Optional[str], attributes: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "id": secrets.token_hex(8),
+        "parent": parent,
+        "name": name,
+        "status": "ok",
+        "attributes": {k: v for k, v in attributes.items() if v is not None},
+    }
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Dict[str, Any]]]:
+    """Trace a block as a child of the current span.
+
+    Args:
+        name: Span name, e.g. a stage or sub-step name
+        **attributes: Scalar attributes; None values are left out
+
+    Yields:
+        The span record, whose ``attributes`` may still be extended, or
+        None outside a traced run
+    """
+    active = _active.get()
+    if active is None:
+        yield None
+        return
+    trace, parent = active
+    record = _new_span(name, parent, attributes)
+    token = _active.set((trace, record["id"]))
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        ended = time.perf_counter()
+        _active.reset(token)
+        trace.add(record, started, ended)
+
+
+def record_span(name: str, started: float, ended: float, **attributes: Any) -> None:
+    """Add an already finished span under the current span, if tracing."""
+    active = _active.get()
+    if active is not None:
+        trace, parent = active
+        trace.add(_new_span(name, parent, attributes), started, ended)
+
+
+@contextmanager
+def pipeline_trace(name: str, **attributes: Any) -> Iterator[Trace]:
+    """Make a new trace current, with a root span covering the block."""
+    trace = Trace()
+    token = _active.set((trace, None))
+    try:
+        with span(name, **attributes):
+            yield trace
+    finally:
+        _active.reset(token)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+def to_otlp(
+    trace: Dict[str, Any], resource: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Convert a stored trace to an OTLP/JSON ``ExportTraceServiceRequest``.
+
+    Args:
+        trace: Trace as stored in the package's ``trace`` artifact
+        resource: Extra resource attributes, e.g. the package id
+
+    Returns:
+        Body accepted by an OTLP/HTTP collector at ``/v1/traces``
+    """
+    origin = trace["start_unix_nano"]
+
+    def nanos(seconds: float) -> str:
+        return str(origin + int(seconds * 1_000_000_000))
+
+    spans = []
+    for s in trace.get("spans", []):
+        status: Dict[str, Any] = {}
+        if s.get("status") == "error":
+            status = {"code": _STATUS_CODE_ERROR, "message": s.get("error", "")}
+        spans.append(
+            {
+                "traceId": trace["trace_id"],
+                "spanId": s["id"],
+                "parentSpanId": s["parent"] or "",
+                "name": s["name"],
+                "kind": _SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": nanos(s["start"]),
+                "endTimeUnixNano": nanos(s["start"] + s["duration"]),
+                "attributes": _otlp_attributes(s.get("attributes", {})),
+                "status": status,
+            }
+        )
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes(
+                        {"service.name": SERVICE_NAME, **(resource or {})}
+                    )
+                },
+                "scopeSpans": [{"scope": {"name": _SCOPE_NAME}, "spans": spans}],
+            }
+        ]
+    }
+
+
+def waterfall(trace: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Lay out a stored trace as rows of a waterfall chart.
+
+    Args:
+        trace: Trace as stored in the package's ``trace`` artifact, or None
+
+    Returns:
+        One row per span in depth-first order, with its ``depth`` and the
+        bar's ``offset`` and ``width`` as percentages of the whole run
+    """
+    spans = (trace or {}).get("spans") or []
+    if not spans:
+        return []
+    ids = {s["id"] for s in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for s in spans:
+        parent = s["parent"] if s["parent"] in ids else None
+        children.setdefault(parent, []).append(s)
+    total = max(s["start"] + s["duration"] for s in spans) or 1.0
+
+    rows: List[Dict[str, Any]] = []
+    stack = [(s, 0) for s in sorted(children.get(None, []), key=_start, reverse=True)]
+    while stack:
+        s, depth = stack.pop()
+        rows.append(
+            {
+                "name": s["name"],
+                "depth": depth,
+                "start": s["start"],
+                "duration": s["duration"],
+                "status": s.get("status", "ok"),
+                "error": s.get("error"),
+                "attributes": s.get("attributes", {}),
+                "offset": round(100 * s["start"] / total, 2),
+                "width": max(round(100 * s["duration"] / total, 2), 0.2),
+            }
+        )
+        stack.extend(
+            (child, depth + 1)
+            for child in sorted(children.get(s["id"], []), key=_start, reverse=True)
+        )
+    return rows
+
+
+def _start(span_record: Dict[str, Any]) -> float:
+    return float(span_record["start"])
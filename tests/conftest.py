@@ -5,10 +5,23 @@ import pytest
 from src.app import create_app
 
 
+@pytest.fixture(autouse=True, scope="session")
+def template_bytecode_cache(tmp_path_factory):
+    """Keep compiled template caches out of the source tree."""
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setenv(
+        "TEMPLATE_BYTECODE_CACHE_DIR", str(tmp_path_factory.mktemp("jinja_cache"))
+    )
+    yield
+    monkeypatch.undo()
+
+
 @pytest.fixture
-def app():
+def app(tmp_path):
     """Create and configure a new app instance for each test."""
-    app = create_app({"TESTING": True})
+    app = create_app(
+        {"TESTING": True, "DATABASE_URL": f"sqlite:///{tmp_path / 'test.db'}"}
+    )
     yield app
 
 
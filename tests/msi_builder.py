@@ -0,0 +1,358 @@
+"""Build minimal MSI databases for tests.
+
+Writes a version 3 OLE compound file containing a SummaryInformation
+property set, a string pool and the requested tables, laid out the way
+Windows Installer stores them. Small streams go to the mini stream, large
+ones to regular sectors, so both read paths are exercised.
+"""
+
+import math
+import struct
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+SECTOR = 512
+MINI_SECTOR = 64
+MINI_CUTOFF = 4096
+ENDOFCHAIN = 0xFFFFFFFE
+FREESECT = 0xFFFFFFFF
+FATSECT = 0xFFFFFFFD
+NOSTREAM = 0xFFFFFFFF
+
+MIME = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz._"
+
+# Column type codes as stored in _Columns
+VALID = 0x0100
+LOCALIZABLE = 0x0200
+STRING = 0x0800
+NULLABLE = 0x1000
+KEY = 0x2000
+
+
+def string_column(width: int = 72, key: bool = False, nullable: bool = False) -> int:
+    return VALID | STRING | width | (KEY if key else 0) | (NULLABLE if nullable else 0)
+
+
+def int_column(width: int = 2, nullable: bool = True) -> int:
+    return VALID | width | (NULLABLE if nullable else 0)
+
+
+BINARY_COLUMN = VALID | STRING | NULLABLE
+
+Table = Tuple[Sequence[Tuple[str, int]], Sequence[Sequence[Any]]]
+
+PROPERTY_COLUMNS = [
+    ("Property", string_column(72, key=True)),
+    ("Value", string_column(0) | LOCALIZABLE),
+]
+SHORTCUT_COLUMNS = [
+    ("Shortcut", string_column(72, key=True)),
+    ("Directory_", string_column(72)),
+    ("Name", string_column(128)),
+    ("Component_", string_column(72)),
+    ("Target", string_column(72)),
+    ("Arguments", string_column(255, nullable=True)),
+    ("IconIndex", int_column(2)),
+]
+ICON_COLUMNS = [("Name", string_column(72, key=True)), ("Data", BINARY_COLUMN)]
+FILE_COLUMNS = [
+    ("File", string_column(72, key=True)),
+    ("Component_", string_column(72)),
+    ("FileName", string_column(255) | LOCALIZABLE),
+    ("FileSize", int_column(4, nullable=False)),
+    ("Version", string_column(72, nullable=True)),
+    ("Language", string_column(20, nullable=True)),
+    ("Attributes", int_column(2)),
+    ("Sequence", int_column(2, nullable=False)),
+]
+COMPONENT_COLUMNS = [
+    ("Component", string_column(72, key=True)),
+    ("ComponentId", string_column(38, nullable=True)),
+    ("Directory_", string_column(72)),
+    ("Attributes", int_column(2, nullable=False)),
+    ("Condition", string_column(255, nullable=True)),
+    ("KeyPath", string_column(72, nullable=True)),
+]
+DIRECTORY_COLUMNS = [
+    ("Directory", string_column(72, key=True)),
+    ("Directory_Parent", string_column(72, nullable=True)),
+    ("DefaultDir", string_column(255) | LOCALIZABLE),
+]
+REGISTRY_COLUMNS = [
+    ("Registry", string_column(72, key=True)),
+    ("Root", int_column(2, nullable=False)),
+    ("Key", string_column(255) | LOCALIZABLE),
+    ("Name", string_column(255, nullable=True) | LOCALIZABLE),
+    ("Value", string_column(0, nullable=True) | LOCALIZABLE),
+    ("Component_", string_column(72)),
+]
+SERVICE_INSTALL_COLUMNS = [
+    ("ServiceInstall", string_column(72, key=True)),
+    ("Name", string_column(255)),
+    ("DisplayName", string_column(255, nullable=True) | LOCALIZABLE),
+    ("ServiceType", int_column(4, nullable=False)),
+    ("StartType", int_column(4, nullable=False)),
+    ("ErrorControl", int_column(4, nullable=False)),
+    ("LoadOrderGroup", string_column(255, nullable=True)),
+    ("Dependencies", string_column(255, nullable=True)),
+    ("StartName", string_column(255, nullable=True)),
+    ("Password", string_column(255, nullable=True)),
+    ("Arguments", string_column(255, nullable=True)),
+    ("Component_", string_column(72)),
+    ("Description", string_column(255, nullable=True) | LOCALIZABLE),
+]
+CUSTOM_ACTION_COLUMNS = [
+    ("Action", string_column(72, key=True)),
+    ("Type", int_column(2, nullable=False)),
+    ("Source", string_column(72, nullable=True)),
+    ("Target", string_column(255, nullable=True)),
+]
+
+
+def encode_stream_name(name: str, table: bool = True) -> str:
+    """Compress a stream name the way Windows Installer does."""
+    chars = [chr(0x4840)] if table else []
+    index = 0
+    while index < len(name):
+        first = MIME.find(name[index])
+        if first < 0:
+            chars.append(name[index])
+            index += 1
+            continue
+        second = MIME.find(name[index + 1]) if index + 1 < len(name) else -1
+        if second >= 0:
+            chars.append(chr(0x3800 + (second << 6) + first))
+            index += 2
+        else:
+            chars.append(chr(0x4800 + first))
+            index += 1
+    return "".join(chars)
+
+
+def _summary_stream(summary: Dict[int, Any], codepage: int) -> bytes:
+    properties = {1: codepage, **summary}
+    values = b""
+    offsets = []
+    header_size = 8 + 8 * len(properties)
+    for pid, value in properties.items():
+        offsets.append((pid, header_size + len(values)))
+        if pid == 1:
+            encoded = struct.pack("<IH2x", 2, value)
+        elif isinstance(value, int):
+            encoded = struct.pack("<Ii", 3, value)
+        else:
+            text = value.encode(f"cp{codepage}") + b"\x00"
+            encoded = struct.pack("<II", 30, len(text)) + text
+            encoded += b"\x00" * (-len(encoded) % 4)
+        values += encoded
+    section = struct.pack("<II", header_size + len(values), len(properties))
+    section += b"".join(struct.pack("<II", pid, offset) for pid, offset in offsets)
+    section += values
+
+    fmtid = uuid.UUID("F29F85E0-4FF9-1068-AB91-08002B27B3D9").bytes_le
+    header = struct.pack("<HHI16sI", 0xFFFE, 0, 0x00020006, b"\x00" * 16, 1)
+    return header + fmtid + struct.pack("<I", 48) + section
+
+
+class _StringPool:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.refs: List[int] = []
+        self.values: List[str] = []
+
+    def ref(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        if value not in self.ids:
+            self.values.append(value)
+            self.refs.append(0)
+            self.ids[value] = len(self.values)
+        self.refs[self.ids[value] - 1] += 1
+        return self.ids[value]
+
+    def streams(self, codepage: int) -> Tuple[bytes, bytes]:
+        pool = struct.pack("<HH", codepage & 0xFFFF, codepage >> 16)
+        data = b""
+        for value, refs in zip(self.values, self.refs):
+            encoded = value.encode(f"cp{codepage}")
+            pool += struct.pack("<HH", len(encoded), refs)
+            data += encoded
+        return pool, data
+
+
+def _column_major(
+    columns: Sequence[Tuple[str, int]],
+    rows: Sequence[Sequence[Any]],
+    strings: _StringPool,
+) -> bytes:
+    data = b""
+    for index, (_, column_type) in enumerate(columns):
+        for row in rows:
+            value = row[index]
+            if column_type & STRING:
+                data += struct.pack(
+                    "<H", 0 if column_type == BINARY_COLUMN else strings.ref(value)
+                )
+            elif column_type & 0xFF == 4:
+                raw = 0 if value is None else (value + 0x80000000) & 0xFFFFFFFF
+                data += struct.pack("<I", raw)
+            else:
+                data += struct.pack("<H", 0 if value is None else value + 0x8000)
+    return data
+
+
+def _compound_file(streams: Dict[str, bytes]) -> bytes:
+    names = list(streams)
+
+    # Small streams live in the mini stream
+    mini_stream = b""
+    minifat: List[int] = []
+    starts: Dict[str, int] = {}
+    for name in names:
+        data = streams[name]
+        if len(data) >= MINI_CUTOFF:
+            continue
+        count = math.ceil(len(data) / MINI_SECTOR)
+        if not count:
+            starts[name] = ENDOFCHAIN
+            continue
+        first = len(minifat)
+        minifat.extend(first + i + 1 for i in range(count - 1))
+        minifat.append(ENDOFCHAIN)
+        mini_stream += data.ljust(count * MINI_SECTOR, b"\x00")
+        starts[name] = first
+
+    def sectors_for(size: int) -> int:
+        return math.ceil(size / SECTOR)
+
+    dir_sectors = sectors_for((len(names) + 1) * 128)
+    minifat_bytes = b"".join(struct.pack("<I", v) for v in minifat)
+    regions = [
+        ("dir", dir_sectors),
+        ("minifat", sectors_for(len(minifat_bytes))),
+        ("ministream", sectors_for(len(mini_stream))),
+    ] + [
+        (name, sectors_for(len(streams[name])))
+        for name in names
+        if len(streams[name]) >= MINI_CUTOFF
+    ]
+    content = sum(count for _, count in regions)
+    fat_sectors = 1
+    while fat_sectors * (SECTOR // 4) < content + fat_sectors:
+        fat_sectors += 1
+
+    fat = [FATSECT] * fat_sectors
+    region_start: Dict[str, int] = {}
+    for name, count in regions:
+        first = len(fat)
+        region_start[name] = first if count else ENDOFCHAIN
+        fat.extend(first + i + 1 for i in range(count - 1))
+        if count:
+            fat.append(ENDOFCHAIN)
+    fat.extend([FREESECT] * (fat_sectors * (SECTOR // 4) - len(fat)))
+
+    def entry(
+        name: str, kind: int, start: int, size: int, child: int, right: int
+    ) -> bytes:
+        encoded = name.encode("utf-16-le")
+        return (
+            encoded.ljust(64, b"\x00")
+            + struct.pack("<HBB", len(encoded) + 2, kind, 1)
+            + struct.pack("<III", NOSTREAM, right, child)
+            + b"\x00" * 36
+            + struct.pack("<IQ", start, size)
+        )
+
+    directory = entry(
+        "Root Entry",
+        5,
+        region_start["ministream"],
+        len(mini_stream),
+        1 if names else NOSTREAM,
+        NOSTREAM,
+    )
+    for index, name in enumerate(names):
+        data = streams[name]
+        start = starts[name] if len(data) < MINI_CUTOFF else region_start[name]
+        right = index + 2 if index + 1 < len(names) else NOSTREAM
+        directory += entry(name, 2, start, len(data), NOSTREAM, right)
+
+    region_data = {
+        "dir": directory,
+        "minifat": minifat_bytes,
+        "ministream": mini_stream,
+        **{name: streams[name] for name in names},
+    }
+    body = b"".join(struct.pack("<I", v) for v in fat)
+    for name, count in regions:
+        body += region_data[name].ljust(count * SECTOR, b"\x00")
+
+    difat = list(range(fat_sectors)) + [FREESECT] * (109 - fat_sectors)
+    header = (
+        b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+        + b"\x00" * 16
+        + struct.pack(
+            "<HHHHH6xIII", 0x3E, 3, 0xFFFE, 9, 6, 0, fat_sectors, region_start["dir"]
+        )
+        + struct.pack(
+            "<IIIIII",
+            0,
+            MINI_CUTOFF,
+            region_start["minifat"],
+            sectors_for(len(minifat_bytes)),
+            ENDOFCHAIN,
+            0,
+        )
+        + struct.pack("<109I", *difat)
+    )
+    return header + body
+
+
+def build_msi(
+    path: Any,
+    properties: Dict[str, str],
+    summary: Optional[Dict[int, Any]] = None,
+    tables: Optional[Dict[str, Table]] = None,
+    codepage: int = 1252,
+) -> None:
+    """Write an MSI database to ``path``.
+
+    Args:
+        path: Destination file path
+        properties: Property table contents
+        summary: SummaryInformation values keyed by property ID
+        tables: Extra tables as name -> (columns, rows)
+        codepage: Code page of the string pool and summary strings
+    """
+    all_tables: Dict[str, Table] = {
+        "Property": (PROPERTY_COLUMNS, list(properties.items())),
+        **(tables or {}),
+    }
+    strings = _StringPool()
+    streams: Dict[str, bytes] = {}
+    column_rows = []
+    for name, (columns, rows) in all_tables.items():
+        for number, (column_name, column_type) in enumerate(columns, start=1):
+            column_rows.append((name, number, column_name, column_type))
+        streams[encode_stream_name(name)] = _column_major(columns, rows, strings)
+
+    streams[encode_stream_name("_Tables")] = b"".join(
+        struct.pack("<H", strings.ref(name)) for name in all_tables
+    )
+    columns_meta = [
+        ("Table", string_column(64)),
+        ("Number", int_column(2, nullable=False)),
+        ("Name", string_column(64)),
+        ("Type", int_column(2, nullable=False)),
+    ]
+    streams[encode_stream_name("_Columns")] = _column_major(
+        columns_meta, column_rows, strings
+    )
+
+    pool, data = strings.streams(codepage)
+    streams[encode_stream_name("_StringPool")] = pool
+    streams[encode_stream_name("_StringData")] = data
+    streams["\x05SummaryInformation"] = _summary_stream(summary or {}, codepage)
+
+    with open(path, "wb") as f:
+        f.write(_compound_file(streams))
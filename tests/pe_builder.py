@@ -0,0 +1,220 @@
+"""Build minimal PE images for tests.
+
+Writes a PE32+ (or PE32) header, a ``.text`` section and, when version
+strings or a manifest are given, a ``.rsrc`` section with a three-level
+resource tree. Anything passed as ``overlay`` is appended after the last
+section, the way installer bootstrappers carry their payloads; build_cab()
+encodes cabinet containers for such overlays.
+"""
+
+import struct
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+FILE_ALIGNMENT = 0x200
+SECTION_ALIGNMENT = 0x1000
+PE_OFFSET = 0x80
+
+RT_VERSION = 16
+RT_MANIFEST = 24
+
+
+def _pad(data: bytes, alignment: int) -> bytes:
+    return data + b"\x00" * (-len(data) % alignment)
+
+
+def _version_block(
+    key: str, value: bytes = b"", text: bool = False, children: Sequence[bytes] = ()
+) -> bytes:
+    buf = _pad(b"\x00" * 6 + (key + "\x00").encode("utf-16-le"), 4) + value
+    if children:
+        buf = _pad(buf, 4) + b"".join(_pad(child, 4) for child in children)
+    value_length = len(value) // 2 if text else len(value)
+    return struct.pack("<HHH", len(buf), value_length, int(text)) + buf[6:]
+
+
+def version_resource(
+    strings: Dict[str, str],
+    product_version: Tuple[int, int, int, int] = (1, 0, 0, 0),
+    language: str = "040904b0",
+) -> bytes:
+    """Encode a VS_VERSIONINFO resource with one StringFileInfo table."""
+    ms = (product_version[0] << 16) | product_version[1]
+    ls = (product_version[2] << 16) | product_version[3]
+    fixed = struct.pack(
+        "<13I", 0xFEEF04BD, 0x10000, ms, ls, ms, ls, 0x3F, 0, 4, 1, 0, 0, 0
+    )
+    entries = [
+        _version_block(name, (value + "\x00").encode("utf-16-le"), text=True)
+        for name, value in strings.items()
+    ]
+    table = _version_block(language, text=True, children=entries)
+    string_info = _version_block("StringFileInfo", text=True, children=[table])
+    var_info = _version_block(
+        "VarFileInfo",
+        text=True,
+        children=[_version_block("Translation", struct.pack("<HH", 0x0409, 1200))],
+    )
+    return _version_block("VS_VERSION_INFO", fixed, children=[string_info, var_info])
+
+
+def _resource_section(resources: Dict[int, bytes], rva: int) -> bytes:
+    """Lay out type -> name (1) -> language (1033) directories and data."""
+    types = sorted(resources)
+    root_size = 16 + 8 * len(types)
+    # One name directory and one language directory per type, 24 bytes each
+    name_dirs = root_size
+    lang_dirs = name_dirs + 24 * len(types)
+    data_entries = lang_dirs + 24 * len(types)
+    data_start = data_entries + 16 * len(types)
+
+    out = bytearray(struct.pack("<IIHHHH", 0, 0, 0, 0, 0, len(types)))
+    for i, type_id in enumerate(types):
+        out += struct.pack("<II", type_id, 0x80000000 | (name_dirs + 24 * i))
+    for i in range(len(types)):
+        out += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1)
+        out += struct.pack("<II", 1, 0x80000000 | (lang_dirs + 24 * i))
+    for i in range(len(types)):
+        out += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, 1)
+        out += struct.pack("<II", 1033, data_entries + 16 * i)
+
+    payloads = bytearray()
+    for type_id in types:
+        offset = data_start + len(payloads)
+        out += struct.pack("<IIII", rva + offset, len(resources[type_id]), 0, 0)
+        payloads += _pad(resources[type_id], 4)
+    return bytes(out + payloads)
+
+
+def build_pe(
+    path,
+    machine: int = 0x8664,
+    version_strings: Optional[Dict[str, str]] = None,
+    product_version: Tuple[int, int, int, int] = (1, 0, 0, 0),
+    manifest: Optional[str] = None,
+    overlay: bytes = b"",
+    pe32_plus: bool = True,
+    extra_sections: Sequence[Tuple[str, bytes]] = (),
+) -> None:
+    """Write a minimal PE image to ``path``.
+
+    Args:
+        path: Destination file
+        machine: COFF machine type
+        version_strings: StringFileInfo values; adds an RT_VERSION resource
+        product_version: VS_FIXEDFILEINFO product/file version
+        manifest: Manifest XML; adds an RT_MANIFEST resource
+        overlay: Bytes appended after the last section
+        pe32_plus: Write a PE32+ optional header instead of PE32
+        extra_sections: Additional ``(name, data)`` sections
+    """
+    resources = {}
+    if version_strings is not None:
+        resources[RT_VERSION] = version_resource(version_strings, product_version)
+    if manifest is not None:
+        resources[RT_MANIFEST] = manifest.encode("utf-8")
+
+    sections: List[Tuple[str, bytes]] = [(".text", b"\xc3" * 16)]
+    sections.extend(extra_sections)
+    rsrc_index = None
+    if resources:
+        rsrc_index = len(sections)
+        sections.append((".rsrc", b""))
+
+    optional_size = 240 if pe32_plus else 224
+    headers_size = PE_OFFSET + 24 + optional_size + 40 * len(sections)
+    raw_offset = headers_size + (-headers_size % FILE_ALIGNMENT)
+
+    rsrc_rva = SECTION_ALIGNMENT * (1 + rsrc_index) if rsrc_index is not None else 0
+    if rsrc_index is not None:
+        sections[rsrc_index] = (".rsrc", _resource_section(resources, rsrc_rva))
+
+    table = bytearray()
+    body = bytearray()
+    for i, (name, data) in enumerate(sections):
+        raw = _pad(data, FILE_ALIGNMENT)
+        table += struct.pack(
+            "<8sIIII16x",
+            name.encode("latin-1"),
+            len(data),
+            SECTION_ALIGNMENT * (1 + i),
+            len(raw),
+            raw_offset + len(body),
+        )
+        body += raw
+
+    optional = bytearray(optional_size)
+    struct.pack_into("<H", optional, 0, 0x20B if pe32_plus else 0x10B)
+    count_offset = 108 if pe32_plus else 92
+    struct.pack_into("<I", optional, count_offset, 16)
+    if rsrc_index is not None:
+        struct.pack_into(
+            "<II",
+            optional,
+            count_offset + 4 + 8 * 2,
+            rsrc_rva,
+            len(sections[rsrc_index][1]),
+        )
+
+    header = bytearray(PE_OFFSET)
+    header[:2] = b"MZ"
+    struct.pack_into("<I", header, 60, PE_OFFSET)
+    header += b"PE\x00\x00"
+    header += struct.pack(
+        "<HHIIIHH", machine, len(sections), 0, 0, 0, optional_size, 0x0102
+    )
+    header += optional + table
+
+    with open(path, "wb") as f:
+        f.write(_pad(bytes(header), FILE_ALIGNMENT))
+        f.write(body)
+        f.write(overlay)
+
+
+def build_cab(files: Sequence[Tuple[str, bytes]], mszip: bool = True) -> bytes:
+    """Encode a single-folder cabinet, MSZIP-compressed in 32 KiB blocks."""
+    stream = b"".join(data for _name, data in files)
+    blocks = []
+    history = b""
+    for start in range(0, max(len(stream), 1), 0x8000):
+        chunk = stream[start : start + 0x8000]
+        if mszip:
+            if history:
+                deflater = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=history)
+            else:
+                deflater = zlib.compressobj(9, zlib.DEFLATED, -15)
+            packed = b"CK" + deflater.compress(chunk) + deflater.flush()
+            history = (history + chunk)[-0x8000:]
+        else:
+            packed = chunk
+        blocks.append(struct.pack("<IHH", 0, len(packed), len(chunk)) + packed)
+
+    file_table = bytearray()
+    folder_offset = 0
+    for name, data in files:
+        file_table += struct.pack("<IIHHHH", len(data), folder_offset, 0, 0, 0, 0x20)
+        file_table += name.encode("ascii") + b"\x00"
+        folder_offset += len(data)
+
+    header_size = 36 + 8
+    files_offset = header_size
+    data_offset = files_offset + len(file_table)
+    total = data_offset + sum(len(b) for b in blocks)
+    header = struct.pack(
+        "<4sIIIIIBBHHHHH",
+        b"MSCF",
+        0,
+        total,
+        0,
+        files_offset,
+        0,
+        3,
+        1,
+        1,
+        len(files),
+        0,
+        0,
+        0,
+    )
+    folder = struct.pack("<IHH", data_offset, len(blocks), 1 if mszip else 0)
+    return header + folder + bytes(file_table) + b"".join(blocks)
@@ -0,0 +1,146 @@
+"""Tests for LLM/MCP record and replay and the offline benchmark."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from openai import OpenAI
+from openai.resources.chat.completions import Completions
+from openai.types.chat import ChatCompletion
+
+from src.app import benchmark
+from src.app.replay import (
+    RECORD,
+    REPLAY,
+    ReplayMissError,
+    chat_completion,
+    use_cassette,
+)
+from src.app.schemas import PSADTScript
+from src.app.services.mcp_service import MCPService
+
+
+def _completion(model, content):
+    return ChatCompletion.model_validate(
+        {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+        }
+    )
+
+
+def _live_completion(self, **request):
+    """Chat completions standing in for OpenAI while recording."""
+    if "PSADTScript" in request["messages"][0]["content"]:
+        script = {f: [] for f in PSADTScript.model_fields if f.endswith("tasks")}
+        script["installation_tasks"] = ["Start-ADTMsiProcess -Action 'Install'"]
+        content = json.dumps(script)
+    else:
+        content = json.dumps(
+            {
+                "structured_instructions": {"action": "install"},
+                "predicted_cmdlets": ["Start-ADTMsiProcess"],
+                "confidence_score": 0.9,
+            }
+        )
+    return _completion(request["model"], content)
+
+
+def test_cassette_replays_by_request_then_in_order(tmp_path):
+    """Changed requests fall back to recording order unless strict."""
+    path = tmp_path / "cassette.json"
+    client = OpenAI(api_key="test")
+    with (
+        patch.object(Completions, "create", _live_completion),
+        use_cassette(path, RECORD),
+    ):
+        for prompt in ("first", "second"):
+            chat_completion(
+                client,
+                model="gpt-test",
+                messages=[{"role": "user", "content": prompt}],
+            )
+
+    with use_cassette(path, REPLAY) as cassette:
+        second = chat_completion(
+            client, model="gpt-test", messages=[{"role": "user", "content": "second"}]
+        )
+        edited = chat_completion(
+            client, model="gpt-test", messages=[{"role": "user", "content": "edited"}]
+        )
+        with pytest.raises(ReplayMissError):
+            chat_completion(client, model="gpt-test", messages=[])
+    assert isinstance(second, ChatCompletion)
+    assert edited.model == "gpt-test"
+    assert cassette.fallbacks == 1
+
+    with use_cassette(path, REPLAY, strict=True), pytest.raises(ReplayMissError):
+        chat_completion(client, model="gpt-test", messages=[])
+
+
+def test_benchmark_records_then_replays_offline(tmp_path, monkeypatch, capsys):
+    """Recorded scenarios are replayed without calling OpenAI or MCP."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    fixtures = tmp_path / "cassettes"
+    args = ["--fixtures", str(fixtures), "--scenario", "scenario-1"]
+
+    with (
+        patch.object(Completions, "create", _live_completion),
+        patch.object(
+            MCPService,
+            "_call_mcp_server",
+            AsyncMock(return_value="Start-ADTMsiProcess"),
+        ),
+    ):
+        assert benchmark.main([*args, "--record", "--no-allocations"]) == 0
+
+    cassette = json.loads((fixtures / "gpt-4o-mini" / "scenario-1.json").read_text())
+    kinds = [i["kind"] for i in cassette["interactions"]]
+    assert kinds.count("llm") == 2
+    assert "mcp" in kinds
+
+    report = tmp_path / "report.json"
+    with (
+        patch.object(Completions, "create", side_effect=AssertionError),
+        patch.object(
+            MCPService, "_call_mcp_server", AsyncMock(side_effect=AssertionError)
+        ),
+    ):
+        assert benchmark.main([*args, "--repeat", "2", "--json", str(report)]) == 0
+        summary = json.loads(report.read_text())
+        baseline = {
+            stage: {**entry, "cpu_median": entry["cpu_median"] / 10}
+            for stage, entry in summary.items()
+        }
+        (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+        status = benchmark.main(
+            [*args, "--repeat", "1", "--baseline", str(tmp_path / "baseline.json")]
+        )
+
+    assert summary[benchmark.TOTAL]["runs"] == 2
+    assert summary["instruction_processing"]["peak_bytes"] > 0
+    assert summary["script_generation"]["cpu_median"] > 0
+    assert status == 1
+    assert "Regression in total" in capsys.readouterr().err
+
+
+def test_benchmark_without_cassettes_asks_to_record(tmp_path, monkeypatch, capsys):
+    """Replaying a scenario that was never recorded exits with status 2."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    args = ["--fixtures", str(tmp_path), "--scenario", "scenario-1"]
+
+    with patch.object(Completions, "create", side_effect=AssertionError):
+        assert benchmark.main(args) == 2
+
+    err = capsys.readouterr().err
+    assert str(tmp_path / "gpt-4o-mini" / "scenario-1.json") in err
+    assert "--record" in err
@@ -0,0 +1,211 @@
+"""Tests for chunked, resumable installer uploads."""
+
+import hashlib
+import os
+import tracemalloc
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+
+from src.app import chunked_upload, create_app
+from src.app.chunked_upload import MIN_CHUNK_SIZE, ChunkError, write_chunk
+from src.app.database import (
+    claim_upload_completion,
+    finish_upload_completion,
+    get_database_service,
+    get_package,
+)
+from src.app.models import UploadBlob, UploadSession
+from src.app.workflow.metadata_stage import wait_for_metadata
+
+CHUNK = MIN_CHUNK_SIZE
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a test client backed by a temporary instance directory."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'chunks.db'}"})
+    app.config["TESTING"] = True
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        get_database_service().create_tables()
+    return app.test_client()
+
+
+@pytest.fixture
+def content():
+    """Installer bytes spanning two full chunks and a short last one."""
+    return os.urandom(2 * CHUNK + 12345)
+
+
+def _start(client, content, filename="big.msi"):
+    response = client.post(
+        "/api/uploads",
+        json={"filename": filename, "size": len(content), "chunk_size": CHUNK},
+    )
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def _put(client, upload_id, content, index, checksum=True):
+    data = content[index * CHUNK : (index + 1) * CHUNK]
+    headers = {"Content-Type": "application/octet-stream"}
+    if checksum:
+        headers["X-Chunk-SHA256"] = hashlib.sha256(data).hexdigest()
+    return client.put(
+        f"/api/uploads/{upload_id}/chunks/{index}", data=data, headers=headers
+    )
+
+
+def _complete(client, upload_id, **form):
+    return client.post(f"/api/uploads/{upload_id}/complete", json=form)
+
+
+def test_chunked_upload_creates_package(client, content):
+    """Chunks sent out of order are reassembled and stored by content hash."""
+    upload = _start(client, content)
+    assert upload["chunk_count"] == 3
+
+    for index in (2, 0, 1):
+        assert _put(client, upload["upload_id"], content, index).status_code == 200
+
+    response = _complete(
+        client,
+        upload["upload_id"],
+        custom_instructions="silent",
+        sha256=hashlib.sha256(content).hexdigest(),
+    )
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["file_hash"] == hashlib.sha256(content).hexdigest()
+    with client.application.app_context():
+        assert wait_for_metadata(payload["package_id"], timeout=10)
+        package = get_package(payload["package_id"])
+        session = get_database_service().get_session()
+        try:
+            blob = session.get(UploadBlob, payload["file_hash"])
+            assert blob.size == len(content)
+            completed = session.get(UploadSession, UUID(upload["upload_id"]))
+            assert str(completed.package_id) == payload["package_id"]
+        finally:
+            session.close()
+
+    assert package.filename == "big.msi"
+    assert package.custom_instructions == "silent"
+    with open(package.file_path, "rb") as f:
+        assert f.read() == content
+    tmp_dir = os.path.join(client.application.instance_path, "uploads", "tmp")
+    assert os.listdir(tmp_dir) == []
+
+    # A repeated completion returns the same package instead of a new one
+    repeated = _complete(client, upload["upload_id"])
+    assert repeated.status_code == 200
+    assert repeated.get_json()["package_id"] == payload["package_id"]
+    assert repeated.get_json()["already_completed"] is True
+
+
+def test_concurrent_completion_is_claimed_once(client, content):
+    """A completion arriving while another runs is rejected."""
+    upload = _start(client, content)
+    for index in range(upload["chunk_count"]):
+        _put(client, upload["upload_id"], content, index)
+
+    with client.application.app_context():
+        assert claim_upload_completion(upload["upload_id"])
+    response = _complete(client, upload["upload_id"])
+    assert response.status_code == 409
+
+    # A released claim (e.g. after a failure) can be retried
+    with client.application.app_context():
+        finish_upload_completion(upload["upload_id"], None)
+    assert _complete(client, upload["upload_id"]).status_code == 200
+
+
+def test_interrupted_upload_resumes(client, content):
+    """After a restart only the missing chunks are sent again."""
+    upload = _start(client, content)
+    upload_id = upload["upload_id"]
+    _put(client, upload_id, content, 0)
+    _put(client, upload_id, content, 2)
+
+    incomplete = _complete(client, upload_id)
+    assert incomplete.status_code == 409
+    assert incomplete.get_json()["missing"] == [1]
+
+    # The in-memory running hash is lost when the server restarts
+    chunked_upload._hashes.clear()
+    status = client.get(f"/api/uploads/{upload_id}").get_json()
+    assert status["received"] == [0, 2]
+
+    _put(client, upload_id, content, 1)
+    response = _complete(client, upload_id)
+
+    assert response.status_code == 200
+    assert response.get_json()["file_hash"] == hashlib.sha256(content).hexdigest()
+
+
+def test_corrupt_chunk_is_rejected(client, content):
+    """A chunk failing its checksum is not recorded and can be re-sent."""
+    upload = _start(client, content)
+    upload_id = upload["upload_id"]
+
+    response = client.put(
+        f"/api/uploads/{upload_id}/chunks/0",
+        data=b"\x00" * CHUNK,
+        headers={"X-Chunk-SHA256": hashlib.sha256(content[:CHUNK]).hexdigest()},
+    )
+    assert response.status_code == 400
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["received"] == []
+
+    short = client.put(f"/api/uploads/{upload_id}/chunks/0", data=content[:100])
+    assert short.status_code == 400
+
+    assert _put(client, upload_id, content, 0).status_code == 200
+    assert client.get(f"/api/uploads/{upload_id}").get_json()["received"] == [0]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"filename": "setup.zip", "size": 10},
+        {"filename": "setup.exe", "size": 0},
+        {"filename": "setup.exe", "size": 10, "chunk_size": 1024},
+    ],
+)
+def test_invalid_upload_requests(client, body):
+    """Bad file types, empty files and tiny chunk sizes are refused."""
+    assert client.post("/api/uploads", json=body).status_code == 400
+
+
+def test_abort_removes_partial_file(client, content):
+    """Aborting deletes the session and its partial file."""
+    upload_id = _start(client, content)["upload_id"]
+    _put(client, upload_id, content, 0)
+    part = chunked_upload.part_path(upload_id, Path(client.application.instance_path))
+    assert os.path.exists(part)
+
+    assert client.delete(f"/api/uploads/{upload_id}").status_code == 200
+    assert not os.path.exists(part)
+    assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+
+
+def test_write_chunk_memory_is_bounded(tmp_path):
+    """Chunks are copied in fixed-size pieces, not read whole."""
+    source = tmp_path / "chunk.bin"
+    with open(source, "wb") as f:
+        f.write(os.urandom(1024) * 16 * 1024)  # 16 MiB
+
+    with open(source, "rb") as stream:
+        tracemalloc.start()
+        try:
+            digest = write_chunk(tmp_path / "out.part", 0, 16 * 1024 * 1024, stream)
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert digest == hashlib.sha256(source.read_bytes()).hexdigest()
+    assert peak < 3 * 1024 * 1024
+
+    with open(source, "rb") as stream, pytest.raises(ChunkError):
+        write_chunk(tmp_path / "out.part", 0, 1024, stream)
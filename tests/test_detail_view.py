@@ -0,0 +1,139 @@
+"""Tests for the materialized package detail view."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.app import create_app
+from src.app.database import create_metadata, create_package, get_database_service
+from src.app.detail_view import current_detail_view
+from src.app.models import Package
+from src.app.schemas import PSADTScript
+from src.app.script_renderer import ScriptRenderer
+from src.app.services.script_generator import PSADTGenerator
+
+
+def _script(task):
+    script = {f: [] for f in PSADTScript.model_fields if f.endswith("tasks")}
+    script["installation_tasks"] = [task]
+    return script
+
+
+@pytest.fixture
+def app(tmp_path):
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'detail.db'}"})
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        get_database_service().create_tables()
+    return app
+
+
+def _update(app, package_id, **fields):
+    with app.app_context():
+        session = get_database_service().get_session()
+        try:
+            package = session.get(Package, package_id)
+            for name, value in fields.items():
+                setattr(package, name, value)
+            session.commit()
+        finally:
+            session.close()
+
+
+def _stored_view(app, package_id):
+    with app.app_context():
+        session = get_database_service().get_session()
+        try:
+            return current_detail_view(session.get(Package, package_id))
+        finally:
+            session.close()
+
+
+def test_completed_package_is_rendered_once(app):
+    """The first view stores the rendered page data; later views only read."""
+    with app.app_context():
+        package_id = create_package(filename="app.msi", file_path="/tmp/app.msi").id
+    _update(
+        app,
+        package_id,
+        status="completed",
+        generated_script=_script("Start-ADTMsiProcess -Action 'Install'"),
+        rag_documentation=json.dumps({"results": []}),
+        pipeline_metadata={"timings": {"stages": {"script_generation": 1.5}}},
+    )
+    client = app.test_client()
+
+    first = client.get(f"/detail/{package_id}").get_data(as_text=True)
+    view = _stored_view(app, package_id)
+    assert "Start-ADTMsiProcess -Action 'Install'" in first
+    assert view["rag_documentation"] == {"results": []}
+    assert view["display_metrics"]["stage_times"]["stage_3_script_generation"] == 1.5
+
+    with patch.object(
+        ScriptRenderer, "render_psadt_script", side_effect=AssertionError
+    ):
+        assert client.get(f"/detail/{package_id}").get_data(as_text=True) == first
+
+    # Regenerated results make the stored view stale
+    _update(app, package_id, generated_script=_script("Start-ADTProcess"))
+    assert _stored_view(app, package_id) is None
+    assert "Start-ADTProcess" in client.get(f"/detail/{package_id}").get_data(
+        as_text=True
+    )
+    assert client.get("/detail/not-a-package").status_code == 404
+
+
+def test_unfinished_package_view_is_not_stored(app):
+    """Packages still in the pipeline are rendered per request."""
+    with app.app_context():
+        package_id = create_package(filename="app.msi", file_path="/tmp/app.msi").id
+    _update(app, package_id, generated_script=_script("Start-ADTMsiProcess"))
+
+    response = app.test_client().get(f"/detail/{package_id}")
+
+    assert "Start-ADTMsiProcess" in response.get_data(as_text=True)
+    assert _stored_view(app, package_id) is None
+
+
+def test_late_metadata_drops_the_view(app):
+    """Metadata stored after completion makes the view render it."""
+    with app.app_context():
+        package_id = create_package(filename="app.msi", file_path="/tmp/app.msi").id
+    _update(app, package_id, status="completed", generated_script=_script("Task"))
+    client = app.test_client()
+    client.get(f"/detail/{package_id}")
+    assert _stored_view(app, package_id) is not None
+
+    with app.app_context():
+        create_metadata(package_id, product_name="Contoso Tools", version="4.2.1")
+
+    assert _stored_view(app, package_id) is None
+    assert "Contoso Tools" in client.get(f"/detail/{package_id}").get_data(
+        as_text=True
+    )
+    assert _stored_view(app, package_id) is not None
+
+
+def test_regeneration_drops_the_view(app, monkeypatch):
+    """generate_script clears the stored view of the package it regenerates."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    with app.app_context():
+        package_id = create_package(filename="app.msi", file_path="/tmp/app.msi").id
+    _update(app, package_id, status="completed", generated_script=_script("Old-Task"))
+    app.test_client().get(f"/detail/{package_id}")
+    assert _stored_view(app, package_id) is not None
+
+    with app.app_context():
+        session = get_database_service().get_session()
+        try:
+            package = session.get(Package, package_id)
+            with patch.object(
+                PSADTGenerator,
+                "_run_stages",
+                return_value=PSADTScript(**_script("New-Task")),
+            ):
+                PSADTGenerator().generate_script("Install", package, session)
+            assert package.detail_view_hash is None
+        finally:
+            session.close()
@@ -0,0 +1,143 @@
+"""Tests for extracting MSIs wrapped inside EXE bootstrappers."""
+
+import os
+import struct
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+from src.app.embedded_payloads import extract_embedded_msi, find_embedded_payloads
+from src.app.metadata_extractor import MetadataExtractor
+from src.app.msi_reader import MsiDatabase
+from src.app.pe_reader import PeImage
+from tests.msi_builder import ICON_COLUMNS, build_msi
+from tests.pe_builder import build_cab, build_pe
+
+PROPERTIES = {
+    "ProductName": "Contoso Tools",
+    "ProductVersion": "4.2.1",
+    "Manufacturer": "Contoso Ltd.",
+    "ProductCode": "{6F1A6A2E-3F43-4C3F-9B44-0D6B2B9E1A10}",
+    "UpgradeCode": "{0E7A4D5B-6C39-47D1-8A31-5C2F0E9C9B21}",
+}
+
+
+def _msi_bytes(tmp_path, name="inner.msi", properties=None, padding=0):
+    path = tmp_path / name
+    props = dict(properties or PROPERTIES)
+    for i in range(padding):
+        props[f"PAD{i:05d}"] = f"{i:08x}" * 16
+    build_msi(
+        path,
+        props,
+        summary={2: "Installation Database", 7: "x64;1033"},
+        tables={"Icon": (ICON_COLUMNS, [("ContosoTools.exe", None)])},
+    )
+    return path.read_bytes()
+
+
+def test_burn_bundle_reads_inner_msi(tmp_path):
+    """The MSI inside a Burn container drives the EXE metadata."""
+    msi = _msi_bytes(tmp_path, padding=400)
+    assert len(msi) > 0x8000  # spans several MSZIP blocks
+    exe = tmp_path / "bundle.exe"
+    build_pe(
+        exe,
+        machine=0x014C,
+        version_strings={"ProductName": "Contoso Tools Setup"},
+        extra_sections=[(".wixburn", b"\x00" * 52)],
+        overlay=build_cab([("0", b"<BurnManifest/>"), ("a0", msi), ("a1", b"x" * 99)]),
+    )
+
+    metadata, executables = MetadataExtractor().extract_with_executables(str(exe))
+
+    assert metadata["product_name"] == "Contoso Tools"
+    assert metadata["product_code"] == PROPERTIES["ProductCode"]
+    assert metadata["architecture"] == "x64"
+    assert executables == ["contosotools.exe"]
+    details = metadata["installer_details"]
+    assert details["framework"]["framework"] == "wix_burn"
+    assert details["version_info"]["ProductName"] == "Contoso Tools Setup"
+    assert details["embedded_msi"]["container"] == "cab"
+    assert details["embedded_msi"]["name"] == "a0"
+    assert details["embedded_msi"]["size"] == len(msi)
+
+
+def test_raw_msi_in_overlay(tmp_path):
+    """An MSI appended after other overlay data is found and sized from its FAT."""
+    msi = _msi_bytes(tmp_path)
+    exe = tmp_path / "setup.exe"
+    build_pe(exe, overlay=b"\x01" * 3000 + msi + b"\x02" * 700)
+
+    with PeImage(str(exe)) as pe:
+        (payload,) = find_embedded_payloads(pe)
+        extracted = extract_embedded_msi(pe, str(tmp_path))
+
+    assert payload.kind == "msi"
+    assert payload.size == len(msi)
+    assert extracted["container"] == "raw"
+    with MsiDatabase(extracted["path"]) as db:
+        assert db.properties() == PROPERTIES
+
+
+def test_self_referencing_difat_in_overlay(tmp_path):
+    """A DIFAT sector pointing at itself is read once, not once per count."""
+    msi = bytearray(_msi_bytes(tmp_path))
+    difat_sector = len(msi) // 512 - 1
+    msi += struct.pack("<128I", *([0xFFFFFFFF] * 127 + [difat_sector]))
+    struct.pack_into("<I", msi, 0x2C, 0xFFFFFFFF)  # FAT sectors
+    struct.pack_into("<II", msi, 0x44, difat_sector, 2_000_000)
+    exe = tmp_path / "setup.exe"
+    build_pe(exe, overlay=b"\x01" * 3000 + bytes(msi))
+
+    with PeImage(str(exe)) as pe, patch.object(pe, "read", wraps=pe.read) as read:
+        (payload,) = find_embedded_payloads(pe)
+
+    assert payload.kind == "msi"
+    assert read.call_count < 1000
+
+
+def test_largest_msi_wins(tmp_path):
+    """With several embedded MSIs the largest is kept, the rest are deleted."""
+    small = _msi_bytes(tmp_path, "small.msi", {"ProductName": "Prerequisite"})
+    large = _msi_bytes(tmp_path, "large.msi", padding=50)
+    exe = tmp_path / "setup.exe"
+    build_pe(exe, overlay=build_cab([("prereq.msi", small), ("product.msi", large)]))
+    out = tmp_path / "out"
+    out.mkdir()
+
+    with PeImage(str(exe)) as pe:
+        extracted = extract_embedded_msi(pe, str(out))
+
+    assert extracted["name"] == "product.msi"
+    assert os.listdir(out) == [os.path.basename(extracted["path"])]
+
+
+@pytest.mark.parametrize("overlay", [b"", b"MSCF\x00\x00\x00\x00garbage" * 50])
+def test_no_embedded_msi(tmp_path, overlay):
+    """Plain EXEs and bogus cabinet headers yield nothing."""
+    exe = tmp_path / "tool.exe"
+    build_pe(exe, overlay=overlay)
+
+    with PeImage(str(exe)) as pe:
+        assert extract_embedded_msi(pe, str(tmp_path)) is None
+
+
+def test_cab_extraction_memory_is_bounded(tmp_path):
+    """Decompression holds one block at a time, not the whole payload."""
+    msi = _msi_bytes(tmp_path, padding=6000)
+    assert len(msi) > 512 * 1024
+    exe = tmp_path / "bundle.exe"
+    build_pe(exe, overlay=build_cab([("product.msi", msi)]))
+
+    with PeImage(str(exe)) as pe:
+        tracemalloc.start()
+        try:
+            extracted = extract_embedded_msi(pe, str(tmp_path))
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert extracted["size"] == len(msi)
+    assert peak < 256 * 1024
@@ -0,0 +1,179 @@
+"""Tests for the concurrent evaluation runner."""
+
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+
+from src.app.schemas import ModelInfo
+from src.app.workflow import evaluation_runner
+from src.app.workflow.evaluation_runner import (
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    INTERRUPTED,
+    EvaluationRun,
+)
+
+RUNNER = "src.app.workflow.evaluation_runner"
+
+
+class _FakeService:
+    """EvaluationService stand-in recording concurrency per model."""
+
+    def __init__(self, instance_dir, gate=None):
+        self.gate = gate
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+        self.peak_total = 0
+        self.calls = []
+
+    def get_models(self):
+        return [
+            ModelInfo(id="a", name="A", description="", max_concurrency=1),
+            ModelInfo(id="b", name="B", description=""),
+        ]
+
+    def run_evaluation(self, model_id, scenario_id, resources=None):
+        with self.lock:
+            self.calls.append((model_id, scenario_id))
+            self.running[model_id] = self.running.get(model_id, 0) + 1
+            self.peak[model_id] = max(
+                self.peak.get(model_id, 0), self.running[model_id]
+            )
+            self.peak_total = max(self.peak_total, sum(self.running.values()))
+        try:
+            if self.gate is not None:
+                self.gate.wait(5)
+            else:
+                time.sleep(0.02)
+            if scenario_id == "broken":
+                return None
+            return SimpleNamespace(
+                id=f"{model_id}-{scenario_id}",
+                model=SimpleNamespace(name=model_id),
+                scenario=SimpleNamespace(title=scenario_id),
+                model_dump=lambda: {"id": f"{model_id}-{scenario_id}"},
+            )
+        finally:
+            with self.lock:
+                self.running[model_id] -= 1
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__, instance_path=str(tmp_path))
+    return app
+
+
+def _execute(app, run, service):
+    events = []
+    with (
+        patch(f"{RUNNER}.EvaluationService", return_value=service),
+        patch(f"{RUNNER}.PipelineResources"),
+    ):
+        run.execute(app, lambda name, data: events.append((name, data)))
+    return events
+
+
+def test_cells_run_concurrently_within_model_caps(app, tmp_path):
+    """The pool is used in parallel but no model exceeds its cap."""
+    service = _FakeService(tmp_path)
+    scenarios = ["s1", "s2", "s3", "broken"]
+    run = EvaluationRun.create(tmp_path, ["a", "b"], scenarios)
+    assert run.start()
+
+    with (
+        patch.object(evaluation_runner, "EVALUATION_WORKERS", 3),
+        patch.object(evaluation_runner, "EVALUATION_MODEL_CONCURRENCY", 2),
+    ):
+        events = _execute(app, run, service)
+
+    assert len(service.calls) == 8
+    assert service.peak["a"] == 1
+    assert service.peak["b"] == 2
+    assert service.peak_total == 3
+
+    progress = [data for name, data in events if name == "evaluation_progress"]
+    assert len(progress) == 8
+    assert progress[-1]["progress"] == 100
+    assert sum(1 for p in progress if "error" in p) == 2
+    assert events[-1][0] == "evaluation_complete"
+    assert events[-1][1]["counts"] == {COMPLETED: 6, FAILED: 2}
+
+    saved = EvaluationRun.load(tmp_path, run.id).snapshot()
+    assert saved["status"] == COMPLETED
+    assert {c["result_id"] for c in saved["cells"]} >= {"a-s1", "b-s3"}
+
+
+def test_cancel_then_resume(app, tmp_path):
+    """Cancelling skips pending cells; resuming runs only those."""
+    gate = threading.Event()
+    service = _FakeService(tmp_path, gate)
+    run = EvaluationRun.create(tmp_path, ["a"], ["s1", "s2", "s3"])
+    run.start()
+
+    worker = threading.Thread(target=_execute, args=(app, run, service))
+    worker.start()
+    while not service.calls:
+        time.sleep(0.01)
+    assert EvaluationRun.load(tmp_path, run.id) is run
+    run.cancel()
+    gate.set()
+    worker.join(5)
+
+    state = EvaluationRun.load(tmp_path, run.id).snapshot()
+    assert state["status"] == CANCELLED
+    assert state["counts"] == {COMPLETED: 1, CANCELLED: 2}
+
+    resumed = EvaluationRun.load(tmp_path, run.id)
+    assert resumed.start()
+    service.calls.clear()
+    _execute(app, resumed, service)
+
+    assert service.calls == [("a", "s2"), ("a", "s3")]
+    assert EvaluationRun.load(tmp_path, run.id).snapshot()["counts"] == {COMPLETED: 3}
+
+
+def test_interrupted_run_is_reported(tmp_path):
+    """A run saved as running by a previous process can be resumed."""
+    run = EvaluationRun.create(tmp_path, ["a"], ["s1"])
+    run.start()
+    evaluation_runner._active.pop(run.id)
+
+    loaded = EvaluationRun.load(tmp_path, run.id)
+
+    assert loaded.snapshot()["status"] == INTERRUPTED
+    assert not loaded.active
+    assert EvaluationRun.load(tmp_path, "not-a-run") is None
+
+
+def test_run_api(tmp_path):
+    """Runs are started, inspected and cancelled through the API."""
+    from src.app import create_app
+
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'eval.db'}"})
+    app.instance_path = str(tmp_path)
+    client = app.test_client()
+
+    with patch.object(EvaluationRun, "execute"):
+        response = client.post(
+            "/api/evaluations/run",
+            json={"model_ids": ["a", "b"], "scenario_ids": ["s1"]},
+        )
+        assert response.status_code == 202
+        run_id = response.get_json()["run_id"]
+
+        state = client.get(f"/api/evaluations/runs/{run_id}").get_json()
+        assert state["status"] == "running"
+        assert state["counts"] == {"pending": 2}
+        assert client.post(f"/api/evaluations/runs/{run_id}/resume").status_code == 409
+        assert client.post(f"/api/evaluations/runs/{run_id}/cancel").status_code == 202
+    evaluation_runner._active.pop(run_id)
+
+    assert client.get("/api/evaluations/runs/missing").status_code == 404
+    assert client.post(f"/api/evaluations/runs/{run_id}/cancel").status_code == 409
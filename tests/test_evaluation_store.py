@@ -0,0 +1,145 @@
+"""Tests for the indexed evaluation result store."""
+
+import json
+
+import pytest
+
+from src.app import create_app
+from src.app.database import evaluation_stats_by_model, save_evaluation_records
+from src.app.schemas import EvaluationResult
+from src.app.services import evaluation_service
+from src.app.services.evaluation_service import EvaluationService, _to_record
+
+
+def _result(index, model_id, scenario_id, category, trust_score, found=2):
+    return EvaluationResult(
+        id=f"00000000-0000-0000-0000-{index:012d}",
+        model={"id": model_id, "name": model_id.upper(), "description": ""},
+        scenario={
+            "id": scenario_id,
+            "title": f"Scenario {scenario_id}",
+            "prompt": "Install",
+            "difficulty": "easy",
+            "category": category,
+            "psadt_variables": {},
+        },
+        timestamp=f"2025-01-01T00:{index:02d}:00+00:00",
+        raw_model_output=f"raw {index}",
+        advisor_corrected_output=f"corrected {index}",
+        evaluation_log="",
+        metrics={
+            "hallucinations_found": found,
+            "hallucinations_corrected": round(trust_score * found),
+            "trust_score": trust_score,
+        },
+        detailed_hallucination_report=[{"line": index}],
+    )
+
+
+@pytest.fixture
+def app(tmp_path):
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'eval.db'}"})
+    app.instance_path = str(tmp_path)
+    (tmp_path / "evaluations").mkdir()
+    yield app
+    evaluation_service._imported_dirs.discard(tmp_path / "evaluations")
+
+
+@pytest.fixture
+def stored(app):
+    results = [
+        _result(1, "gpt", "s1", "msi", 1.0),
+        _result(2, "gpt", "s2", "exe", 0.5),
+        _result(3, "claude", "s1", "msi", 0.5),
+        _result(4, "claude", "s2", "exe", 0.0),
+        _result(5, "gpt", "s1", "msi", 0.0),
+    ]
+    with app.app_context():
+        save_evaluation_records([_to_record(r) for r in results])
+    return results
+
+
+def test_listing_is_paginated_filtered_and_sorted(app, tmp_path, stored):
+    """Pages come from SQL with the total of all matching results."""
+    with app.app_context():
+        service = EvaluationService(tmp_path)
+
+        page, total = service.list_evaluations(limit=2)
+        assert total == 5
+        assert [e.id[-1] for e in page] == ["5", "4"]
+        assert page[0].timestamp == "2025-01-01T00:05:00+00:00"
+
+        page, total = service.list_evaluations(limit=2, offset=4)
+        assert (total, [e.id[-1] for e in page]) == (5, ["1"])
+
+        page, total = service.list_evaluations(model_id="gpt", category="msi")
+        assert (total, [e.id[-1] for e in page]) == (2, ["5", "1"])
+
+        page, _ = service.list_evaluations(sort="trust-score-desc")
+        assert [e.metrics.trust_score for e in page] == [1.0, 0.5, 0.5, 0.0, 0.0]
+
+        full = service.get_evaluation(stored[1].id)
+        assert full == stored[1]
+        assert service.get_evaluation("missing") is None
+
+
+def test_trust_scores_are_aggregated_per_model(app, stored):
+    """Per-model statistics are computed by a GROUP BY query."""
+    with app.app_context():
+        stats = {s["model_id"]: s for s in evaluation_stats_by_model()}
+
+    assert stats["gpt"]["evaluations"] == 3
+    assert stats["gpt"]["avg_trust_score"] == pytest.approx(0.5)
+    assert stats["gpt"]["max_trust_score"] == 1.0
+    assert stats["claude"]["hallucinations_found"] == 4
+    assert stats["claude"]["hallucinations_corrected"] == 1
+    assert stats["claude"]["last_evaluated"] == "2025-01-01T00:04:00+00:00"
+
+
+def test_legacy_json_results_are_imported_once(app, tmp_path, stored):
+    """Result files written by earlier versions show up in the table."""
+    legacy = _result(6, "gpt", "s3", "zip", 0.25)
+    evaluations_dir = tmp_path / "evaluations"
+    (evaluations_dir / f"{legacy.id}.json").write_text(json.dumps(legacy.model_dump()))
+    # Already stored; must not be imported twice
+    (evaluations_dir / f"{stored[0].id}.json").write_text(
+        json.dumps(stored[0].model_dump())
+    )
+
+    with app.app_context():
+        service = EvaluationService(tmp_path)
+        _, total = service.list_evaluations()
+        assert total == 6
+        assert service.get_evaluation(legacy.id) == legacy
+
+        (evaluations_dir / f"{legacy.id}.json").unlink()
+        assert service.list_evaluations()[1] == 6
+
+
+def test_evaluations_api(app, stored):
+    """The API serves pages and per-model statistics."""
+    client = app.test_client()
+
+    body = client.get("/api/evaluations?limit=2&scenario_id=s2").get_json()
+    assert body["total"] == 2
+    assert body["limit"] == 2
+    assert [e["model"]["id"] for e in body["evaluations"]] == ["claude", "gpt"]
+    assert "raw_model_output" not in body["evaluations"][0]
+
+    searched = client.get("/api/evaluations?search=claude&sort=trust-score-asc")
+    assert [e["id"] for e in searched.get_json()["evaluations"]] == [
+        stored[3].id,
+        stored[2].id,
+    ]
+    assert client.get("/api/evaluations?search=EXE").get_json()["total"] == 2
+
+    assert client.get("/api/evaluations?sort=bogus").status_code == 400
+    assert client.get("/api/evaluations?limit=x").status_code == 400
+    assert client.get("/api/evaluations?limit=100000").get_json()["limit"] == 500
+
+    stats = client.get("/api/evaluations/stats").get_json()["models"]
+    assert [s["model_id"] for s in stats] == ["gpt", "claude"]
+
+    detail = client.get(f"/evaluations/{stored[0].id}")
+    assert detail.status_code == 200
+    assert "corrected 1" in detail.get_data(as_text=True)
@@ -8,7 +8,13 @@ import pytest
 from werkzeug.datastructures import FileStorage
 from io import BytesIO
 
-from src.app.file_persistence import save_uploaded_file, get_file_path, delete_file
+import hashlib
+
+from src.app.file_persistence import (
+    get_file_path,
+    delete_file,
+    store_uploaded_file,
+)
 
 
 @pytest.fixture
@@ -33,58 +39,6 @@ def mock_file():
 class TestFilePersistence:
     """Test file persistence functionality."""
 
-    def test_save_uploaded_file(self, temp_instance_dir, mock_file):
-        """Test saving an uploaded file with UUID naming."""
-        # Save the file
-        file_id, file_path = save_uploaded_file(mock_file, temp_instance_dir)
-
-        # Verify file_id is a UUID
-        assert isinstance(file_id, UUID)
-
-        # Verify file path format
-        expected_filename = f"{file_id}_test_installer.msi"
-        expected_path = temp_instance_dir / "uploads" / expected_filename
-        assert file_path == str(expected_path)
-
-        # Verify file was actually saved
-        assert os.path.exists(file_path)
-
-        # Verify file content
-        with open(file_path, "rb") as f:
-            content = f.read()
-        assert content == b"This is a test MSI file content"
-
-    def test_save_uploaded_file_creates_uploads_dir(self, temp_instance_dir, mock_file):
-        """Test that uploads directory is created if it doesn't exist."""
-        uploads_dir = temp_instance_dir / "uploads"
-        assert not uploads_dir.exists()
-
-        # Save file should create the directory
-        file_id, file_path = save_uploaded_file(mock_file, temp_instance_dir)
-
-        assert uploads_dir.exists()
-        assert uploads_dir.is_dir()
-
-    def test_save_uploaded_file_with_different_extensions(self, temp_instance_dir):
-        """Test saving files with different extensions."""
-        test_cases = [
-            ("installer.exe", "application/x-executable"),
-            ("setup.msi", "application/x-msi"),
-            ("package.zip", "application/zip"),
-        ]
-
-        for filename, content_type in test_cases:
-            file_obj = BytesIO(b"test content")
-            mock_file = FileStorage(
-                stream=file_obj, filename=filename, content_type=content_type
-            )
-
-            file_id, file_path = save_uploaded_file(mock_file, temp_instance_dir)
-
-            # Verify correct extension is preserved
-            assert file_path.endswith(filename)
-            assert os.path.exists(file_path)
-
     def test_get_file_path(self, temp_instance_dir):
         """Test getting file path from UUID and filename."""
         file_id = UUID("12345678-1234-5678-9012-123456789abc")
@@ -98,7 +52,7 @@ class TestFilePersistence:
     def test_delete_file(self, temp_instance_dir, mock_file):
         """Test deleting a saved file."""
         # First save a file
-        file_id, file_path = save_uploaded_file(mock_file, temp_instance_dir)
+        file_path = store_uploaded_file(mock_file, temp_instance_dir).file_path
         assert os.path.exists(file_path)
 
         # Delete the file
@@ -130,23 +84,19 @@ class TestFilePersistence:
                 stream=file_obj, filename=unsafe_name, content_type="application/x-msi"
             )
 
-            file_id, file_path = save_uploaded_file(mock_file, temp_instance_dir)
+            file_path = store_uploaded_file(mock_file, temp_instance_dir).file_path
 
-            # Verify file is saved in uploads directory (not escaped)
-            assert str(temp_instance_dir / "uploads") in file_path
+            # Verify file is saved in the object store (not escaped)
+            assert str(temp_instance_dir / "uploads" / "objects") in file_path
             assert os.path.exists(file_path)
 
-            # Verify filename is sanitized but extension preserved
-            path_obj = Path(file_path)
-            assert path_obj.parent == temp_instance_dir / "uploads"
-
     def test_save_empty_file(self, temp_instance_dir):
         """Test saving an empty file."""
         empty_file = FileStorage(
             stream=BytesIO(b""), filename="empty.msi", content_type="application/x-msi"
         )
 
-        file_id, file_path = save_uploaded_file(empty_file, temp_instance_dir)
+        file_path = store_uploaded_file(empty_file, temp_instance_dir).file_path
 
         assert os.path.exists(file_path)
         assert os.path.getsize(file_path) == 0
@@ -161,7 +111,7 @@ class TestFilePersistence:
             content_type="application/x-msi",
         )
 
-        file_id, file_path = save_uploaded_file(large_file, temp_instance_dir)
+        file_path = store_uploaded_file(large_file, temp_instance_dir).file_path
 
         assert os.path.exists(file_path)
         assert os.path.getsize(file_path) == 1024 * 1024
@@ -170,3 +120,37 @@ class TestFilePersistence:
         with open(file_path, "rb") as f:
             saved_content = f.read()
         assert saved_content == large_content
+
+
+class TestContentAddressedStore:
+    """Test the content-addressed upload store."""
+
+    def test_store_uploaded_file_hashes_content(self, temp_instance_dir, mock_file):
+        """Stored files are named after the SHA-256 of their content."""
+        stored = store_uploaded_file(mock_file, temp_instance_dir)
+
+        digest = hashlib.sha256(b"This is a test MSI file content").hexdigest()
+        assert stored.sha256 == digest
+        assert stored.size == len(b"This is a test MSI file content")
+        assert not stored.already_stored
+        assert Path(stored.file_path) == (
+            temp_instance_dir / "uploads" / "objects" / digest[:2] / f"{digest}.msi"
+        )
+        assert Path(stored.file_path).read_bytes() == b"This is a test MSI file content"
+
+    def test_identical_content_is_stored_once(self, temp_instance_dir):
+        """Uploading the same bytes twice reuses the existing object."""
+        content = b"B" * (3 * 1024 * 1024 + 17)
+        first = store_uploaded_file(
+            FileStorage(stream=BytesIO(content), filename="a.msi"), temp_instance_dir
+        )
+        second = store_uploaded_file(
+            FileStorage(stream=BytesIO(content), filename="b.msi"), temp_instance_dir
+        )
+
+        assert second.already_stored
+        assert first.file_path == second.file_path
+        assert first.sha256 == hashlib.sha256(content).hexdigest()
+        objects = list((temp_instance_dir / "uploads" / "objects").rglob("*.msi"))
+        assert len(objects) == 1
+        assert not any((temp_instance_dir / "uploads" / "tmp").iterdir())
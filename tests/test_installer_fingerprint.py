@@ -0,0 +1,109 @@
+"""Tests for EXE installer-framework fingerprinting."""
+
+import pytest
+
+from src.app.installer_fingerprint import (
+    detect_installer_framework,
+    scan_region,
+)
+from src.app.metadata_extractor import MetadataExtractor
+from src.app.pe_reader import PeImage
+from tests.pe_builder import build_pe
+
+NSIS_OVERLAY = b"\x00\x00\x00\x00\xef\xbe\xad\xdeNullsoftInst" + b"\x00" * 2048
+
+INNO_MANIFEST = (
+    '<assembly xmlns="urn:schemas-microsoft-com:asm.v1" manifestVersion="1.0">'
+    '<assemblyIdentity name="JR.Inno.Setup" type="win32"/></assembly>'
+)
+
+
+def _detect(path):
+    with PeImage(str(path)) as pe:
+        return detect_installer_framework(pe)
+
+
+@pytest.mark.parametrize(
+    "options, framework, switches",
+    [
+        ({"overlay": NSIS_OVERLAY}, "nsis", "/S"),
+        (
+            {"manifest": INNO_MANIFEST},
+            "inno",
+            "/VERYSILENT /SUPPRESSMSGBOXES /NORESTART /SP-",
+        ),
+        (
+            {"extra_sections": [(".wixburn", b"\x00" * 52)], "overlay": NSIS_OVERLAY},
+            "wix_burn",
+            "/quiet /norestart",
+        ),
+        (
+            {"overlay": b"ISSetupStream" + b"\x00" * 512},
+            "installshield",
+            '/s /v"/qn REBOOT=ReallySuppress"',
+        ),
+        (
+            {"extra_sections": [(".data", b"C:\\SquirrelTemp\\Setup.log")]},
+            "squirrel",
+            "--silent",
+        ),
+    ],
+)
+def test_detects_framework(tmp_path, options, framework, switches):
+    """Each framework is recognised from its section, overlay or resources."""
+    path = tmp_path / "setup.exe"
+    build_pe(path, **options)
+
+    result = _detect(path)
+
+    assert result["framework"] == framework
+    assert result["silent_switches"] == switches
+    assert result["evidence"]
+
+
+def test_unknown_exe(tmp_path):
+    """Plain executables are not fingerprinted."""
+    path = tmp_path / "tool.exe"
+    build_pe(path, overlay=b"\x00" * 1024)
+
+    assert _detect(path) is None
+
+
+def test_installshield_name_alone_is_not_enough(tmp_path):
+    """A program that merely mentions InstallShield is not an installer."""
+    mentions = tmp_path / "tool.exe"
+    build_pe(mentions, extra_sections=[(".data", b"Packaged with InstallShield")])
+    stub = tmp_path / "setup.exe"
+    build_pe(stub, extra_sections=[(".data", b"InstallShield\x00ISSetup.dll")])
+
+    assert _detect(mentions) is None
+    assert _detect(stub)["framework"] == "installshield"
+
+
+def test_scan_region_finds_markers_across_chunks(tmp_path):
+    """Markers straddling a chunk boundary are still found."""
+    path = tmp_path / "setup.exe"
+    build_pe(path)
+    with open(path, "ab") as f:
+        f.write(b"x" * 60 + b"NullsoftInst" + b"x" * 60)
+
+    with PeImage(str(path)) as pe:
+        start = pe.overlay_offset()
+        found = scan_region(
+            pe, start, 200, [b"NullsoftInst", b"missing"], chunk_size=64
+        )
+
+    assert found == {b"NullsoftInst"}
+
+
+def test_extractor_adds_framework_to_installer_details(tmp_path):
+    """The framework and its switches end up in the EXE metadata."""
+    path = tmp_path / "setup.exe"
+    build_pe(path, version_strings={"ProductName": "Contoso"}, overlay=NSIS_OVERLAY)
+
+    metadata = MetadataExtractor().extract_metadata(str(path))
+
+    framework = metadata["installer_details"]["framework"]
+    assert framework["framework"] == "nsis"
+    assert framework["silent_switches"] == "/S"
+    assert metadata["installer_details"]["version_info"] == {"ProductName": "Contoso"}
@@ -1,3 +1,5 @@
+from jinja2 import Environment, FileSystemLoader
+
 from src.app.services.instruction_processor import InstructionProcessor
 from src.app.schemas import InstructionResult
 
@@ -29,3 +31,31 @@ def test_instruction_processor_with_no_clear_action():
     result = processor.process_instructions("I want to package this application.")
     assert isinstance(result, InstructionResult)
     assert result.confidence_score < 0.5
+
+
+def test_instruction_prompt_includes_installer_details():
+    """Extracted installer facts are rendered into the Stage 1 prompt."""
+    env = Environment(loader=FileSystemLoader("src/app/prompts"))
+    prompt = env.get_template("instruction_processing.j2").render(
+        user_instructions="Install silently",
+        metadata={
+            "product_name": "Contoso Tools",
+            "version": None,
+            "executable_names": ["contosotools.exe"],
+            "installer_details": {
+                "counts": {"CustomAction": 2, "Registry": 1},
+                "services": [{"name": "ContosoSvc", "start_type": "auto"}],
+                "shortcuts": [],
+                "custom_actions": [{"action": "A"}, {"action": "B"}],
+                "registry": [{"root": "HKLM", "key": "SOFTWARE\\Contoso"}],
+            },
+        },
+        cmdlet_reference=[],
+    )
+
+    assert "**Name**: Contoso Tools" in prompt
+    assert "**Version**: 1.0.0" in prompt
+    assert "**Installed Executables**: contosotools.exe" in prompt
+    assert "ContosoSvc (auto)" in prompt
+    assert "**Custom Actions**: 2" in prompt
+    assert "HKLM\\SOFTWARE\\Contoso" in prompt
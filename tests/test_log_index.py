@@ -0,0 +1,186 @@
+"""Tests for indexed tail/range reads of package logs."""
+
+import json
+import threading
+import uuid
+
+import pytest
+
+from src.app import create_app, routes
+from src.app.database import (
+    create_package,
+    get_database_service,
+    update_package_status,
+)
+from src.app.log_index import LogIndex
+from src.app.package_logger import close_package_loggers, get_package_logger
+
+
+def _write(path, entries, tail=""):
+    with open(path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.write(tail)
+
+
+def _entries(count, step="STEP", level="INFO"):
+    return [{"step": step, "level": level, "message": f"m{i}"} for i in range(count)]
+
+
+def test_tail_and_since(tmp_path):
+    """Tails read only the last lines; ``since`` continues after a cursor."""
+    log = tmp_path / "pkg.jsonl"
+    _write(log, _entries(100))
+    index = LogIndex(log)
+
+    tail = index.select(tail=3)
+    assert [e["message"] for e in tail.entries] == ["m97", "m98", "m99"]
+    assert tail.total == 100
+    assert tail.next_offset == log.stat().st_size
+
+    _write(log, [{"step": "NEW", "level": "INFO", "message": "late"}])
+    later = index.select(since=tail.next_offset)
+    assert [e["message"] for e in later.entries] == ["late"]
+    assert index.select(since=later.next_offset).entries == []
+
+
+def test_start_limit_and_filters(tmp_path):
+    """Line offsets, step and minimum-level filters come from the index."""
+    log = tmp_path / "pkg.jsonl"
+    _write(log, _entries(5, "UPLOAD"))
+    _write(log, _entries(3, "RAG", "WARNING"))
+    _write(log, _entries(2, "RAG", "ERROR"))
+    index = LogIndex(log)
+
+    page = index.select(start=4, limit=3)
+    assert [(e["step"], e["message"]) for e in page.entries] == [
+        ("UPLOAD", "m4"),
+        ("RAG", "m0"),
+        ("RAG", "m1"),
+    ]
+    assert len(index.select(steps=["RAG"]).entries) == 5
+    assert len(index.select(min_level="WARNING").entries) == 5
+    errors = index.select(steps=["RAG", "UPLOAD"], min_level="ERROR", tail=1)
+    assert [e["message"] for e in errors.entries] == ["m1"]
+
+
+def test_index_is_incremental(tmp_path):
+    """Only appended bytes are scanned; partial lines wait for their newline."""
+    log = tmp_path / "pkg.jsonl"
+    _write(log, _entries(10), tail='{"step": "HALF"')
+    index = LogIndex(log)
+
+    assert index.sync() == 10
+    size = index.index_path.stat().st_size
+    with open(log, "a") as f:
+        f.write(', "level": "INFO", "message": "done"}\n')
+
+    assert index.sync() == 11
+    assert index.index_path.stat().st_size > size
+    assert index.select(tail=1).entries[0]["message"] == "done"
+
+
+def test_truncated_log_is_reindexed(tmp_path):
+    """A log replaced by a shorter one gets a fresh index."""
+    log = tmp_path / "pkg.jsonl"
+    _write(log, _entries(50))
+    LogIndex(log).sync()
+    log.write_text("")
+    _write(log, _entries(2, "FRESH"))
+
+    result = LogIndex(log).select()
+    assert [e["step"] for e in result.entries] == ["FRESH", "FRESH"]
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a test client backed by a temporary instance directory."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'logs.db'}"})
+    app.config["TESTING"] = True
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        get_database_service().create_tables()
+    yield app.test_client()
+    close_package_loggers()
+
+
+def test_logs_api_tail_since_and_range(client):
+    """The API pages through the log and serves byte ranges of the file."""
+    with client.application.app_context():
+        package = create_package(filename="app.msi", file_path="/tmp/app.msi")
+        package_logger = get_package_logger(str(package.id))
+        for i in range(20):
+            package_logger.log_step("UPLOAD", f"step {i}")
+        package_logger.log_step("RAG", "lookup failed", "WARNING")
+
+    response = client.get(f"/api/packages/{package.id}/logs?tail=2")
+    payload = response.get_json()
+    assert [e["message"] for e in payload["entries"]] == ["step 19", "lookup failed"]
+    assert payload["total"] == 21
+    assert "[RAG] lookup failed" in payload["logs"]
+
+    warnings = client.get(f"/api/packages/{package.id}/logs?level=WARNING")
+    assert len(warnings.get_json()["entries"]) == 1
+
+    with client.application.app_context():
+        package_logger.log_step("UPLOAD", "after poll")
+    polled = client.get(
+        f"/api/packages/{package.id}/logs?since={payload['next_offset']}"
+    ).get_json()
+    assert [e["message"] for e in polled["entries"]] == ["after poll"]
+
+    raw = client.get(
+        f"/api/packages/{package.id}/logs/raw", headers={"Range": "bytes=0-9"}
+    )
+    assert raw.status_code == 206
+    assert len(raw.data) == 10
+
+    view = client.get(f"/logs/{package.id}")
+    assert view.status_code == 200
+    assert b"after poll" in view.data
+
+
+def test_follow_stream_resumes_from_last_event_id(client):
+    """The SSE follow mode starts at the Last-Event-ID byte offset."""
+    with client.application.app_context():
+        package = create_package(filename="app.msi", file_path="/tmp/app.msi")
+        package_logger = get_package_logger(str(package.id))
+        package_logger.log_step("UPLOAD", "old")
+        package_logger.log_step("UPLOAD", "new")
+        entries = package_logger.read_range().entries
+        cursor = package_logger.read_range(tail=1).next_offset
+    first_line = len(json.dumps(entries[0], separators=(",", ":"))) + 1
+
+    response = client.get(
+        f"/api/packages/{package.id}/logs/stream",
+        headers={"Last-Event-ID": str(first_line)},
+        buffered=False,
+    )
+    events = response.response
+    event = json.loads(next(events).split(b"data: ", 1)[1])
+    assert event["message"] == "new"
+    assert event["text"].endswith("[UPLOAD] new")
+    assert next(events) == f"id: {cursor}\n\n".encode()
+    response.close()
+
+
+def test_follow_stream_ends_with_the_package(client, monkeypatch):
+    """Streams end once a finished package's log is drained, and are capped."""
+    with client.application.app_context():
+        package = create_package(filename="app.msi", file_path="/tmp/app.msi")
+        get_package_logger(str(package.id)).log_step("UPLOAD", "last words")
+        update_package_status(str(package.id), "completed")
+
+    response = client.get(f"/api/packages/{package.id}/logs/stream")
+    frames = b"".join(response.response)
+    response.close()
+    assert b"last words" in frames
+    assert frames.endswith(b"event: end\ndata: {}\n\n")
+
+    missing = client.get(f"/api/packages/{uuid.uuid4()}/logs/stream")
+    assert missing.status_code == 404
+
+    monkeypatch.setattr(routes, "_log_stream_slots", threading.BoundedSemaphore(1))
+    routes._log_stream_slots.acquire()
+    busy = client.get(f"/api/packages/{package.id}/logs/stream")
+    assert busy.status_code == 503
@@ -0,0 +1,172 @@
+"""Tests for the queue-based log pipeline."""
+
+import logging
+import threading
+import time
+from unittest.mock import patch
+
+from src.app import log_pipeline
+from src.app.log_pipeline import BatchFileHandler, LogPipeline, PipelineHandler
+from src.app.logging_cmtrace import CMTraceFormatter
+
+
+def _logger(name, handler):
+    logger = logging.Logger(name, logging.DEBUG)
+    logger.addHandler(handler)
+    return logger
+
+
+def _stall(pipeline):
+    """Block the writer thread until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+    blocker = logging.Handler()
+
+    def wait(_record):
+        started.set()
+        release.wait(5)
+
+    blocker.handle = wait
+    pipeline.submit(blocker, logging.makeLogRecord({}))
+    assert started.wait(5)
+    return release
+
+
+def test_records_are_written_in_batches(tmp_path):
+    """Queued records reach the file with one write per batch."""
+    pipeline = LogPipeline()
+    target = BatchFileHandler(tmp_path / "app.log", delay=True)
+    logger = _logger("batched", PipelineHandler(target, pipeline))
+
+    release = _stall(pipeline)
+    for i in range(50):
+        logger.info("record %d", i)
+    with patch.object(target, "emit_batch", wraps=target.emit_batch) as emit:
+        release.set()
+        assert pipeline.flush()
+
+    assert emit.call_count == 1
+    lines = (tmp_path / "app.log").read_text().splitlines()
+    assert lines == [f"record {i}" for i in range(50)]
+    pipeline.stop()
+
+
+def test_drop_policy_never_blocks(tmp_path):
+    """With a full queue the drop policy discards and counts records."""
+    pipeline = LogPipeline(maxsize=5, policy="drop")
+    target = BatchFileHandler(tmp_path / "app.log", delay=True)
+    logger = _logger("dropping", PipelineHandler(target, pipeline))
+
+    release = _stall(pipeline)
+    for i in range(20):
+        logger.info("record %d", i)
+    release.set()
+    pipeline.flush()
+
+    assert pipeline.dropped == 15
+    assert len((tmp_path / "app.log").read_text().splitlines()) == 5
+    pipeline.stop()
+
+
+def test_block_policy_waits_for_space(tmp_path):
+    """The block policy gives up after its timeout."""
+    pipeline = LogPipeline(maxsize=1, policy="block", block_timeout=0.05)
+    target = BatchFileHandler(tmp_path / "app.log", delay=True)
+
+    release = _stall(pipeline)
+    assert pipeline.submit(target, logging.makeLogRecord({"msg": "kept"}))
+    assert not pipeline.submit(target, logging.makeLogRecord({"msg": "lost"}))
+    release.set()
+    pipeline.flush()
+
+    assert (tmp_path / "app.log").read_text() == "kept\n"
+    pipeline.stop()
+
+
+def test_arguments_are_captured_when_logged(tmp_path):
+    """Later changes to a logged object do not change the written message."""
+    pipeline = LogPipeline()
+    target = BatchFileHandler(tmp_path / "app.log", delay=True)
+    logger = _logger("snapshot", PipelineHandler(target, pipeline))
+    items = ["a"]
+
+    release = _stall(pipeline)
+    logger.info("items=%s", items)
+    items.append("b")
+    release.set()
+    pipeline.flush()
+
+    assert (tmp_path / "app.log").read_text() == "items=['a']\n"
+    pipeline.stop()
+
+
+def test_cmtrace_timestamp_is_cached_per_second():
+    """strftime runs once per second, not per record."""
+    formatter = CMTraceFormatter()
+    records = []
+    for msecs in (1, 250, 999):
+        record = logging.makeLogRecord({"msg": "x"})
+        record.created = 1_700_000_000 + msecs / 1000
+        record.msecs = msecs
+        records.append(record)
+
+    with patch(
+        "src.app.logging_cmtrace.time.strftime", wraps=time.strftime
+    ) as strftime:
+        lines = [formatter.format(r) for r in records]
+
+    assert strftime.call_count == 2  # one time and one date string
+    assert '.001+000"' in lines[0]
+    assert '.999+000"' in lines[2]
+
+
+def test_handlers_close_synchronously_after_stop(tmp_path):
+    """Closing a handler after stop() does not restart the writer thread."""
+    pipeline = LogPipeline()
+    target = BatchFileHandler(tmp_path / "app.log", delay=True)
+    handler = PipelineHandler(target, pipeline)
+    logger = _logger("stopped", handler)
+    logger.info("before stop")
+    pipeline.stop()
+
+    with patch("src.app.log_pipeline.threading.Thread") as thread:
+        logger.info("after stop")
+        handler.flush()
+        handler.close()
+
+    thread.assert_not_called()
+    assert target.stream is None
+    assert (tmp_path / "app.log").read_text() == "before stop\nafter stop\n"
+
+
+def test_no_new_threads_at_shutdown(tmp_path):
+    """When threads cannot be started, records and closes are written inline."""
+    pipeline = LogPipeline()
+    target = BatchFileHandler(tmp_path / "app.log", delay=True)
+    handler = PipelineHandler(target, pipeline)
+    logger = _logger("shutdown", handler)
+
+    with patch(
+        "src.app.log_pipeline.threading.Thread.start",
+        side_effect=RuntimeError("can't create new thread at interpreter shutdown"),
+    ):
+        logger.info("at exit")
+        handler.close()
+
+    assert target.stream is None
+    assert (tmp_path / "app.log").read_text() == "at exit\n"
+
+
+def test_shutdown_hooks_run_after_stop(monkeypatch):
+    """Exit hooks run once the writer thread is stopped."""
+    pipeline = LogPipeline()
+    pipeline.submit(logging.NullHandler(), logging.makeLogRecord({}))
+    stopped = []
+    monkeypatch.setattr(log_pipeline, "_pipeline", pipeline)
+    monkeypatch.setattr(log_pipeline, "_shutdown_hooks", [])
+    log_pipeline.on_shutdown(lambda: stopped.append(pipeline._stopped))
+
+    log_pipeline._shutdown()
+
+    assert stopped == [True]
+    assert not pipeline._thread.is_alive()
@@ -5,6 +5,7 @@ import tempfile
 from pathlib import Path
 import re
 
+from src.app.log_pipeline import flush_logs
 from src.app.logging_cmtrace import (
     CMTraceFormatter,
     setup_cmtrace_logging,
@@ -124,6 +125,7 @@ class TestCMTraceLogging:
             logger.info("Test message")
 
             # Check log file was created and contains CMTrace format
+            flush_logs()
             assert log_file.exists()
             content = log_file.read_text()
             assert "<![LOG[Test message]LOG]!>" in content
@@ -145,6 +147,7 @@ class TestCMTraceLogging:
             # Check that log file was created
             log_file = logs_dir / "aipackager.log"
             logger.info("Test message")
+            flush_logs()
 
             assert log_file.exists()
             content = log_file.read_text()
@@ -169,6 +172,7 @@ class TestCMTraceLogging:
             log_warning(logger, "Warning message")
             log_error(logger, "Error message")
             log_debug(logger, "Debug message")
+            flush_logs()
 
             content = log_file.read_text()
 
@@ -194,6 +198,7 @@ class TestCMTraceLogging:
             logger.info("Application started")
             logger.warning("File upload warning")
             logger.error("Processing failed")
+            flush_logs()
 
             content = log_file.read_text()
             lines = content.strip().split("\n")
@@ -225,6 +230,7 @@ class TestCMTraceLogging:
 
             logger1.info("Message from component 1")
             logger2.info("Message from component 2")
+            flush_logs()
 
             content1 = log_file1.read_text()
             content2 = log_file2.read_text()
@@ -249,6 +255,7 @@ class TestCMTraceLogging:
             logger.warning("Warning message")
             logger.error("Error message")
             logger.critical("Critical message")
+            flush_logs()
 
             content = log_file.read_text()
 
@@ -291,6 +298,7 @@ class TestCMTraceLogging:
             # Log message with Unicode characters
             unicode_message = "Processing file: café_résumé.msi 🚀"
             logger.info(unicode_message)
+            flush_logs()
 
             content = log_file.read_text(encoding="utf-8")
             assert unicode_message in content
@@ -350,36 +350,6 @@ class TestMetadataExtractor:
         finally:
             Path(temp_path).unlink()
 
-    def test_extract_version_info(self):
-        """Test version info extraction."""
-        extractor = MetadataExtractor()
-
-        with tempfile.NamedTemporaryFile(suffix=".exe", delete=False) as temp_file:
-            temp_file.write(b"Test content")
-            temp_path = temp_file.name
-
-        try:
-            metadata = extractor._extract_version_info(temp_path)
-            assert isinstance(metadata, dict)
-
-        finally:
-            Path(temp_path).unlink()
-
-    def test_extract_version_info_windows(self):
-        """Test Windows-specific version info extraction."""
-        extractor = MetadataExtractor()
-
-        with tempfile.NamedTemporaryFile(suffix=".exe", delete=False) as temp_file:
-            temp_file.write(b"Test content")
-            temp_path = temp_file.name
-
-        try:
-            metadata = extractor._extract_version_info_windows(temp_path)
-            assert isinstance(metadata, dict)
-
-        finally:
-            Path(temp_path).unlink()
-
     def test_is_msitools_available(self):
         """Test msitools availability check."""
         extractor = MetadataExtractor()
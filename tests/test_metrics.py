@@ -0,0 +1,152 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+import io
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.app import create_app
+from src.app.database import get_database_service
+from src.app.metrics import (
+    Counter,
+    Histogram,
+    observe_llm_call,
+    observe_mcp_call,
+)
+from src.app.workflow.metadata_stage import METADATA_WORKERS
+
+
+def _sample(text, name, **labels):
+    """Value of one sample in an exposition, or None."""
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = re.match(r"([a-zA-Z_:]+)(\{(.*)\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(3) or ""))
+        if found == {k: str(v) for k, v in labels.items()}:
+            return float(match.group(4))
+    return None
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a test client backed by a temporary instance directory."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'metrics.db'}"})
+    app.config["TESTING"] = True
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        get_database_service().create_tables()
+    return app.test_client()
+
+
+def _scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    return response.get_data(as_text=True)
+
+
+def test_histogram_and_counter_exposition():
+    """Families render HELP/TYPE lines and cumulative buckets."""
+    histogram = Histogram(
+        "test_request_seconds",
+        "Test latency",
+        ["route"],
+        registry=None,
+        buckets=(0.1, 1),
+    )
+    histogram.labels("a").observe(0.05)
+    histogram.labels("a").observe(0.5)
+    histogram.labels("a").observe(5)
+    counter = Counter("test_events_total", "Test events", registry=None)
+    counter.inc(3)
+
+    text = "\n".join(histogram.render() + counter.render())
+
+    assert "# TYPE test_request_seconds histogram" in text
+    assert _sample(text, "test_request_seconds_bucket", route="a", le="0.1") == 1
+    assert _sample(text, "test_request_seconds_bucket", route="a", le="1.0") == 2
+    assert _sample(text, "test_request_seconds_bucket", route="a", le="+Inf") == 3
+    assert _sample(text, "test_request_seconds_count", route="a") == 3
+    assert _sample(text, "test_request_seconds_sum", route="a") == 5.55
+    assert "# TYPE test_events counter" in text
+    assert _sample(text, "test_events_total") == 3
+
+
+def test_llm_and_mcp_calls_are_measured(client):
+    """Token counts, latency and errors are exported per model and tool."""
+    before = _scrape(client)
+    tokens_before = (
+        _sample(before, "aipackager_llm_tokens_total", model="m1", direction="input")
+        or 0
+    )
+
+    with observe_llm_call("m1") as call:
+        call.record(
+            SimpleNamespace(
+                usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+            )
+        )
+    with pytest.raises(RuntimeError), observe_mcp_call("perform_rag_query"):
+        raise RuntimeError("server down")
+
+    text = _scrape(client)
+    assert (
+        _sample(text, "aipackager_llm_tokens_total", model="m1", direction="input")
+        == tokens_before + 120
+    )
+    assert (
+        _sample(text, "aipackager_llm_tokens_total", model="m1", direction="output")
+        is not None
+    )
+    assert _sample(text, "aipackager_llm_request_seconds_count", model="m1") >= 1
+    assert (
+        _sample(text, "aipackager_mcp_call_errors_total", tool="perform_rag_query") >= 1
+    )
+
+
+def test_uploads_caches_queues_and_commits_are_exported(client):
+    """An upload moves the byte, cache and commit metrics."""
+    before = _scrape(client)
+    uploaded = _sample(before, "aipackager_upload_bytes_total", mode="form") or 0
+    misses = (
+        _sample(
+            before,
+            "aipackager_cache_requests_total",
+            cache="upload_blob",
+            result="miss",
+        )
+        or 0
+    )
+
+    response = client.post(
+        "/api/packages",
+        data={"installer": (io.BytesIO(b"MZ" + b"\0" * 998), "setup.exe")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+
+    text = _scrape(client)
+    assert _sample(text, "aipackager_upload_bytes_total", mode="form") == (
+        uploaded + 1000
+    )
+    assert _sample(text, "aipackager_upload_seconds_total", mode="form") > 0
+    assert (
+        _sample(
+            text, "aipackager_cache_requests_total", cache="upload_blob", result="miss"
+        )
+        == misses + 1
+    )
+    assert _sample(text, "aipackager_db_commit_seconds_count") > 0
+    assert _sample(text, "aipackager_queue_depth", queue="log") is not None
+    assert _sample(text, "aipackager_workers", pool="metadata") == METADATA_WORKERS
+    assert "aipackager_pipeline_stage_seconds" in text
+
+
+def test_fallback_registry_rejects_duplicates():
+    """Defining the same metric twice is an error, as in prometheus_client."""
+    with pytest.raises(ValueError):
+        Counter("aipackager_llm_tokens_total", "duplicate", ["model"])
@@ -4,9 +4,10 @@ import pytest
 from datetime import datetime
 from uuid import UUID
 from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 
-from src.app.models import Base, Package, Metadata
+from src.app.models import Artifact, Base, Package, Metadata
 
 
 @pytest.fixture
@@ -186,3 +187,74 @@ class TestModelConstraints:
 
         assert metadata.package_id == package.id
         assert metadata.product_name == "Test Product"
+
+    def test_metadata_package_id_is_unique(self, session):
+        """Test that a package can only have one metadata record."""
+        package = Package(filename="test.msi", file_path="/uploads/test.msi")
+        session.add(package)
+        session.commit()
+
+        session.add(Metadata(package_id=package.id, product_name="First"))
+        session.commit()
+
+        with pytest.raises(IntegrityError):
+            session.add(Metadata(package_id=package.id, product_name="Second"))
+            session.commit()
+
+
+class TestArtifactStorage:
+    """Test content-addressed storage of pipeline artifacts."""
+
+    def test_artifact_round_trip(self, session):
+        """Test that artifact-backed fields read back what was written."""
+        script = {"installation_tasks": ["Start-ADTMsiProcess -Action Install"]}
+        package = Package(
+            filename="test.msi",
+            file_path="/uploads/test.msi",
+            generated_script=script,
+            rag_documentation="Start-ADTMsiProcess documentation",
+        )
+        session.add(package)
+        session.commit()
+        package_id = package.id
+        session.expunge_all()
+
+        reloaded = session.get(Package, package_id)
+        assert reloaded.generated_script == script
+        assert reloaded.rag_documentation == "Start-ADTMsiProcess documentation"
+        assert reloaded.initial_script is None
+
+    def test_identical_artifacts_stored_once(self, session):
+        """Test that the same output across packages shares one artifact row."""
+        script = {"installation_tasks": ["Write-ADTLogEntry -Message 'x'"] * 50}
+        for index in range(3):
+            session.add(
+                Package(
+                    filename=f"retry{index}.msi",
+                    file_path=f"/uploads/retry{index}.msi",
+                    generated_script=script,
+                    initial_script=script,
+                )
+            )
+        session.commit()
+
+        artifacts = session.query(Artifact).all()
+        assert len(artifacts) == 1
+        assert artifacts[0].size > len(artifacts[0].data)  # stored compressed
+
+    def test_reassigning_artifact_updates_reference(self, session):
+        """Test that assigning a new value points the package at a new artifact."""
+        package = Package(
+            filename="test.msi",
+            file_path="/uploads/test.msi",
+            hallucination_report={"has_hallucinations": True},
+        )
+        session.add(package)
+        session.commit()
+        old_hash = package.hallucination_report_hash
+
+        package.hallucination_report = {"has_hallucinations": False}
+        session.commit()
+
+        assert package.hallucination_report_hash != old_hash
+        assert package.hallucination_report == {"has_hallucinations": False}
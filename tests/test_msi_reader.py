@@ -0,0 +1,334 @@
+"""Tests for the native MSI reader."""
+
+import struct
+from unittest.mock import patch
+
+import pytest
+
+from src.app.metadata_extractor import MetadataExtractor
+from src.app.msi_reader import (
+    CompoundFile,
+    MsiDatabase,
+    MsiFormatError,
+    is_msi_database,
+)
+from tests.msi_builder import (
+    COMPONENT_COLUMNS,
+    CUSTOM_ACTION_COLUMNS,
+    DIRECTORY_COLUMNS,
+    FILE_COLUMNS,
+    FREESECT,
+    ICON_COLUMNS,
+    REGISTRY_COLUMNS,
+    SECTOR,
+    SERVICE_INSTALL_COLUMNS,
+    SHORTCUT_COLUMNS,
+    build_msi,
+)
+
+PROPERTIES = {
+    "ProductName": "Contoso Tools",
+    "ProductVersion": "4.2.1",
+    "Manufacturer": "Contoso Ltd.",
+    "ProductCode": "{6F1A6A2E-3F43-4C3F-9B44-0D6B2B9E1A10}",
+    "UpgradeCode": "{0E7A4D5B-6C39-47D1-8A31-5C2F0E9C9B21}",
+    "ProductLanguage": "1033",
+    "ALLUSERS": "1",
+}
+
+SUMMARY = {
+    2: "Installation Database",
+    3: "Contoso Tools",
+    4: "Contoso Ltd.",
+    6: "Contoso Tools 4.2.1 © Contoso",
+    7: "x64;1033",
+    14: 200,
+}
+
+
+@pytest.fixture
+def msi_path(tmp_path):
+    """An MSI with a Property, Shortcut and Icon table."""
+    path = tmp_path / "contoso.msi"
+    build_msi(
+        path,
+        PROPERTIES,
+        summary=SUMMARY,
+        tables={
+            "Shortcut": (
+                SHORTCUT_COLUMNS,
+                [
+                    (
+                        "ToolsShortcut",
+                        "ProgramMenuFolder",
+                        "CTOOLS~1|Contoso Tools",
+                        "MainComponent",
+                        "[INSTALLDIR]ContosoTools.exe",
+                        None,
+                        0,
+                    ),
+                ],
+            ),
+            "Icon": (ICON_COLUMNS, [("Updater.exe", None)]),
+        },
+    )
+    return path
+
+
+def test_reads_summary_information(msi_path):
+    """SummaryInformation strings and integers are decoded."""
+    with MsiDatabase(str(msi_path)) as msi:
+        summary = msi.summary_information()
+
+    assert summary["title"] == "Installation Database"
+    assert summary["template"] == "x64;1033"
+    assert summary["comments"] == "Contoso Tools 4.2.1 © Contoso"
+    assert summary["page_count"] == 200
+    assert summary["codepage"] == 1252
+
+
+def test_reads_tables(msi_path):
+    """Table streams are decoded through the string pool and _Columns."""
+    with MsiDatabase(str(msi_path)) as msi:
+        assert msi.properties() == PROPERTIES
+        assert set(msi.table_names()) == {"Property", "Shortcut", "Icon"}
+        (shortcut,) = msi.table("Shortcut")
+        assert msi.table("Missing") == []
+
+    assert shortcut["Target"] == "[INSTALLDIR]ContosoTools.exe"
+    assert shortcut["Arguments"] is None
+    assert shortcut["IconIndex"] == 0
+
+
+def test_large_streams_use_regular_sectors(tmp_path):
+    """Streams above the mini stream cutoff are read from the FAT chain."""
+    properties = {f"PROP{i:04d}": f"value-{i}-" + "x" * 20 for i in range(800)}
+    path = tmp_path / "large.msi"
+    build_msi(path, properties)
+
+    with MsiDatabase(str(path)) as msi:
+        assert msi.properties() == properties
+
+
+def test_utf8_codepage(tmp_path):
+    """Strings are decoded with the database code page."""
+    path = tmp_path / "utf8.msi"
+    build_msi(path, {"ProductName": "ツール"}, codepage=65001)
+
+    with MsiDatabase(str(path)) as msi:
+        assert msi.properties()["ProductName"] == "ツール"
+
+
+def test_rejects_non_msi(tmp_path):
+    """Files without the compound file signature raise MsiFormatError."""
+    path = tmp_path / "fake.msi"
+    path.write_bytes(b"Sample MSI content")
+
+    assert not is_msi_database(str(path))
+    with pytest.raises(MsiFormatError):
+        MsiDatabase(str(path))
+
+
+def _corrupt_summary(data):
+    # Section offset points at the end of the stream: struct.error
+    return data[:44] + struct.pack("<I", 48)
+
+
+def _corrupt_codepage(data):
+    # UTF-16 code page has no single-byte codec: LookupError
+    return struct.pack("<HH", 1200, 0) + data[4:]
+
+
+@pytest.mark.parametrize(
+    "stream, corrupt",
+    [
+        ("\x05SummaryInformation", _corrupt_summary),
+        ("!_StringPool", _corrupt_codepage),
+    ],
+)
+def test_corrupted_streams_raise_format_error(msi_path, stream, corrupt):
+    """Decoding failures surface as MsiFormatError and the extractor falls back."""
+    read_stream = CompoundFile.read_stream
+
+    def corrupted(self, name):
+        data = read_stream(self, name)
+        return corrupt(data) if name == stream else data
+
+    extractor = MetadataExtractor()
+    with patch.object(CompoundFile, "read_stream", corrupted):
+        with MsiDatabase(str(msi_path)) as msi, pytest.raises(MsiFormatError):
+            msi.summary_information()
+            msi.properties()
+
+        with patch.object(
+            extractor, "_is_msitools_available", return_value=False
+        ), patch.object(
+            extractor, "_extract_msi_alternative", return_value={}
+        ) as fallback:
+            metadata = extractor.extract_metadata(str(msi_path))
+
+    fallback.assert_called_once()
+    assert metadata["filename"] == "contoso.msi"
+
+
+def test_extractor_matches_msitools_fields_without_subprocess(msi_path):
+    """The extractor reads MSIs natively without spawning msiinfo."""
+    extractor = MetadataExtractor()
+    with patch("src.app.metadata_extractor.subprocess.run") as run:
+        metadata, executables = extractor.extract_with_executables(str(msi_path))
+        assert extractor.extract_metadata(str(msi_path)) == metadata
+        assert extractor.extract_executable_names(str(msi_path)) == executables
+    run.assert_not_called()
+
+    assert metadata["product_name"] == "Contoso Tools"
+    assert metadata["version"] == "4.2.1"
+    assert metadata["publisher"] == "Contoso Ltd."
+    assert metadata["product_code"] == PROPERTIES["ProductCode"]
+    assert metadata["upgrade_code"] == PROPERTIES["UpgradeCode"]
+    assert metadata["summary_subject"] == "Contoso Tools"
+    assert metadata["summary_author"] == "Contoso Ltd."
+    assert metadata["architecture"] == "x64"
+    assert metadata["language"] == "en-US"
+    assert executables == ["contosotools.exe", "updater.exe"]
+
+
+def test_installer_details_from_tables(tmp_path):
+    """Install-time tables are decoded into installer_details in one pass."""
+    path = tmp_path / "service.msi"
+    build_msi(
+        path,
+        PROPERTIES,
+        tables={
+            "Directory": (
+                DIRECTORY_COLUMNS,
+                [
+                    ("TARGETDIR", None, "SourceDir"),
+                    ("ProgramFiles64Folder", "TARGETDIR", "."),
+                    ("CONTOSO", "ProgramFiles64Folder", "Contoso"),
+                    ("INSTALLDIR", "CONTOSO", "CTOOLS|Contoso Tools"),
+                ],
+            ),
+            "Component": (
+                COMPONENT_COLUMNS,
+                [("MainComponent", None, "INSTALLDIR", 256, None, "ToolsExe")],
+            ),
+            "File": (
+                FILE_COLUMNS,
+                [
+                    (
+                        "ToolsExe",
+                        "MainComponent",
+                        "CTOOLS.EXE|ContosoTools.exe",
+                        5_000_000,
+                        "4.2.1.0",
+                        "1033",
+                        0,
+                        1,
+                    ),
+                    (
+                        "ToolsSvc",
+                        "MainComponent",
+                        "ctsvc.exe",
+                        70_000,
+                        "4.2.1.0",
+                        None,
+                        0,
+                        2,
+                    ),
+                    ("Readme", "MainComponent", "readme.txt", 120, None, None, 0, 3),
+                ],
+            ),
+            "Registry": (
+                REGISTRY_COLUMNS,
+                [
+                    (
+                        "RegVersion",
+                        2,
+                        "SOFTWARE\\Contoso\\Tools",
+                        "Version",
+                        "4.2.1",
+                        "MainComponent",
+                    )
+                ],
+            ),
+            "ServiceInstall": (
+                SERVICE_INSTALL_COLUMNS,
+                [
+                    (
+                        "Svc",
+                        "ContosoSvc",
+                        "Contoso Service",
+                        16,
+                        2,
+                        1,
+                        None,
+                        None,
+                        "LocalSystem",
+                        None,
+                        None,
+                        "MainComponent",
+                        None,
+                    )
+                ],
+            ),
+            "CustomAction": (
+                CUSTOM_ACTION_COLUMNS,
+                [("SetInstallDir", 51, "INSTALLDIR", "[ProgramFiles64Folder]Contoso")],
+            ),
+        },
+    )
+
+    extractor = MetadataExtractor()
+    metadata, executables = extractor.extract_with_executables(str(path))
+    details = metadata["installer_details"]
+
+    # No Shortcut/Icon tables: executables come from the File table
+    assert executables == ["contosotools.exe", "ctsvc.exe"]
+    assert details["executables"] == ["ContosoTools.exe", "ctsvc.exe"]
+    assert (
+        details["directories"]["INSTALLDIR"]
+        == "[ProgramFiles64Folder]Contoso\\Contoso Tools"
+    )
+    assert details["files"][0] == {
+        "name": "ContosoTools.exe",
+        "directory": "[ProgramFiles64Folder]Contoso\\Contoso Tools",
+        "component": "MainComponent",
+        "size": 5_000_000,
+        "version": "4.2.1.0",
+    }
+    assert details["registry"] == [
+        {
+            "root": "HKLM",
+            "key": "SOFTWARE\\Contoso\\Tools",
+            "name": "Version",
+            "value": "4.2.1",
+            "component": "MainComponent",
+        }
+    ]
+    assert details["services"] == [
+        {
+            "name": "ContosoSvc",
+            "display_name": "Contoso Service",
+            "start_type": "auto",
+            "account": "LocalSystem",
+        }
+    ]
+    assert details["custom_actions"][0]["type"] == 51
+    assert details["counts"]["File"] == 3
+    assert details["counts"]["Shortcut"] == 0
+
+
+def test_self_referencing_difat_is_rejected(msi_path):
+    """A DIFAT sector pointing at itself fails fast instead of looping."""
+    data = bytearray(msi_path.read_bytes())
+    data += b"\x00" * SECTOR * 400
+    difat_sector = len(data) // SECTOR - 1
+    data += struct.pack(
+        f"<{SECTOR // 4}I", *([FREESECT] * (SECTOR // 4 - 1) + [difat_sector])
+    )
+    struct.pack_into("<I", data, 0x2C, 0xFFFFFFFF)  # FAT sectors
+    struct.pack_into("<II", data, 0x44, difat_sector, 3_000_000)
+    msi_path.write_bytes(bytes(data))
+
+    with pytest.raises(MsiFormatError, match="cycle"):
+        MsiDatabase(str(msi_path))
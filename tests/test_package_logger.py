@@ -0,0 +1,143 @@
+"""Tests for the cached per-package logger registry and JSONL logs."""
+
+from unittest.mock import patch
+
+import json
+import threading
+
+import pytest
+from flask import Flask
+
+from src.app import package_logger
+from src.app.log_pipeline import BatchFileHandler, flush_logs
+from src.app.package_logger import (
+    PackageLogger,
+    close_package_loggers,
+    get_package_logger,
+)
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Flask app whose instance directory is a temporary path."""
+    app = Flask(__name__, instance_path=str(tmp_path))
+    with app.app_context():
+        yield app
+    close_package_loggers()
+
+
+def test_logger_is_cached_without_filesystem_calls(app):
+    """Repeated lookups return the same logger and skip mkdir."""
+    first = get_package_logger("pkg-1")
+
+    with patch("pathlib.Path.mkdir") as mkdir:
+        second = get_package_logger("pkg-1")
+        other = get_package_logger("pkg-2")
+
+    assert second is first
+    assert other is not first
+    mkdir.assert_not_called()
+
+
+def test_records_are_written_off_the_calling_thread(app):
+    """log_step only queues; the writer thread does the file I/O."""
+    logger = get_package_logger("pkg-1")
+    writers = []
+    original = BatchFileHandler.emit_batch
+
+    def spy(handler, records):
+        writers.append(threading.current_thread().name)
+        original(handler, records)
+
+    with patch.object(BatchFileHandler, "emit_batch", spy):
+        logger.log_step("UPLOAD", "Upload started")
+        logger.log_error("METADATA_EXTRACTION", ValueError("bad table"))
+        logger.flush()
+
+    assert writers and set(writers) == {"log-writer"}
+    content = logger.log_file.read_text()
+    assert '"message":"Upload started"' in content
+    assert "ERROR: bad table" in content
+
+
+def test_get_logs_sees_queued_records(app):
+    """Readers wait for queued records first."""
+    logger = get_package_logger("pkg-1")
+    logger.log_step("UPLOAD", "Upload started")
+
+    assert "Upload started" in get_package_logger("pkg-1").get_logs()
+
+
+def test_least_recently_used_logger_is_closed(app):
+    """Beyond the limit the idle logger's file is closed."""
+    with patch.object(package_logger, "MAX_OPEN_LOGGERS", 2):
+        first = get_package_logger("pkg-1")
+        second = get_package_logger("pkg-2")
+        second.log_step("UPLOAD", "Upload started")
+        second.log_5_stage_pipeline(1, "Instruction Processing", "Started")
+        flush_logs()
+        assert second._file_handler.stream is not None
+        get_package_logger("pkg-1")  # pkg-2 is now least recently used
+        get_package_logger("pkg-3")
+        flush_logs()
+
+        assert get_package_logger("pkg-1") is first
+        assert len(package_logger._loggers) == 2
+        assert second._file_handler.stream is None
+
+        # An evicted logger is rebuilt on demand and appends to the same file
+        second_again = get_package_logger("pkg-2")
+        assert second_again is not second
+        second_again.log_step("UPLOAD", "Still writable")
+        logs = second_again.get_logs()
+
+    assert "Upload started" in logs
+    assert "Still writable" in logs
+
+
+def test_entries_are_compact_json_lines(app):
+    """Each step is one JSON object; small payloads are inlined."""
+    logger = get_package_logger("pkg-1")
+    logger.log_step("UPLOAD", "Upload started", data={"file_size": 42})
+    logger.log_step("RAG", "Cmdlet lookup failed", "WARNING", {"cmdlet": "Foo"})
+
+    logger.flush()
+    lines = logger.log_file.read_text().splitlines()
+    entries = [json.loads(line) for line in lines]
+
+    assert [e["step"] for e in entries] == ["UPLOAD", "RAG"]
+    assert entries[0]["data"] == {"file_size": 42}
+    assert entries[1]["level"] == "WARNING"
+    assert all("\n" not in line and ": " not in line for line in lines)
+    assert list(logger.read_entries()) == entries
+    assert "[UPLOAD] Upload started" in logger.get_logs()
+
+
+def test_large_payloads_go_to_side_files(app):
+    """Payloads over the inline limit are stored once and referenced by hash."""
+    logger = get_package_logger("pkg-1")
+    messages = [{"role": "user", "content": "x" * 1000}] * 20
+
+    with patch.object(package_logger, "INLINE_PAYLOAD_LIMIT", 1024):
+        logger.log_step("LLM", "Prompt sent", data={"messages": messages})
+        logger.log_step("LLM", "Prompt retried", data={"messages": messages})
+    first, second = logger.read_entries()
+
+    assert "data" not in first
+    assert first["data_ref"] == second["data_ref"]
+    assert len(list((logger.log_file.parent / "payloads").iterdir())) == 1
+    assert logger.load_payload(first["data_ref"]["sha256"]) == {"messages": messages}
+
+
+def test_disabled_levels_skip_serialization(app, tmp_path):
+    """With DEBUG off, INFO payloads are never serialized."""
+    with patch.object(package_logger, "PACKAGE_LOG_LEVEL", "INFO"):
+        logger = PackageLogger("pkg-quiet", tmp_path / "logs")
+
+    with patch.object(package_logger.json, "dumps") as dumps:
+        logger.log_step("UPLOAD", "Upload started", data={"file_size": 42})
+        dumps.assert_not_called()
+
+    (entry,) = logger.read_entries()
+    assert entry["message"] == "Upload started"
+    assert "data" not in entry
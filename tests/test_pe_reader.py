@@ -0,0 +1,129 @@
+"""Tests for the native PE resource reader."""
+
+import struct
+
+import pytest
+
+from src.app.metadata_extractor import MetadataExtractor
+from src.app.pe_reader import RT_VERSION, PeFormatError, PeImage, is_pe_image
+from tests.pe_builder import SECTION_ALIGNMENT, build_pe, version_resource
+
+VERSION_STRINGS = {
+    "CompanyName": "Contoso Ltd.",
+    "FileDescription": "Contoso Tools Setup",
+    "ProductName": "Contoso Tools",
+    "ProductVersion": "4, 2, 1, 0",
+    "LegalCopyright": "© Contoso",
+}
+
+MANIFEST = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<assembly xmlns="urn:schemas-microsoft-com:asm.v1" manifestVersion="1.0">
+  <assemblyIdentity name="Contoso.Tools.Setup" version="4.2.1.0" type="win32"/>
+  <trustInfo xmlns="urn:schemas-microsoft-com:asm.v3">
+    <security>
+      <requestedPrivileges>
+        <requestedExecutionLevel level="requireAdministrator" uiAccess="false"/>
+      </requestedPrivileges>
+    </security>
+  </trustInfo>
+</assembly>
+"""
+
+
+@pytest.fixture
+def setup_exe(tmp_path):
+    """A PE32+ image with version info, a manifest and an overlay."""
+    path = tmp_path / "setup.exe"
+    build_pe(
+        path,
+        version_strings=VERSION_STRINGS,
+        product_version=(4, 2, 1, 0),
+        manifest=MANIFEST,
+        overlay=b"\x00" * 4096,
+    )
+    return path
+
+
+def test_reads_version_info_and_manifest(setup_exe):
+    """StringFileInfo, VS_FIXEDFILEINFO and the manifest are decoded."""
+    with PeImage(str(setup_exe)) as pe:
+        assert pe.architecture == "x64"
+        assert [s.name for s in pe.sections] == [".text", ".rsrc"]
+        assert pe.overlay_offset() == pe.size - 4096
+        info = pe.version_info()
+        manifest = pe.manifest()
+
+    assert info["strings"]["ProductName"] == "Contoso Tools"
+    assert info["strings"]["LegalCopyright"] == "© Contoso"
+    assert info["product_version"] == "4.2.1.0"
+    assert manifest == {
+        "execution_level": "requireAdministrator",
+        "ui_access": "false",
+        "assembly_name": "Contoso.Tools.Setup",
+        "assembly_version": "4.2.1.0",
+    }
+
+
+def test_pe32_without_resources(tmp_path):
+    """Images without a resource section yield empty results."""
+    path = tmp_path / "plain.exe"
+    build_pe(path, machine=0x014C, pe32_plus=False)
+
+    with PeImage(str(path)) as pe:
+        assert pe.architecture == "x86"
+        assert pe.version_info() == {"strings": {}}
+        assert pe.manifest() == {}
+
+
+def test_rejects_non_pe(tmp_path):
+    """Files without a DOS/PE header raise PeFormatError."""
+    path = tmp_path / "fake.exe"
+    path.write_bytes(b"Sample EXE content")
+
+    assert not is_pe_image(str(path))
+    with pytest.raises(PeFormatError):
+        PeImage(str(path))
+
+
+def test_extractor_maps_version_info(setup_exe):
+    """EXE metadata comes from the version resource on every platform."""
+    extractor = MetadataExtractor()
+    metadata = extractor.extract_metadata(str(setup_exe))
+
+    assert metadata["product_name"] == "Contoso Tools"
+    assert metadata["version"] == "4.2.1.0"
+    assert metadata["publisher"] == "Contoso Ltd."
+    assert metadata["architecture"] == "x64"
+    details = metadata["installer_details"]
+    assert details["version_info"]["FileDescription"] == "Contoso Tools Setup"
+    assert details["manifest"]["execution_level"] == "requireAdministrator"
+
+    psadt = extractor.get_psadt_variables(metadata)
+    assert psadt["appName"] == "Contoso Tools"
+    assert psadt["appVendor"] == "Contoso Ltd."
+
+
+def test_self_referencing_resource_tree_is_bounded(tmp_path):
+    """Directories shared by many entries are walked and copied once."""
+    fanout = 300
+    dir_size = 16 + 8 * fanout
+    names, languages = dir_size, 2 * dir_size
+    leaf = 3 * dir_size
+    payload = version_resource(VERSION_STRINGS)
+    rva = 2 * SECTION_ALIGNMENT  # first extra section
+
+    rsrc = bytearray()
+    for entry_id, target in (
+        (RT_VERSION, 0x80000000 | names),
+        (1, 0x80000000 | languages),
+        (1033, leaf),
+    ):
+        rsrc += struct.pack("<IIHHHH", 0, 0, 0, 0, 0, fanout)
+        rsrc += struct.pack("<II", entry_id, target) * fanout
+    rsrc += struct.pack("<IIII", rva + leaf + 16, len(payload), 0, 0) + payload
+    path = tmp_path / "hostile.exe"
+    build_pe(path, extra_sections=[(".rsrc", bytes(rsrc))])
+
+    with PeImage(str(path)) as pe:
+        assert len(list(pe.resources(RT_VERSION))) == 1
+        assert pe.version_info()["strings"]["ProductName"] == "Contoso Tools"
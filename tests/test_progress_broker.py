@@ -0,0 +1,165 @@
+"""Tests for the package progress pub/sub broker."""
+
+import json
+import queue
+from unittest.mock import patch
+
+import pytest
+
+from src.app import create_app, progress_broker
+from src.app.database import (
+    create_package,
+    get_database_service,
+    update_package_status,
+)
+from src.app.progress_broker import ProgressBroker, get_progress_broker
+
+
+def _drain(subscription):
+    events = []
+    while True:
+        try:
+            events.append(subscription.get(timeout=0.01)[1])
+        except queue.Empty:
+            return events
+
+
+def test_all_subscribers_receive_events():
+    """Every tab subscribed to a package gets each event."""
+    broker = ProgressBroker(fanout_path=None)
+    first = broker.subscribe("pkg-1")
+    second = broker.subscribe("pkg-1")
+    other = broker.subscribe("pkg-2")
+
+    broker.publish("pkg-1", {"progress": 20})
+    broker.close("pkg-1")
+
+    assert _drain(first) == [{"progress": 20}, None]
+    assert _drain(second) == [{"progress": 20}, None]
+    assert _drain(other) == []
+
+
+def test_late_subscriber_is_replayed_recent_events():
+    """Events before subscribing come from the bounded replay buffer."""
+    broker = ProgressBroker(replay_size=3, fanout_path=None)
+    for step in range(5):
+        broker.publish("pkg-1", {"progress": step})
+
+    late = broker.subscribe("pkg-1")
+    assert _drain(late) == [{"progress": 2}, {"progress": 3}, {"progress": 4}]
+    assert broker.last_event("pkg-1") == {"progress": 4}
+
+    resumed = broker.subscribe("pkg-1", since=4)
+    assert _drain(resumed) == [{"progress": 4}]
+
+
+def test_slow_subscriber_drops_oldest_events():
+    """A full subscriber queue keeps the newest events and never blocks."""
+    broker = ProgressBroker(subscriber_queue_size=2, fanout_path=None)
+    slow = broker.subscribe("pkg-1")
+    for step in range(10):
+        broker.publish("pkg-1", {"progress": step})
+
+    assert _drain(slow) == [{"progress": 8}, {"progress": 9}]
+
+
+def test_closed_channels_are_cleaned_up():
+    """Finished channels are kept for late subscribers, then dropped."""
+    broker = ProgressBroker(retention=60, fanout_path=None)
+    broker.publish("pkg-1", {"status": "completed"})
+    broker.close("pkg-1")
+    assert _drain(broker.subscribe("pkg-1")) == [{"status": "completed"}, None]
+
+    with patch.object(progress_broker.time, "monotonic", return_value=1e12):
+        broker.publish("pkg-2", {"progress": 0})
+
+    assert "pkg-1" not in broker._channels
+    assert "pkg-2" in broker._channels
+
+
+def test_regeneration_reopens_channel():
+    """Publishing after close starts a fresh run without the old end marker."""
+    broker = ProgressBroker(fanout_path=None)
+    broker.publish("pkg-1", {"status": "failed"})
+    broker.close("pkg-1")
+    broker.publish("pkg-1", {"status": "processing"})
+
+    assert _drain(broker.subscribe("pkg-1")) == [{"status": "processing"}]
+
+
+def test_events_fan_out_between_processes(tmp_path):
+    """Brokers sharing a fan-out database see each other's events."""
+    path = str(tmp_path / "progress.db")
+    worker_a = ProgressBroker(fanout_path=path)
+    early = {"progress": 10}
+    worker_a.publish("pkg-1", early)
+    worker_b = ProgressBroker(fanout_path=path)
+    try:
+        # A worker started later backfills the channel from the database
+        remote = worker_b.subscribe("pkg-1")
+        assert _drain(remote) == [early]
+
+        worker_a.publish("pkg-1", {"progress": 50})
+        worker_b._fanout.poll()
+        seq, event = remote.get(timeout=1)
+        assert event == {"progress": 50}
+
+        local = worker_a.subscribe("pkg-1", since=seq - 1)
+        assert _drain(local) == [{"progress": 50}]
+    finally:
+        worker_a.stop()
+        worker_b.stop()
+
+
+def test_expired_channels_forget_their_backfill(tmp_path):
+    """Backfill bookkeeping is dropped with the channel it belongs to."""
+    broker = ProgressBroker(retention=60, fanout_path=str(tmp_path / "progress.db"))
+    try:
+        broker.publish("pkg-1", {"status": "completed"})
+        broker.close("pkg-1")
+        broker.subscribe("pkg-1").close()
+        assert "pkg-1" in broker._fanout._backfilled
+
+        with patch.object(progress_broker.time, "monotonic", return_value=1e12):
+            broker.publish("pkg-2", {"progress": 0})
+
+        assert "pkg-1" not in broker._channels
+        assert "pkg-1" not in broker._fanout._backfilled
+    finally:
+        broker.stop()
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a test client backed by a temporary database."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'progress.db'}"})
+    app.config["TESTING"] = True
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        get_database_service().create_tables()
+    return app.test_client()
+
+
+def test_stream_progress_replays_to_each_tab(client):
+    """Two progress pages opened late both get the events so far."""
+    broker = get_progress_broker()
+    broker.publish("job-1", {"status": "processing", "progress": 33})
+    broker.publish("job-1", {"status": "completed", "progress": 100})
+    broker.close("job-1")
+
+    for _tab in range(2):
+        body = client.get("/stream-progress/job-1").get_data(as_text=True)
+        events = [
+            json.loads(line[6:]) for line in body.split("\n") if line[:5] == "data:"
+        ]
+        assert [e["progress"] for e in events] == [33, 100]
+
+
+def test_stream_progress_of_finished_package(client):
+    """A package finished before the broker saw it reports its final state."""
+    with client.application.app_context():
+        package = create_package(filename="app.msi", file_path="/tmp/app.msi")
+        update_package_status(str(package.id), "completed")
+
+    body = client.get(f"/stream-progress/{package.id}").get_data(as_text=True)
+    assert json.loads(body[6:])["status"] == "completed"
@@ -0,0 +1,134 @@
+"""Tests for progress delivery over Socket.IO and the SSE fallback."""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.app import create_app, progress_stream
+from src.app.database import (
+    create_package,
+    get_database_service,
+    update_package_status,
+)
+from src.app.progress_broker import get_progress_broker
+from src.app.progress_stream import NAMESPACE
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create an application backed by a temporary database."""
+    app, _ = create_app(
+        {
+            "DATABASE_URL": f"sqlite:///{tmp_path / 'stream.db'}",
+            "PROGRESS_HEARTBEAT_INTERVAL": 0.05,
+        }
+    )
+    app.config["TESTING"] = True
+    with app.app_context():
+        get_database_service().create_tables()
+    return app
+
+
+def _progress(client):
+    return [
+        packet["args"][0]
+        for packet in client.get_received(NAMESPACE)
+        if packet["name"] == "progress"
+    ]
+
+
+def test_socket_subscribers_get_published_events(app):
+    """Events reach every subscribed socket without a per-client loop."""
+    socketio = app.extensions["socketio"]
+    tabs = [socketio.test_client(app, namespace=NAMESPACE) for _ in range(3)]
+    for tab in tabs:
+        tab.emit("subscribe", {"package_id": "job-socket"}, namespace=NAMESPACE)
+
+    seq = get_progress_broker().publish("job-socket", {"progress": 40})
+
+    for tab in tabs:
+        assert _progress(tab) == [{"id": seq, "data": {"progress": 40}}]
+        tab.disconnect(namespace=NAMESPACE)
+
+
+def test_socket_resume_replays_missed_events(app):
+    """A reconnecting client is sent only events after its last id."""
+    broker = get_progress_broker()
+    first = broker.publish("job-resume", {"progress": 10})
+    broker.publish("job-resume", {"progress": 20})
+    broker.publish("job-resume", {"progress": 30})
+
+    client = app.extensions["socketio"].test_client(app, namespace=NAMESPACE)
+    client.emit(
+        "subscribe",
+        {"package_id": "job-resume", "last_event_id": first},
+        namespace=NAMESPACE,
+    )
+
+    received = _progress(client)
+    assert [m["data"]["progress"] for m in received] == [20, 30]
+    client.disconnect(namespace=NAMESPACE)
+
+
+def test_socket_subscribe_with_invalid_last_event_id(app):
+    """A non-numeric last id subscribes without replaying buffered events."""
+    broker = get_progress_broker()
+    broker.publish("job-bad-id", {"progress": 10})
+
+    client = app.extensions["socketio"].test_client(app, namespace=NAMESPACE)
+    client.emit(
+        "subscribe",
+        {"package_id": "job-bad-id", "last_event_id": "not-a-number"},
+        namespace=NAMESPACE,
+    )
+    assert _progress(client) == []
+
+    seq = broker.publish("job-bad-id", {"progress": 20})
+    assert _progress(client) == [{"id": seq, "data": {"progress": 20}}]
+    client.disconnect(namespace=NAMESPACE)
+
+
+def test_socket_subscribe_to_finished_package(app):
+    """A finished package with nothing buffered sends its final state."""
+    with app.app_context():
+        package = create_package(filename="app.msi", file_path="/tmp/app.msi")
+        update_package_status(str(package.id), "failed")
+
+    client = app.extensions["socketio"].test_client(app, namespace=NAMESPACE)
+    client.emit("subscribe", {"package_id": str(package.id)}, namespace=NAMESPACE)
+
+    received = _progress(client)
+    assert received[0]["data"]["status"] == "failed"
+    assert received[-1]["data"] is None
+    client.disconnect(namespace=NAMESPACE)
+
+
+def test_sse_resumes_from_last_event_id_with_heartbeats(app):
+    """The SSE fallback honours Last-Event-ID and the heartbeat setting."""
+    broker = get_progress_broker()
+    first = broker.publish("job-sse", {"progress": 10})
+    second = broker.publish("job-sse", {"progress": 90})
+
+    response = app.test_client().get(
+        "/stream-progress/job-sse",
+        headers={"Last-Event-ID": str(first)},
+        buffered=False,
+    )
+    frames = response.response
+    assert next(frames) == f'id: {second}\ndata: {{"progress": 90}}\n\n'.encode()
+    assert next(frames) == b":\n\n"
+
+    broker.close("job-sse")
+    assert list(frames) == []
+    response.close()
+
+
+def test_sse_streams_are_capped(app):
+    """Beyond the limit SSE requests are refused instead of taking a thread."""
+    with patch.object(progress_stream, "_sse_slots") as slots:
+        slots.acquire.return_value = False
+        response = app.test_client().get("/stream-progress/job-capped")
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert "Socket.IO" in response.get_data(as_text=True)
@@ -0,0 +1,135 @@
+"""Query-plan regression tests for the hot database paths.
+
+Each test runs the real data-access code against SQLite, captures the SELECT
+statements it issues and asserts via ``EXPLAIN QUERY PLAN`` that none of them
+falls back to a full table scan or a temporary sort.
+"""
+
+import re
+
+import pytest
+from sqlalchemy import event
+
+from src.app import create_app
+from src.app.database import (
+    create_metadata,
+    create_package,
+    find_duplicate_metadata,
+    get_all_packages,
+    get_database_service,
+    get_package,
+)
+from src.aipackager.workflow import PackageRequest
+
+FULL_SCAN = re.compile(r"^SCAN (packages|metadata)$")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR ORDER BY")
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create an app backed by a file-based SQLite database."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'plans.db'}"})
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        get_database_service().create_tables()
+        for index in range(5):
+            package = create_package(f"app{index}.msi", f"/uploads/app{index}.msi")
+            create_metadata(
+                package.id,
+                product_name=f"App {index}",
+                version="1.0.0",
+                product_code=f"{{0000000{index}-0000-0000-0000-000000000000}}",
+                upgrade_code="{11111111-0000-0000-0000-000000000000}",
+            )
+        yield app
+
+
+def _capture_plans(func):
+    """Run ``func`` and return the query plan of every SELECT it issued."""
+    engine = get_database_service().engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert statements, "expected the hot path to issue at least one query"
+
+    plans = []
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for statement, parameters in statements:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append((statement, [row[3] for row in cursor.fetchall()]))
+    finally:
+        raw.close()
+    return plans
+
+
+def _assert_indexed(plans):
+    for statement, details in plans:
+        for detail in details:
+            assert not FULL_SCAN.match(detail), f"Full table scan: {statement}"
+            assert not TEMP_SORT.search(detail), f"Unindexed sort: {statement}"
+
+
+def test_resume_pending_jobs_uses_status_index(app):
+    """Resuming pending jobs must search by status, not scan packages."""
+    with app.app_context():
+        plans = _capture_plans(PackageRequest.resume_pending_jobs)
+    _assert_indexed(plans)
+    assert any(
+        "ix_packages_status_upload_time" in detail
+        for _, details in plans
+        for detail in details
+    )
+
+
+def test_history_listing_is_index_ordered(app):
+    """History ordering by upload_time must come straight from an index."""
+    with app.app_context():
+        plans = _capture_plans(get_all_packages)
+    _assert_indexed(plans)
+
+
+def test_package_and_metadata_load_use_indexes(app):
+    """Loading a package and its metadata must use the PK and package_id index."""
+    with app.app_context():
+        package_id = get_all_packages()[0].id
+        plans = _capture_plans(lambda: get_package(package_id))
+    _assert_indexed(plans)
+    assert any(
+        "ix_metadata_package_id" in detail for _, details in plans for detail in details
+    )
+
+
+def test_dedup_lookups_use_indexes(app):
+    """Product code/version and upgrade code lookups must be index searches."""
+    with app.app_context():
+        plans = _capture_plans(
+            lambda: find_duplicate_metadata(
+                product_code="{00000001-0000-0000-0000-000000000000}",
+                version="1.0.0",
+            )
+        )
+        plans += _capture_plans(
+            lambda: find_duplicate_metadata(
+                upgrade_code="{11111111-0000-0000-0000-000000000000}"
+            )
+        )
+        assert (
+            len(
+                find_duplicate_metadata(
+                    upgrade_code="{11111111-0000-0000-0000-000000000000}"
+                )
+            )
+            == 5
+        )
+    _assert_indexed(plans)
@@ -0,0 +1,93 @@
+"""Tests for the shared, precompiled Jinja environments."""
+
+import os
+import uuid
+from unittest.mock import patch
+
+import pytest
+from jinja2 import Environment
+
+from src.app import create_app, templating
+from src.app.models import Metadata, Package
+from src.app.script_renderer import ScriptRenderer
+from src.app.templating import (
+    PROMPTS,
+    PSADT,
+    get_environment,
+    precompile_templates,
+)
+
+
+@pytest.fixture
+def fresh_registry(tmp_path, monkeypatch):
+    """Empty registry with its bytecode cache in a temporary directory."""
+    monkeypatch.setattr(templating, "TEMPLATE_BYTECODE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(templating, "_environments", {})
+    monkeypatch.setattr(templating, "_auto_reload", False)
+    return tmp_path
+
+
+def _package():
+    return Package(
+        id=uuid.uuid4(),
+        filename="app.msi",
+        file_path="/tmp/app.msi",
+        package_metadata=Metadata(product_name="App", version="1.0"),
+    )
+
+
+def test_renderers_share_compiled_templates(fresh_registry):
+    """Renders after precompilation never compile a template."""
+    assert ScriptRenderer().psadt_env is ScriptRenderer().psadt_env
+    assert get_environment(PROMPTS) is not get_environment(PSADT)
+    assert precompile_templates() > 0
+
+    with patch.object(Environment, "compile", side_effect=AssertionError):
+        script = ScriptRenderer().render_psadt_script(
+            _package(), {"installation_tasks": ["Start-ADTMsiProcess"]}
+        )
+        get_environment(PROMPTS).get_template("instruction_processing.j2")
+
+    assert "Start-ADTMsiProcess" in script
+
+
+def test_bytecode_cache_survives_a_new_process(fresh_registry, monkeypatch):
+    """A fresh registry loads templates from the on-disk bytecode cache."""
+    precompile_templates()
+    assert list((fresh_registry / PSADT).glob("*.cache"))
+
+    monkeypatch.setattr(templating, "_environments", {})
+    with patch.object(Environment, "compile", side_effect=AssertionError):
+        template = get_environment(PSADT).get_template(
+            "psadt/Invoke-AppDeployToolkit.ps1.j2"
+        )
+    assert template is get_environment(PSADT).get_template(
+        "psadt/Invoke-AppDeployToolkit.ps1.j2"
+    )
+
+
+def test_auto_reload_follows_debug(fresh_registry):
+    """Only debug apps check templates for changes on disk."""
+    database_url = f"sqlite:///{fresh_registry / 'app.db'}"
+    create_app({"DEBUG": True, "DATABASE_URL": database_url})
+    assert get_environment(PSADT).auto_reload
+
+    create_app({"DATABASE_URL": database_url})
+    assert not get_environment(PSADT).auto_reload
+    assert not get_environment(PROMPTS).auto_reload
+
+
+def test_bytecode_cache_defaults_to_instance_folder(fresh_registry, monkeypatch):
+    """Without configuration the cache lives in the app's instance folder."""
+    monkeypatch.delenv("TEMPLATE_BYTECODE_CACHE_DIR", raising=False)
+    database_url = f"sqlite:///{fresh_registry / 'app.db'}"
+    with patch("src.app.set_bytecode_cache_dir") as set_dir:
+        app, _ = create_app({"DATABASE_URL": database_url})
+    set_dir.assert_called_once_with(os.path.join(app.instance_path, "jinja_cache"))
+
+    configured = str(fresh_registry / "configured")
+    create_app(
+        {"DATABASE_URL": database_url, "TEMPLATE_BYTECODE_CACHE_DIR": configured}
+    )
+    assert templating.TEMPLATE_BYTECODE_CACHE_DIR == configured
+    assert list((fresh_registry / "configured" / PSADT).glob("*.cache"))
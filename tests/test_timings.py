@@ -0,0 +1,209 @@
+"""Tests for pipeline stage timings and their percentiles."""
+
+from unittest.mock import patch
+
+from src.app import create_app
+from src.app.database import create_package, get_database_service
+from src.app.models import Package
+from src.app.schemas import InstructionResult, PSADTScript
+from src.app.services.metrics_service import MetricsService, percentile
+from src.app.services.script_generator import PSADTGenerator
+from src.app.workflow import timings
+from src.app.workflow.timings import (
+    DB_COMMIT,
+    LLM_CALL,
+    current_timer,
+    pipeline_timer,
+    substep,
+)
+
+GENERATOR = "src.app.services.script_generator"
+
+
+class _Clock:
+    """perf_counter stand-in advanced by hand."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_substeps_are_attributed_to_the_running_stage():
+    """Stage and sub-step durations come from the monotonic clock."""
+    clock = _Clock()
+    with patch.object(timings.time, "perf_counter", clock):
+        with pipeline_timer() as timer:
+            with timer.stage("instruction_processing"):
+                clock.now += 0.5
+                with substep(LLM_CALL):
+                    clock.now += 2.0
+            with substep(LLM_CALL):
+                clock.now += 1.0
+            with timer.stage("script_generation"):
+                for _ in range(2):
+                    with substep(LLM_CALL):
+                        clock.now += 1.5
+        result = timer.as_dict()
+
+    assert current_timer() is None
+    assert result["total"] == 6.5
+    assert result["stages"] == {
+        "instruction_processing": 2.5,
+        "script_generation": 3.0,
+    }
+    assert result["substeps"]["instruction_processing"][LLM_CALL] == {
+        "count": 1,
+        "seconds": 2.0,
+    }
+    assert result["substeps"]["script_generation"][LLM_CALL]["count"] == 2
+    assert result["substeps"]["other"][LLM_CALL]["seconds"] == 1.0
+
+
+def test_substep_outside_a_run_is_a_no_op():
+    """Services can time sub-steps unconditionally."""
+    with substep(LLM_CALL):
+        pass
+    assert current_timer() is None
+
+
+def test_db_commits_are_timed(tmp_path):
+    """Session commits during a run are recorded as a sub-step."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'timing.db'}"})
+    with app.app_context():
+        get_database_service().create_tables()
+        session = get_database_service().get_session()
+        try:
+            with pipeline_timer() as timer:
+                with timer.stage("rag_enrichment"):
+                    session.add(Package(filename="a.msi", file_path="/tmp/a.msi"))
+                    session.commit()
+            session.add(Package(filename="b.msi", file_path="/tmp/b.msi"))
+            session.commit()
+        finally:
+            session.close()
+
+    assert timer.substeps["rag_enrichment"][DB_COMMIT]["count"] == 1
+
+
+def test_percentiles_across_packages():
+    """p50/p95/p99 are reported for the total, stages and sub-steps."""
+    runs = [
+        {
+            "total": float(i),
+            "stages": {"script_generation": float(i)},
+            "substeps": {
+                "script_generation": {LLM_CALL: {"count": 1, "seconds": i / 2}}
+            },
+        }
+        for i in range(1, 101)
+    ]
+
+    report = MetricsService.aggregate_timings(runs)
+
+    assert report["total"] == {"count": 100, "p50": 50.5, "p95": 95.05, "p99": 99.01}
+    assert report["script_generation"]["p50"] == 50.5
+    assert report["script_generation.llm_call"]["p99"] == 49.505
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_display_metrics_use_recorded_timings():
+    """Stage times shown on the detail page are the measured ones."""
+    service = MetricsService(
+        {
+            "pipeline_metadata": {
+                "timings": {
+                    "total": 4.2,
+                    "stages": {"instruction_processing": 1.25},
+                    "substeps": {
+                        "instruction_processing": {
+                            LLM_CALL: {"count": 1, "seconds": 1.1}
+                        }
+                    },
+                }
+            }
+        }
+    )
+
+    metrics = service.get_display_metrics()
+
+    assert metrics["stage_times"]["stage_1_instruction_processing"] == 1.25
+    assert metrics["stage_times"]["stage_5_advisor_correction"] is None
+    assert metrics["substep_times"] == {"instruction_processing": {LLM_CALL: 1.1}}
+    assert metrics["overall_performance"]["total_pipeline_time"] == 4.2
+
+
+def test_stage_timings_api(tmp_path):
+    """The API aggregates the timings stored on packages."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'api.db'}"})
+    with app.app_context():
+        get_database_service().create_tables()
+        for seconds in (1.0, 3.0):
+            package = create_package(filename="a.msi", file_path="/tmp/a.msi")
+            session = get_database_service().get_session()
+            try:
+                stored = session.get(Package, package.id)
+                stored.pipeline_metadata = {
+                    "timings": {"total": seconds, "stages": {"rag": seconds}}
+                }
+                session.commit()
+            finally:
+                session.close()
+        create_package(filename="b.msi", file_path="/tmp/b.msi")
+
+    payload = app.test_client().get("/api/metrics/stage-timings").get_json()
+
+    assert payload["packages"] == 2
+    assert payload["percentiles"]["rag"]["p50"] == 2.0
+
+
+def test_generate_script_stores_timings(tmp_path):
+    """A pipeline run leaves its stage timings in pipeline_metadata."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'run.db'}"})
+    app.instance_path = str(tmp_path)
+    script = PSADTScript(
+        **{field: [] for field in PSADTScript.model_fields if field.endswith("tasks")}
+    )
+    with app.app_context():
+        get_database_service().create_tables()
+        package_id = create_package(filename="a.msi", file_path="/tmp/a.msi").id
+        session = get_database_service().get_session()
+        try:
+            package = session.get(Package, package_id)
+            with (
+                patch(f"{GENERATOR}.InstructionProcessor") as processor,
+                patch(f"{GENERATOR}.RAGService") as rag,
+                patch(f"{GENERATOR}.HallucinationDetector") as detector,
+                patch(f"{GENERATOR}.AdvisorService"),
+                patch.object(
+                    PSADTGenerator, "_generate_initial_script", return_value=script
+                ),
+            ):
+                processor.return_value.process_instructions.return_value = (
+                    InstructionResult(
+                        structured_instructions={},
+                        predicted_cmdlets=[],
+                        confidence_score=1.0,
+                    )
+                )
+                rag.return_value.query.return_value = "docs"
+                detector.return_value.detect.return_value = {
+                    "has_hallucinations": False
+                }
+                PSADTGenerator().generate_script(
+                    "Install", package=package, session=session
+                )
+            session.expire_all()
+            stored = session.get(Package, package_id).pipeline_metadata["timings"]
+        finally:
+            session.close()
+
+    assert set(stored["stages"]) == {
+        "instruction_processing",
+        "rag_enrichment",
+        "script_generation",
+        "hallucination_detection",
+    }
+    # Stage results are committed after the timed stage work
+    assert stored["substeps"]["other"][DB_COMMIT]["count"] >= 4
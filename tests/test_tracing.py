@@ -0,0 +1,178 @@
+"""Tests for pipeline span trees and their OTLP export."""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.app import create_app
+from src.app.database import create_package, get_database_service
+from src.app.models import Package
+from src.app.schemas import InstructionResult, PSADTScript
+from src.app.services.script_generator import PSADTGenerator
+from src.app.workflow.timings import DB_COMMIT, LLM_CALL, substep
+from src.app.workflow.tracing import (
+    pipeline_trace,
+    span,
+    to_otlp,
+    waterfall,
+)
+
+GENERATOR = "src.app.services.script_generator"
+
+
+def _by_name(trace):
+    return {s["name"]: s for s in trace["spans"]}
+
+
+def test_spans_nest_under_the_current_span():
+    """Spans opened inside another span become its children."""
+    with pipeline_trace("run", package_id="p1") as trace:
+        with span("stage_a"), substep(LLM_CALL, model="gpt-test"):
+            pass
+        with pytest.raises(ValueError), span("stage_b"):
+            raise ValueError("bad cmdlet")
+
+    spans = _by_name(trace.as_dict())
+    assert spans["run"]["parent"] is None
+    assert spans["run"]["attributes"] == {"package_id": "p1"}
+    assert spans["stage_a"]["parent"] == spans["run"]["id"]
+    assert spans[LLM_CALL]["parent"] == spans["stage_a"]["id"]
+    assert spans[LLM_CALL]["attributes"] == {"model": "gpt-test"}
+    assert spans["stage_b"]["status"] == "error"
+    assert spans["stage_b"]["error"] == "ValueError: bad cmdlet"
+    assert spans["run"]["duration"] >= spans["stage_a"]["duration"]
+
+
+def test_span_outside_a_trace_is_a_no_op():
+    """Services can open spans unconditionally."""
+    with span("stage") as record:
+        assert record is None
+
+
+def test_otlp_export():
+    """Stored traces convert to OTLP/JSON with absolute nanosecond times."""
+    trace = {
+        "trace_id": "ab" * 16,
+        "start_unix_nano": 1_000_000_000_000,
+        "spans": [
+            {
+                "id": "01" * 8,
+                "parent": None,
+                "name": "generate_script",
+                "start": 0.0,
+                "duration": 2.0,
+                "status": "ok",
+                "attributes": {"retries": 1, "model": "gpt-test"},
+            },
+            {
+                "id": "02" * 8,
+                "parent": "01" * 8,
+                "name": LLM_CALL,
+                "start": 0.5,
+                "duration": 1.25,
+                "status": "error",
+                "error": "Timeout: slow",
+                "attributes": {},
+            },
+        ],
+        "dropped": 0,
+    }
+
+    body = to_otlp(trace, {"package.id": "p1"})
+
+    resource_spans = body["resourceSpans"][0]
+    assert {"key": "package.id", "value": {"stringValue": "p1"}} in resource_spans[
+        "resource"
+    ]["attributes"]
+    root, child = resource_spans["scopeSpans"][0]["spans"]
+    assert root["parentSpanId"] == ""
+    assert root["endTimeUnixNano"] == "1002000000000"
+    assert {"key": "retries", "value": {"intValue": "1"}} in root["attributes"]
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["startTimeUnixNano"] == "1000500000000"
+    assert child["status"] == {"code": 2, "message": "Timeout: slow"}
+
+
+def test_waterfall_layout():
+    """Rows are depth-first with bars positioned relative to the run."""
+    trace = {
+        "spans": [
+            {"id": "r", "parent": None, "name": "run", "start": 0.0, "duration": 4.0},
+            {"id": "b", "parent": "r", "name": "b", "start": 2.0, "duration": 2.0},
+            {"id": "a", "parent": "r", "name": "a", "start": 0.0, "duration": 1.0},
+            {"id": "c", "parent": "a", "name": "c", "start": 0.5, "duration": 0.0},
+        ]
+    }
+
+    rows = waterfall(trace)
+
+    assert [(r["name"], r["depth"]) for r in rows] == [
+        ("run", 0),
+        ("a", 1),
+        ("c", 2),
+        ("b", 1),
+    ]
+    assert (rows[3]["offset"], rows[3]["width"]) == (50.0, 50.0)
+    assert rows[2]["width"] == 0.2
+    assert waterfall(None) == []
+
+
+def test_generate_script_stores_trace(tmp_path):
+    """A pipeline run stores its span tree, served by the trace API."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'trace.db'}"})
+    app.instance_path = str(tmp_path)
+    script = PSADTScript(
+        **{field: [] for field in PSADTScript.model_fields if field.endswith("tasks")}
+    )
+    with app.app_context():
+        get_database_service().create_tables()
+        package_id = create_package(filename="a.msi", file_path="/tmp/a.msi").id
+        session = get_database_service().get_session()
+        try:
+            package = session.get(Package, package_id)
+            with (
+                patch(f"{GENERATOR}.InstructionProcessor") as processor,
+                patch(f"{GENERATOR}.RAGService") as rag,
+                patch(f"{GENERATOR}.HallucinationDetector") as detector,
+                patch(f"{GENERATOR}.AdvisorService"),
+                patch.object(
+                    PSADTGenerator, "_generate_initial_script", return_value=script
+                ),
+            ):
+                processor.return_value.process_instructions.return_value = (
+                    InstructionResult(
+                        structured_instructions={},
+                        predicted_cmdlets=[],
+                        confidence_score=1.0,
+                    )
+                )
+                rag.return_value.query.return_value = "docs"
+                detector.return_value.detect.return_value = {
+                    "has_hallucinations": False
+                }
+                PSADTGenerator().generate_script(
+                    "Install", package=package, session=session
+                )
+            session.expire_all()
+            stored = session.get(Package, package_id)
+            trace = stored.trace
+            assert "trace" not in stored.pipeline_metadata
+            assert "timings" in stored.pipeline_metadata
+        finally:
+            session.close()
+
+    spans = _by_name(trace)
+    root = spans["generate_script"]
+    assert root["attributes"]["package_id"] == str(package_id)
+    assert spans["instruction_processing"]["parent"] == root["id"]
+    commits = [s for s in trace["spans"] if s["name"] == DB_COMMIT]
+    assert commits
+    assert {c["parent"] for c in commits} <= {s["id"] for s in trace["spans"]}
+
+    client = app.test_client()
+    response = client.get(f"/api/packages/{package_id}/trace")
+    assert response.status_code == 200
+    exported = response.get_json()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(exported) == len(trace["spans"])
+    detail = client.get(f"/detail/{package_id}").get_data(as_text=True)
+    assert 'class="trace-bar trace-instruction_processing' in detail
@@ -0,0 +1,246 @@
+"""Tests for content-addressed deduplication of uploads."""
+
+import hashlib
+import threading
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.app import create_app
+from src.app.database import (
+    create_metadata,
+    get_database_service,
+    get_package,
+    set_metadata_status,
+    update_package_status,
+)
+from src.app.metadata_extractor import EXTRACTOR_VERSION, MetadataExtractor
+from src.app.models import MetadataCacheEntry, Package, UploadBlob
+from src.app.workflow.metadata_stage import metadata_pending, wait_for_metadata
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a test client backed by a temporary instance directory."""
+    app, _ = create_app({"DATABASE_URL": f"sqlite:///{tmp_path / 'dedup.db'}"})
+    app.config["TESTING"] = True
+    app.instance_path = str(tmp_path)
+    with app.app_context():
+        get_database_service().create_tables()
+    return app.test_client()
+
+
+def _upload(client, content, filename, **form):
+    response = client.post(
+        "/api/packages", data={"installer": (BytesIO(content), filename), **form}
+    )
+    assert response.status_code == 200
+    payload = response.get_json()
+    with client.application.app_context():
+        assert wait_for_metadata(payload["package_id"], timeout=10)
+    return payload
+
+
+def _ref_count(client, sha256):
+    with client.application.app_context():
+        session = get_database_service().get_session()
+        try:
+            blob = session.get(UploadBlob, sha256)
+            return blob.ref_count if blob else 0
+        finally:
+            session.close()
+
+
+def test_reupload_reuses_stored_file_and_metadata(client):
+    """Identical uploads share one file and reuse the extracted metadata."""
+    first = _upload(client, b"Same installer", "app.msi")
+    second = _upload(client, b"Same installer", "app-copy.msi")
+
+    assert first["file_hash"] == second["file_hash"]
+    assert first["deduplicated"] is False
+    assert second["deduplicated"] is True
+    assert first["metadata_cached"] is False
+    assert second["metadata_cached"] is True
+    assert second["reused_from"] is None
+    assert _ref_count(client, first["file_hash"]) == 2
+
+    with client.application.app_context():
+        original = get_package(first["package_id"])
+        duplicate = get_package(second["package_id"])
+
+    assert duplicate.file_path == original.file_path
+    assert duplicate.file_hash == original.file_hash
+    assert duplicate.package_metadata is not None
+    assert duplicate.package_metadata.id != original.package_metadata.id
+
+
+def test_different_content_is_not_deduplicated(client):
+    """Different bytes get their own stored object and extraction run."""
+    first = _upload(client, b"Installer one", "app.msi")
+    second = _upload(client, b"Installer two", "app.msi")
+
+    assert first["file_hash"] != second["file_hash"]
+    assert second["deduplicated"] is False
+    assert _ref_count(client, first["file_hash"]) == 1
+
+
+def test_failed_upload_releases_stored_file(client):
+    """A failed registration drops its reference; the last one deletes the file."""
+    shared = _upload(client, b"Shared installer", "app.msi")
+
+    with patch(
+        "src.app.routes.start_metadata_stage", side_effect=RuntimeError("queue down")
+    ):
+        for content in (b"Shared installer", b"Lonely installer"):
+            response = client.post(
+                "/api/packages",
+                data={"installer": (BytesIO(content), "app.msi")},
+            )
+            assert response.status_code == 500
+
+    assert _ref_count(client, shared["file_hash"]) == 1
+    lonely = hashlib.sha256(b"Lonely installer").hexdigest()
+    assert _ref_count(client, lonely) == 0
+    store = Path(client.application.instance_path)
+    assert list(store.rglob(f"{shared['file_hash']}*"))
+    assert not list(store.rglob(f"{lonely}*"))
+    with client.application.app_context():
+        session = get_database_service().get_session()
+        try:
+            assert session.query(Package).count() == 1
+        finally:
+            session.close()
+
+
+def test_restart_requeues_lost_extractions(client):
+    """Extractions queued by a previous process are queued again on startup."""
+    with patch("src.app.routes.start_metadata_stage", return_value=False):
+        response = client.post(
+            "/api/packages",
+            data={"installer": (BytesIO(b"Interrupted installer"), "app.msi")},
+        )
+    package_id = response.get_json()["package_id"]
+
+    database_url = client.application.config["DATABASE_URL"]
+    with patch("src.aipackager.workflow.PackageRequest.resume_pending_jobs"):
+        create_app({"DATABASE_URL": database_url})
+
+    with client.application.app_context():
+        assert wait_for_metadata(package_id, timeout=10)
+        assert get_package(package_id).package_metadata is not None
+
+
+def test_cache_hit_skips_extraction(client):
+    """A cached installer is not handed to the extractor again."""
+    _upload(client, b"Cached installer", "app.msi")
+
+    with patch.object(MetadataExtractor, "extract_with_executables") as extract:
+        second = _upload(client, b"Cached installer", "app.msi")
+
+    assert second["metadata_cached"] is True
+    extract.assert_not_called()
+
+
+def test_extractor_version_bump_invalidates_cache(client):
+    """Entries from an older extractor version are not reused."""
+    first = _upload(client, b"Versioned installer", "app.msi")
+
+    with patch("src.app.workflow.metadata_stage.EXTRACTOR_VERSION", 99):
+        second = _upload(client, b"Versioned installer", "app.msi")
+
+    assert second["metadata_cached"] is False
+    with client.application.app_context():
+        session = get_database_service().get_session()
+        try:
+            versions = {
+                entry.extractor_version
+                for entry in session.query(MetadataCacheEntry).filter_by(
+                    sha256=first["file_hash"]
+                )
+            }
+        finally:
+            session.close()
+    assert versions == {EXTRACTOR_VERSION, 99}
+
+
+def test_reuse_script_copies_completed_results(client):
+    """With reuse_script the new package reuses a completed package's script."""
+    first = _upload(client, b"Packaged installer", "app.msi")
+    with client.application.app_context():
+        session = get_database_service().get_session()
+        try:
+            package = session.get(Package, get_package(first["package_id"]).id)
+            package.generated_script = {"install": ["Start-ADTMsiProcess"]}
+            session.commit()
+        finally:
+            session.close()
+        update_package_status(first["package_id"], "completed")
+
+    second = _upload(client, b"Packaged installer", "app.msi", reuse_script="1")
+
+    assert second["reused_from"] == first["package_id"]
+    assert second["status"] == "completed"
+    with client.application.app_context():
+        reused = get_package(second["package_id"])
+    assert reused.generated_script == {"install": ["Start-ADTMsiProcess"]}
+    assert reused.pipeline_metadata["reused_from"] == first["package_id"]
+
+
+def test_upload_returns_before_extraction_finishes(client):
+    """Extraction runs in the background; the upload does not wait for it."""
+    release = threading.Event()
+    original = MetadataExtractor.extract_with_executables
+
+    def slow_extract(self, file_path):
+        release.wait(timeout=10)
+        return original(self, file_path)
+
+    with patch.object(MetadataExtractor, "extract_with_executables", slow_extract):
+        response = client.post(
+            "/api/packages",
+            data={"installer": (BytesIO(b"Slow installer"), "slow.msi")},
+        )
+        payload = response.get_json()
+        package_id = payload["package_id"]
+
+        assert payload["metadata_status"] == "queued"
+        with client.application.app_context():
+            assert metadata_pending(package_id)
+            assert get_package(package_id).package_metadata is None
+
+            release.set()
+            assert wait_for_metadata(package_id, timeout=10)
+
+    with client.application.app_context():
+        assert not metadata_pending(package_id)
+        package = get_package(package_id)
+    assert package.package_metadata is not None
+    assert package.current_step == "extract_metadata"
+
+
+def _create_metadata_in(client, package_id):
+    with client.application.app_context():
+        create_metadata(package_id, product_name="Remote")
+
+
+def test_extraction_queued_by_another_process_is_awaited(client):
+    """Without a local extraction the stored metadata status is followed."""
+    with patch("src.app.routes.start_metadata_stage", return_value=False):
+        response = client.post(
+            "/api/packages",
+            data={"installer": (BytesIO(b"Remote installer"), "remote.msi")},
+        )
+    package_id = response.get_json()["package_id"]
+
+    with client.application.app_context():
+        assert not metadata_pending(package_id)
+        set_metadata_status(package_id, "queued")
+        assert metadata_pending(package_id)
+        assert not wait_for_metadata(package_id, timeout=0.1)
+
+        threading.Timer(0.2, _create_metadata_in, (client, package_id)).start()
+        assert wait_for_metadata(package_id, timeout=10)
+        assert not metadata_pending(package_id)
+        assert get_package(package_id).package_metadata.product_name == "Remote"